@@ -13,17 +13,35 @@ from src.controllers.auth_controller import auth_bp
 from src.controllers.journal_controller import journal_bp
 from src.controllers.notification_controller import notification_bp
 from src.controllers.weekly_survey_controller import weekly_survey_bp
+from src.controllers.admin_controller import admin_bp
 from src.database import db
+from src.config import DatabaseConfig
+from src.db_pool import instrument_engine
+from src.cache import cache
 
 def create_app():
     app = Flask(__name__)
 
     app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv("DATABASE_URL")
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-        "pool_pre_ping": True,
-        "pool_recycle": 300,
-    }
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = DatabaseConfig.engine_options()
+
+    # Optional read replica: read-only endpoints use it unless the user wrote within the
+    # stickiness window, which should comfortably exceed the replica's lag.
+    replica_url = os.getenv("DATABASE_REPLICA_URL")
+    if replica_url:
+        app.config["SQLALCHEMY_BINDS"] = {"replica": replica_url}
+        app.config["READ_REPLICA_STICKY_SECONDS"] = int(os.getenv("READ_REPLICA_STICKY_SECONDS", 15))
+
+    # Per-user response cache for dashboard reads. The memory backend can't see bumps from
+    # other processes, so its entries are capped at RESPONSE_CACHE_MEMORY_TTL seconds.
+    app.config["RESPONSE_CACHE_REDIS_URL"] = os.getenv("RESPONSE_CACHE_REDIS_URL", os.getenv("REDIS_URL"))
+    app.config["RESPONSE_CACHE_BACKEND"] = os.getenv(
+        "RESPONSE_CACHE_BACKEND", "redis" if app.config["RESPONSE_CACHE_REDIS_URL"] else "memory"
+    )
+    app.config["RESPONSE_CACHE_TTL"] = int(os.getenv("RESPONSE_CACHE_TTL", 900))
+    app.config["RESPONSE_CACHE_MAX_ENTRIES"] = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 1024))
+    app.config["RESPONSE_CACHE_MEMORY_TTL"] = int(os.getenv("RESPONSE_CACHE_MEMORY_TTL", 30))
 
     app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "default_secret_key")
     app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY", "default_jwt_secret")
@@ -45,6 +63,14 @@ def create_app():
          allow_headers=["Content-Type", "Authorization", "X-Requested-With"])
 
     db.init_app(app)
+    cache.init_app(app)
+
+    with app.app_context():
+        for engine in db.engines.values():
+            instrument_engine(
+                engine,
+                statement_timeout_ms=DatabaseConfig.statement_timeout_ms() if DatabaseConfig.pgbouncer() else None,
+            )
 
     jwt = JWTManager(app)
     
@@ -54,6 +80,7 @@ def create_app():
     app.register_blueprint(journal_bp)
     app.register_blueprint(notification_bp)
     app.register_blueprint(weekly_survey_bp)
+    app.register_blueprint(admin_bp)
 
     @app.route("/health", methods=["GET"])
     def health():
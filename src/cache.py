@@ -0,0 +1,226 @@
+import functools
+import hashlib
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, has_app_context
+
+from src.utils.timezone_utils import local_date
+
+
+class InProcessCacheBackend:
+    """
+    Thread-safe LRU cache with per-key TTL, local to one process.
+
+    Versions are per process too, so a bump from another web worker or a Celery task never
+    reaches this cache. Entries are therefore kept for at most `max_ttl` seconds, which
+    bounds how long a write made elsewhere can go unseen.
+    """
+
+    shared = False
+
+    def __init__(self, max_entries=1024, max_ttl=30):
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self._entries = OrderedDict()
+        # Versions live outside the LRU so eviction can never roll a user's version back
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        ttl = min(ttl, self.max_ttl)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_version(self, key):
+        with self._lock:
+            return self._versions.setdefault(key, time.time_ns())
+
+    def incr_version(self, key):
+        with self._lock:
+            self._versions[key] = self._versions.get(key, time.time_ns()) + 1
+            return self._versions[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+
+class RedisCacheBackend:
+    """Shared cache in Redis so web workers and Celery workers see the same versions."""
+
+    shared = True
+
+    def __init__(self, url):
+        import redis
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+    def get(self, key):
+        try:
+            raw = self.client.get(key)
+            return json.loads(raw) if raw is not None else None
+        except Exception as e:
+            print(f"[CACHE] Redis get failed: {e}", flush=True)
+            return None
+
+    def set(self, key, value, ttl):
+        try:
+            self.client.set(key, json.dumps(value), ex=ttl)
+        except Exception as e:
+            print(f"[CACHE] Redis set failed: {e}", flush=True)
+
+    def get_version(self, key):
+        # A missing version (never set, or evicted) restarts from the clock, so it can
+        # never collide with a version that cached responses were stored under before.
+        self.client.set(key, time.time_ns(), nx=True)
+        return int(self.client.get(key))
+
+    def incr_version(self, key):
+        self.client.set(key, time.time_ns(), nx=True)
+        return self.client.incr(key)
+
+
+class ResponseCache:
+    """
+    Per-user versioned cache for read endpoints.
+
+    Cached values are keyed by (endpoint, params, user data version, UTC day). Every write
+    to a user's journals or surveys bumps their version, so stale entries are never read
+    again and simply age out via TTL/LRU. With the in-process backend, bumps only reach
+    the process that made them, so its entries are capped at RESPONSE_CACHE_MEMORY_TTL
+    seconds; use the redis backend for full-length TTLs. The UTC day is part of the key because the
+    dashboard endpoints are relative to "today"; endpoints with a `tz` param use
+    the local day in that zone instead.
+    """
+
+    def __init__(self):
+        self.default_ttl = 900
+
+    def init_app(self, app):
+        backend_name = app.config.get("RESPONSE_CACHE_BACKEND", "memory")
+        max_entries = app.config.get("RESPONSE_CACHE_MAX_ENTRIES", 1024)
+        memory_ttl = app.config.get("RESPONSE_CACHE_MEMORY_TTL", 30)
+        self.default_ttl = app.config.get("RESPONSE_CACHE_TTL", self.default_ttl)
+
+        if backend_name == "redis":
+            backend = RedisCacheBackend(app.config["RESPONSE_CACHE_REDIS_URL"])
+        elif backend_name == "memory":
+            backend = InProcessCacheBackend(max_entries, memory_ttl)
+        else:
+            backend = None
+        app.extensions["response_cache"] = backend
+
+    @property
+    def backend(self):
+        if not has_app_context():
+            return None
+        return current_app.extensions.get("response_cache")
+
+    @staticmethod
+    def _version_key(user_id):
+        return f"user_version:{user_id}"
+
+    def get_user_version(self, user_id):
+        """Current data version for a user, or None when caching is disabled."""
+        backend = self.backend
+        if backend is None:
+            return None
+        try:
+            return backend.get_version(self._version_key(user_id))
+        except Exception as e:
+            print(f"[CACHE] Failed to read version for {user_id}: {e}", flush=True)
+            return None
+
+    def bump_user_version(self, user_id):
+        """Invalidate everything cached for a user. Call after the write has committed."""
+        backend = self.backend
+        if backend is None:
+            return
+        try:
+            backend.incr_version(self._version_key(user_id))
+            # Pins the user's reads to the primary while replicas catch up (see read_replica)
+            sticky_seconds = current_app.config.get("READ_REPLICA_STICKY_SECONDS")
+            if sticky_seconds and backend.shared:
+                backend.set(self._recent_write_key(user_id), 1, sticky_seconds)
+        except Exception as e:
+            print(f"[CACHE] Failed to bump version for {user_id}: {e}", flush=True)
+
+    @staticmethod
+    def _recent_write_key(user_id):
+        return f"recent_write:{user_id}"
+
+    def has_recent_write(self, user_id):
+        """
+        Whether the user wrote within the read-replica stickiness window.
+        Returns None when recent writes can't be tracked: caching is disabled, or the backend
+        is per process and would miss writes made by other workers and Celery.
+        """
+        backend = self.backend
+        if backend is None or not backend.shared:
+            return None
+        return backend.get(self._recent_write_key(user_id)) is not None
+
+    def cached(self, endpoint, ttl=None):
+        """
+        Cache a function's JSON-serializable result per user data version.
+        The wrapped function must take a `user_id` argument; all other arguments form the params.
+        """
+        def decorator(fn):
+            signature = inspect.signature(fn)
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                user_id = bound.arguments["user_id"]
+                version = self.get_user_version(user_id)
+                if version is None:
+                    return fn(*args, **kwargs)
+
+                params = {
+                    name: value for name, value in bound.arguments.items()
+                    if name not in ("cls", "self", "user_id")
+                }
+                key = self.build_key(endpoint, user_id, version, params)
+                hit = self.backend.get(key)
+                if hit is not None:
+                    return hit
+
+                result = fn(*args, **kwargs)
+                self.backend.set(key, result, ttl or self.default_ttl)
+                return result
+
+            return wrapper
+
+        return decorator
+
+    @staticmethod
+    def build_key(endpoint, user_id, version, params):
+        # Endpoints taking a `tz` param are relative to the user's local day
+        today = local_date(params.get("tz")).isoformat()
+        digest = hashlib.sha1(
+            json.dumps(params, sort_keys=True, default=str).encode()
+        ).hexdigest()[:16]
+        return f"resp:{endpoint}:{user_id}:{version}:{today}:{digest}"
+
+
+cache = ResponseCache()
@@ -17,8 +17,40 @@ celery_app.conf.update(
     worker_max_memory_per_child=450000, 
     task_acks_late=True,  
     worker_prefetch_multiplier=1,  
+
+    # Bulk import enrichment, account deletion and theme fitting run on their own queue so
+    # they can't starve per-entry enrichment
+    task_routes={
+        'src.tasks.enrich.enrich_journal_batch': {'queue': 'bulk'},
+        'src.tasks.account.delete_user_account': {'queue': 'bulk'},
+        'src.tasks.themes.fit_user_themes': {'queue': 'bulk'},
+    },
+
+    beat_schedule={
+        'refit-stale-themes': {
+            'task': 'src.tasks.themes.refit_stale_themes',
+            'schedule': 6 * 3600.0,  # Every 6 hours
+        },
+    },
 )
 
+_flask_app = None
+
+
+def get_flask_app():
+    """
+    Flask app for task code, created once per worker process so tasks reuse its engine
+    and connection pool instead of building new ones on every run.
+    """
+    global _flask_app
+    if _flask_app is None:
+        from src.app import create_app
+        _flask_app = create_app()
+    return _flask_app
+
+
 import src.tasks.enrich
+import src.tasks.account
+import src.tasks.themes
 import src.services.smart_scheduler
 import src.services.survey_scheduler 
\ No newline at end of file
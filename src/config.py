@@ -15,4 +15,133 @@ class Config:
     # Email Configuration
     SENDGRID_API_KEY = os.getenv("SENDGRID_API_KEY")
     FROM_EMAIL = os.getenv("FROM_EMAIL", "noreply@sentimeter.com")
-    EMAIL_PROVIDER = os.getenv("EMAIL_PROVIDER", "sendgrid")
\ No newline at end of file
+    EMAIL_PROVIDER = os.getenv("EMAIL_PROVIDER", "sendgrid")
+
+class DatabaseConfig:
+    """
+    SQLAlchemy engine profile, read from the environment.
+
+    DB_POOL_CLASS            queue (default) or null (no client-side pooling, e.g. behind PgBouncer)
+    DB_POOL_SIZE             persistent connections per process (default 5)
+    DB_MAX_OVERFLOW          extra connections allowed under load (default 10)
+    DB_POOL_TIMEOUT          seconds to wait for a connection before failing (default 30)
+    DB_POOL_RECYCLE          seconds before a connection is replaced (default 300)
+    DB_POOL_PRE_PING         test connections on checkout (default true)
+    DB_STATEMENT_TIMEOUT_MS  abort statements running longer than this (default off)
+    DB_PGBOUNCER             PgBouncer transaction pooling in front of Postgres (default false)
+    """
+
+    @staticmethod
+    def _flag(name, default):
+        return os.getenv(name, str(default)).strip().lower() in ("1", "true", "yes")
+
+    @classmethod
+    def pgbouncer(cls):
+        return cls._flag("DB_PGBOUNCER", False)
+
+    @classmethod
+    def statement_timeout_ms(cls):
+        return int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 0)) or None
+
+    @classmethod
+    def engine_options(cls):
+        from sqlalchemy.pool import NullPool
+        from src.db_pool import InstrumentedQueuePool
+
+        options = {
+            "pool_pre_ping": cls._flag("DB_POOL_PRE_PING", True),
+            "connect_args": {
+                "application_name": os.getenv(
+                    "DB_APPLICATION_NAME", "sentimeter-worker" if os.getenv("IS_CELERY_WORKER") else "sentimeter-web"
+                ),
+            },
+        }
+
+        if os.getenv("DB_POOL_CLASS", "queue") == "null":
+            options["poolclass"] = NullPool
+        else:
+            options.update({
+                "poolclass": InstrumentedQueuePool,
+                "pool_size": int(os.getenv("DB_POOL_SIZE", 5)),
+                "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 10)),
+                "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", 30)),
+                "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 300)),
+            })
+
+        # PgBouncer in transaction mode drops session settings between transactions, so the
+        # timeout is applied per transaction with SET LOCAL instead (see instrument_engine)
+        timeout = cls.statement_timeout_ms()
+        if timeout and not cls.pgbouncer():
+            options["connect_args"]["options"] = f"-c statement_timeout={timeout}"
+
+        return options
+
+
+class EmbeddingConfig:
+    """
+    How entry embeddings are stored and searched, read from the environment.
+
+    EMBEDDING_STORAGE            full (default), halfvec or binary. The compact modes keep a
+                                 quantized copy in `journals.embedding_compact`
+                                 (see src/scripts/quantize_embeddings.py) and search that
+    EMBEDDING_DIMENSIONS         dimensions kept in the compact copy (default 1536). Lower values
+                                 truncate and renormalize, which is what the OpenAI `dimensions`
+                                 parameter does for text-embedding-3 models
+    EMBEDDING_KEEP_FULL          keep the float32 `embedding` to rerank candidates (default true)
+    EMBEDDING_RERANK_CANDIDATES  candidates read from the compact index per result (default 10)
+    EMBEDDING_EF_SEARCH          HNSW search list size for compact searches (default 100); the
+                                 iterative scan grows it as needed to fill each user's results
+    """
+
+    FULL = "full"
+    HALFVEC = "halfvec"
+    BINARY = "binary"
+    FULL_DIMENSIONS = 1536
+
+    @classmethod
+    def storage(cls):
+        storage = os.getenv("EMBEDDING_STORAGE", cls.FULL).strip().lower()
+        if storage not in (cls.FULL, cls.HALFVEC, cls.BINARY):
+            raise ValueError(f"Unsupported EMBEDDING_STORAGE: {storage}")
+        return storage
+
+    @classmethod
+    def dimensions(cls):
+        dimensions = int(os.getenv("EMBEDDING_DIMENSIONS", cls.FULL_DIMENSIONS))
+        if not 1 <= dimensions <= cls.FULL_DIMENSIONS:
+            raise ValueError(f"EMBEDDING_DIMENSIONS must be between 1 and {cls.FULL_DIMENSIONS}")
+        return dimensions
+
+    @classmethod
+    def keep_full(cls):
+        return DatabaseConfig._flag("EMBEDDING_KEEP_FULL", True)
+
+    @classmethod
+    def rerank_candidates(cls):
+        return max(int(os.getenv("EMBEDDING_RERANK_CANDIDATES", 10)), 1)
+
+    @classmethod
+    def ef_search(cls):
+        return min(max(int(os.getenv("EMBEDDING_EF_SEARCH", 100)), 1), 1000)
+
+    @classmethod
+    def compact_type(cls, storage=None):
+        """Postgres type of the compact column, e.g. halfvec(512) or bit(512)."""
+        storage = storage or cls.storage()
+        return f"{'bit' if storage == cls.BINARY else 'halfvec'}({cls.dimensions()})"
+
+
+class AdminConfig:
+    """
+    Access to care-team/admin views, read from the environment.
+
+    ADMIN_USER_IDS  comma-separated user_ids (Google IDs) allowed to use /api/admin endpoints
+    """
+
+    @classmethod
+    def user_ids(cls):
+        return {value.strip() for value in os.getenv("ADMIN_USER_IDS", "").split(",") if value.strip()}
+
+    @classmethod
+    def is_admin(cls, user_id):
+        return user_id in cls.user_ids()
@@ -0,0 +1,63 @@
+from functools import wraps
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from src.config import AdminConfig
+from src.database import db
+from src.db_pool import pool_stats
+from src.utils.read_replica import read_replica
+from src.services.cohort_service import CohortService
+
+admin_bp = Blueprint("admin", __name__, url_prefix="/api/admin")
+
+
+def admin_required(fn):
+    """Only let users listed in ADMIN_USER_IDS through; use below `@jwt_required()`."""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not AdminConfig.is_admin(get_jwt_identity()):
+            return jsonify({"error": "Forbidden"}), 403
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+@admin_bp.route("/survey-cohort/weeks", methods=["GET"])
+@jwt_required()
+@admin_required
+@read_replica
+def get_survey_cohort_weeks():
+    """
+    Get per-week survey statistics across all users, newest first.
+
+    Endpoint: GET /api/admin/survey-cohort/weeks?limit=<1-104>&cursor=<week>&from=<YYYY-MM-DD>&to=<YYYY-MM-DD>
+
+    :return: JSON with `weeks` (respondents, completion and urgent rates, per-dimension score
+        distributions and averages) and `next_cursor` for the following page.
+    """
+    try:
+        result = CohortService.get_survey_weeks(
+            limit=request.args.get("limit", CohortService.DEFAULT_PAGE_SIZE, type=int),
+            cursor=request.args.get("cursor"),
+            start_date=request.args.get("from"),
+            end_date=request.args.get("to"),
+        )
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@admin_bp.route("/db-pool", methods=["GET"])
+@jwt_required()
+@admin_required
+def get_db_pool_stats():
+    """
+    Connection pool statistics for every database bind (primary and replicas).
+
+    Endpoint: GET /api/admin/db-pool
+
+    :return: JSON keyed by bind name.
+    """
+    return jsonify({
+        bind or "primary": pool_stats(engine) for bind, engine in db.engines.items()
+    }), 200
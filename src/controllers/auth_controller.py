@@ -1,6 +1,7 @@
 from flask import Blueprint, request, redirect, jsonify, make_response, url_for
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from src.models.user_model import User
+from src.utils.request_identity import current_user, REGISTERED_CLAIM
 
 
 import requests
@@ -87,7 +88,8 @@ def callback():
             User.save(google_id, email, name)
 
 
-        token = create_access_token(identity=google_id)
+        # The user row exists now, so existence checks can trust this token
+        token = create_access_token(identity=google_id, additional_claims={REGISTERED_CLAIM: True})
         print(f"Created JWT token for user: {google_id}", flush=True)
         print(f"Token length: {len(token)}", flush=True)
         
@@ -140,7 +142,7 @@ def user_info():
     try:
         identity = get_jwt_identity()
         print(f"JWT identity: {identity}", flush=True)
-        user = User.find_by_google_id(identity)
+        user = current_user(identity)
 
         if not user:
             print(f"User not found for identity: {identity}", flush=True)
@@ -157,6 +159,33 @@ def user_info():
         traceback.print_exc()
         return jsonify({"error": f"Failed to fetch user info: {str(e)}"}), 500
     
+@auth_bp.route("/account", methods=["DELETE"])
+@jwt_required()
+def delete_account():
+    """
+    Deletes the authenticated user's account and all of their data.
+
+    Deletion runs as a background job that removes journals in chunks, so accounts
+    with long histories don't tie up the request or hold locks for long.
+
+    Returns:
+        - 202 Accepted: A JSON object with the background task ID.
+        - 404 Not Found: If the user does not exist.
+        - 500 Error: A JSON object with an error message if scheduling fails.
+    """
+    try:
+        identity = get_jwt_identity()
+        if not User.find_by_google_id(identity):
+            return jsonify({"error": "User not found"}), 404
+
+        from src.tasks.account import delete_user_account
+        task = delete_user_account.delay(identity)
+        return jsonify({"message": "Account deletion started", "task_id": task.id}), 202
+    except Exception as e:
+        print(f"ACCOUNT DELETE ERROR: {str(e)}", flush=True)
+        return jsonify({"error": f"Failed to delete account: {str(e)}"}), 500
+
+
 @auth_bp.route("/authorize-calendar", methods=["GET"])
 def authorize_calendar():
     try:
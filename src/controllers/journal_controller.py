@@ -1,6 +1,13 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from src.utils.http_cache import conditional_get
+from src.utils.read_replica import read_replica
+from src.utils.timezone_utils import parse_time_range
 from src.services.journal_service import JournalService
+from src.services.journal_import_service import JournalImportService, ImportValidationError
+from src.services.journal_export_service import JournalExportService
+from src.services.theme_service import ThemeService
+from src.services.sentiment_analytics_service import SentimentAnalyticsService
 
 journal_bp = Blueprint("journal", __name__, url_prefix="/api/journals")
 
@@ -15,6 +22,15 @@ def extract_user_id():
     return identity
 
 
+def get_time_range_args():
+    """
+    Optional `from`/`to` filter shared by list endpoints, as a half-open range [from, to).
+    Only bounds that were supplied are returned, as `start`/`end` keyword arguments.
+    """
+    start, end = parse_time_range(request.args.get("from"), request.args.get("to"))
+    return {name: value for name, value in (("start", start), ("end", end)) if value is not None}
+
+
 def get_client_ip():
     """
     Get the real client IP address from the 'X-Forwarded-For' header.
@@ -62,22 +78,113 @@ def create_journal_entry():
         return jsonify({"error": str(e)}), 500
 
 
+@journal_bp.route("/import", methods=["POST"])
+@jwt_required()
+def import_journal_entries():
+    """
+    Bulk import journal entries, e.g. when migrating from another journaling app.
+
+    Endpoint: POST /api/journals/import?format=<json|ndjson|csv>
+
+    The body is a JSON array (or {"entries": [...]}), NDJSON, or CSV with an `entry`, `date`
+    and optional `latitude`/`longitude` columns. Each row needs `entry` and `date`.
+    The format defaults from the Content-Type. The whole import is validated first;
+    if any row is invalid nothing is inserted.
+
+    :return: 202 with the import's progress, or 400 with per-row `errors`.
+    """
+    user_id = extract_user_id()
+    try:
+        fmt = JournalImportService.detect_format(request.mimetype, request.args.get("format"))
+        result = JournalImportService.import_entries(user_id, request.get_data(as_text=True), fmt)
+        return jsonify({"message": "Import accepted", "import": result}), 202
+    except ImportValidationError as e:
+        return jsonify({"error": str(e), "errors": e.errors}), 400
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@journal_bp.route("/import/<import_id>", methods=["GET"])
+@jwt_required()
+@read_replica
+def get_import_status(import_id):
+    """
+    Report progress of a bulk import.
+
+    Endpoint: GET /api/journals/import/<import_id>
+
+    :return: JSON with status, total_rows and enriched_rows, or 404.
+    """
+    user_id = extract_user_id()
+    try:
+        job = JournalImportService.get_import(user_id, import_id)
+        if not job:
+            return jsonify({"error": "Import not found"}), 404
+        return jsonify(job), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@journal_bp.route("/export", methods=["GET"])
+@jwt_required()
+@read_replica
+def export_journal_entries():
+    """
+    Stream the authenticated user's entire journal as a download.
+
+    Endpoint: GET /api/journals/export?format=<ndjson|csv>&embeddings=<true|false>&gzip=<true|false>
+
+    Query Parameters:
+    - `format`: ndjson (default) or csv.
+    - `embeddings`: Include each entry's embedding vector (default: false).
+    - `gzip`: Compress the download on the fly (default: false).
+
+    :return: Streamed file attachment, oldest entry first.
+    """
+    user_id = extract_user_id()
+    fmt = request.args.get("format", "ndjson")
+    include_embeddings = request.args.get("embeddings", "false").lower() == "true"
+    compress = request.args.get("gzip", "false").lower() == "true"
+
+    try:
+        chunks = JournalExportService.export(user_id, fmt, include_embeddings, compress)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    filename = f"journal-export.{fmt}" + (".gz" if compress else "")
+    return Response(
+        stream_with_context(chunks),
+        mimetype="application/gzip" if compress else JournalExportService.MIMETYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @journal_bp.route("", methods=["GET"])
 @jwt_required()
+@read_replica
+@conditional_get
 def get_all_journal_entries():
     """
     Retrieve all journal entries for the authenticated user.
     
-    Endpoint: GET /api/journals
+    Endpoint: GET /api/journals?from=<date or datetime>&to=<date or datetime>
+
+    Query Parameters:
+    - `from`: Optional inclusive start (YYYY-MM-DD or ISO datetime, UTC if no offset).
+    - `to`: Optional exclusive end.
     
     :return: JSON response with a list of all journal entries or a 404 message if none found.
     """
     user_id = extract_user_id()
     try:
-        journal_entries = JournalService.get_all_journal_entries(user_id)
+        journal_entries = JournalService.get_all_journal_entries(user_id, **get_time_range_args())
         if not journal_entries:
             return jsonify({"message": "No journal entries found"}), 404
         return jsonify({"message": "Journal entries retrieved", "entries": journal_entries}), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -95,7 +202,7 @@ def delete_journal_entry(entry_id):
     """
     user_id = extract_user_id()
     try:
-        success = JournalService.delete_journal_entry(entry_id)
+        success = JournalService.delete_journal_entry(user_id, entry_id)
         if not success:
             return jsonify({"error": "Journal entry not found"}), 404
         return jsonify({"message": "Journal entry deleted successfully"}), 200
@@ -103,26 +210,55 @@ def delete_journal_entry(entry_id):
         return jsonify({"error": str(e)}), 500
 
 
+@journal_bp.route("/batch-delete", methods=["POST"])
+@jwt_required()
+def delete_journal_entries():
+    """
+    Delete many of the authenticated user's journal entries in one request.
+
+    Endpoint: POST /api/journals/batch-delete
+    Body: {"entry_ids": ["<uuid>", ...]} (at most 1000)
+
+    :return: JSON with the `deleted` IDs and the IDs that were `not_found` (missing or
+        owned by another user), or 400 for an invalid request.
+    """
+    user_id = extract_user_id()
+    data = request.get_json(silent=True) or {}
+    try:
+        result = JournalService.delete_journal_entries(user_id, data.get("entry_ids"))
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @journal_bp.route("/recent", methods=["GET"])
 @jwt_required()
+@read_replica
+@conditional_get
 def get_recent_entries():
     """
     Retrieve the most recent journal entries for the authenticated user.
     
-    Endpoint: GET /api/journals/recent
+    Endpoint: GET /api/journals/recent?from=<date or datetime>&to=<date or datetime>
     
     :return: JSON response with the most recent journal entries.
     """
     user_id = extract_user_id()
     try:
-        entries = JournalService.get_recent_entries(user_id)
+        entries = JournalService.get_recent_entries(user_id, **get_time_range_args())
         return jsonify(entries), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 @journal_bp.route("/filter", methods=["GET"])
 @jwt_required()
+@read_replica
+@conditional_get
 def get_entries_by_time():
     """
     Retrieve journal entries for a specific year and month.
@@ -149,6 +285,8 @@ def get_entries_by_time():
 
 @journal_bp.route("/heatmap", methods=["GET"])
 @jwt_required()
+@read_replica
+@conditional_get
 def get_heatmap_data():
     """
     Retrieve heatmap data for the authenticated user's journal entries.
@@ -167,6 +305,8 @@ def get_heatmap_data():
 
 @journal_bp.route("/sentiments", methods=["GET"])
 @jwt_required()
+@read_replica
+@conditional_get
 def get_dashboard_sentiments():
     """
     Retrieve sentiment analysis data for the authenticated user's dashboard.
@@ -183,10 +323,97 @@ def get_dashboard_sentiments():
         return jsonify({"error": str(e)}), 500
 
 
+@journal_bp.route("/sentiments/aggregate", methods=["GET"])
+@jwt_required()
+@read_replica
+@conditional_get
+def get_sentiment_aggregates():
+    """
+    Retrieve sentiment statistics bucketed by day, week or month.
+
+    Endpoint: GET /api/journals/sentiments/aggregate?granularity=<day|week|month>&from=<YYYY-MM-DD>&to=<YYYY-MM-DD>
+
+    Query Parameters:
+    - `granularity`: Bucket size, one of day, week, month (default: day).
+    - `from`: Inclusive start date (default: one year before `to`).
+    - `to`: Exclusive end date (default: tomorrow, UTC).
+
+    :return: JSON response with average, count, min and max sentiment per bucket.
+    """
+    user_id = extract_user_id()
+    granularity = request.args.get("granularity", "day")
+    if granularity not in ("day", "week", "month"):
+        return jsonify({"error": "granularity must be one of 'day', 'week', 'month'"}), 400
+
+    try:
+        result = JournalService.get_sentiment_aggregates(
+            user_id, granularity, request.args.get("from"), request.args.get("to")
+        )
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@journal_bp.route("/sentiments/analytics", methods=["GET"])
+@jwt_required()
+@read_replica
+@conditional_get
+def get_sentiment_analytics():
+    """
+    Retrieve sentiment trend analytics computed from the daily rollup.
+
+    Endpoint: GET /api/journals/sentiments/analytics?from=<YYYY-MM-DD>&to=<YYYY-MM-DD>
+
+    Query Parameters:
+    - `from`: Inclusive start date (default: 365 days before `to`).
+    - `to`: Exclusive end date (default: tomorrow, UTC). Ranges are limited to 3650 days.
+
+    :return: JSON with a summary, a daily series (rolling 7/30-day means, EWMA, 30-day
+        volatility, anomaly flag), weekly averages with week-over-week deltas, anomalies
+        and change points.
+    """
+    user_id = extract_user_id()
+    try:
+        result = SentimentAnalyticsService.get_analytics(user_id, request.args.get("from"), request.args.get("to"))
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@journal_bp.route("/weather/mood", methods=["GET"])
+@jwt_required()
+@read_replica
+@conditional_get
+def get_weather_mood():
+    """
+    Retrieve how the user's mood varies with the weather at the time of writing.
+
+    Endpoint: GET /api/journals/weather/mood?band=<1-20>
+
+    Query Parameters:
+    - `band`: Width of the temperature bands in °C (default: 5).
+
+    :return: JSON with the overall average sentiment and per weather condition and
+        temperature band averages, counts and differences from the overall average.
+    """
+    user_id = extract_user_id()
+    try:
+        band_width = request.args.get("band", JournalService.WEATHER_BAND_WIDTH, type=int)
+        return jsonify(JournalService.get_weather_mood(user_id, band_width)), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
 
 @journal_bp.route("/keywords", methods=["GET"])
 @jwt_required()
+@read_replica
+@conditional_get
 def get_top_keywords():
     """
     Retrieve the top N most common keywords for a user.
@@ -204,29 +431,68 @@ def get_top_keywords():
 
 @journal_bp.route("/search/keyword", methods=["GET"])
 @jwt_required()
+@read_replica
+@conditional_get
 def get_entries_by_keyword():
     """
-    Retrieve journal entries by keyword for a specific user.
-
-    Endpoint: GET /api/journals/entries/keyword?keyword=<keyword>
-    :query_param keyword: The keyword to filter entries by.
-    :return: JSON response containing the matching journal entries.
+    Retrieve journal entries by keyword for a specific user, newest first.
+
+    Endpoint: GET /api/journals/search/keyword?keyword=<keyword>&cursor=<cursor>&limit=<limit>&from=<from>&to=<to>
+    :query_param keyword: The keyword to filter entries by (case-insensitive).
+    :query_param cursor: Optional `next_cursor` from a previous page.
+    :query_param limit: Optional page size (default 20, max 100).
+    :query_param from: Optional inclusive start date or datetime.
+    :query_param to: Optional exclusive end date or datetime.
+    :return: JSON response containing the matching journal entries and the next cursor.
     """
     user_id = extract_user_id()
     keyword = request.args.get("keyword")
+    cursor = request.args.get("cursor")
+    limit = request.args.get("limit", type=int)
 
-    if not keyword:
+    if not keyword or not keyword.strip():
         return jsonify({"error": "Keyword parameter is required."}), 400
 
     try:
-        entries = JournalService.get_entries_by_keyword(user_id, keyword)
-        return jsonify({"entries": entries}), 200
+        entries, next_cursor = JournalService.get_entries_by_keyword(
+            user_id, keyword, cursor, limit, **get_time_range_args()
+        )
+        return jsonify({"entries": entries, "next_cursor": next_cursor}), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@journal_bp.route("/keywords/suggest", methods=["GET"])
+@jwt_required()
+@read_replica
+@conditional_get
+def suggest_keywords():
+    """
+    Autocomplete keywords by prefix, with fuzzy matching for typos.
+
+    Endpoint: GET /api/journals/keywords/suggest?q=<prefix>&limit=<limit>
+    :return: JSON response with matching keywords and how often each was used.
+    """
+    user_id = extract_user_id()
+    prefix = request.args.get("q", "")
+    limit = request.args.get("limit", default=10, type=int)
+
+    if not prefix.strip():
+        return jsonify({"error": "Query parameter 'q' is required."}), 400
+
+    try:
+        suggestions = JournalService.suggest_keywords(user_id, prefix, min(max(limit, 1), 50))
+        return jsonify({"keywords": suggestions}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
 
 @journal_bp.route("/search/date", methods=["GET"])
 @jwt_required()
+@read_replica
+@conditional_get
 def get_entries_by_month():
     """
     Retrieve journal entries for a specific month and year.
@@ -252,6 +518,7 @@ def get_entries_by_month():
 
 @journal_bp.route("/search/semantic", methods=["GET", "OPTIONS"])
 @jwt_required()
+@read_replica
 def get_entries_by_semantic_search():
     if request.method == "OPTIONS":
         return jsonify({}), 200
@@ -270,13 +537,69 @@ def get_entries_by_semantic_search():
         return jsonify({"error": f"Search failed: {str(e)}"}), 500
 
 
+@journal_bp.route("/<entry_id>/similar", methods=["GET"])
+@jwt_required()
+@read_replica
+@conditional_get
+def get_similar_entries(entry_id):
+    """
+    Find entries similar to one of the user's entries, using its stored embedding.
+
+    Endpoint: GET /api/journals/<entry_id>/similar?top_k=<1-50>&from=<date or datetime>&to=<date or datetime>
+
+    :param entry_id: The entry to find related entries for; it is excluded from the results.
+    :return: JSON with `entries`, nearest first. Empty while the entry is still being enriched.
+    """
+    user_id = extract_user_id()
+    try:
+        top_k = request.args.get("top_k", 5, type=int)
+        entries = JournalService.get_similar_entries(user_id, entry_id, top_k, **get_time_range_args())
+        if entries is None:
+            return jsonify({"error": "Journal entry not found"}), 404
+        return jsonify({"entries": entries}), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@journal_bp.route("/themes", methods=["GET"])
+@jwt_required()
+@read_replica
+@conditional_get
+def get_themes():
+    """
+    Retrieve the user's precomputed themes: clusters of related entries, refit in the background.
+
+    Endpoint: GET /api/journals/themes
+
+    :return: JSON with `themes` (label, keywords, entry count and most recent entries of each)
+        and `fitted_at`. Themes appear once the user has enough enriched entries.
+    """
+    user_id = extract_user_id()
+    try:
+        return jsonify(ThemeService.get_themes(user_id)), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @journal_bp.route("/streak", methods=["GET"])
 @jwt_required()
+@read_replica
+@conditional_get
 def get_streak():
     """
     Calculate and return the user's journaling streak statistics.
-    Endpoint: GET /api/journals/streak
+    Endpoint: GET /api/journals/streak?tz=<IANA timezone>
+
+    Query Parameters:
+    - `tz`: Optional timezone (e.g. America/Toronto) to count streaks by local day instead of UTC.
     """
     user_id = extract_user_id()
-    stats = JournalService.get_streak_stats(user_id)
-    return jsonify(stats), 200
\ No newline at end of file
+    try:
+        stats = JournalService.get_streak_stats(user_id, request.args.get("tz"))
+        return jsonify(stats), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
\ No newline at end of file
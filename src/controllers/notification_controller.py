@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from src.services.notification_service import NotificationService
-from src.models.user_model import User
+from src.utils.request_identity import current_user
 
 notification_bp = Blueprint('notification', __name__, url_prefix='/api/notifications')
 notification_service = NotificationService()
@@ -14,8 +14,8 @@ def get_notification_settings():
     try:
         user_id = get_jwt_identity()
         
-        # Check if user exists
-        user = User.find_by_google_id(user_id)
+        # Check if user exists (the service reuses this lookup)
+        user = current_user(user_id)
         if not user:
             return jsonify({"error": "User not found"}), 404
         
@@ -42,8 +42,8 @@ def update_notification_settings():
     try:
         user_id = get_jwt_identity()
         
-        # Check if user exists
-        user = User.find_by_google_id(user_id)
+        # Check if user exists (the service reuses this lookup)
+        user = current_user(user_id)
         if not user:
             return jsonify({"error": "User not found"}), 404
         
@@ -117,8 +117,8 @@ def send_test_email():
     try:
         user_id = get_jwt_identity()
         
-        # Check if user exists
-        user = User.find_by_google_id(user_id)
+        # Check if user exists (the service reuses this lookup)
+        user = current_user(user_id)
         if not user:
             return jsonify({"error": "User not found"}), 404
         
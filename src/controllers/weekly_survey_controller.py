@@ -1,5 +1,7 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from src.utils.http_cache import conditional_get
+from src.utils.read_replica import read_replica
 from src.services.weekly_survey_service import WeeklySurveyService
 
 weekly_survey_bp = Blueprint("weekly_survey", __name__, url_prefix="/api/weekly-surveys")
@@ -54,6 +56,8 @@ def create_weekly_survey():
 
 @weekly_survey_bp.route("", methods=["GET"])
 @jwt_required()
+@read_replica
+@conditional_get
 def get_weekly_surveys():
     """
     Retrieve weekly surveys for the authenticated user.
@@ -83,6 +87,8 @@ def get_weekly_surveys():
 
 @weekly_survey_bp.route("/check", methods=["GET"])
 @jwt_required()
+@read_replica
+@conditional_get
 def check_survey_exists():
     """
     Check if user has already completed a survey this week.
@@ -102,25 +108,46 @@ def check_survey_exists():
 
 @weekly_survey_bp.route("/missing-weeks", methods=["GET"])
 @jwt_required()
+@read_replica
+@conditional_get
 def get_missing_weeks():
     """
-    Get list of missing weeks for the user (for week picker).
+    Get list of missing weeks for the user (for week picker), newest first.
     
     Endpoint: GET /api/weekly-surveys/missing-weeks
     
-    :return: JSON response with list of missing week dates.
+    Query Parameters:
+    - from: Optional inclusive start date (YYYY-MM-DD). Defaults to the last 8 weeks.
+    - to: Optional exclusive end date (YYYY-MM-DD)
+    - limit: Page size (default and max: 104)
+    - cursor: `next_cursor` from the previous page
+    
+    :return: JSON response with list of missing week dates and the next page cursor.
     """
     user_id = extract_user_id()
     
+    # Only pass what was supplied so the service defaults apply otherwise
+    options = {
+        name: request.args.get(arg)
+        for name, arg in (("start_date", "from"), ("end_date", "to"), ("cursor", "cursor"))
+        if request.args.get(arg)
+    }
+    if "limit" in request.args:
+        options["limit"] = request.args.get("limit", type=int) or 0
+    
     try:
-        missing_weeks = WeeklySurveyService.get_missing_weeks(user_id)
-        return jsonify({"missing_weeks": missing_weeks}), 200
+        result = WeeklySurveyService.get_missing_weeks(user_id, **options)
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": "Failed to get missing weeks"}), 500
 
 
 @weekly_survey_bp.route("/summary", methods=["GET"])
 @jwt_required()
+@read_replica
+@conditional_get
 def get_survey_summary():
     """
     Get survey summary with computed statistics for dashboard.
@@ -129,8 +156,9 @@ def get_survey_summary():
     
     Query Parameters:
     - weeks: Number of weeks to include (default: 12)
+    - ranges: Optional comma-separated week counts (e.g. 4,12,52) to also compute statistics for
     
-    :return: JSON response with weeks data and computed statistics.
+    :return: JSON response with weeks data and computed statistics, plus `ranges` when requested.
     """
     user_id = extract_user_id()
     
@@ -141,8 +169,15 @@ def get_survey_summary():
     if weeks < 1 or weeks > 52:  # Reasonable limits
         return jsonify({"error": "Weeks parameter must be between 1 and 52"}), 400
     
+    options = {}
+    if request.args.get("ranges"):
+        try:
+            options["ranges"] = [int(value) for value in request.args["ranges"].split(",")]
+        except ValueError:
+            return jsonify({"error": "Ranges must be comma-separated week counts"}), 400
+    
     try:
-        summary = WeeklySurveyService.get_survey_summary(user_id, weeks)
+        summary = WeeklySurveyService.get_survey_summary(user_id, weeks, **options)
         return jsonify(summary), 200
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
@@ -150,6 +185,34 @@ def get_survey_summary():
         return jsonify({"error": "Failed to get survey summary"}), 500
 
 
+@weekly_survey_bp.route("/timeline", methods=["GET"])
+@jwt_required()
+@read_replica
+@conditional_get
+def get_weekly_timeline():
+    """
+    Get survey scores and journal sentiment side by side for each week, with correlations.
+    
+    Endpoint: GET /api/weekly-surveys/timeline
+    
+    Query Parameters:
+    - weeks: Number of weeks to include (default: 12, max: 104)
+    
+    :return: JSON response with per-week survey scores, entry counts and average journal
+        sentiment, and the correlation between journal sentiment and each survey score.
+    """
+    user_id = extract_user_id()
+    weeks = request.args.get("weeks", 12, type=int)
+    
+    try:
+        timeline = WeeklySurveyService.get_weekly_timeline(user_id, weeks)
+        return jsonify(timeline), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": "Failed to get weekly timeline"}), 500
+
+
 @weekly_survey_bp.route("/test-reminder", methods=["POST"])
 @jwt_required()
 def test_survey_reminder():
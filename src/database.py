@@ -1,5 +1,39 @@
+from flask import g, has_app_context
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.elements import TextClause
 
-db = SQLAlchemy()
+REPLICA_BIND = "replica"
 
-Base = db.Model
\ No newline at end of file
+
+class RoutingSession(Session):
+    """
+    Sends reads to the `replica` bind while a request has opted in (see
+    `src.utils.read_replica.read_replica`). Flushes, INSERT/UPDATE/DELETE statements,
+    SELECT ... FOR UPDATE and raw text() SQL (which may be DML) always go to the primary,
+    as does everything outside such requests.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and use_read_replica() and not is_write(clause):
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def use_read_replica():
+    return has_app_context() and g.get("use_read_replica", False)
+
+
+def is_write(clause):
+    return (
+        isinstance(clause, (UpdateBase, TextClause))
+        or getattr(clause, "_for_update_arg", None) is not None
+    )
+
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+
+Base = db.Model
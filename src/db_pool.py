@@ -0,0 +1,146 @@
+"""
+Connection pool instrumentation: counters fed by pool events plus acquire-time tracking,
+exposed through `pool_stats` for the admin-only /api/admin/db-pool endpoint.
+"""
+
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+# Acquires slower than this are counted as waits for a connection
+SLOW_ACQUIRE_SECONDS = 0.05
+
+
+class PoolMetrics:
+    """Thread-safe counters for one engine's pool. Survive pool recreation on dispose."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.overflow_checkouts = 0
+        self._connected_at = {}
+
+    def record_acquire(self, seconds, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            if seconds >= SLOW_ACQUIRE_SECONDS:
+                self.waits += 1
+                self.wait_seconds += seconds
+                self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+            self._connected_at[id(connection_record)] = time.monotonic()
+
+    def on_checkout(self, pool, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+            if isinstance(pool, QueuePool) and pool.checkedout() > pool.size():
+                self.overflow_checkouts += 1
+
+    def on_close(self, dbapi_connection, connection_record):
+        with self._lock:
+            self._connected_at.pop(id(connection_record), None)
+
+    def on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self._lock:
+            ages = [now - connected_at for connected_at in self._connected_at.values()]
+            return {
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "overflow_checkouts": self.overflow_checkouts,
+                "timeouts": self.timeouts,
+                "waits": self.waits,
+                "wait_seconds_total": round(self.wait_seconds, 3),
+                "wait_seconds_max": round(self.max_wait_seconds, 3),
+                "open_connections": len(ages),
+                "connection_age_seconds_max": round(max(ages), 1) if ages else 0,
+                "connection_age_seconds_avg": round(sum(ages) / len(ages), 1) if ages else 0,
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times how long each checkout waits for a connection."""
+
+    metrics = None
+
+    def _do_get(self):
+        if self.metrics is None:
+            return super()._do_get()
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_acquire(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record_acquire(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def instrument_engine(engine, statement_timeout_ms=None):
+    """
+    Attach pool metrics to an engine and, when given, enforce a statement timeout with
+    `SET LOCAL` at the start of every transaction. Unlike a session-level setting this is
+    safe behind PgBouncer in transaction pooling mode.
+    """
+    metrics = PoolMetrics()
+    engine.pool_metrics = metrics
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        engine.pool.metrics = metrics
+
+    event.listen(engine, "connect", metrics.on_connect)
+    event.listen(engine, "close", metrics.on_close)
+    event.listen(engine, "detach", lambda dbapi_connection, record: metrics.on_close(dbapi_connection, record))
+    event.listen(engine, "invalidate", metrics.on_invalidate)
+    event.listen(
+        engine,
+        "checkout",
+        lambda dbapi_connection, record, proxy: metrics.on_checkout(engine.pool, dbapi_connection, record, proxy),
+    )
+
+    if statement_timeout_ms:
+        @event.listens_for(engine, "begin")
+        def set_statement_timeout(connection):
+            connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(statement_timeout_ms)}")
+
+    return metrics
+
+
+def pool_stats(engine):
+    """Current pool occupancy plus the accumulated metrics for an engine."""
+    pool = engine.pool
+    stats = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            # QueuePool counts overflow from -pool_size; only connections beyond the pool matter here
+            "overflow": max(pool.overflow(), 0),
+            "timeout": pool.timeout(),
+        })
+    metrics = getattr(engine, "pool_metrics", None)
+    if metrics is not None:
+        stats.update(metrics.snapshot())
+    return stats
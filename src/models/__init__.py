@@ -1,9 +1,16 @@
 from src.models.user_model import User
 from src.models.journal_model import JournalEntryModel
 from src.models.notification_model import NotificationSettings
+from src.models.keyword_count_model import UserKeywordCount
+from src.models.daily_rollup_model import JournalDailyRollup
+from src.models.journal_import_model import JournalImport
+from src.models.theme_model import UserTheme
+from src.models.survey_state_model import SurveyRollingState
+from src.models.survey_cohort_model import SurveyCohortWeek, SurveyCohortScore
 
 # Ensure both models are loaded before setting up relationships
 User.entries.property.mapper.class_ = JournalEntryModel
 JournalEntryModel.user.property.mapper.class_ = User
 
-__all__ = ["User", "JournalEntryModel", "NotificationSettings"]
\ No newline at end of file
+__all__ = ["User", "JournalEntryModel", "NotificationSettings", "UserKeywordCount", "JournalDailyRollup", "JournalImport", "UserTheme", "SurveyRollingState",
+           "SurveyCohortWeek", "SurveyCohortScore"]
\ No newline at end of file
@@ -0,0 +1,263 @@
+from collections import Counter
+from datetime import timezone
+from sqlalchemy import Column, String, Integer, Float, Date, ForeignKey, text
+from sqlalchemy.dialects.postgresql import insert
+from src.database import Base, db
+
+
+class JournalDailyRollup(Base):
+    """
+    One row per user per UTC day with entry and sentiment totals.
+    Maintained in the same transaction as entry inserts, deletes and enrichment,
+    so dashboard analytics never have to scan raw journal rows.
+    """
+
+    __tablename__ = "journal_daily_rollup"
+
+    user_id = Column(String, ForeignKey("users.user_id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    entry_count = Column(Integer, nullable=False, default=0)
+    sentiment_sum = Column(Float, nullable=False, default=0.0)
+    scored_count = Column(Integer, nullable=False, default=0)
+
+    @staticmethod
+    def day_of(timestamp):
+        """UTC calendar day an entry timestamp is rolled up into."""
+        if timestamp.tzinfo is None:
+            return timestamp.date()
+        return timestamp.astimezone(timezone.utc).date()
+
+    @classmethod
+    def apply(cls, user_id, day, entry_delta=0, sentiment_delta=0.0, scored_delta=0):
+        """Add deltas to a user's day, creating the row if needed. Does not commit."""
+        stmt = insert(cls).values(
+            user_id=user_id,
+            day=day,
+            entry_count=entry_delta,
+            sentiment_sum=sentiment_delta,
+            scored_count=scored_delta,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[cls.user_id, cls.day],
+            set_={
+                "entry_count": cls.entry_count + stmt.excluded.entry_count,
+                "sentiment_sum": cls.sentiment_sum + stmt.excluded.sentiment_sum,
+                "scored_count": cls.scored_count + stmt.excluded.scored_count,
+            },
+        )
+        db.session.execute(stmt)
+        if entry_delta < 0:
+            db.session.query(cls).filter(
+                cls.user_id == user_id, cls.day == day, cls.entry_count <= 0
+            ).delete(synchronize_session=False)
+
+    @classmethod
+    def record_entry(cls, user_id, timestamp):
+        cls.apply(user_id, cls.day_of(timestamp), entry_delta=1)
+
+    @classmethod
+    def record_entries(cls, user_id, timestamps):
+        """Count many new entries with one multi-row upsert. Does not commit."""
+        per_day = Counter(cls.day_of(timestamp) for timestamp in timestamps)
+        if not per_day:
+            return
+        stmt = insert(cls).values([
+            {"user_id": user_id, "day": day, "entry_count": count, "sentiment_sum": 0.0, "scored_count": 0}
+            for day, count in sorted(per_day.items())
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[cls.user_id, cls.day],
+            set_={"entry_count": cls.entry_count + stmt.excluded.entry_count},
+        )
+        db.session.execute(stmt)
+
+    @classmethod
+    def record_sentiment(cls, user_id, timestamp, sentiment_score):
+        if sentiment_score is None:
+            return
+        cls.apply(user_id, cls.day_of(timestamp), sentiment_delta=sentiment_score, scored_delta=1)
+
+    @classmethod
+    def remove_entry(cls, user_id, timestamp, sentiment_score=None):
+        scored = sentiment_score is not None
+        cls.apply(
+            user_id,
+            cls.day_of(timestamp),
+            entry_delta=-1,
+            sentiment_delta=-sentiment_score if scored else 0.0,
+            scored_delta=-1 if scored else 0,
+        )
+
+    @classmethod
+    def remove_entries(cls, user_id, entries):
+        """
+        Subtract many deleted entries with one multi-row upsert, dropping days that
+        reach zero entries. Does not commit.
+
+        :param entries: (timestamp, sentiment_score) pairs of the deleted entries.
+        """
+        per_day = {}
+        for timestamp, sentiment_score in entries:
+            totals = per_day.setdefault(cls.day_of(timestamp), [0, 0.0, 0])
+            totals[0] -= 1
+            if sentiment_score is not None:
+                totals[1] -= sentiment_score
+                totals[2] -= 1
+        if not per_day:
+            return
+        stmt = insert(cls).values([
+            {
+                "user_id": user_id,
+                "day": day,
+                "entry_count": entry_delta,
+                "sentiment_sum": sentiment_delta,
+                "scored_count": scored_delta,
+            }
+            for day, (entry_delta, sentiment_delta, scored_delta) in sorted(per_day.items())
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[cls.user_id, cls.day],
+            set_={
+                "entry_count": cls.entry_count + stmt.excluded.entry_count,
+                "sentiment_sum": cls.sentiment_sum + stmt.excluded.sentiment_sum,
+                "scored_count": cls.scored_count + stmt.excluded.scored_count,
+            },
+        )
+        db.session.execute(stmt)
+        db.session.query(cls).filter(
+            cls.user_id == user_id, cls.day.in_(sorted(per_day)), cls.entry_count <= 0
+        ).delete(synchronize_session=False)
+
+    @classmethod
+    def get_range(cls, user_id, start_day, end_day):
+        """Return the user's rollup rows for days in [start_day, end_day), oldest first."""
+        return db.session.query(cls.day, cls.entry_count, cls.sentiment_sum, cls.scored_count) \
+            .filter(cls.user_id == user_id) \
+            .filter(cls.day >= start_day) \
+            .filter(cls.day < end_day) \
+            .order_by(cls.day) \
+            .all()
+
+    @classmethod
+    def get_streak_islands(cls, user_id, window_start, tz=None):
+        """
+        Gaps-and-islands over the user's active days: consecutive days collapse into
+        islands (day - row_number is constant within a run), so only a single summary
+        row comes back no matter how long the history is.
+
+        Days come from the rollup (UTC) or, when `tz` is given, from the distinct
+        local dates of the user's entries.
+
+        :return: Dict with `longest`, `last_day`, and `recent` islands as
+            (start_day, end_day, length) tuples for islands ending on/after `window_start`.
+        """
+        if tz:
+            days_sql = """
+                SELECT DISTINCT (timestamp AT TIME ZONE :tz)::date AS day
+                FROM journals
+                WHERE user_id = :user_id
+            """
+        else:
+            days_sql = """
+                SELECT day
+                FROM journal_daily_rollup
+                WHERE user_id = :user_id AND entry_count > 0
+            """
+
+        row = db.session.execute(text(f"""
+            WITH days AS ({days_sql}),
+            islands AS (
+                SELECT MIN(day) AS start_day, MAX(day) AS end_day, COUNT(*) AS length
+                FROM (
+                    SELECT day, day - (ROW_NUMBER() OVER (ORDER BY day))::int AS grp
+                    FROM days
+                ) numbered
+                GROUP BY grp
+            )
+            SELECT
+                (SELECT MAX(length) FROM islands) AS longest,
+                (SELECT MAX(end_day) FROM islands) AS last_day,
+                (SELECT array_agg(start_day ORDER BY end_day) FROM islands WHERE end_day >= :window_start) AS starts,
+                (SELECT array_agg(end_day ORDER BY end_day) FROM islands WHERE end_day >= :window_start) AS ends,
+                (SELECT array_agg(length ORDER BY end_day) FROM islands WHERE end_day >= :window_start) AS lengths
+        """), {"user_id": user_id, "window_start": window_start, "tz": tz}).one()
+
+        return {
+            "longest": row.longest or 0,
+            "last_day": row.last_day,
+            "recent": list(zip(row.starts or [], row.ends or [], row.lengths or [])),
+        }
+
+    @classmethod
+    def rebuild(cls, user_id=None):
+        """Recompute rollup rows from journals, for one user or everyone."""
+        params = {}
+        user_filter = ""
+        if user_id:
+            user_filter = "WHERE user_id = :user_id"
+            params["user_id"] = user_id
+
+        delete_query = db.session.query(cls)
+        if user_id:
+            delete_query = delete_query.filter(cls.user_id == user_id)
+        delete_query.delete(synchronize_session=False)
+
+        result = db.session.execute(text(f"""
+            INSERT INTO journal_daily_rollup (user_id, day, entry_count, sentiment_sum, scored_count)
+            SELECT user_id,
+                   (timestamp AT TIME ZONE 'UTC')::date,
+                   COUNT(*),
+                   COALESCE(SUM(sentiment_score), 0),
+                   COUNT(sentiment_score)
+            FROM journals
+            {user_filter}
+            GROUP BY 1, 2
+        """), params)
+        db.session.commit()
+        return result.rowcount
+
+    @classmethod
+    def find_inconsistencies(cls, user_id=None):
+        """
+        Compare rollup rows against a fresh aggregate of journals.
+        :return: List of mismatched (user_id, day) rows with expected and actual totals.
+        """
+        params = {}
+        journal_filter = ""
+        rollup_filter = ""
+        if user_id:
+            journal_filter = "WHERE user_id = :user_id"
+            rollup_filter = "WHERE user_id = :user_id"
+            params["user_id"] = user_id
+
+        rows = db.session.execute(text(f"""
+            WITH expected AS (
+                SELECT user_id,
+                       (timestamp AT TIME ZONE 'UTC')::date AS day,
+                       COUNT(*) AS entry_count,
+                       COALESCE(SUM(sentiment_score), 0) AS sentiment_sum,
+                       COUNT(sentiment_score) AS scored_count
+                FROM journals
+                {journal_filter}
+                GROUP BY 1, 2
+            ),
+            actual AS (
+                SELECT user_id, day, entry_count, sentiment_sum, scored_count
+                FROM journal_daily_rollup
+                {rollup_filter}
+            )
+            SELECT COALESCE(e.user_id, a.user_id) AS user_id,
+                   COALESCE(e.day, a.day) AS day,
+                   e.entry_count AS expected_entries, a.entry_count AS actual_entries,
+                   e.sentiment_sum AS expected_sentiment_sum, a.sentiment_sum AS actual_sentiment_sum,
+                   e.scored_count AS expected_scored, a.scored_count AS actual_scored
+            FROM expected e
+            FULL OUTER JOIN actual a ON a.user_id = e.user_id AND a.day = e.day
+            WHERE e.user_id IS NULL
+               OR a.user_id IS NULL
+               OR e.entry_count <> a.entry_count
+               OR e.scored_count <> a.scored_count
+               OR abs(e.sentiment_sum - a.sentiment_sum) > 1e-6
+            ORDER BY 1, 2
+        """), params).all()
+        return [dict(row._mapping) for row in rows]
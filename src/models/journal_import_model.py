@@ -0,0 +1,56 @@
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, case
+from sqlalchemy.dialects.postgresql import UUID
+from src.database import Base, db
+
+
+class JournalImport(Base):
+    """Progress of one bulk journal import, from insertion through batched enrichment."""
+
+    __tablename__ = "journal_imports"
+
+    STATUS_ENRICHING = "enriching"
+    STATUS_COMPLETED = "completed"
+
+    import_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(String, ForeignKey("users.user_id"), nullable=False, index=True)
+    status = Column(String, nullable=False, default=STATUS_ENRICHING)
+    total_rows = Column(Integer, nullable=False, default=0)
+    enriched_rows = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    def to_dict(self):
+        return {
+            "import_id": str(self.import_id),
+            "status": self.status,
+            "total_rows": self.total_rows,
+            "enriched_rows": self.enriched_rows,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+    @classmethod
+    def get_for_user(cls, user_id, import_id):
+        """Return the import if it belongs to the user, else None."""
+        try:
+            import_uuid = uuid.UUID(str(import_id))
+        except ValueError:
+            return None
+        return db.session.query(cls).filter_by(import_id=import_uuid, user_id=user_id).first()
+
+    @classmethod
+    def record_enriched(cls, import_id, count):
+        """
+        Atomically add enriched rows and mark the import completed once every row is done.
+        Does not commit; runs in the enrichment batch's transaction.
+        """
+        if not count:
+            return
+        enriched = cls.enriched_rows + count
+        db.session.query(cls).filter(cls.import_id == import_id).update({
+            cls.enriched_rows: enriched,
+            cls.status: case((enriched >= cls.total_rows, cls.STATUS_COMPLETED), else_=cls.status),
+            cls.updated_at: datetime.now(timezone.utc),
+        }, synchronize_session=False)
@@ -1,16 +1,22 @@
 import uuid
-from datetime import datetime, timedelta, timezone
+import base64
+from datetime import datetime, timezone
 from collections import Counter, defaultdict
-from calendar import monthrange
+from types import SimpleNamespace
 from dateutil.relativedelta import relativedelta
 from src.services.text_service import TextAnalysisService
 from sqlalchemy.orm.exc import NoResultFound
-from sqlalchemy import Column, String, Float, DateTime, ForeignKey, JSON, and_, cast, Boolean
+from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, JSON, Index, and_, cast, Boolean, or_, func, delete, any_, bindparam, text
 from sqlalchemy.dialects.postgresql import UUID, ARRAY
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, aliased
 from datetime import datetime, timezone
 import uuid
 from src.database import Base, db
+from src.cache import cache
+from src.config import EmbeddingConfig
+from src.utils.embedding_utils import compact_embedding, decode_compact_embedding, to_vector_literal
+from src.models.keyword_count_model import UserKeywordCount
+from src.models.daily_rollup_model import JournalDailyRollup
 from sqlalchemy.sql.expression import desc
 
 from pgvector.sqlalchemy import Vector
@@ -18,9 +24,11 @@ from pgvector.sqlalchemy import Vector
 class JournalEntryModel(Base):
     __tablename__ = "journals"
 
+    # When journals is partitioned (src/scripts/partition_journals.py) the database primary key
+    # also includes the partition key; entry_id alone remains the ORM identity.
     entry_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(String, ForeignKey("users.user_id"), nullable=False, index=True)
-    timestamp = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), index=True)
+    user_id = Column(String, ForeignKey("users.user_id"), nullable=False)
+    timestamp = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False, index=True)
     entry = Column(String, nullable=False)
     sentiment = Column(String)
     sentiment_score = Column(Float)
@@ -32,9 +40,38 @@ class JournalEntryModel(Base):
     processing = Column(Boolean, default=True, index=True)
     last_enriched_at = Column(DateTime(timezone=True), nullable=True, default=None)
     ip_address = Column(String, nullable=True)
+    # Cluster from src/services/theme_service.py; see UserTheme
+    theme_id = Column(Integer, nullable=True)
+    # Narrow copies of `weather` fields (see WeatherService.project) for the weather/mood aggregates
+    weather_condition = Column(String, nullable=True)
+    temperature = Column(Float, nullable=True)
 
     user = relationship("User", back_populates="entries", lazy="joined")
 
+    __table_args__ = (
+        # Supports `keywords @> ARRAY[...]` containment lookups for keyword search.
+        Index("ix_journals_keywords_gin", "keywords", postgresql_using="gin"),
+        # Per-user time-range reads (lists, month filter, sentiment and streak queries) are a
+        # single range scan; INCLUDE makes sentiment aggregates index-only. The leading user_id
+        # column also replaces the old single-column user_id index.
+        Index(
+            "ix_journals_user_timestamp",
+            "user_id",
+            desc("timestamp"),
+            postgresql_include=["sentiment_score"],
+        ),
+        # Weather/mood aggregates read only this index (src/scripts/add_weather_projection.py)
+        Index(
+            "ix_journals_user_weather",
+            "user_id",
+            "weather_condition",
+            postgresql_include=["temperature", "sentiment_score"],
+            postgresql_where=text("weather_condition IS NOT NULL"),
+        ),
+    )
+
+    DEFAULT_PAGE_SIZE = 20
+    MAX_PAGE_SIZE = 100
 
     def save(self):
         try:
@@ -69,7 +106,8 @@ class JournalEntryModel(Base):
             "location": self.location,
             "processing": self.processing,
             "last_enriched_at": self.last_enriched_at.isoformat() if self.last_enriched_at else None,
-            "ip_address": self.ip_address
+            "ip_address": self.ip_address,
+            "theme_id": self.theme_id,
         }
 
     @classmethod
@@ -84,33 +122,110 @@ class JournalEntryModel(Base):
             raise
 
     @classmethod
-    def delete_entry(cls, entry_id):
+    def delete_entry(cls, entry_id, user_id):
+        """Delete one of the user's entries. Returns False if it doesn't exist or isn't theirs."""
         try:
-            entry = db.session.query(JournalEntryModel).filter_by(entry_id=entry_id).one()
-            db.session.delete(entry)
-            db.session.commit()
-            return True
-        except NoResultFound:
-    
+            return bool(cls.delete_entries(user_id, [entry_id]))
+        except ValueError:
             return False
+
+    MAX_DELETE_BATCH = 1000
+
+    @classmethod
+    def delete_entries(cls, user_id, entry_ids):
+        """
+        Delete the user's entries among `entry_ids` in a single
+        `DELETE ... WHERE entry_id = ANY(:ids) AND user_id = :uid RETURNING` round trip.
+        Keyword counts and the daily rollup are updated from the returned rows in the
+        same transaction. IDs that don't exist or belong to another user are ignored.
+
+        A concurrent enrichment commit can't skew the totals: the DELETE waits on the
+        row lock and RETURNING reports the enriched values.
+
+        :raises ValueError: If an ID is not a valid UUID.
+        :return: List of deleted entry IDs as strings.
+        """
+        ids = [uuid.UUID(str(entry_id)) for entry_id in entry_ids]
+        if not ids:
+            return []
+        try:
+            stmt = delete(cls) \
+                .where(cls.entry_id == any_(bindparam("ids", ids, type_=ARRAY(UUID(as_uuid=True))))) \
+                .where(cls.user_id == user_id) \
+                .returning(cls.entry_id, cls.timestamp, cls.sentiment_score, cls.keywords)
+            deleted = db.session.execute(stmt).all()
+            if deleted:
+                UserKeywordCount.decrement_many(user_id, [row.keywords for row in deleted])
+                JournalDailyRollup.remove_entries(
+                    user_id, [(row.timestamp, row.sentiment_score) for row in deleted]
+                )
+            db.session.commit()
         except Exception as e:
             db.session.rollback()
-            print(f"[ERROR] Failed to delete journal entry: {e}")
+            print(f"[ERROR] Failed to delete journal entries: {e}")
             raise
+        if deleted:
+            cache.bump_user_version(user_id)
+        return [str(row.entry_id) for row in deleted]
+
+    @classmethod
+    def delete_chunk_for_user(cls, user_id, chunk_size=1000):
+        """
+        Delete up to `chunk_size` of the user's entries and commit, so deleting a whole
+        account holds row locks briefly instead of for one huge transaction.
+        Derived tables are not touched; the caller clears them afterwards.
+
+        :return: Number of entries deleted.
+        """
+        chunk = db.session.query(cls.entry_id) \
+            .filter(cls.user_id == user_id) \
+            .limit(chunk_size) \
+            .scalar_subquery()
+        result = db.session.execute(
+            delete(cls).where(cls.user_id == user_id, cls.entry_id.in_(chunk)).returning(cls.entry_id)
+        ).all()
+        db.session.commit()
+        return len(result)
+
+    IMPORT_INSERT_BATCH_SIZE = 1000
+
+    @classmethod
+    def bulk_insert(cls, user_id, rows):
+        """
+        Insert many unenriched entries with client-supplied timestamps and count them in
+        the daily rollup. Uses executemany, which SQLAlchemy sends as multi-row INSERTs.
+        Does not commit.
+
+        :param rows: Dicts with `entry`, `timestamp` and optional `location`.
+        :return: List of new entry IDs, in input order.
+        """
+        entry_ids = [uuid.uuid4() for _ in rows]
+        values = [
+            {
+                "entry_id": entry_id,
+                "user_id": user_id,
+                "entry": row["entry"],
+                "timestamp": row["timestamp"],
+                "location": row.get("location"),
+                "processing": True,
+            }
+            for entry_id, row in zip(entry_ids, rows)
+        ]
+        for start in range(0, len(values), cls.IMPORT_INSERT_BATCH_SIZE):
+            db.session.execute(cls.__table__.insert(), values[start:start + cls.IMPORT_INSERT_BATCH_SIZE])
+        JournalDailyRollup.record_entries(user_id, [row["timestamp"] for row in rows])
+        return entry_ids
 
     @classmethod
     def get_entries_by_month(cls, user_id, year, month, specific_columns=None):
         try:
             start_date = datetime(int(year), int(month), 1, tzinfo=timezone.utc)
-            end_day = monthrange(int(year), int(month))[1]
-            end_date = datetime(int(year), int(month), end_day, 23, 59, 59, tzinfo=timezone.utc)
-
-            query = db.session.query(JournalEntryModel).filter(
-                and_(
-                    JournalEntryModel.user_id == user_id,
-                    JournalEntryModel.timestamp >= start_date,
-                    JournalEntryModel.timestamp <= end_date
-                )
+            end_date = start_date + relativedelta(months=1)
+
+            query = JournalEntryModel.in_time_range(
+                db.session.query(JournalEntryModel).filter(JournalEntryModel.user_id == user_id),
+                start_date,
+                end_date,
             )
 
             results = query.all()
@@ -122,19 +237,35 @@ class JournalEntryModel(Base):
             print(f"[ERROR] Failed to retrieve entries for {year}-{month}: {e}")
             raise
 
+    @staticmethod
+    def in_time_range(query, start=None, end=None):
+        """
+        Restrict a query to entries with timestamps in the half-open range [start, end).
+        Either bound may be None.
+        """
+        if start is not None:
+            query = query.filter(JournalEntryModel.timestamp >= start)
+        if end is not None:
+            query = query.filter(JournalEntryModel.timestamp < end)
+        return query
+
     @classmethod
-    def get_all_entries(cls, user_id, limit=None, specific_attributes=None):
+    def get_all_entries(cls, user_id, limit=None, specific_attributes=None, start=None, end=None):
         """
         Retrieve all journal entries for a user using PostgreSQL with optional limit and selected attributes.
 
         :param user_id: The user's ID.
         :param limit: Optional max number of entries to return.
         :param specific_attributes: Optional list of attribute names to return per entry.
+        :param start: Optional inclusive start timestamp.
+        :param end: Optional exclusive end timestamp.
         :return: List of entries as dicts.
         """
         try:
-            query = db.session.query(JournalEntryModel).filter(
-                JournalEntryModel.user_id == user_id
+            query = cls.in_time_range(
+                db.session.query(JournalEntryModel).filter(JournalEntryModel.user_id == user_id),
+                start,
+                end,
             ).order_by(JournalEntryModel.timestamp.desc())
 
             if limit:
@@ -154,11 +285,33 @@ class JournalEntryModel(Base):
             print(f"[ERROR] Failed to retrieve entries for user {user_id}: {e}")
             raise
 
+    EXPORT_COLUMNS = (
+        "entry_id", "timestamp", "entry", "sentiment", "sentiment_score",
+        "emotions", "keywords", "weather", "location",
+    )
+
+    @classmethod
+    def iter_export_rows(cls, user_id, include_embeddings=False, chunk_size=500):
+        """
+        Stream a user's entries oldest first as plain dicts.
+        Selects columns rather than ORM objects and uses `yield_per`, which fetches through a
+        server-side cursor, so memory stays flat regardless of history size.
+        """
+        columns = [getattr(cls, name) for name in cls.EXPORT_COLUMNS]
+        if include_embeddings:
+            columns.append(cls.embedding)
+        query = db.session.query(*columns) \
+            .filter(cls.user_id == user_id) \
+            .order_by(cls.timestamp, cls.entry_id) \
+            .yield_per(chunk_size)
+        for row in query:
+            yield row._asdict()
+
     @staticmethod
-    def get_recent_entries(user_id, limit=12):
+    def get_recent_entries(user_id, limit=12, start=None, end=None):
         try:
-            return [entry.to_dict() for entry in db.session.query(JournalEntryModel)
-            .filter_by(user_id=user_id)
+            query = db.session.query(JournalEntryModel).filter_by(user_id=user_id)
+            return [entry.to_dict() for entry in JournalEntryModel.in_time_range(query, start, end)
             .order_by(desc(JournalEntryModel.timestamp))
             .limit(limit)
             .all()]
@@ -167,41 +320,154 @@ class JournalEntryModel(Base):
             raise
 
     @staticmethod
-    def get_entries_by_keyword(user_id, keyword):
+    def normalize_keywords(keywords):
+        """
+        Lowercase and trim keywords, dropping blanks and duplicates while keeping order.
+        """
+        if not keywords:
+            return keywords
+        seen = []
+        for keyword in keywords:
+            if not isinstance(keyword, str):
+                continue
+            normalized = keyword.strip().lower()
+            if normalized and normalized not in seen:
+                seen.append(normalized)
+        return seen
+
+    @staticmethod
+    def encode_cursor(entry):
+        """
+        Build an opaque keyset cursor from the last entry of a page.
+        """
+        raw = f"{entry.timestamp.isoformat()}|{entry.entry_id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor):
         try:
-            return [entry.to_dict() for entry in db.session.query(JournalEntryModel)
-            .filter(JournalEntryModel.user_id == user_id)
-            .filter(JournalEntryModel.keywords.any(keyword))
-            .all()]
+            raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+            timestamp, entry_id = raw.split("|", 1)
+            return datetime.fromisoformat(timestamp), uuid.UUID(entry_id)
+        except Exception:
+            raise ValueError("Invalid cursor")
+
+    @classmethod
+    def paginate(cls, query, cursor=None, limit=None):
+        """
+        Apply (timestamp, entry_id) keyset pagination to a query of entries, newest first.
+
+        :return: Tuple of (entries as dicts, next cursor or None).
+        """
+        limit = min(max(int(limit or cls.DEFAULT_PAGE_SIZE), 1), cls.MAX_PAGE_SIZE)
+        if cursor:
+            cursor_ts, cursor_id = cls.decode_cursor(cursor)
+            query = query.filter(or_(
+                JournalEntryModel.timestamp < cursor_ts,
+                and_(JournalEntryModel.timestamp == cursor_ts, JournalEntryModel.entry_id < cursor_id)
+            ))
+        rows = query.order_by(
+            JournalEntryModel.timestamp.desc(), JournalEntryModel.entry_id.desc()
+        ).limit(limit + 1).all()
+
+        next_cursor = cls.encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+        return [entry.to_dict() for entry in rows[:limit]], next_cursor
+
+    @staticmethod
+    def get_entries_by_keyword(user_id, keyword, cursor=None, limit=None, start=None, end=None):
+        """
+        Page through a user's entries tagged with a keyword (case-insensitive),
+        optionally within [start, end).
+        Uses array containment so the lookup is served by the GIN index on `keywords`.
+        """
+        try:
+            normalized = keyword.strip().lower()
+            query = db.session.query(JournalEntryModel) \
+                .filter(JournalEntryModel.user_id == user_id) \
+                .filter(JournalEntryModel.keywords.contains([normalized]))
+            query = JournalEntryModel.in_time_range(query, start, end)
+            return JournalEntryModel.paginate(query, cursor, limit)
+        except ValueError:
+            raise
         except Exception as e:
             print(f"[ERROR] Failed to retrieve entries by keyword '{keyword}': {e}")
             raise
 
-   
-
-
+    SENTIMENT_GRANULARITIES = ("day", "week", "month")
 
     @staticmethod
-    def get_sentiments_by_date(user_id, start_date, end_date):
+    def aggregate_sentiments(user_id, granularity, start, end):
         """
-        Returns list of entries (with timestamp and sentiment_score) for a user between two dates (inclusive).
+        Bucket a user's sentiment scores by UTC day, week (Monday) or month in a single
+        GROUP BY query over [start, end).
+
+        :return: List of buckets (oldest first) with average, count, min and max score.
+            Buckets without scored entries are omitted.
         """
+        if granularity not in JournalEntryModel.SENTIMENT_GRANULARITIES:
+            raise ValueError(f"Unsupported granularity: {granularity}")
         try:
-            start_dt = datetime.strptime(start_date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
-            end_dt = datetime.strptime(end_date, "%Y-%m-%d").replace(tzinfo=timezone.utc) + timedelta(days=1)
-
-            entries = db.session.query(JournalEntryModel.timestamp, JournalEntryModel.sentiment_score) \
+            bucket = func.date_trunc(granularity, func.timezone("UTC", JournalEntryModel.timestamp)).label("bucket")
+            rows = db.session.query(
+                bucket,
+                func.avg(JournalEntryModel.sentiment_score).label("average"),
+                func.count(JournalEntryModel.sentiment_score).label("count"),
+                func.min(JournalEntryModel.sentiment_score).label("min"),
+                func.max(JournalEntryModel.sentiment_score).label("max"),
+            ) \
                 .filter(JournalEntryModel.user_id == user_id) \
-                .filter(JournalEntryModel.timestamp >= start_dt) \
-                .filter(JournalEntryModel.timestamp < end_dt) \
+                .filter(JournalEntryModel.timestamp >= start) \
+                .filter(JournalEntryModel.timestamp < end) \
+                .filter(JournalEntryModel.sentiment_score != None) \
+                .group_by(bucket) \
+                .order_by(bucket) \
                 .all()
 
-            return [{"timestamp": e.timestamp, "sentiment_score": e.sentiment_score} for e in entries]
+            return [
+                {
+                    "bucket": row.bucket.date().isoformat(),
+                    "average_sentiment": float(row.average),
+                    "count": row.count,
+                    "min_sentiment": row.min,
+                    "max_sentiment": row.max,
+                }
+                for row in rows
+            ]
         except Exception as e:
-            print(f"[ERROR] Failed to retrieve entries by date: {e}")
+            print(f"[ERROR] Failed to aggregate sentiments by {granularity}: {e}")
             raise
 
+    @staticmethod
+    def aggregate_weather_mood(user_id, band_width):
+        """
+        Sentiment statistics per weather condition, per `band_width`-degree temperature band
+        and overall, as one GROUPING SETS query over the projected weather columns.
 
+        :return: Rows of (condition, band, grouped_by, count, average, min, max), where
+            `grouped_by` is 'condition', 'band' or 'overall' and `band` is the band's index
+            (floor(temperature / band_width)).
+        """
+        return db.session.execute(text("""
+            SELECT weather_condition AS condition,
+                   band,
+                   CASE
+                       WHEN GROUPING(weather_condition) = 0 THEN 'condition'
+                       WHEN GROUPING(band) = 0 THEN 'band'
+                       ELSE 'overall'
+                   END AS grouped_by,
+                   COUNT(*) AS count,
+                   AVG(sentiment_score) AS average,
+                   MIN(sentiment_score) AS min,
+                   MAX(sentiment_score) AS max
+            FROM (
+                SELECT weather_condition, floor(temperature / :band_width)::int AS band, sentiment_score
+                FROM journals
+                WHERE user_id = :user_id
+                  AND weather_condition IS NOT NULL
+                  AND sentiment_score IS NOT NULL
+            ) projected
+            GROUP BY GROUPING SETS ((weather_condition), (band), ())
+        """), {"user_id": user_id, "band_width": band_width}).all()
 
     @staticmethod
     def get_entries_by_semantic_search(user_id, query_vector, top_k=5):
@@ -209,6 +475,10 @@ class JournalEntryModel(Base):
             if not isinstance(query_vector, list):
                 raise ValueError("Query vector must be a list of floats")
 
+            if EmbeddingConfig.storage() != EmbeddingConfig.FULL:
+                entry_ids = JournalEntryModel.search_compact_embeddings(user_id, query_vector, top_k)
+                return [entry.to_dict() for entry in JournalEntryModel._load_in_order(entry_ids)]
+
             results = db.session.query(JournalEntryModel) \
                 .filter(JournalEntryModel.user_id == user_id) \
                 .filter(JournalEntryModel.embedding != None) \
@@ -222,19 +492,277 @@ class JournalEntryModel(Base):
             print(f"[ERROR] Failed to perform semantic search: {e}")
             raise
 
+    # Quantized copy of `embedding`, added by src/scripts/quantize_embeddings.py. Not mapped on
+    # the model because it only exists when a compact EMBEDDING_STORAGE mode is enabled.
+    COMPACT_EMBEDDING_COLUMN = "embedding_compact"
+
+    @staticmethod
+    def store_compact_embeddings(embeddings, storage=None):
+        """
+        Write the compact form of each entry's embedding. Does not commit.
+
+        :param embeddings: (entry_id, full embedding) pairs.
+        """
+        storage = storage or EmbeddingConfig.storage()
+        values = [
+            {"entry_id": entry_id, "value": compact_embedding(embedding, storage)}
+            for entry_id, embedding in embeddings
+            if embedding is not None
+        ]
+        if storage == EmbeddingConfig.FULL or not values:
+            return
+        db.session.execute(text(f"""
+            UPDATE journals
+            SET {JournalEntryModel.COMPACT_EMBEDDING_COLUMN} = CAST(:value AS {EmbeddingConfig.compact_type(storage)})
+            WHERE entry_id = :entry_id
+        """), values)
+
+    @staticmethod
+    def search_compact_embeddings(user_id, query_vector, top_k=5, storage=None, rerank=None):
+        """
+        Two-stage search: nearest candidates by the compact column (cosine distance for
+        halfvec, Hamming distance for binary), then, when full vectors are kept, rerank
+        those candidates by exact cosine distance on `embedding`.
+
+        :return: Entry IDs (UUID), nearest first.
+        """
+        storage = storage or EmbeddingConfig.storage()
+        return JournalEntryModel._compact_search(
+            user_id,
+            top_k,
+            storage,
+            rerank,
+            query_compact_sql=f"CAST(:query_compact AS {EmbeddingConfig.compact_type(storage)})",
+            query_full_sql=f"CAST(:query AS vector({EmbeddingConfig.FULL_DIMENSIONS}))",
+            params={
+                "query_compact": compact_embedding(query_vector, storage),
+                "query": to_vector_literal(query_vector),
+            },
+        )
+
+    @staticmethod
+    def _compact_search(user_id, top_k, storage, rerank, query_compact_sql, query_full_sql, params, filters=""):
+        """Run the two-stage compact search for SQL expressions yielding the query vectors."""
+        if rerank is None:
+            rerank = EmbeddingConfig.keep_full()
+        column = JournalEntryModel.COMPACT_EMBEDDING_COLUMN
+        operator = "<~>" if storage == EmbeddingConfig.BINARY else "<=>"
+
+        # The HNSW index spans every user's entries and user_id is filtered after the scan.
+        # A plain scan stops after ef_search neighbours from the whole table, which rarely
+        # belong to this user; iterative scan keeps going until LIMIT rows pass the filter.
+        # relaxed_order may return neighbours slightly out of order, so the outer query sorts.
+        db.session.execute(
+            text("SELECT set_config('hnsw.iterative_scan', 'relaxed_order', true), "
+                 "set_config('hnsw.ef_search', :ef_search, true)"),
+            {"ef_search": str(EmbeddingConfig.ef_search())},
+        )
+
+        sql = f"""
+            WITH candidates AS MATERIALIZED (
+                SELECT entry_id, {column} {operator} {query_compact_sql} AS distance{", embedding" if rerank else ""}
+                FROM journals
+                WHERE user_id = :user_id AND {column} IS NOT NULL {filters}
+                ORDER BY distance
+                LIMIT :candidates
+            )
+            SELECT entry_id FROM candidates
+            ORDER BY {f"embedding <=> {query_full_sql}" if rerank else "distance"}
+            LIMIT :top_k
+        """
+
+        params = dict(
+            params,
+            user_id=user_id,
+            top_k=top_k,
+            candidates=top_k * EmbeddingConfig.rerank_candidates() if rerank else top_k,
+        )
+        rows = db.session.execute(text(sql).columns(entry_id=UUID(as_uuid=True)), params).all()
+        return [row.entry_id for row in rows]
+
+    @staticmethod
+    def get_similar_entries(user_id, entry_id, top_k=5, start=None, end=None):
+        """
+        Entries nearest to one of the user's entries, using its stored embedding as the
+        query vector (no new embedding is generated). The source entry is excluded.
+        Optionally restricted to timestamps in [start, end).
+
+        :return: List of entry dicts, nearest first; an empty list if the source entry has
+            no embedding yet; None if it doesn't exist or belongs to another user.
+        """
+        try:
+            source_id = uuid.UUID(str(entry_id))
+        except ValueError:
+            return None
+
+        try:
+            compact = EmbeddingConfig.storage() != EmbeddingConfig.FULL
+            has_compact = f"{JournalEntryModel.COMPACT_EMBEDDING_COLUMN} IS NOT NULL" if compact else "false"
+            # Look the source up first: a NULL query vector would order nothing and the kNN
+            # query would return arbitrary entries of the user's instead of no results
+            source = db.session.execute(text(f"""
+                SELECT embedding IS NOT NULL AS has_full,
+                       {has_compact} AS has_compact
+                FROM journals
+                WHERE entry_id = :source_id AND user_id = :user_id
+            """), {"source_id": source_id, "user_id": user_id}).first()
+            if source is None:
+                return None
+            if not (source.has_compact if compact else source.has_full):
+                return []
+
+            if compact:
+                entries = JournalEntryModel._get_similar_compact(
+                    user_id, source_id, top_k, start, end, rerank=EmbeddingConfig.keep_full() and source.has_full
+                )
+            else:
+                source_entry = aliased(JournalEntryModel)
+                source_vector = db.session.query(source_entry.embedding) \
+                    .filter(source_entry.entry_id == source_id, source_entry.user_id == user_id) \
+                    .scalar_subquery()
+                query = db.session.query(JournalEntryModel) \
+                    .filter(JournalEntryModel.user_id == user_id) \
+                    .filter(JournalEntryModel.entry_id != source_id) \
+                    .filter(JournalEntryModel.embedding != None)
+                entries = JournalEntryModel.in_time_range(query, start, end) \
+                    .order_by(JournalEntryModel.embedding.cosine_distance(source_vector)) \
+                    .limit(top_k) \
+                    .all()
+
+            return [entry.to_dict() for entry in entries]
+
+        except Exception as e:
+            print(f"[ERROR] Failed to find similar entries: {e}")
+            raise
+
+    @staticmethod
+    def _get_similar_compact(user_id, source_id, top_k, start, end, rerank=None):
+        """
+        Similar-entry search over the compact column, with the source's vectors read in SQL.
+        The caller must have checked that the source has a compact vector.
+        """
+        column = JournalEntryModel.COMPACT_EMBEDDING_COLUMN
+        source_sql = "(SELECT {column} FROM journals WHERE entry_id = :source_id AND user_id = :user_id)"
+        filters = "AND entry_id <> :source_id"
+        params = {"source_id": source_id}
+        if start is not None:
+            filters += " AND timestamp >= :start"
+            params["start"] = start
+        if end is not None:
+            filters += " AND timestamp < :end"
+            params["end"] = end
+
+        entry_ids = JournalEntryModel._compact_search(
+            user_id,
+            top_k,
+            EmbeddingConfig.storage(),
+            rerank,
+            query_compact_sql=source_sql.format(column=column),
+            query_full_sql=source_sql.format(column="embedding"),
+            params=params,
+            filters=filters,
+        )
+        return JournalEntryModel._load_in_order(entry_ids)
+
+    @staticmethod
+    def _load_in_order(entry_ids):
+        """Load entries by ID, keeping the order of `entry_ids`."""
+        if not entry_ids:
+            return []
+        entries = db.session.query(JournalEntryModel) \
+            .filter(JournalEntryModel.entry_id.in_(entry_ids)) \
+            .all()
+        by_id = {entry.entry_id: entry for entry in entries}
+        return [by_id[entry_id] for entry_id in entry_ids if entry_id in by_id]
+
+    @staticmethod
+    def clustering_column():
+        """Column theme clustering reads: `embedding`, or the compact copy when full vectors aren't kept."""
+        if EmbeddingConfig.storage() == EmbeddingConfig.FULL or EmbeddingConfig.keep_full():
+            return "embedding"
+        return JournalEntryModel.COMPACT_EMBEDDING_COLUMN
+
+    @staticmethod
+    def get_embeddings_for_clustering(user_id):
+        """
+        The user's enriched entries as (entry_id, embedding, keywords) rows.
+
+        Without full vectors (EMBEDDING_KEEP_FULL=false) the compact copy is decoded and
+        zero-padded to the full dimensions. For unit-length centroids that padding ranks a
+        full query embedding exactly as cosine similarity on its truncated prefix would, so
+        `UserTheme.nearest` keeps working with the full embedding of a new entry.
+        """
+        column = JournalEntryModel.clustering_column()
+        if column == "embedding":
+            return db.session.query(JournalEntryModel.entry_id, JournalEntryModel.embedding, JournalEntryModel.keywords) \
+                .filter(JournalEntryModel.user_id == user_id) \
+                .filter(JournalEntryModel.embedding != None) \
+                .all()
+
+        storage = EmbeddingConfig.storage()
+        rows = db.session.execute(text(f"""
+            SELECT entry_id, CAST({column} AS text) AS compact, keywords
+            FROM journals
+            WHERE user_id = :user_id AND {column} IS NOT NULL
+        """), {"user_id": user_id}).all()
+        return [
+            SimpleNamespace(
+                entry_id=row.entry_id,
+                embedding=decode_compact_embedding(row.compact, storage),
+                keywords=row.keywords,
+            )
+            for row in rows
+        ]
+
+    @staticmethod
+    def set_themes(user_id, assignments):
+        """
+        Store theme assignments with one executemany UPDATE. Does not commit.
+
+        :param assignments: (entry_id, theme_id) pairs.
+        """
+        if not assignments:
+            return
+        db.session.execute(
+            text("UPDATE journals SET theme_id = :theme_id WHERE entry_id = :entry_id AND user_id = :user_id"),
+            [
+                {"entry_id": entry_id, "theme_id": theme_id, "user_id": user_id}
+                for entry_id, theme_id in assignments
+            ],
+        )
+
+    @staticmethod
+    def get_theme_members(user_id, per_theme=3):
+        """
+        Entry counts and the most recent entries of each of the user's themes, in one
+        pass over the user's rows.
+
+        :return: Rows of (theme_id, total, entry_id, timestamp, snippet), newest first per theme.
+        """
+        return db.session.execute(text("""
+            SELECT theme_id, total, entry_id, timestamp, snippet
+            FROM (
+                SELECT theme_id, entry_id, timestamp, left(entry, 140) AS snippet,
+                       ROW_NUMBER() OVER (PARTITION BY theme_id ORDER BY timestamp DESC) AS position,
+                       COUNT(*) OVER (PARTITION BY theme_id) AS total
+                FROM journals
+                WHERE user_id = :user_id AND theme_id IS NOT NULL
+            ) ranked
+            WHERE position <= :per_theme
+            ORDER BY theme_id, timestamp DESC
+        """), {"user_id": user_id, "per_theme": per_theme}).all()
+
     @staticmethod
     def get_entry_timestamps_in_range(user_id, start_date, end_date):
         """
-        Return a list of timestamps for a user between start_date and end_date (inclusive).
+        Return a list of timestamps for a user in the half-open range [start_date, end_date).
         """
         try:
+            query = db.session.query(JournalEntryModel.timestamp) \
+                .filter(JournalEntryModel.user_id == user_id)
             return [
                 entry.timestamp
-                for entry in db.session.query(JournalEntryModel.timestamp)
-                    .filter(JournalEntryModel.user_id == user_id)
-                    .filter(JournalEntryModel.timestamp >= start_date)
-                    .filter(JournalEntryModel.timestamp <= end_date)
-                    .all()
+                for entry in JournalEntryModel.in_time_range(query, start_date, end_date).all()
             ]
         except Exception as e:
             print(f"[ERROR] Failed to fetch entry timestamps for heatmap: {e}")
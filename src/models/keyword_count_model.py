@@ -0,0 +1,142 @@
+from collections import Counter
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index, desc, func, text
+from sqlalchemy.dialects.postgresql import insert
+from src.database import Base, db
+
+
+def escape_like(value):
+    """Escape LIKE wildcards so `value` only matches literally (use with ESCAPE '\\')."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class UserKeywordCount(Base):
+    """Per-user keyword usage counts, maintained incrementally as entries are enriched and deleted."""
+
+    __tablename__ = "user_keyword_counts"
+
+    user_id = Column(String, ForeignKey("users.user_id"), primary_key=True)
+    keyword = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    last_seen = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Top-N reads are a single index range scan in count order
+        Index("ix_user_keyword_counts_top", "user_id", desc("count"), "keyword"),
+    )
+
+    @classmethod
+    def increment(cls, user_id, keywords, seen_at=None):
+        """Add one use of each keyword. Does not commit; runs in the caller's transaction."""
+        keywords = sorted(set(keywords or []))
+        if not keywords:
+            return
+        stmt = insert(cls).values([
+            {"user_id": user_id, "keyword": keyword, "count": 1, "last_seen": seen_at}
+            for keyword in keywords
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[cls.user_id, cls.keyword],
+            set_={
+                "count": cls.count + stmt.excluded.count,
+                "last_seen": func.greatest(cls.last_seen, stmt.excluded.last_seen),
+            },
+        )
+        db.session.execute(stmt)
+
+    @classmethod
+    def decrement(cls, user_id, keywords):
+        """Remove one use of each keyword, dropping rows that reach zero. Does not commit."""
+        keywords = sorted(set(keywords or []))
+        if not keywords:
+            return
+        db.session.query(cls).filter(
+            cls.user_id == user_id, cls.keyword.in_(keywords)
+        ).update({cls.count: cls.count - 1}, synchronize_session=False)
+        db.session.query(cls).filter(
+            cls.user_id == user_id, cls.keyword.in_(keywords), cls.count <= 0
+        ).delete(synchronize_session=False)
+
+    @classmethod
+    def decrement_many(cls, user_id, keyword_lists):
+        """
+        Remove the uses recorded for many deleted entries with one upsert of negative
+        counts, dropping rows that reach zero. Does not commit.
+
+        :param keyword_lists: One keyword list per deleted entry.
+        """
+        uses = Counter()
+        for keywords in keyword_lists:
+            uses.update(set(keywords or []))
+        if not uses:
+            return
+        stmt = insert(cls).values([
+            {"user_id": user_id, "keyword": keyword, "count": -count}
+            for keyword, count in sorted(uses.items())
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[cls.user_id, cls.keyword],
+            set_={"count": cls.count + stmt.excluded.count},
+        )
+        db.session.execute(stmt)
+        db.session.query(cls).filter(
+            cls.user_id == user_id, cls.keyword.in_(sorted(uses)), cls.count <= 0
+        ).delete(synchronize_session=False)
+
+    @classmethod
+    def get_top(cls, user_id, top_n=10):
+        """Return the user's top N keywords as (keyword, count) pairs."""
+        rows = db.session.query(cls.keyword, cls.count) \
+            .filter(cls.user_id == user_id) \
+            .order_by(cls.count.desc(), cls.keyword) \
+            .limit(top_n) \
+            .all()
+        return [(row.keyword, row.count) for row in rows]
+
+    @classmethod
+    def suggest(cls, user_id, prefix, limit=10):
+        """
+        Prefix and fuzzy lookup over the user's distinct keywords, served by the
+        pg_trgm index on `keyword`. Prefix matches rank first, then similarity, then usage.
+        """
+        rows = db.session.execute(text("""
+            SELECT keyword, count
+            FROM user_keyword_counts
+            WHERE user_id = :user_id
+              AND (keyword LIKE :prefix ESCAPE '\\' OR :query <% keyword)
+            ORDER BY (keyword LIKE :prefix ESCAPE '\\') DESC, word_similarity(:query, keyword) DESC, count DESC, keyword
+            LIMIT :limit
+        """), {
+            "user_id": user_id,
+            "query": prefix,
+            "prefix": f"{escape_like(prefix)}%",
+            "limit": limit,
+        }).all()
+        return [{"keyword": row.keyword, "count": row.count} for row in rows]
+
+    @classmethod
+    def rebuild(cls, user_id=None):
+        """
+        Recompute counts from journals in bulk, for one user or everyone.
+        Each keyword counts at most once per entry.
+        """
+        params = {}
+        user_filter = ""
+        if user_id:
+            user_filter = "AND j.user_id = :user_id"
+            params["user_id"] = user_id
+
+        delete_query = db.session.query(cls)
+        if user_id:
+            delete_query = delete_query.filter(cls.user_id == user_id)
+        delete_query.delete(synchronize_session=False)
+
+        result = db.session.execute(text(f"""
+            INSERT INTO user_keyword_counts (user_id, keyword, count, last_seen)
+            SELECT j.user_id, k.keyword, COUNT(*), MAX(j.timestamp)
+            FROM journals j
+            CROSS JOIN LATERAL (SELECT DISTINCT unnest(j.keywords) AS keyword) k
+            WHERE j.keywords IS NOT NULL {user_filter}
+            GROUP BY j.user_id, k.keyword
+        """), params)
+        db.session.commit()
+        return result.rowcount
@@ -0,0 +1,168 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, String, Integer, Date, DateTime, text
+from sqlalchemy.dialects.postgresql import insert
+from src.database import Base, db
+
+SCORE_FIELDS = ("stress", "anxiety", "depression", "happiness", "satisfaction")
+
+# weekly_surveys rows unpivoted into (dimension, score) pairs
+_UNPIVOT = "CROSS JOIN LATERAL (VALUES {}) AS v(dimension, score)".format(
+    ", ".join(f"('{field}', s.{field})" for field in SCORE_FIELDS)
+)
+
+
+class SurveyCohortWeek(Base):
+    """
+    Survey totals across all users for one week. Kept current in the same transaction as
+    each new survey, so cohort views read one row per week instead of every user's surveys.
+    """
+
+    __tablename__ = "survey_cohort_weeks"
+
+    week_start = Column(Date, primary_key=True)
+    respondents = Column(Integer, nullable=False, default=0)
+    urgent_count = Column(Integer, nullable=False, default=0)
+    sleep_issue_count = Column(Integer, nullable=False, default=0)
+    self_harm_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    @classmethod
+    def record_survey(cls, survey):
+        """Add a new survey to its week's totals and score distributions. Does not commit."""
+        stmt = insert(cls).values(
+            week_start=survey.week_start,
+            respondents=1,
+            urgent_count=int(bool(survey.urgent_flag)),
+            sleep_issue_count=int(bool(survey.significant_sleep_issues)),
+            self_harm_count=int(bool(survey.self_harm_thoughts)),
+            updated_at=datetime.now(timezone.utc),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[cls.week_start],
+            set_={
+                "respondents": cls.respondents + stmt.excluded.respondents,
+                "urgent_count": cls.urgent_count + stmt.excluded.urgent_count,
+                "sleep_issue_count": cls.sleep_issue_count + stmt.excluded.sleep_issue_count,
+                "self_harm_count": cls.self_harm_count + stmt.excluded.self_harm_count,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        db.session.execute(stmt)
+
+        scores = insert(SurveyCohortScore).values([
+            {"week_start": survey.week_start, "dimension": field, "score": getattr(survey, field), "respondents": 1}
+            for field in SCORE_FIELDS
+        ])
+        scores = scores.on_conflict_do_update(
+            index_elements=[SurveyCohortScore.week_start, SurveyCohortScore.dimension, SurveyCohortScore.score],
+            set_={"respondents": SurveyCohortScore.respondents + scores.excluded.respondents},
+        )
+        db.session.execute(scores)
+
+    @classmethod
+    def adjust_urgent_count(cls, week_start, delta):
+        """Apply a change to an existing survey's urgent flag to its week's totals. Does not commit."""
+        db.session.query(cls).filter(cls.week_start == week_start).update(
+            {cls.urgent_count: cls.urgent_count + delta, cls.updated_at: datetime.now(timezone.utc)},
+            synchronize_session=False,
+        )
+
+    @classmethod
+    def remove_user(cls, user_id):
+        """Subtract all of a user's surveys, before they are deleted. Does not commit."""
+        db.session.execute(text("""
+            UPDATE survey_cohort_weeks w
+            SET respondents = w.respondents - d.respondents,
+                urgent_count = w.urgent_count - d.urgent_count,
+                sleep_issue_count = w.sleep_issue_count - d.sleep_issue_count,
+                self_harm_count = w.self_harm_count - d.self_harm_count,
+                updated_at = now()
+            FROM (
+                SELECT week_start,
+                       COUNT(*) AS respondents,
+                       COUNT(*) FILTER (WHERE urgent_flag) AS urgent_count,
+                       COUNT(*) FILTER (WHERE significant_sleep_issues) AS sleep_issue_count,
+                       COUNT(*) FILTER (WHERE self_harm_thoughts) AS self_harm_count
+                FROM weekly_surveys
+                WHERE user_id = :user_id
+                GROUP BY week_start
+            ) d
+            WHERE w.week_start = d.week_start
+        """), {"user_id": user_id})
+        db.session.execute(text(f"""
+            UPDATE survey_cohort_scores c
+            SET respondents = c.respondents - d.respondents
+            FROM (
+                SELECT s.week_start, v.dimension, v.score, COUNT(*) AS respondents
+                FROM weekly_surveys s
+                {_UNPIVOT}
+                WHERE s.user_id = :user_id
+                GROUP BY s.week_start, v.dimension, v.score
+            ) d
+            WHERE c.week_start = d.week_start AND c.dimension = d.dimension AND c.score = d.score
+        """), {"user_id": user_id})
+        db.session.query(cls).filter(cls.respondents <= 0).delete(synchronize_session=False)
+        db.session.query(SurveyCohortScore).filter(SurveyCohortScore.respondents <= 0) \
+            .delete(synchronize_session=False)
+
+    @classmethod
+    def rebuild(cls):
+        """Recompute every week from weekly_surveys with two grouped inserts. Does not commit."""
+        db.session.query(SurveyCohortScore).delete(synchronize_session=False)
+        db.session.query(cls).delete(synchronize_session=False)
+        db.session.execute(text("""
+            INSERT INTO survey_cohort_weeks (
+                week_start, respondents, urgent_count, sleep_issue_count, self_harm_count, updated_at
+            )
+            SELECT week_start,
+                   COUNT(*),
+                   COUNT(*) FILTER (WHERE urgent_flag),
+                   COUNT(*) FILTER (WHERE significant_sleep_issues),
+                   COUNT(*) FILTER (WHERE self_harm_thoughts),
+                   now()
+            FROM weekly_surveys
+            GROUP BY week_start
+        """))
+        db.session.execute(text(f"""
+            INSERT INTO survey_cohort_scores (week_start, dimension, score, respondents)
+            SELECT s.week_start, v.dimension, v.score, COUNT(*)
+            FROM weekly_surveys s
+            {_UNPIVOT}
+            GROUP BY s.week_start, v.dimension, v.score
+        """))
+        return db.session.query(cls).count()
+
+    @classmethod
+    def get_page(cls, limit, before=None, first_week=None, last_week=None):
+        """
+        Up to `limit` weeks, newest first, optionally before the `before` week (keyset cursor)
+        and within [first_week, last_week].
+        """
+        query = db.session.query(cls)
+        if before:
+            query = query.filter(cls.week_start < before)
+        if first_week:
+            query = query.filter(cls.week_start >= first_week)
+        if last_week:
+            query = query.filter(cls.week_start <= last_week)
+        return query.order_by(cls.week_start.desc()).limit(limit).all()
+
+
+class SurveyCohortScore(Base):
+    """Number of surveys in a week that gave `score` (1-5) for one dimension (e.g. stress)."""
+
+    __tablename__ = "survey_cohort_scores"
+
+    week_start = Column(Date, primary_key=True)
+    dimension = Column(String, primary_key=True)
+    score = Column(Integer, primary_key=True)
+    respondents = Column(Integer, nullable=False, default=0)
+
+    @classmethod
+    def get_for_weeks(cls, week_starts):
+        """Distribution rows for the given weeks, in one primary-key range read."""
+        if not week_starts:
+            return []
+        return db.session.query(cls.week_start, cls.dimension, cls.score, cls.respondents) \
+            .filter(cls.week_start >= min(week_starts), cls.week_start <= max(week_starts)) \
+            .all()
@@ -0,0 +1,186 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import Column, String, Integer, Date, DateTime, ForeignKey, text
+from sqlalchemy.dialects.postgresql import insert
+from src.database import Base, db
+from src.models.survey_cohort_model import SurveyCohortWeek
+
+
+class SurveyRollingState(Base):
+    """
+    Running per-user survey state: the high-stress streak ending at the latest surveyed week,
+    the first surveyed week and score totals. Advanced in the same transaction as each new
+    survey, so urgent-flag evaluation never re-reads the user's survey history.
+    """
+
+    __tablename__ = "survey_rolling_state"
+
+    user_id = Column(String, ForeignKey("users.user_id"), primary_key=True)
+    # First surveyed week; cohort completion rates count users from this week on
+    first_week_start = Column(Date, nullable=True)
+    last_week_start = Column(Date, nullable=True)
+    # Consecutive weeks, ending at last_week_start, with stress >= HIGH_STRESS
+    high_stress_streak = Column(Integer, nullable=False, default=0)
+    survey_count = Column(Integer, nullable=False, default=0)
+    stress_sum = Column(Integer, nullable=False, default=0)
+    anxiety_sum = Column(Integer, nullable=False, default=0)
+    depression_sum = Column(Integer, nullable=False, default=0)
+    happiness_sum = Column(Integer, nullable=False, default=0)
+    satisfaction_sum = Column(Integer, nullable=False, default=0)
+    urgent_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    HIGH_STRESS = 4
+    SCORE_FIELDS = ("stress", "anxiety", "depression", "happiness", "satisfaction")
+
+    @classmethod
+    def apply_survey(cls, survey):
+        """
+        Set a new survey's urgent flag from the user's high-stress streak and advance the
+        state. Does not commit.
+
+        A survey for a week after the latest one is O(1). A survey filled in for an earlier
+        week (week picker) can join streaks, so that rare case re-evaluates the urgent flags
+        of the weeks after it and recomputes the user's state with `rebuild`.
+
+        :return: The high-stress streak ending at the survey's week.
+        """
+        # Make sure the row exists, then lock it so concurrent submissions apply in turn
+        db.session.execute(insert(cls).values(user_id=survey.user_id).on_conflict_do_nothing())
+        state = db.session.query(cls).filter(cls.user_id == survey.user_id).with_for_update().one()
+
+        high = survey.stress >= cls.HIGH_STRESS
+        if state.last_week_start is None or survey.week_start > state.last_week_start:
+            follows = state.last_week_start is not None \
+                and survey.week_start - state.last_week_start == timedelta(weeks=1)
+            streak = (state.high_stress_streak + 1 if follows else 1) if high else 0
+            survey.urgent_flag = survey.compute_urgent_flag(streak)
+
+            state.first_week_start = state.first_week_start or survey.week_start
+            state.last_week_start = survey.week_start
+            state.high_stress_streak = streak
+            state.survey_count += 1
+            for field in cls.SCORE_FIELDS:
+                setattr(state, f"{field}_sum", getattr(state, f"{field}_sum") + getattr(survey, field))
+            state.urgent_count += int(bool(survey.urgent_flag))
+            state.updated_at = datetime.now(timezone.utc)
+            return streak
+
+        db.session.add(survey)
+        db.session.flush()
+        streak = cls.streak_ending(survey.user_id, survey.week_start)
+        survey.urgent_flag = survey.compute_urgent_flag(streak)
+        cls.reflag_following_weeks(survey, streak)
+        db.session.flush()
+        cls.rebuild(survey.user_id)
+        db.session.expire(state)
+        return streak
+
+    @classmethod
+    def reflag_following_weeks(cls, survey, streak):
+        """
+        Re-evaluate the urgent flags of the surveys after a backfilled one, whose high-stress
+        streaks it may have lengthened, and correct the cohort urgent counts. Does not commit.
+
+        Filling a week in only ever joins streaks, and a survey k weeks later already had a
+        streak of at least k, so only the next HIGH_STRESS_STREAK_WEEKS - 1 weeks can change.
+        """
+        survey_cls = type(survey)
+        later = db.session.query(survey_cls).filter(
+            survey_cls.user_id == survey.user_id,
+            survey_cls.week_start > survey.week_start,
+            survey_cls.week_start < survey.week_start + timedelta(weeks=survey.HIGH_STRESS_STREAK_WEEKS),
+        ).order_by(survey_cls.week_start).all()
+
+        previous = survey.week_start
+        for later_survey in later:
+            if later_survey.week_start - previous != timedelta(weeks=1) or later_survey.stress < cls.HIGH_STRESS:
+                break
+            streak += 1
+            urgent = later_survey.compute_urgent_flag(streak)
+            if urgent != bool(later_survey.urgent_flag):
+                later_survey.urgent_flag = urgent
+                SurveyCohortWeek.adjust_urgent_count(later_survey.week_start, 1 if urgent else -1)
+            previous = later_survey.week_start
+
+    @classmethod
+    def streak_ending(cls, user_id, week_start):
+        """High-stress streak ending at `week_start`, from the user's surveys up to that week."""
+        return db.session.execute(text("""
+            SELECT COALESCE(MIN(position) FILTER (
+                       WHERE stress < :high OR week_start <> CAST(:week_start AS date) - 7 * CAST(position - 1 AS int)
+                   ), COUNT(*) + 1) - 1
+            FROM (
+                SELECT week_start, stress, ROW_NUMBER() OVER (ORDER BY week_start DESC) AS position
+                FROM weekly_surveys
+                WHERE user_id = :user_id AND week_start <= :week_start
+            ) recent
+        """), {"user_id": user_id, "week_start": week_start, "high": cls.HIGH_STRESS}).scalar()
+
+    @classmethod
+    def rebuild(cls, user_id=None):
+        """
+        Recompute the state of one user, or of every user with surveys, from weekly_surveys
+        in a single set-based upsert. Does not commit.
+
+        :return: Number of users whose state was written.
+        """
+        sums = ", ".join(f"SUM({field}) AS {field}_sum" for field in cls.SCORE_FIELDS)
+        columns = ", ".join(f"{field}_sum" for field in cls.SCORE_FIELDS)
+        updates = ", ".join(f"{field}_sum = EXCLUDED.{field}_sum" for field in cls.SCORE_FIELDS)
+        result = db.session.execute(text(f"""
+            INSERT INTO survey_rolling_state (
+                user_id, first_week_start, last_week_start, high_stress_streak, survey_count, {columns}, urgent_count, updated_at
+            )
+            SELECT user_id,
+                   MIN(week_start),
+                   MAX(week_start),
+                   -- Surveys before the first break (a gap or a lower-stress week) form the streak
+                   COALESCE(MIN(position) FILTER (
+                       WHERE stress < :high OR week_start <> last_week - 7 * CAST(position - 1 AS int)
+                   ), COUNT(*) + 1) - 1,
+                   COUNT(*),
+                   {sums},
+                   COUNT(*) FILTER (WHERE urgent_flag),
+                   now()
+            FROM (
+                SELECT s.*,
+                       MAX(week_start) OVER (PARTITION BY user_id) AS last_week,
+                       ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY week_start DESC) AS position
+                FROM weekly_surveys s
+                WHERE CAST(:user_id AS varchar) IS NULL OR user_id = :user_id
+            ) ranked
+            GROUP BY user_id
+            ON CONFLICT (user_id) DO UPDATE SET
+                first_week_start = EXCLUDED.first_week_start,
+                last_week_start = EXCLUDED.last_week_start,
+                high_stress_streak = EXCLUDED.high_stress_streak,
+                survey_count = EXCLUDED.survey_count,
+                {updates},
+                urgent_count = EXCLUDED.urgent_count,
+                updated_at = EXCLUDED.updated_at
+        """), {"user_id": user_id, "high": cls.HIGH_STRESS})
+        return result.rowcount
+
+    @classmethod
+    def get_for_user(cls, user_id):
+        return db.session.query(cls).filter(cls.user_id == user_id).first()
+
+    @classmethod
+    def enrolled_by_week(cls, first_week, last_week):
+        """
+        Number of users who had started surveying by each week in [first_week, last_week],
+        from one aggregate over the per-user state rows.
+        :return: Dict of week_start -> enrolled users.
+        """
+        rows = db.session.execute(text("""
+            WITH starts AS (
+                SELECT first_week_start, COUNT(*) AS users
+                FROM survey_rolling_state
+                WHERE first_week_start <= :last_week
+                GROUP BY first_week_start
+            )
+            SELECT CAST(week AS date) AS week_start,
+                   (SELECT COALESCE(SUM(users), 0) FROM starts WHERE first_week_start <= CAST(week AS date)) AS enrolled
+            FROM generate_series(CAST(:first_week AS date), CAST(:last_week AS date), interval '7 days') AS week
+        """), {"first_week": first_week, "last_week": last_week}).all()
+        return {row.week_start: row.enrolled for row in rows}
@@ -0,0 +1,66 @@
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from pgvector.sqlalchemy import Vector
+from src.database import Base, db
+
+
+class UserTheme(Base):
+    """
+    One cluster ("theme") of a user's entry embeddings, fit in the background by
+    ThemeService. Entries point at their theme through `journals.theme_id`.
+    """
+
+    __tablename__ = "user_themes"
+
+    user_id = Column(String, ForeignKey("users.user_id"), primary_key=True)
+    theme_id = Column(Integer, primary_key=True)
+    label = Column(String, nullable=False)
+    keywords = Column(ARRAY(String))
+    centroid = Column(Vector(1536), nullable=False)
+    # Embedded entries the fit saw; the refit job compares this with the current count
+    fitted_entries = Column(Integer, nullable=False, default=0)
+    fitted_at = Column(DateTime(timezone=True), nullable=False)
+
+    @classmethod
+    def replace_for_user(cls, user_id, themes):
+        """Swap in a new set of themes for the user. Does not commit."""
+        db.session.query(cls).filter(cls.user_id == user_id).delete(synchronize_session=False)
+        db.session.add_all([cls(user_id=user_id, **theme) for theme in themes])
+
+    @classmethod
+    def nearest(cls, user_id, embedding):
+        """ID of the user's theme whose centroid is closest to `embedding`, or None without themes."""
+        return db.session.query(cls.theme_id) \
+            .filter(cls.user_id == user_id) \
+            .order_by(cls.centroid.cosine_distance(embedding)) \
+            .limit(1) \
+            .scalar()
+
+    @classmethod
+    def get_for_user(cls, user_id):
+        return db.session.query(cls.theme_id, cls.label, cls.keywords, cls.fitted_at) \
+            .filter(cls.user_id == user_id) \
+            .order_by(cls.theme_id) \
+            .all()
+
+    @classmethod
+    def find_stale_users(cls, min_entries, min_new_entries, growth, column="embedding"):
+        """
+        Users who have enough embedded entries but no themes yet, or whose entry count
+        grew by at least max(`min_new_entries`, `growth` x the count at the last fit).
+        `column` is the journals vector column clustering reads.
+        """
+        rows = db.session.execute(text(f"""
+            SELECT j.user_id
+            FROM journals j
+            LEFT JOIN (
+                SELECT user_id, MAX(fitted_entries) AS fitted
+                FROM user_themes
+                GROUP BY user_id
+            ) t ON t.user_id = j.user_id
+            WHERE j.{column} IS NOT NULL
+            GROUP BY j.user_id, t.fitted
+            HAVING COUNT(*) >= :min_entries
+               AND (t.fitted IS NULL OR COUNT(*) - t.fitted >= GREATEST(:min_new_entries, t.fitted * :growth))
+        """), {"min_entries": min_entries, "min_new_entries": min_new_entries, "growth": growth}).all()
+        return [row.user_id for row in rows]
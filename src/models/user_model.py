@@ -1,6 +1,7 @@
 from sqlalchemy import Column, String
 from sqlalchemy.orm import relationship
 from src.database import Base, db
+from src.models.notification_model import NotificationSettings
 
 
 class User(Base):
@@ -22,3 +23,12 @@ class User(Base):
     @classmethod
     def find_by_google_id(cls, google_id):
         return db.session.query(cls).filter_by(user_id=google_id).first()
+
+    @classmethod
+    def find_with_settings(cls, google_id):
+        """The user and their notification settings (or None) in one outer-joined query."""
+        row = db.session.query(cls, NotificationSettings) \
+            .outerjoin(NotificationSettings, NotificationSettings.user_id == cls.user_id) \
+            .filter(cls.user_id == google_id) \
+            .first()
+        return (row[0], row[1]) if row else (None, None)
@@ -1,7 +1,11 @@
-from sqlalchemy import Column, String, Integer, Boolean, Date, DateTime, ForeignKey
+from sqlalchemy import Column, String, Integer, Boolean, Date, DateTime, ForeignKey, text, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.sql import func
 from datetime import date, datetime, timezone
 from src.database import Base, db
+from src.cache import cache
+from src.models.survey_state_model import SurveyRollingState
+from src.models.survey_cohort_model import SurveyCohortWeek
 
 
 class WeeklySurvey(Base):
@@ -26,26 +30,40 @@ class WeeklySurvey(Base):
 
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
 
-    def compute_urgent_flag(self):
-        """Apply tiered safety logic."""
+    # Consecutive high-stress weeks (see SurveyRollingState.HIGH_STRESS) that make a survey urgent
+    HIGH_STRESS_STREAK_WEEKS = 3
+
+    def compute_urgent_flag(self, high_stress_streak: int = 0):
+        """
+        Apply tiered safety logic.
+        :param high_stress_streak: High-stress weeks in a row ending with this survey's week,
+            as tracked by SurveyRollingState.
+        """
         if self.self_harm_thoughts:
             return True
         if max(self.depression, self.anxiety) >= 4:
             return True
-        # rolling stress streak handled in service layer (for future implementation)
+        if high_stress_streak >= self.HIGH_STRESS_STREAK_WEEKS:
+            return True
         return False
 
     @classmethod
     def create_survey(cls, user_id: str, week_start: date, **survey_data):
-        """Create a new weekly survey"""
+        """Create a new weekly survey, updating the user's rolling state and the cohort totals in the same transaction"""
         survey = cls(
             user_id=user_id,
             week_start=week_start,
             **survey_data
         )
-        survey.urgent_flag = survey.compute_urgent_flag()
-        db.session.add(survey)
-        db.session.commit()
+        try:
+            SurveyRollingState.apply_survey(survey)
+            SurveyCohortWeek.record_survey(survey)
+            db.session.add(survey)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        cache.bump_user_version(user_id)
         return survey
 
     @classmethod
@@ -69,4 +87,120 @@ class WeeklySurvey(Base):
         """Get surveys for user since specific date"""
         return db.session.query(cls).filter_by(user_id=user_id).filter(
             cls.week_start >= since_date
-        ).order_by(cls.week_start.asc()).all() 
\ No newline at end of file
+        ).order_by(cls.week_start.asc()).all()
+
+    @classmethod
+    def find_missing_weeks(cls, user_id: str, first_week: date, last_week: date, limit: int):
+        """
+        Mondays from `last_week` back to `first_week` (inclusive, newest first) the user has
+        no survey for, at most `limit` of them, in one query over a generated week series.
+        """
+        return db.session.execute(text("""
+            SELECT CAST(week AS date) AS week_start
+            FROM generate_series(CAST(:last_week AS date), CAST(:first_week AS date), interval '-7 days') AS week
+            WHERE NOT EXISTS (
+                SELECT 1 FROM weekly_surveys s
+                WHERE s.user_id = :user_id AND s.week_start = CAST(week AS date)
+            )
+            ORDER BY week_start DESC
+            LIMIT :limit
+        """), {"user_id": user_id, "first_week": first_week, "last_week": last_week, "limit": limit}).scalars().all()
+
+    SCORE_FIELDS = ("stress", "anxiety", "depression", "happiness", "satisfaction")
+
+    @classmethod
+    def get_timeline(cls, user_id: str, range_start: date, weeks: int):
+        """
+        One row per week from `range_start` (a Monday) for `weeks` weeks, joining the user's
+        survey with that week's journal totals from the daily rollup, in a single statement.
+        Every row also carries the correlation across the range between weekly mean journal
+        sentiment and each survey score (`<field>_correlation`), and `paired_weeks`, the
+        number of weeks with both a survey and scored entries.
+        """
+        correlations = ",\n".join(
+            f"corr(j.average_sentiment, s.{field}) OVER () AS {field}_correlation" for field in cls.SCORE_FIELDS
+        )
+        return db.session.execute(text(f"""
+            WITH weeks AS (
+                SELECT (CAST(:range_start AS date) + 7 * n) AS week_start
+                FROM generate_series(0, :weeks - 1) AS n
+            ),
+            journal AS (
+                SELECT date_trunc('week', day)::date AS week_start,
+                       SUM(entry_count) AS entry_count,
+                       SUM(sentiment_sum) / NULLIF(SUM(scored_count), 0) AS average_sentiment
+                FROM journal_daily_rollup
+                WHERE user_id = :user_id
+                  AND day >= :range_start
+                  AND day < CAST(:range_start AS date) + 7 * :weeks
+                GROUP BY 1
+            )
+            SELECT w.week_start,
+                   s.stress, s.anxiety, s.depression, s.happiness, s.satisfaction,
+                   s.urgent_flag, s.significant_sleep_issues,
+                   COALESCE(j.entry_count, 0) AS entry_count,
+                   j.average_sentiment,
+                   COUNT(*) FILTER (WHERE s.week_start IS NOT NULL AND j.average_sentiment IS NOT NULL) OVER ()
+                       AS paired_weeks,
+                   {correlations}
+            FROM weeks w
+            LEFT JOIN weekly_surveys s ON s.user_id = :user_id AND s.week_start = w.week_start
+            LEFT JOIN journal j ON j.week_start = w.week_start
+            ORDER BY w.week_start
+        """), {"user_id": user_id, "range_start": range_start, "weeks": weeks}).all()
+
+    @classmethod
+    def get_week_rows(cls, user_id: str, range_start: date, range_end: date):
+        """Column rows (no ORM objects) of the user's surveys in [range_start, range_end], oldest first"""
+        return db.session.query(
+            cls.week_start, cls.stress, cls.anxiety, cls.depression, cls.happiness, cls.satisfaction,
+            cls.urgent_flag, cls.significant_sleep_issues,
+        ).filter(
+            cls.user_id == user_id,
+            cls.week_start >= range_start,
+            cls.week_start <= range_end,
+        ).order_by(cls.week_start).all()
+
+    @classmethod
+    def summarize_ranges(cls, user_id: str, current_week: date, ranges):
+        """
+        Survey statistics for each range of the last N weeks (ending with `current_week`), in
+        one statement reading only the surveys of the longest range.
+
+        Each row has `weeks`, `completion_count`, `high_alerts`, `streak_weeks` and
+        `avg_/min_/max_<field>` for every score field. The streak counts consecutive surveyed
+        weeks back from `current_week`: a survey is part of it when its week is exactly as
+        many weeks back as there are newer surveys.
+        """
+        stats = ",\n".join(
+            f"AVG(s.{field}) AS avg_{field}, MIN(s.{field}) AS min_{field}, MAX(s.{field}) AS max_{field}"
+            for field in cls.SCORE_FIELDS
+        )
+        statement = text(f"""
+            WITH surveys AS (
+                SELECT week_start, urgent_flag, {", ".join(cls.SCORE_FIELDS)},
+                       (CAST(:current_week AS date) - week_start) / 7 AS weeks_ago,
+                       week_start = CAST(:current_week AS date)
+                           - 7 * CAST(ROW_NUMBER() OVER (ORDER BY week_start DESC) - 1 AS int) AS in_streak
+                FROM weekly_surveys
+                WHERE user_id = :user_id
+                  AND week_start <= :current_week
+                  AND week_start > CAST(:current_week AS date) - 7 * CAST(:max_weeks AS int)
+            )
+            SELECT r.weeks,
+                   COUNT(s.week_start) AS completion_count,
+                   COUNT(*) FILTER (WHERE s.urgent_flag) AS high_alerts,
+                   COUNT(*) FILTER (WHERE s.in_streak) AS streak_weeks,
+                   {stats}
+            FROM unnest(:ranges) AS r(weeks)
+            LEFT JOIN surveys s ON s.weeks_ago < r.weeks
+            GROUP BY r.weeks
+            ORDER BY r.weeks
+        """).bindparams(bindparam("ranges", type_=ARRAY(Integer)))
+        return db.session.execute(statement, {
+            "user_id": user_id,
+            "current_week": current_week,
+            "max_weeks": max(ranges),
+            "ranges": list(ranges),
+        }).all()
+
@@ -0,0 +1,108 @@
+"""
+Database migration script for the weather/mood analytics.
+Adds the narrow `weather_condition` and `temperature` columns to journals, backfills
+them from the `weather` JSON in batches (with WeatherService.project), and creates
+the covering index the aggregate query reads instead of the table.
+
+Usage:
+    python -m src.scripts.add_weather_projection [--batch-size 5000]
+"""
+
+import argparse
+import os
+import sys
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.app import create_app
+from src.database import db
+from src.services.weather_service import WeatherService
+
+
+def add_columns():
+    """Add the projected weather columns"""
+    db.session.execute(db.text("ALTER TABLE journals ADD COLUMN IF NOT EXISTS weather_condition VARCHAR"))
+    db.session.execute(db.text("ALTER TABLE journals ADD COLUMN IF NOT EXISTS temperature DOUBLE PRECISION"))
+    db.session.commit()
+    print("✅ Added weather_condition and temperature columns")
+
+
+def backfill(batch_size):
+    """
+    Fill the columns for enriched entries, one keyset batch per transaction. Values come
+    from WeatherService.project itself, so backfilled rows group exactly like newly
+    enriched ones; rows whose weather doesn't project get both columns cleared.
+    """
+    last_id = None
+    total = 0
+    while True:
+        rows = db.session.execute(db.text("""
+            SELECT entry_id, weather
+            FROM journals
+            WHERE (weather IS NOT NULL OR weather_condition IS NOT NULL OR temperature IS NOT NULL)
+              AND (CAST(:last_id AS uuid) IS NULL OR entry_id > CAST(:last_id AS uuid))
+            ORDER BY entry_id
+            LIMIT :batch_size
+        """), {"last_id": last_id, "batch_size": batch_size}).all()
+        if not rows:
+            break
+
+        values = []
+        for row in rows:
+            condition, temperature = WeatherService.project(row.weather)
+            values.append({"entry_id": row.entry_id, "condition": condition, "temperature": temperature})
+        db.session.execute(db.text("""
+            UPDATE journals
+            SET weather_condition = :condition, temperature = :temperature
+            WHERE entry_id = :entry_id
+        """), values)
+        db.session.commit()
+
+        total += len(rows)
+        last_id = str(rows[-1].entry_id)
+        print(f"   Backfilled {total} entries...")
+
+    print(f"✅ Backfilled weather columns for {total} entries")
+
+
+def create_index():
+    """Create the covering index used by the weather/mood aggregates"""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(db.text("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_journals_user_weather
+            ON journals (user_id, weather_condition) INCLUDE (temperature, sentiment_score)
+            WHERE weather_condition IS NOT NULL
+        """))
+        print("✅ Created index on journals (user_id, weather_condition) INCLUDE (temperature, sentiment_score)")
+
+        # Refresh stats and the visibility map so the planner can pick index-only scans
+        conn.execute(db.text("VACUUM (ANALYZE) journals"))
+        print("✅ Vacuumed and analyzed journals")
+
+
+def main():
+    """Run the migration"""
+    parser = argparse.ArgumentParser(description="Add and backfill the projected weather columns")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Entries updated per transaction")
+    args = parser.parse_args()
+
+    print("🚀 Starting weather projection migration...")
+
+    app = create_app()
+
+    with app.app_context():
+        try:
+            add_columns()
+            backfill(args.batch_size)
+            create_index()
+            print("🎉 Migration completed successfully!")
+        except Exception as e:
+            db.session.rollback()
+            print(f"💥 Migration failed: {e}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Measure how well compact embedding search matches exact full-precision search.
+
+Samples entries that have both a full and a compact vector, uses each one's full vector as
+the query, and compares the compact search (with and without the full-precision rerank)
+against exact cosine search over the same user's entries. The query entry itself is
+excluded from both result lists. Needs the full vectors, so run it before `drop-full`.
+
+Queries are spread evenly over several users. The HNSW index covers every user's entries,
+so a single-user sample can't show searches coming back short once user_id is filtered;
+the "short" column counts queries that returned fewer than k results.
+
+Usage:
+    python -m src.scripts.benchmark_embedding_recall [--samples 200] [--users 20] [--k 5] [--min-entries 50]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.app import create_app
+from src.config import EmbeddingConfig
+from src.database import db
+from src.models.journal_model import JournalEntryModel
+from src.utils.embedding_utils import to_vector_literal
+
+COLUMN = JournalEntryModel.COMPACT_EMBEDDING_COLUMN
+
+
+def sample_queries(samples, users, min_entries):
+    """
+    Random entries with both vector forms, an even share from each of `users` random users
+    with enough entries to make recall meaningful
+    """
+    return db.session.execute(db.text(f"""
+        WITH eligible AS (
+            SELECT user_id
+            FROM journals
+            WHERE embedding IS NOT NULL AND {COLUMN} IS NOT NULL
+            GROUP BY user_id
+            HAVING COUNT(*) >= :min_entries
+            ORDER BY random()
+            LIMIT :users
+        ),
+        ranked AS (
+            SELECT j.entry_id, j.user_id, j.embedding::text AS embedding,
+                   ROW_NUMBER() OVER (PARTITION BY j.user_id ORDER BY random()) AS position
+            FROM journals j
+            JOIN eligible e ON e.user_id = j.user_id
+            WHERE j.embedding IS NOT NULL AND j.{COLUMN} IS NOT NULL
+        )
+        SELECT entry_id, user_id, embedding
+        FROM ranked
+        ORDER BY position, random()
+        LIMIT :samples
+    """), {"samples": samples, "users": users, "min_entries": min_entries}).all()
+
+
+def exact_search(user_id, query_vector, k):
+    """Ground truth: exact cosine distance over the user's full vectors"""
+    rows = db.session.execute(db.text(f"""
+        SELECT entry_id
+        FROM journals
+        WHERE user_id = :user_id AND embedding IS NOT NULL AND {COLUMN} IS NOT NULL
+        ORDER BY embedding <=> CAST(:query AS vector({EmbeddingConfig.FULL_DIMENSIONS}))
+        LIMIT :k
+    """), {"user_id": user_id, "query": to_vector_literal(query_vector), "k": k}).scalars().all()
+    return [str(entry_id) for entry_id in rows]
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def run_benchmark(samples, users, k, min_entries):
+    storage = EmbeddingConfig.storage()
+    if storage == EmbeddingConfig.FULL:
+        raise RuntimeError("EMBEDDING_STORAGE is 'full'; nothing to compare against")
+
+    queries = sample_queries(samples, users, min_entries)
+    if not queries:
+        raise RuntimeError("No entries with both full and compact embeddings; run quantize_embeddings backfill first")
+    sampled_users = len({row.user_id for row in queries})
+    if sampled_users < 2:
+        print("⚠️ Only one user has enough entries; short per-user results won't show up in this run")
+
+    results = {"exact": [], "compact": [], "compact+rerank": []}
+    recalls = {"compact": [], "compact+rerank": []}
+    short = {"compact": 0, "compact+rerank": 0}
+
+    for row in queries:
+        entry_id = str(row.entry_id)
+        query_vector = [float(value) for value in row.embedding.strip("[]").split(",")]
+
+        truth, elapsed = timed(exact_search, row.user_id, query_vector, k + 1)
+        results["exact"].append(elapsed)
+        truth = [found for found in truth if found != entry_id][:k]
+
+        for label, rerank in (("compact", False), ("compact+rerank", True)):
+            found, elapsed = timed(
+                JournalEntryModel.search_compact_embeddings, row.user_id, query_vector, k + 1, storage, rerank
+            )
+            results[label].append(elapsed)
+            found = [str(candidate) for candidate in found if str(candidate) != entry_id][:k]
+            if len(found) < len(truth):
+                short[label] += 1
+            if truth:
+                recalls[label].append(len(set(found) & set(truth)) / len(truth))
+
+    sizes = db.session.execute(db.text(f"""
+        SELECT AVG(pg_column_size(embedding)) AS full_bytes, AVG(pg_column_size({COLUMN})) AS compact_bytes
+        FROM journals
+        WHERE embedding IS NOT NULL AND {COLUMN} IS NOT NULL
+    """)).one()
+
+    print(f"\n📊 {EmbeddingConfig.compact_type(storage)} vs vector({EmbeddingConfig.FULL_DIMENSIONS}), "
+          f"{len(queries)} queries over {sampled_users} users, recall@{k}")
+    print(f"   Avg bytes per vector: full {sizes.full_bytes:.0f}, compact {sizes.compact_bytes:.0f}")
+    for label, timings in results.items():
+        recall = recalls.get(label)
+        recall_text = f"recall {sum(recall) / len(recall):.3f}" if recall else "recall 1.000 (baseline)"
+        short_text = f"short {short[label]}/{len(queries)}" if label in short else ""
+        print(f"   {label:<16} {recall_text}  {short_text:<12} "
+              f"p50 {percentile(timings, 0.5):.1f} ms  p95 {percentile(timings, 0.95):.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark recall of compact embedding search")
+    parser.add_argument("--samples", type=int, default=200, help="Number of query entries")
+    parser.add_argument("--users", type=int, default=20, help="Number of users the queries are spread over")
+    parser.add_argument("--k", type=int, default=5, help="Results per query")
+    parser.add_argument("--min-entries", type=int, default=50, help="Only sample users with at least this many entries")
+    args = parser.parse_args()
+
+    print("🚀 Starting embedding recall benchmark...")
+
+    app = create_app()
+
+    with app.app_context():
+        try:
+            run_benchmark(args.samples, args.users, args.k, args.min_entries)
+            print("🎉 Benchmark completed!")
+        except Exception as e:
+            print(f"💥 Benchmark failed: {e}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark the sentiment analytics engine on synthetic multi-year histories.
+
+Generates daily rollup-shaped series (entries on ~70% of days, regime shifts and outliers),
+then times the vectorized metrics (SentimentAnalyticsService.compute_metrics) against a
+per-day Python loop computing just the rolling means and EWMA, plus the full `analyze`
+including JSON shaping. Needs no database.
+
+Usage:
+    python -m src.scripts.benchmark_sentiment_analytics [--years 1 3 5 10] [--repeat 20]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.services.sentiment_analytics_service import SentimentAnalyticsService
+
+
+def synthetic_history(days, seed=0):
+    """Dense (days, sums, counts) arrays resembling a journaling history"""
+    rng = np.random.default_rng(seed)
+    counts = rng.poisson(1.2, days) * (rng.random(days) < 0.7)
+    # Mood drifts between regimes every ~90 days, with occasional extreme days
+    regimes = np.repeat(rng.uniform(-0.5, 0.6, days // 90 + 1), 90)[:days]
+    daily = np.clip(regimes + rng.normal(0, 0.15, days), -1, 1)
+    outliers = rng.random(days) < 0.01
+    daily[outliers] = -daily[outliers]
+    start = np.datetime64("2015-01-01")
+    return np.arange(start, start + days), daily * counts, counts.astype(float)
+
+
+def loop_baseline(sums, counts):
+    """The same rolling means and EWMA as plain per-day Python loops"""
+    span = SentimentAnalyticsService.EWMA_SPAN
+    alpha = 2.0 / (span + 1)
+    numerator = denominator = 0.0
+    results = []
+    for i in range(len(sums)):
+        row = {}
+        for window in (SentimentAnalyticsService.SHORT_WINDOW, SentimentAnalyticsService.LONG_WINDOW):
+            window_sum = window_count = 0.0
+            for j in range(max(0, i - window + 1), i + 1):
+                window_sum += sums[j]
+                window_count += counts[j]
+            row[window] = window_sum / window_count if window_count else None
+        numerator = (1 - alpha) * numerator + alpha * sums[i]
+        denominator = (1 - alpha) * denominator + alpha * counts[i]
+        row["ewma"] = numerator / denominator if denominator else None
+        results.append(row)
+    return results
+
+
+def time_call(fn, repeat, *args):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def run_benchmark(years, repeat):
+    print(f"{'history':>10} {'days':>6} {'metrics':>11} {'loop (3 of them)':>17} {'speedup':>8} {'full analyze':>13}")
+    for count in years:
+        days, sums, counts = synthetic_history(int(count * 365))
+        vectorized = time_call(SentimentAnalyticsService.compute_metrics, repeat, sums, counts)
+        looped = time_call(loop_baseline, max(1, repeat // 5), sums.tolist(), counts.tolist())
+        full = time_call(SentimentAnalyticsService.analyze, repeat, days, sums, counts)
+
+        # The vectorized rolling means and EWMA must match the loop
+        baseline = loop_baseline(sums.tolist(), counts.tolist())
+        expected = np.array([row["ewma"] if row["ewma"] is not None else np.nan for row in baseline])
+        np.testing.assert_allclose(SentimentAnalyticsService.ewma(sums, counts), expected, rtol=1e-9, atol=1e-12)
+
+        print(f"{count:>8}y {len(days):>6} {vectorized:>8.2f} ms {looped:>14.2f} ms {looped / vectorized:>7.1f}x {full:>10.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vectorized sentiment analytics")
+    parser.add_argument("--years", type=float, nargs="+", default=[1, 3, 5, 10], help="History lengths to test")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per history (median reported)")
+    args = parser.parse_args()
+
+    print("🚀 Starting sentiment analytics benchmark...")
+    run_benchmark(args.years, args.repeat)
+    print("🎉 Benchmark completed!")
+
+
+if __name__ == "__main__":
+    main()
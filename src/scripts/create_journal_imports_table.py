@@ -0,0 +1,39 @@
+"""
+Database migration script for bulk journal imports.
+Creates the journal_imports table used to report import and enrichment progress.
+"""
+
+import os
+import sys
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.app import create_app
+from src.database import db
+from src.models.journal_import_model import JournalImport
+
+
+def create_journal_imports_table():
+    """Create the journal_imports table"""
+    JournalImport.__table__.create(db.engine, checkfirst=True)
+    print("✅ Created journal_imports table")
+
+
+def main():
+    """Run the migration"""
+    print("🚀 Starting journal imports migration...")
+
+    app = create_app()
+
+    with app.app_context():
+        try:
+            create_journal_imports_table()
+            print("🎉 Migration completed successfully!")
+        except Exception as e:
+            print(f"💥 Migration failed: {e}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Database migration script for per-user time-range reads.
+Creates the composite (user_id, timestamp DESC) index on journals, covering
+sentiment_score, and drops the single-column user_id index it replaces.
+"""
+
+import os
+import sys
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.app import create_app
+from src.database import db
+
+
+def create_time_indexes():
+    """Create the composite covering index and drop the redundant user_id index"""
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction block
+    with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(db.text("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_journals_user_timestamp
+            ON journals (user_id, timestamp DESC) INCLUDE (sentiment_score)
+        """))
+        print("✅ Created index on journals (user_id, timestamp DESC) INCLUDE (sentiment_score)")
+
+        conn.execute(db.text("DROP INDEX CONCURRENTLY IF EXISTS ix_journals_user_id"))
+        print("✅ Dropped redundant index ix_journals_user_id")
+
+        # Refresh stats and the visibility map so the planner can pick index-only scans
+        conn.execute(db.text("VACUUM (ANALYZE) journals"))
+        print("✅ Vacuumed and analyzed journals")
+
+
+def main():
+    """Run the migration"""
+    print("🚀 Starting journal time index migration...")
+
+    app = create_app()
+
+    with app.app_context():
+        try:
+            create_time_indexes()
+            print("🎉 Migration completed successfully!")
+        except Exception as e:
+            print(f"💥 Migration failed: {e}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
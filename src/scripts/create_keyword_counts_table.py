@@ -0,0 +1,86 @@
+"""
+Database migration script for per-user keyword counts.
+Creates the user_keyword_counts table and its indexes, then rebuilds the counts
+from existing journal entries. Safe to re-run: the rebuild replaces all counts.
+
+Keyword suggestions read this table's trigram index, so the journals trigram index
+and its journal_keywords_text() helper, created by earlier versions of
+create_keyword_indexes.py, are dropped once this table is in place.
+
+Usage:
+    python -m src.scripts.create_keyword_counts_table [--user <user_id>]
+"""
+
+import argparse
+import os
+import sys
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.app import create_app
+from src.database import db
+from src.models.keyword_count_model import UserKeywordCount
+
+
+def create_keyword_counts_table():
+    """Create the user_keyword_counts table and its indexes"""
+    UserKeywordCount.__table__.create(db.engine, checkfirst=True)
+    print("✅ Created user_keyword_counts table")
+
+    with db.engine.connect() as conn:
+        conn.execute(db.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        conn.execute(db.text("""
+            CREATE INDEX IF NOT EXISTS ix_user_keyword_counts_top
+            ON user_keyword_counts (user_id, count DESC, keyword)
+        """))
+        conn.execute(db.text("""
+            CREATE INDEX IF NOT EXISTS ix_user_keyword_counts_trgm
+            ON user_keyword_counts USING gin (keyword gin_trgm_ops)
+        """))
+        conn.commit()
+    print("✅ Created keyword count indexes")
+
+
+def drop_journal_keyword_trigram_index():
+    """
+    Drop the suggestion index on journals left by earlier keyword index migrations.
+    No-op on databases that never had it.
+    """
+    # DROP INDEX CONCURRENTLY cannot run inside a transaction block
+    with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(db.text("DROP INDEX CONCURRENTLY IF EXISTS ix_journals_keywords_trgm"))
+        conn.execute(db.text("DROP FUNCTION IF EXISTS journal_keywords_text(varchar[])"))
+    print("✅ Dropped trigram index on journals (keywords)")
+
+
+def rebuild_keyword_counts(user_id=None):
+    """Recompute keyword counts from journals"""
+    rows = UserKeywordCount.rebuild(user_id)
+    scope = f"user {user_id}" if user_id else "all users"
+    print(f"✅ Rebuilt {rows} keyword counts for {scope}")
+
+
+def main():
+    """Run the migration"""
+    parser = argparse.ArgumentParser(description="Create and rebuild per-user keyword counts")
+    parser.add_argument("--user", help="Only rebuild counts for this user_id")
+    args = parser.parse_args()
+
+    print("🚀 Starting keyword counts migration...")
+
+    app = create_app()
+
+    with app.app_context():
+        try:
+            create_keyword_counts_table()
+            rebuild_keyword_counts(args.user)
+            drop_journal_keyword_trigram_index()
+            print("🎉 Migration completed successfully!")
+        except Exception as e:
+            print(f"💥 Migration failed: {e}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
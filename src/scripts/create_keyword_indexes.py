@@ -0,0 +1,66 @@
+"""
+Database migration script for keyword search.
+Normalizes stored keywords (lowercased, trimmed, de-duplicated) and creates the
+GIN index used for keyword containment lookups.
+"""
+
+import os
+import sys
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.app import create_app
+from src.database import db
+
+
+def normalize_existing_keywords():
+    """Lowercase and trim keywords already stored on journal entries"""
+    with db.engine.connect() as conn:
+        result = conn.execute(db.text("""
+            UPDATE journals
+            SET keywords = ARRAY(
+                SELECT normalized
+                FROM (
+                    SELECT lower(btrim(kw)) AS normalized, MIN(ord) AS first_seen
+                    FROM unnest(keywords) WITH ORDINALITY AS k(kw, ord)
+                    WHERE btrim(kw) <> ''
+                    GROUP BY lower(btrim(kw))
+                ) deduped
+                ORDER BY first_seen
+            )
+            WHERE keywords IS NOT NULL
+        """))
+        conn.commit()
+    print(f"✅ Normalized keywords on {result.rowcount} entries")
+
+
+def create_keyword_indexes():
+    """Create the GIN index on journals.keywords"""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(db.text("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_journals_keywords_gin
+            ON journals USING gin (keywords)
+        """))
+        print("✅ Created GIN index on journals (keywords)")
+
+
+def main():
+    """Run the migration"""
+    print("🚀 Starting keyword index migration...")
+
+    app = create_app()
+
+    with app.app_context():
+        try:
+            normalize_existing_keywords()
+            create_keyword_indexes()
+            print("🎉 Migration completed successfully!")
+        except Exception as e:
+            print(f"💥 Migration failed: {e}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
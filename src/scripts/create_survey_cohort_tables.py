@@ -0,0 +1,60 @@
+"""
+Database migration script for cohort survey analytics.
+Creates the survey_cohort_weeks and survey_cohort_scores aggregate tables and fills them
+from existing weekly surveys. Also adds survey_rolling_state.first_week_start (used for
+completion rates) and rebuilds the rolling state to fill it. Safe to re-run; the rebuild
+replaces the aggregates in one transaction.
+"""
+
+import os
+import sys
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.app import create_app
+from src.database import db
+from src.models.survey_cohort_model import SurveyCohortWeek, SurveyCohortScore
+from src.models.survey_state_model import SurveyRollingState
+
+
+def create_cohort_tables():
+    """Create the aggregate tables and the first_week_start column"""
+    SurveyCohortWeek.__table__.create(db.engine, checkfirst=True)
+    SurveyCohortScore.__table__.create(db.engine, checkfirst=True)
+    print("✅ Created survey_cohort_weeks and survey_cohort_scores tables")
+
+    SurveyRollingState.__table__.create(db.engine, checkfirst=True)
+    with db.engine.connect() as conn:
+        conn.execute(db.text("ALTER TABLE survey_rolling_state ADD COLUMN IF NOT EXISTS first_week_start date"))
+        conn.commit()
+    print("✅ Added survey_rolling_state.first_week_start")
+
+
+def rebuild_aggregates():
+    """Recompute the cohort aggregates and rolling state from weekly_surveys"""
+    weeks = SurveyCohortWeek.rebuild()
+    users = SurveyRollingState.rebuild()
+    db.session.commit()
+    print(f"✅ Rebuilt cohort aggregates for {weeks} weeks and rolling state for {users} users")
+
+
+def main():
+    """Run the migration"""
+    print("🚀 Starting survey cohort migration...")
+
+    app = create_app()
+
+    with app.app_context():
+        try:
+            create_cohort_tables()
+            rebuild_aggregates()
+            print("🎉 Migration completed successfully!")
+        except Exception as e:
+            db.session.rollback()
+            print(f"💥 Migration failed: {e}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Database migration script for the rolling survey state.
+Creates the survey_rolling_state table and rebuilds every user's state (high-stress
+streak and score totals) from their existing weekly surveys. Safe to re-run; a rebuild
+overwrites whatever state is there.
+
+Usage:
+    python -m src.scripts.create_survey_rolling_state_table [--user <user_id>]
+"""
+
+import argparse
+import os
+import sys
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.app import create_app
+from src.database import db
+from src.models.survey_state_model import SurveyRollingState
+
+
+def create_survey_rolling_state_table():
+    """Create the survey_rolling_state table"""
+    SurveyRollingState.__table__.create(db.engine, checkfirst=True)
+    print("✅ Created survey_rolling_state table")
+
+
+def rebuild_states(user_id=None):
+    """Recompute the state of one user or all users in a single statement"""
+    count = SurveyRollingState.rebuild(user_id)
+    db.session.commit()
+    print(f"✅ Rebuilt rolling survey state for {count} users")
+
+
+def main():
+    """Run the migration"""
+    parser = argparse.ArgumentParser(description="Create and rebuild the rolling survey state")
+    parser.add_argument("--user", help="Only rebuild this user_id")
+    args = parser.parse_args()
+
+    print("🚀 Starting rolling survey state migration...")
+
+    app = create_app()
+
+    with app.app_context():
+        try:
+            create_survey_rolling_state_table()
+            rebuild_states(args.user)
+            print("🎉 Migration completed successfully!")
+        except Exception as e:
+            db.session.rollback()
+            print(f"💥 Migration failed: {e}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Database migration script for per-user themes.
+Creates the user_themes table and the journals.theme_id column, then optionally fits
+themes for every user with enough enriched entries. Safe to re-run.
+
+Usage:
+    python -m src.scripts.create_user_themes_table [--fit] [--user <user_id>]
+"""
+
+import argparse
+import os
+import sys
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.app import create_app
+from src.database import db
+from src.models.theme_model import UserTheme
+from src.services.theme_service import ThemeService
+
+
+def create_user_themes_table():
+    """Create the user_themes table and add theme_id to journals"""
+    UserTheme.__table__.create(db.engine, checkfirst=True)
+    print("✅ Created user_themes table")
+
+    with db.engine.connect() as conn:
+        # Nullable with no default, so this is a metadata-only change
+        conn.execute(db.text("ALTER TABLE journals ADD COLUMN IF NOT EXISTS theme_id integer"))
+        conn.commit()
+    print("✅ Added journals.theme_id")
+
+
+def fit_themes(user_id=None):
+    """Fit themes synchronously for one user or every user due a fit"""
+    user_ids = [user_id] if user_id else ThemeService.find_users_to_refit()
+    for index, current in enumerate(user_ids, start=1):
+        count = ThemeService.fit_user(current)
+        print(f"   [{index}/{len(user_ids)}] {current}: {count} themes")
+    print(f"✅ Fit themes for {len(user_ids)} users")
+
+
+def main():
+    """Run the migration"""
+    parser = argparse.ArgumentParser(description="Create per-user theme storage and fit initial themes")
+    parser.add_argument("--fit", action="store_true", help="Fit themes now instead of waiting for the periodic job")
+    parser.add_argument("--user", help="Only fit themes for this user_id")
+    args = parser.parse_args()
+
+    print("🚀 Starting user themes migration...")
+
+    app = create_app()
+
+    with app.app_context():
+        try:
+            create_user_themes_table()
+            if args.fit or args.user:
+                fit_themes(args.user)
+            print("🎉 Migration completed successfully!")
+        except Exception as e:
+            print(f"💥 Migration failed: {e}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
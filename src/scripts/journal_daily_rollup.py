@@ -0,0 +1,81 @@
+"""
+Maintenance script for the journal_daily_rollup table.
+
+Usage:
+    python -m src.scripts.journal_daily_rollup create            # create the table
+    python -m src.scripts.journal_daily_rollup rebuild [--user]  # backfill from journals
+    python -m src.scripts.journal_daily_rollup check [--user] [--repair]
+"""
+
+import argparse
+import os
+import sys
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.app import create_app
+from src.database import db
+from src.models.daily_rollup_model import JournalDailyRollup
+
+
+def create_rollup_table():
+    """Create the journal_daily_rollup table"""
+    JournalDailyRollup.__table__.create(db.engine, checkfirst=True)
+    print("✅ Created journal_daily_rollup table")
+
+
+def rebuild_rollup(user_id=None):
+    """Recompute rollup rows from journals"""
+    rows = JournalDailyRollup.rebuild(user_id)
+    scope = f"user {user_id}" if user_id else "all users"
+    print(f"✅ Rebuilt {rows} daily rollup rows for {scope}")
+
+
+def check_rollup(user_id=None, repair=False):
+    """Report rollup rows that disagree with journals, optionally rebuilding affected users"""
+    mismatches = JournalDailyRollup.find_inconsistencies(user_id)
+    if not mismatches:
+        print("✅ Daily rollup is consistent with journals")
+        return True
+
+    for row in mismatches:
+        print(
+            f"❌ {row['user_id']} {row['day']}: "
+            f"entries {row['expected_entries']} != {row['actual_entries']}, "
+            f"scored {row['expected_scored']} != {row['actual_scored']}, "
+            f"sentiment_sum {row['expected_sentiment_sum']} != {row['actual_sentiment_sum']}"
+        )
+    print(f"Found {len(mismatches)} inconsistent rollup rows")
+
+    if repair:
+        for affected_user in sorted({row["user_id"] for row in mismatches}):
+            rebuild_rollup(affected_user)
+        return True
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the journal daily rollup")
+    parser.add_argument("command", choices=["create", "rebuild", "check"])
+    parser.add_argument("--user", help="Limit rebuild/check to this user_id")
+    parser.add_argument("--repair", action="store_true", help="Rebuild users with inconsistent rows")
+    args = parser.parse_args()
+
+    app = create_app()
+
+    with app.app_context():
+        try:
+            if args.command == "create":
+                create_rollup_table()
+            elif args.command == "rebuild":
+                rebuild_rollup(args.user)
+            elif not check_rollup(args.user, args.repair):
+                sys.exit(1)
+        except Exception as e:
+            print(f"💥 Daily rollup {args.command} failed: {e}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+"""
+Migrate `journals` to a declaratively partitioned table and maintain its partitions.
+
+Strategies:
+- range: monthly partitions on `timestamp` (primary key becomes (entry_id, timestamp)).
+  Supports retention by detaching old months.
+- hash: N partitions on hash(user_id) (primary key becomes (entry_id, user_id)).
+
+Indexes are declared on the partitioned parent, so Postgres creates them on every
+partition, including partitions added later. Rows that landed in the default partition
+for a month are moved into that month's partition when it is created.
+
+The migration runs online:
+    1. create    - build journals_partitioned, its partitions and indexes, and install a
+                   trigger that mirrors every write on journals into it
+    2. backfill  - copy existing rows in keyset-ordered chunks, one transaction per chunk
+    3. swap      - verify counts, then rename tables and indexes in one short transaction;
+                   the old table is kept as journals_unpartitioned
+
+Maintenance (range strategy):
+    ensure       - create monthly partitions ahead of time (run monthly, e.g. from cron)
+    detach       - retention hook: detach months older than --keep-months, then rebuild the
+                   daily rollup and keyword counts of affected users
+
+Usage:
+    python -m src.scripts.partition_journals create [--strategy range|hash] [--partitions 16] [--months-ahead 3]
+    python -m src.scripts.partition_journals backfill [--chunk-size 5000]
+    python -m src.scripts.partition_journals swap
+    python -m src.scripts.partition_journals ensure [--months-ahead 3]
+    python -m src.scripts.partition_journals detach --keep-months 36 [--drop] [--dry-run]
+"""
+
+import argparse
+import os
+import re
+import sys
+from datetime import date
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from dateutil.relativedelta import relativedelta
+from src.app import create_app
+from src.database import db
+from src.cache import cache
+from src.models.daily_rollup_model import JournalDailyRollup
+from src.models.keyword_count_model import UserKeywordCount
+from src.models.journal_model import JournalEntryModel
+
+NEW_TABLE = "journals_partitioned"
+OLD_TABLE = "journals_unpartitioned"
+SYNC_TRIGGER = "journals_partition_sync"
+MONTH_PARTITION = re.compile(r"^journals_y(\d{4})m(\d{2})$")
+
+# Index names the model declares, mapped to their definitions on the partitioned parent
+PARENT_INDEXES = {
+    "ix_journals_user_timestamp": "(user_id, timestamp DESC) INCLUDE (sentiment_score)",
+    "ix_journals_user_weather": "(user_id, weather_condition) INCLUDE (temperature, sentiment_score) "
+                                "WHERE weather_condition IS NOT NULL",
+    "ix_journals_keywords_gin": "USING gin (keywords)",
+    "ix_journals_timestamp": "(timestamp)",
+    "ix_journals_processing": "(processing)",
+}
+# Added by quantize_embeddings.py; see parent_indexes()
+COMPACT_COLUMN = JournalEntryModel.COMPACT_EMBEDDING_COLUMN
+COMPACT_INDEX = "ix_journals_embedding_compact"
+
+
+def month_partition_name(month_start):
+    return f"journals_y{month_start.year}m{month_start.month:02d}"
+
+
+def create_month_partition(conn, parent, month_start):
+    """
+    Create the partition holding [month_start, next month) if it doesn't exist.
+    Postgres refuses to create it while the default partition holds rows for that month,
+    so those rows are moved into the new partition in the same transaction.
+    """
+    name = month_partition_name(month_start)
+    if conn.execute(db.text("SELECT to_regclass(:name)"), {"name": name}).scalar():
+        return name
+
+    start = month_start.isoformat()
+    end = (month_start + relativedelta(months=1)).isoformat()
+    default = conn.execute(db.text("""
+        SELECT partdefid::regclass::text
+        FROM pg_partitioned_table
+        WHERE partrelid = CAST(:parent AS regclass) AND partdefid <> 0
+    """), {"parent": parent}).scalar()
+
+    moved = 0
+    if default:
+        # Keep new rows for the month out of the default partition until the move is done
+        conn.execute(db.text("SET LOCAL lock_timeout = '5s'"))
+        conn.execute(db.text(f"LOCK TABLE {default} IN ACCESS EXCLUSIVE MODE"))
+        conn.execute(db.text(f"CREATE TEMP TABLE {name}_moved (LIKE {parent}) ON COMMIT DROP"))
+        moved = conn.execute(db.text(f"""
+            WITH moved AS (
+                DELETE FROM {default}
+                WHERE timestamp >= '{start}' AND timestamp < '{end}'
+                RETURNING *
+            )
+            INSERT INTO {name}_moved SELECT * FROM moved
+        """)).rowcount
+
+    conn.execute(db.text(f"""
+        CREATE TABLE {name} PARTITION OF {parent}
+        FOR VALUES FROM ('{start}') TO ('{end}')
+    """))
+
+    if default:
+        if moved:
+            conn.execute(db.text(f"INSERT INTO {parent} SELECT * FROM {name}_moved"))
+            print(f"   Moved {moved} rows from {default} into {name}")
+        conn.execute(db.text(f"DROP TABLE {name}_moved"))
+    return name
+
+
+def parent_indexes(conn):
+    """
+    PARENT_INDEXES plus the HNSW index on the compact embedding column, which only exists
+    when a compact EMBEDDING_STORAGE mode was migrated (see quantize_embeddings.py).
+    """
+    indexes = dict(PARENT_INDEXES)
+    compact_type = conn.execute(db.text("""
+        SELECT format_type(atttypid, atttypmod)
+        FROM pg_attribute
+        WHERE attrelid = 'journals'::regclass AND attname = :column AND NOT attisdropped
+    """), {"column": COMPACT_COLUMN}).scalar()
+    if compact_type:
+        ops = "bit_hamming_ops" if compact_type.startswith("bit") else "halfvec_cosine_ops"
+        indexes[COMPACT_INDEX] = f"USING hnsw ({COMPACT_COLUMN} {ops})"
+    return indexes
+
+
+def get_partition_strategy(conn, table):
+    """Return 'range', 'hash' or None if the table isn't partitioned"""
+    strategy = conn.execute(db.text("""
+        SELECT p.partstrat
+        FROM pg_partitioned_table p
+        JOIN pg_class c ON c.oid = p.partrelid
+        WHERE c.relname = :table
+    """), {"table": table}).scalar()
+    return {"r": "range", "h": "hash"}.get(strategy)
+
+
+def create_partitioned_table(strategy="range", hash_partitions=16, months_ahead=3):
+    """Create journals_partitioned with partitions, indexes and the sync trigger"""
+    with db.engine.connect() as conn:
+        partition_key = "RANGE (timestamp)" if strategy == "range" else "HASH (user_id)"
+        conn.execute(db.text(f"""
+            CREATE TABLE IF NOT EXISTS {NEW_TABLE} (
+                LIKE journals INCLUDING DEFAULTS INCLUDING GENERATED
+            ) PARTITION BY {partition_key}
+        """))
+
+        # The partition key must be part of every unique constraint
+        pk_columns = "entry_id, timestamp" if strategy == "range" else "entry_id, user_id"
+        conn.execute(db.text(f"ALTER TABLE {NEW_TABLE} ALTER COLUMN timestamp SET NOT NULL"))
+        conn.execute(db.text(f"""
+            DO $$
+            BEGIN
+                IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = '{NEW_TABLE}_pkey') THEN
+                    ALTER TABLE {NEW_TABLE} ADD CONSTRAINT {NEW_TABLE}_pkey PRIMARY KEY ({pk_columns});
+                END IF;
+                IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = '{NEW_TABLE}_user_id_fkey') THEN
+                    ALTER TABLE {NEW_TABLE} ADD CONSTRAINT {NEW_TABLE}_user_id_fkey
+                        FOREIGN KEY (user_id) REFERENCES users (user_id);
+                END IF;
+            END $$
+        """))
+        print(f"✅ Created {NEW_TABLE} partitioned by {partition_key}")
+
+        if strategy == "range":
+            first = conn.execute(db.text("SELECT MIN(timestamp AT TIME ZONE 'UTC')::date FROM journals")).scalar()
+            current = date.today().replace(day=1)
+            month = (first or current).replace(day=1)
+            last = current + relativedelta(months=months_ahead)
+            count = 0
+            while month <= last:
+                create_month_partition(conn, NEW_TABLE, month)
+                month += relativedelta(months=1)
+                count += 1
+            # Catches rows outside the created months (e.g. far-future client timestamps)
+            conn.execute(db.text(f"CREATE TABLE IF NOT EXISTS journals_default PARTITION OF {NEW_TABLE} DEFAULT"))
+            print(f"✅ Created {count} monthly partitions and a default partition")
+        else:
+            for remainder in range(hash_partitions):
+                conn.execute(db.text(f"""
+                    CREATE TABLE IF NOT EXISTS journals_h{remainder:02d} PARTITION OF {NEW_TABLE}
+                    FOR VALUES WITH (MODULUS {hash_partitions}, REMAINDER {remainder})
+                """))
+            print(f"✅ Created {hash_partitions} hash partitions")
+
+        # Declared on the parent so every partition (present and future) gets its own copy.
+        # Temporary names avoid clashing with the live table's indexes until the swap.
+        for name, definition in parent_indexes(conn).items():
+            conn.execute(db.text(f"CREATE INDEX IF NOT EXISTS {name}_p ON {NEW_TABLE} {definition}"))
+        print("✅ Created partitioned indexes")
+
+        # Mirror writes on journals while the backfill runs
+        conn.execute(db.text(f"""
+            CREATE OR REPLACE FUNCTION {SYNC_TRIGGER}() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    DELETE FROM {NEW_TABLE} WHERE entry_id = OLD.entry_id;
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    INSERT INTO {NEW_TABLE} SELECT NEW.* ON CONFLICT DO NOTHING;
+                END IF;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+        """))
+        conn.execute(db.text(f"DROP TRIGGER IF EXISTS {SYNC_TRIGGER} ON journals"))
+        conn.execute(db.text(f"""
+            CREATE TRIGGER {SYNC_TRIGGER}
+            AFTER INSERT OR UPDATE OR DELETE ON journals
+            FOR EACH ROW EXECUTE FUNCTION {SYNC_TRIGGER}()
+        """))
+        conn.commit()
+        print("✅ Installed sync trigger on journals")
+
+
+def backfill(chunk_size=5000):
+    """Copy existing rows in entry_id order, committing after each chunk"""
+    copied = 0
+    last_id = None
+    while True:
+        with db.engine.connect() as conn:
+            # FOR SHARE holds off concurrent updates/deletes of the chunk until it commits,
+            # so the sync trigger always sees the copied row and nothing is resurrected
+            row = conn.execute(db.text(f"""
+                WITH chunk AS (
+                    SELECT * FROM journals
+                    WHERE (CAST(:last_id AS uuid) IS NULL OR entry_id > CAST(:last_id AS uuid))
+                    ORDER BY entry_id
+                    LIMIT :chunk_size
+                    FOR SHARE
+                ),
+                inserted AS (
+                    INSERT INTO {NEW_TABLE} SELECT * FROM chunk
+                    ON CONFLICT DO NOTHING
+                )
+                SELECT COUNT(*) AS rows, MAX(entry_id::text) AS last_id FROM chunk
+            """), {"last_id": last_id, "chunk_size": chunk_size}).one()
+            conn.commit()
+
+        if not row.rows:
+            break
+        copied += row.rows
+        last_id = row.last_id
+        print(f"   Copied {copied} rows (through {last_id})")
+
+    print(f"✅ Backfilled {copied} rows into {NEW_TABLE}")
+
+
+def swap():
+    """Verify the copy and swap the partitioned table in under a brief exclusive lock"""
+    with db.engine.connect() as conn:
+        conn.execute(db.text("SET LOCAL lock_timeout = '5s'"))
+        conn.execute(db.text("LOCK TABLE journals IN ACCESS EXCLUSIVE MODE"))
+
+        old_count = conn.execute(db.text("SELECT COUNT(*) FROM journals")).scalar()
+        new_count = conn.execute(db.text(f"SELECT COUNT(*) FROM {NEW_TABLE}")).scalar()
+        if old_count != new_count:
+            conn.rollback()
+            raise RuntimeError(f"Row counts differ (journals={old_count}, {NEW_TABLE}={new_count}); run backfill again")
+
+        indexes = parent_indexes(conn)
+        conn.execute(db.text(f"DROP TRIGGER IF EXISTS {SYNC_TRIGGER} ON journals"))
+        conn.execute(db.text(f"ALTER TABLE journals RENAME TO {OLD_TABLE}"))
+        for name in indexes:
+            conn.execute(db.text(f"ALTER INDEX IF EXISTS {name} RENAME TO {name}_old"))
+            conn.execute(db.text(f"ALTER INDEX IF EXISTS {name}_p RENAME TO {name}"))
+        conn.execute(db.text(f"ALTER TABLE {NEW_TABLE} RENAME TO journals"))
+        conn.commit()
+
+    with db.engine.connect() as conn:
+        conn.execute(db.text(f"DROP FUNCTION IF EXISTS {SYNC_TRIGGER}()"))
+        conn.commit()
+    print(f"✅ Swapped in partitioned journals ({new_count} rows); previous table kept as {OLD_TABLE}")
+
+
+def ensure_partitions(months_ahead=3):
+    """Create upcoming monthly partitions on the live journals table"""
+    with db.engine.connect() as conn:
+        if get_partition_strategy(conn, "journals") != "range":
+            print("ℹ️  journals is not range-partitioned; nothing to do")
+            return
+        month = date.today().replace(day=1)
+        for _ in range(months_ahead + 1):
+            create_month_partition(conn, "journals", month)
+            month += relativedelta(months=1)
+        conn.commit()
+    print(f"✅ Monthly partitions exist through {month_partition_name(month - relativedelta(months=1))}")
+
+
+def detach_old_partitions(keep_months, drop=False, dry_run=False):
+    """
+    Retention hook: detach monthly partitions entirely older than `keep_months`.
+    Detached tables are kept (archived) unless --drop is given. Daily rollups and keyword
+    counts of affected users are rebuilt so analytics match the remaining entries.
+    """
+    cutoff = date.today().replace(day=1) - relativedelta(months=keep_months)
+
+    with db.engine.connect() as conn:
+        if get_partition_strategy(conn, "journals") != "range":
+            print("ℹ️  journals is not range-partitioned; retention only applies to monthly partitions")
+            return
+        partitions = conn.execute(db.text("""
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            JOIN pg_class p ON p.oid = i.inhparent
+            WHERE p.relname = 'journals'
+            ORDER BY c.relname
+        """)).scalars().all()
+
+    expired = []
+    for name in partitions:
+        match = MONTH_PARTITION.match(name)
+        if match and date(int(match.group(1)), int(match.group(2)), 1) + relativedelta(months=1) <= cutoff:
+            expired.append(name)
+
+    if not expired:
+        print(f"✅ No partitions older than {cutoff.isoformat()}")
+        return
+
+    for name in expired:
+        if dry_run:
+            print(f"   Would detach {name}")
+            continue
+
+        with db.engine.connect() as conn:
+            affected_users = conn.execute(db.text(f"SELECT DISTINCT user_id FROM {name}")).scalars().all()
+        # DETACH ... CONCURRENTLY isn't allowed while a default partition exists, so take the
+        # brief exclusive lock instead and give up rather than queue behind long queries
+        with db.engine.connect() as conn:
+            conn.execute(db.text("SET LOCAL lock_timeout = '5s'"))
+            conn.execute(db.text(f"ALTER TABLE journals DETACH PARTITION {name}"))
+            if drop:
+                conn.execute(db.text(f"DROP TABLE {name}"))
+            conn.commit()
+        print(f"✅ {'Dropped' if drop else 'Detached'} {name}")
+
+        for user_id in affected_users:
+            JournalDailyRollup.rebuild(user_id)
+            UserKeywordCount.rebuild(user_id)
+            cache.bump_user_version(user_id)
+        print(f"   Rebuilt rollups and keyword counts for {len(affected_users)} users")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Partition the journals table and maintain its partitions")
+    parser.add_argument("command", choices=["create", "backfill", "swap", "ensure", "detach"])
+    parser.add_argument("--strategy", choices=["range", "hash"], default="range")
+    parser.add_argument("--partitions", type=int, default=16, help="Number of hash partitions")
+    parser.add_argument("--months-ahead", type=int, default=3, help="Monthly partitions to create ahead of today")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Rows per backfill transaction")
+    parser.add_argument("--keep-months", type=int, help="Months of entries to keep attached (detach)")
+    parser.add_argument("--drop", action="store_true", help="Drop detached partitions instead of archiving them")
+    parser.add_argument("--dry-run", action="store_true", help="List partitions that would be detached")
+    args = parser.parse_args()
+
+    if args.command == "detach" and not args.keep_months:
+        parser.error("detach requires --keep-months")
+
+    app = create_app()
+
+    with app.app_context():
+        try:
+            if args.command == "create":
+                create_partitioned_table(args.strategy, args.partitions, args.months_ahead)
+            elif args.command == "backfill":
+                backfill(args.chunk_size)
+            elif args.command == "swap":
+                swap()
+            elif args.command == "ensure":
+                ensure_partitions(args.months_ahead)
+            else:
+                detach_old_partitions(args.keep_months, args.drop, args.dry_run)
+        except Exception as e:
+            print(f"💥 Partition {args.command} failed: {e}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
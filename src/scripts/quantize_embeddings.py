@@ -0,0 +1,200 @@
+"""
+Migrate journal embeddings to compact (quantized) storage.
+
+Uses the mode configured for the app (see EmbeddingConfig in src/config.py):
+    EMBEDDING_STORAGE=halfvec|binary  EMBEDDING_DIMENSIONS=<n>  EMBEDDING_KEEP_FULL=true|false
+
+Steps, each safe to re-run:
+    1. add        - add `journals.embedding_compact` as halfvec(n) or bit(n) (needs pgvector >= 0.8,
+                    whose iterative index scans keep per-user searches complete)
+    2. backfill   - fill it from the full vectors in keyset-ordered chunks, one transaction each
+    3. index      - build an HNSW index on the compact column concurrently
+    4. drop-full  - only with EMBEDDING_KEEP_FULL=false: null out the float32 vectors in chunks
+                    so their space can be reused (search then skips the rerank step)
+
+Deploy the app with the new EMBEDDING_* settings after `add`, so new entries are written in
+both forms while the backfill runs, and switch searches over once `index` is done.
+
+Usage:
+    python -m src.scripts.quantize_embeddings add
+    python -m src.scripts.quantize_embeddings backfill [--chunk-size 2000]
+    python -m src.scripts.quantize_embeddings index
+    python -m src.scripts.quantize_embeddings drop-full [--chunk-size 2000]
+"""
+
+import argparse
+import os
+import sys
+import uuid
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.app import create_app
+from src.config import EmbeddingConfig
+from src.database import db
+from src.models.journal_model import JournalEntryModel
+
+COLUMN = JournalEntryModel.COMPACT_EMBEDDING_COLUMN
+INDEX_NAME = "ix_journals_embedding_compact"
+MIN_PGVECTOR_VERSION = (0, 8, 0)
+
+
+def get_storage():
+    """Configured compact storage mode; the full mode has nothing to migrate"""
+    storage = EmbeddingConfig.storage()
+    if storage == EmbeddingConfig.FULL:
+        raise RuntimeError("EMBEDDING_STORAGE is 'full'; set it to 'halfvec' or 'binary' first")
+    return storage
+
+
+def compact_sql(storage, column="embedding"):
+    """SQL expression computing the compact form from a full vector, matching compact_embedding()"""
+    dimensions = EmbeddingConfig.dimensions()
+    reduced = f"subvector({column}, 1, {dimensions})"
+    if storage == EmbeddingConfig.BINARY:
+        # Normalizing can't change signs, so binary skips it
+        return f"binary_quantize({reduced})::bit({dimensions})"
+    return f"l2_normalize({reduced})::halfvec({dimensions})"
+
+
+def check_pgvector_version():
+    """halfvec/bit need pgvector 0.7; searches set hnsw.iterative_scan, added in 0.8"""
+    version = db.session.execute(db.text(
+        "SELECT extversion FROM pg_extension WHERE extname = 'vector'"
+    )).scalar()
+    if not version or tuple(int(part) for part in version.split(".")[:3]) < MIN_PGVECTOR_VERSION:
+        raise RuntimeError(f"pgvector >= 0.8.0 is required for halfvec/bit and iterative index scans (found {version})")
+
+
+def add_column():
+    """Add the compact column with the configured type"""
+    storage = get_storage()
+    compact_type = EmbeddingConfig.compact_type(storage)
+
+    check_pgvector_version()
+
+    existing = db.session.execute(db.text("""
+        SELECT format_type(atttypid, atttypmod)
+        FROM pg_attribute
+        WHERE attrelid = 'journals'::regclass AND attname = :column AND NOT attisdropped
+    """), {"column": COLUMN}).scalar()
+    if existing and existing != compact_type:
+        raise RuntimeError(
+            f"journals.{COLUMN} already exists as {existing}; drop it (and {INDEX_NAME}) to switch to {compact_type}"
+        )
+
+    db.session.execute(db.text(f"ALTER TABLE journals ADD COLUMN IF NOT EXISTS {COLUMN} {compact_type}"))
+    db.session.commit()
+    print(f"✅ journals.{COLUMN} is {compact_type}")
+
+
+def backfill(chunk_size):
+    """Compute compact vectors for entries that have a full vector but no compact one"""
+    storage = get_storage()
+    last_id = uuid.UUID(int=0)
+    total = 0
+
+    while True:
+        rows = db.session.execute(db.text(f"""
+            WITH chunk AS (
+                SELECT entry_id
+                FROM journals
+                WHERE entry_id > :last_id AND embedding IS NOT NULL AND {COLUMN} IS NULL
+                ORDER BY entry_id
+                LIMIT :chunk_size
+            )
+            UPDATE journals j
+            SET {COLUMN} = {compact_sql(storage, "j.embedding")}
+            FROM chunk
+            WHERE j.entry_id = chunk.entry_id
+            RETURNING j.entry_id
+        """), {"last_id": last_id, "chunk_size": chunk_size}).scalars().all()
+        db.session.commit()
+
+        if not rows:
+            break
+        total += len(rows)
+        last_id = max(uuid.UUID(str(entry_id)) for entry_id in rows)
+        print(f"   ...{total} entries quantized")
+
+    print(f"✅ Backfilled {total} compact embeddings")
+
+
+def create_index():
+    """Build the HNSW index on the compact column without blocking writes"""
+    storage = get_storage()
+    check_pgvector_version()
+    ops = "bit_hamming_ops" if storage == EmbeddingConfig.BINARY else "halfvec_cosine_ops"
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(db.text(f"""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME}
+            ON journals USING hnsw ({COLUMN} {ops})
+        """))
+        print(f"✅ Created HNSW index {INDEX_NAME} ({ops})")
+
+        conn.execute(db.text("ANALYZE journals"))
+        print("✅ Analyzed journals")
+
+
+def drop_full_vectors(chunk_size):
+    """Null out float32 vectors that already have a compact copy"""
+    get_storage()
+    if EmbeddingConfig.keep_full():
+        raise RuntimeError("EMBEDDING_KEEP_FULL is enabled; full vectors are still needed for reranking")
+
+    total = 0
+    while True:
+        count = db.session.execute(db.text(f"""
+            UPDATE journals
+            SET embedding = NULL
+            WHERE entry_id IN (
+                SELECT entry_id
+                FROM journals
+                WHERE embedding IS NOT NULL AND {COLUMN} IS NOT NULL
+                LIMIT :chunk_size
+            )
+        """), {"chunk_size": chunk_size}).rowcount
+        db.session.commit()
+
+        if not count:
+            break
+        total += count
+        print(f"   ...{total} full vectors dropped")
+
+    with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(db.text("VACUUM (ANALYZE) journals"))
+    print(f"✅ Dropped {total} full vectors and vacuumed journals")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate journal embeddings to compact storage")
+    parser.add_argument("command", choices=["add", "backfill", "index", "drop-full"])
+    parser.add_argument("--chunk-size", type=int, default=2000, help="Rows per transaction")
+    args = parser.parse_args()
+
+    print(f"🚀 Starting embedding quantization step: {args.command}")
+
+    app = create_app()
+
+    with app.app_context():
+        try:
+            if args.command == "add":
+                add_column()
+            elif args.command == "backfill":
+                backfill(args.chunk_size)
+            elif args.command == "index":
+                create_index()
+            else:
+                drop_full_vectors(args.chunk_size)
+            print("🎉 Step completed successfully!")
+        except Exception as e:
+            db.session.rollback()
+            print(f"💥 Embedding quantization {args.command} failed: {e}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Optional
+
+from src.models.survey_cohort_model import SurveyCohortWeek, SurveyCohortScore, SCORE_FIELDS
+from src.models.survey_state_model import SurveyRollingState
+
+
+class CohortService:
+    """
+    Survey analytics across all users for care-team/admin views, read from the per-week
+    cohort aggregates (survey_cohort_weeks / survey_cohort_scores) rather than per-user data.
+    """
+
+    DEFAULT_PAGE_SIZE = 12
+    MAX_PAGE_SIZE = 104
+    SCORES = range(1, 6)
+
+    @staticmethod
+    def _parse_date(name: str, value: Optional[str]) -> Optional[date]:
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, "%Y-%m-%d").date()
+        except ValueError:
+            raise ValueError(f"Invalid '{name}' value: {value}. Use YYYY-MM-DD")
+
+    @staticmethod
+    def _rate(count: int, total: int) -> Optional[float]:
+        return round(count / total * 100, 1) if total else None
+
+    @classmethod
+    def get_survey_weeks(cls, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                         start_date: Optional[str] = None, end_date: Optional[str] = None) -> Dict[str, Any]:
+        """
+        A page of per-week cohort statistics, newest first: respondents, completion rate
+        (respondents out of users who had started surveying by that week), urgent, sleep
+        and self-harm counts, and each dimension's score distribution and average.
+
+        :param cursor: `next_cursor` from the previous page.
+        :param start_date: Optional inclusive lower bound on week_start (YYYY-MM-DD).
+        :param end_date: Optional exclusive upper bound on week_start (YYYY-MM-DD).
+        :return: Dictionary with `weeks` and `next_cursor`.
+        """
+        if limit < 1 or limit > cls.MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {cls.MAX_PAGE_SIZE}")
+        before = cls._parse_date("cursor", cursor)
+        first_week = cls._parse_date("from", start_date)
+        end = cls._parse_date("to", end_date)
+        if first_week and end and first_week >= end:
+            raise ValueError("'from' must be before 'to'")
+        last_week = end - timedelta(days=1) if end else None
+
+        # One extra row tells whether another page follows
+        weeks = SurveyCohortWeek.get_page(limit + 1, before, first_week, last_week)
+        has_more = len(weeks) > limit
+        weeks = weeks[:limit]
+        if not weeks:
+            return {"weeks": [], "next_cursor": None}
+
+        week_starts = [week.week_start for week in weeks]
+        enrolled = SurveyRollingState.enrolled_by_week(min(week_starts), max(week_starts))
+        distributions = {}
+        for row in SurveyCohortScore.get_for_weeks(week_starts):
+            distributions.setdefault((row.week_start, row.dimension), {})[row.score] = row.respondents
+
+        results = []
+        for week in weeks:
+            users = enrolled.get(week.week_start, 0)
+            dimensions = {}
+            for field in SCORE_FIELDS:
+                counts = distributions.get((week.week_start, field), {})
+                answered = sum(counts.values())
+                dimensions[field] = {
+                    "distribution": {str(score): counts.get(score, 0) for score in cls.SCORES},
+                    "average": round(sum(score * count for score, count in counts.items()) / answered, 2)
+                    if answered else None,
+                }
+            results.append({
+                "week_start": week.week_start.isoformat(),
+                "respondents": week.respondents,
+                "enrolled_users": users,
+                "completion_rate": cls._rate(week.respondents, users),
+                "urgent_count": week.urgent_count,
+                "urgent_rate": cls._rate(week.urgent_count, week.respondents),
+                "sleep_issue_count": week.sleep_issue_count,
+                "self_harm_count": week.self_harm_count,
+                "dimensions": dimensions,
+            })
+
+        return {
+            "weeks": results,
+            "next_cursor": results[-1]["week_start"] if has_more else None,
+        }
@@ -0,0 +1,82 @@
+import csv
+import io
+import json
+import zlib
+from src.models.journal_model import JournalEntryModel
+
+
+class JournalExportService:
+    FORMATS = ("ndjson", "csv")
+    MIMETYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+    # Lines are buffered into chunks of about this size before being written to the response
+    CHUNK_BYTES = 64 * 1024
+
+    @staticmethod
+    def serialize_row(row):
+        """Make a row JSON-friendly: ISO timestamps, string IDs, embedding as a list of floats."""
+        row["entry_id"] = str(row["entry_id"])
+        row["timestamp"] = row["timestamp"].isoformat() if row["timestamp"] else None
+        if row.get("embedding") is not None:
+            row["embedding"] = [float(value) for value in row["embedding"]]
+        return row
+
+    @staticmethod
+    def iter_lines(user_id, fmt, include_embeddings=False):
+        """Yield the export one line at a time."""
+        rows = JournalEntryModel.iter_export_rows(user_id, include_embeddings)
+        if fmt == "ndjson":
+            for row in rows:
+                yield json.dumps(JournalExportService.serialize_row(row)) + "\n"
+            return
+
+        fields = list(JournalEntryModel.EXPORT_COLUMNS) + (["embedding"] if include_embeddings else [])
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fields)
+        writer.writeheader()
+        for row in rows:
+            row = JournalExportService.serialize_row(row)
+            # Nested values (keywords, weather, location, ...) are written as JSON
+            writer.writerow({
+                key: json.dumps(value) if isinstance(value, (list, dict)) else value
+                for key, value in row.items()
+            })
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    @staticmethod
+    def iter_chunks(lines):
+        """Group lines into ~CHUNK_BYTES byte chunks."""
+        pending, size = [], 0
+        for line in lines:
+            encoded = line.encode("utf-8")
+            pending.append(encoded)
+            size += len(encoded)
+            if size >= JournalExportService.CHUNK_BYTES:
+                yield b"".join(pending)
+                pending, size = [], 0
+        if pending:
+            yield b"".join(pending)
+
+    @staticmethod
+    def gzip_chunks(chunks):
+        """Gzip a byte stream on the fly."""
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for chunk in chunks:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
+
+    @staticmethod
+    def export(user_id, fmt="ndjson", include_embeddings=False, compress=False):
+        """
+        Stream a user's whole journal.
+        :return: Generator of byte chunks.
+        """
+        if fmt not in JournalExportService.FORMATS:
+            raise ValueError(f"format must be one of {', '.join(JournalExportService.FORMATS)}")
+        chunks = JournalExportService.iter_chunks(
+            JournalExportService.iter_lines(user_id, fmt, include_embeddings)
+        )
+        return JournalExportService.gzip_chunks(chunks) if compress else chunks
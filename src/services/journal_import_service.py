@@ -0,0 +1,184 @@
+import csv
+import io
+import json
+from datetime import timezone
+from dateutil.parser import parse
+from src.database import db
+from src.cache import cache
+from src.models.journal_model import JournalEntryModel
+from src.models.journal_import_model import JournalImport
+
+
+class ImportValidationError(ValueError):
+    """Raised when an import has row errors; nothing is inserted."""
+
+    def __init__(self, errors):
+        super().__init__(f"Import has {len(errors)} invalid rows")
+        self.errors = errors
+
+
+class JournalImportService:
+    FORMATS = ("json", "ndjson", "csv")
+    MAX_ROWS = 10000
+    MAX_ENTRY_LENGTH = 20000
+    # Entries per enrichment task; each task loads the ML models once for the whole batch
+    ENRICH_BATCH_SIZE = 50
+
+    @staticmethod
+    def detect_format(mimetype, requested=None):
+        """Pick the payload format from an explicit `format` parameter or the Content-Type."""
+        if requested:
+            if requested not in JournalImportService.FORMATS:
+                raise ValueError(f"format must be one of {', '.join(JournalImportService.FORMATS)}")
+            return requested
+        if mimetype in ("application/x-ndjson", "application/jsonl", "application/jsonlines"):
+            return "ndjson"
+        if mimetype in ("text/csv", "application/csv"):
+            return "csv"
+        return "json"
+
+    @staticmethod
+    def parse_rows(body, fmt):
+        """
+        Split the raw payload into row dicts.
+        Returns (rows, errors) so per-line syntax errors are reported like validation errors.
+        Row numbers are 1-based.
+        """
+        rows, errors = [], []
+        if fmt == "ndjson":
+            for number, line in enumerate(body.splitlines(), start=1):
+                if not line.strip():
+                    continue
+                try:
+                    rows.append((number, json.loads(line)))
+                except json.JSONDecodeError as e:
+                    errors.append({"row": number, "error": f"Invalid JSON: {e.msg}"})
+        elif fmt == "csv":
+            reader = csv.DictReader(io.StringIO(body))
+            if not reader.fieldnames or "entry" not in reader.fieldnames:
+                raise ValueError("CSV header must include an 'entry' column")
+            for number, record in enumerate(reader, start=1):
+                location = None
+                if record.get("latitude") or record.get("longitude"):
+                    location = {"latitude": record.get("latitude"), "longitude": record.get("longitude")}
+                rows.append((number, {"entry": record.get("entry"), "date": record.get("date"), "location": location}))
+        else:
+            try:
+                payload = json.loads(body)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON: {e.msg}")
+            if isinstance(payload, dict):
+                payload = payload.get("entries")
+            if not isinstance(payload, list):
+                raise ValueError("JSON imports must be an array of entries or {\"entries\": [...]}")
+            rows = list(enumerate(payload, start=1))
+        return rows, errors
+
+    @staticmethod
+    def validate_row(row):
+        """Normalize one row to {entry, timestamp, location} or raise ValueError."""
+        if not isinstance(row, dict):
+            raise ValueError("Row must be an object")
+
+        text = row.get("entry")
+        if not isinstance(text, str) or not text.strip():
+            raise ValueError("'entry' is required")
+        if len(text) > JournalImportService.MAX_ENTRY_LENGTH:
+            raise ValueError(f"'entry' is longer than {JournalImportService.MAX_ENTRY_LENGTH} characters")
+
+        raw_date = row.get("date") or row.get("timestamp")
+        if not raw_date:
+            raise ValueError("'date' is required")
+        try:
+            timestamp = parse(str(raw_date))
+        except (ValueError, OverflowError):
+            raise ValueError(f"Invalid date: {raw_date}")
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.astimezone(timezone.utc)
+        else:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+
+        location = row.get("location")
+        if location is not None:
+            try:
+                location = {
+                    "latitude": float(location["latitude"]),
+                    "longitude": float(location["longitude"]),
+                }
+            except (TypeError, KeyError, ValueError):
+                raise ValueError("'location' must have numeric latitude and longitude")
+            if not (-90 <= location["latitude"] <= 90 and -180 <= location["longitude"] <= 180):
+                raise ValueError("'location' is out of range")
+
+        return {"entry": text, "timestamp": timestamp, "location": location}
+
+    @staticmethod
+    def validate(body, fmt):
+        """
+        Parse and validate the whole payload.
+        :return: List of normalized rows.
+        :raises ImportValidationError: With every row error, if any row is invalid.
+        """
+        parsed, errors = JournalImportService.parse_rows(body, fmt)
+        if not parsed and not errors:
+            raise ValueError("Import contains no entries")
+        if len(parsed) + len(errors) > JournalImportService.MAX_ROWS:
+            raise ValueError(f"Imports are limited to {JournalImportService.MAX_ROWS} entries")
+
+        rows = []
+        for number, row in parsed:
+            try:
+                rows.append(JournalImportService.validate_row(row))
+            except ValueError as e:
+                errors.append({"row": number, "error": str(e)})
+
+        if errors:
+            raise ImportValidationError(sorted(errors, key=lambda error: error["row"]))
+        return rows
+
+    @staticmethod
+    def import_entries(user_id, body, fmt):
+        """
+        Validate and insert an import in one transaction, then queue enrichment in batches
+        on the bulk queue.
+        :return: The import's progress dict.
+        """
+        rows = JournalImportService.validate(body, fmt)
+
+        try:
+            job = JournalImport(
+                user_id=user_id,
+                status=JournalImport.STATUS_ENRICHING,
+                total_rows=len(rows),
+                enriched_rows=0,
+            )
+            db.session.add(job)
+            db.session.flush()
+            entry_ids = JournalEntryModel.bulk_insert(user_id, rows)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"[ERROR] Failed to import journal entries: {e}")
+            raise
+        cache.bump_user_version(user_id)
+
+        JournalImportService.dispatch_enrichment(job.import_id, entry_ids)
+        return job.to_dict()
+
+    @staticmethod
+    def dispatch_enrichment(import_id, entry_ids):
+        try:
+            from src.tasks.enrich import enrich_journal_batch
+            size = JournalImportService.ENRICH_BATCH_SIZE
+            for start in range(0, len(entry_ids), size):
+                batch = [str(entry_id) for entry_id in entry_ids[start:start + size]]
+                enrich_journal_batch.delay(batch, str(import_id))
+            print(f"Queued enrichment for import {import_id} ({len(entry_ids)} entries)", flush=True)
+        except Exception as e:
+            # Entries stay processing=True and can be re-queued with retry_failed_entries
+            print(f"Failed to queue import enrichment: {e}", flush=True)
+
+    @staticmethod
+    def get_import(user_id, import_id):
+        job = JournalImport.get_for_user(user_id, import_id)
+        return job.to_dict() if job else None
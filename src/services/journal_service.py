@@ -1,9 +1,13 @@
+import uuid
 from datetime import datetime, timezone
 from src.models.journal_model import JournalEntryModel
+from src.models.keyword_count_model import UserKeywordCount
+from src.models.daily_rollup_model import JournalDailyRollup
+from src.database import db
+from src.cache import cache
 from dateutil.parser import parse
 from src.services.text_service import TextAnalysisService
 from src.services.weather_service import WeatherService
-from collections import Counter
 from datetime import timedelta
 import logging
 
@@ -37,7 +41,10 @@ class JournalService:
                 embedding=None,
             )
 
+            db.session.add(journal_entry)
+            JournalDailyRollup.record_entry(user_id, timestamp)
             saved_entry = journal_entry.save()
+            cache.bump_user_version(user_id)
             
             try:
                 from src.tasks.enrich import enrich_journal_entry
@@ -53,13 +60,15 @@ class JournalService:
             raise
 
     @staticmethod
-    def get_all_journal_entries(user_id):
+    def get_all_journal_entries(user_id, start=None, end=None):
         """
         Retrieve all journal entries for a specific user.
         :param user_id: ID of the user.
+        :param start: Optional inclusive start timestamp.
+        :param end: Optional exclusive end timestamp.
         :return: List of journal entries.
         """
-        return JournalEntryModel.get_all_entries(user_id)
+        return JournalEntryModel.get_all_entries(user_id, start=start, end=end)
 
     @staticmethod
     def get_journal_entry(user_id, entry_id):
@@ -72,22 +81,48 @@ class JournalService:
         return JournalEntryModel.get_entry_by_id(user_id, entry_id)
 
     @staticmethod
-    def delete_journal_entry(entry_id):
+    def delete_journal_entry(user_id, entry_id):
         """
-        Delete a specific journal entry by entry ID.
+        Delete one of the user's journal entries by entry ID.
+        :param user_id: The user's ID; entries owned by other users are never deleted.
         :param entry_id: Entry ID of the journal entry to delete.
         :return: True if deletion was successful, False otherwise.
         """
-        return JournalEntryModel.delete_entry(entry_id)
+        return JournalEntryModel.delete_entry(entry_id, user_id)
 
     @staticmethod
-    def get_recent_entries(user_id):
+    def delete_journal_entries(user_id, entry_ids):
         """
-        Fetch the last 12 journal entries for a user.
+        Delete many of the user's journal entries in one statement.
+        :param user_id: The user's ID.
+        :param entry_ids: Entry IDs to delete, at most `JournalEntryModel.MAX_DELETE_BATCH`.
+        :raises ValueError: If the list is empty, too long, or contains an invalid ID.
+        :return: Dict with the `deleted` IDs and the requested IDs that were `not_found`.
+        """
+        if not isinstance(entry_ids, list) or not entry_ids:
+            raise ValueError("entry_ids must be a non-empty list")
+        if len(entry_ids) > JournalEntryModel.MAX_DELETE_BATCH:
+            raise ValueError(f"At most {JournalEntryModel.MAX_DELETE_BATCH} entries can be deleted per request")
+        try:
+            requested = list(dict.fromkeys(str(uuid.UUID(str(entry_id))) for entry_id in entry_ids))
+        except ValueError:
+            raise ValueError("entry_ids must be valid UUIDs")
+
+        deleted = JournalEntryModel.delete_entries(user_id, requested)
+        deleted_set = set(deleted)
+        return {
+            "deleted": deleted,
+            "not_found": [entry_id for entry_id in requested if entry_id not in deleted_set],
+        }
+
+    @staticmethod
+    def get_recent_entries(user_id, start=None, end=None):
+        """
+        Fetch the last 12 journal entries for a user, optionally within [start, end).
         :param user_id: The user's ID.
         :return: A list of the 12 most recent journal entries.
         """
-        return JournalEntryModel.get_recent_entries(user_id)
+        return JournalEntryModel.get_recent_entries(user_id, start=start, end=end)
 
     @staticmethod
     def get_entries_by_month(user_id, year, month):
@@ -111,142 +146,194 @@ class JournalService:
     
 
     @staticmethod
+    @cache.cached("heatmap")
     def get_heatmap_data(user_id, days=365):
         """
-        Fetch heatmap data for the last 365 days.
+        Fetch heatmap data for the last 365 days from the daily rollup.
         :param user_id: The user's ID.
         :return: A dictionary with dates as keys and entry counts as values.
         """
-        today = datetime.now(timezone.utc)
-        start_date = today - timedelta(days=days)
-        try:
-            timestamps = JournalEntryModel.get_entry_timestamps_in_range(user_id, start_date, today)
-            date_counts = Counter(ts.date().isoformat() for ts in timestamps)
-            heatmap_data = {
-                (today - timedelta(days=i)).strftime('%Y-%m-%d'): date_counts.get(
-                    (today - timedelta(days=i)).strftime('%Y-%m-%d'), 0)
-                for i in range(days)
-            }
-            return heatmap_data
-        except Exception as e:
-            return {}
-    
+        today = datetime.now(timezone.utc).date()
+        start_day = today - timedelta(days=days - 1)
+        date_counts = {
+            row.day: row.entry_count
+            for row in JournalDailyRollup.get_range(user_id, start_day, today + timedelta(days=1))
+        }
+        return {
+            (today - timedelta(days=i)).isoformat(): date_counts.get(today - timedelta(days=i), 0)
+            for i in range(days)
+        }
+
     @staticmethod
+    def _get_daily_sentiments(user_id, start_day, end_day):
+        """
+        Read per-day sentiment totals for [start_day, end_day] from the daily rollup.
+        :return: A dictionary of date -> (sentiment_sum, scored_count) for days with scored entries.
+        """
+        return {
+            row.day: (row.sentiment_sum, row.scored_count)
+            for row in JournalDailyRollup.get_range(user_id, start_day, end_day + timedelta(days=1))
+            if row.scored_count
+        }
+
+    @staticmethod
+    def _average(totals):
+        sentiment_sum = sum(total for total, _ in totals)
+        scored_count = sum(count for _, count in totals)
+        return sentiment_sum / scored_count if scored_count else 0
+
+    @staticmethod
+    @cache.cached("sentiments")
     def get_dashboard_sentiments(user_id):
         try:
+            # One rollup read covers all three charts
+            today = datetime.now(timezone.utc).date()
+            daily = JournalService._get_daily_sentiments(user_id, today - timedelta(days=364), today)
             return {
-                "last_week": JournalService.get_last_week_sentiments(user_id),
-                "last_month": JournalService.get_last_month_sentiments(user_id),
-                "last_year": JournalService.get_last_year_sentiments(user_id)
+                "last_week": JournalService.get_last_week_sentiments(user_id, daily),
+                "last_month": JournalService.get_last_month_sentiments(user_id, daily),
+                "last_year": JournalService.get_last_year_sentiments(user_id, daily)
             }
         except Exception as e:
+            # Re-raise rather than return empty charts, which would be cached for the full TTL
             print(f"Error getting dashboard sentiments for user {user_id}: {e}")
-            import traceback
-            traceback.print_exc()
-            return {
-                "last_week": [],
-                "last_month": [],
-                "last_year": []
-            }
+            raise
 
     @staticmethod
-    def get_last_week_sentiments(user_id):
+    def get_last_week_sentiments(user_id, daily=None):
         try:
-            today = datetime.now(timezone.utc)
+            today = datetime.now(timezone.utc).date()
             start = today - timedelta(days=6)
-            raw = JournalEntryModel.get_sentiments_by_date(user_id, start.strftime('%Y-%m-%d'), today.strftime('%Y-%m-%d'))
-            from collections import defaultdict
-            grouped = defaultdict(list)
-            for e in raw:
-                if e["sentiment_score"] is not None and e["timestamp"] is not None:
-                    grouped[e["timestamp"].date().isoformat()].append(e["sentiment_score"])
+            if daily is None:
+                daily = JournalService._get_daily_sentiments(user_id, start, today)
             return [
                 {
                     "day": (start + timedelta(days=i)).strftime('%A'),
-                    "average_sentiment": sum(grouped.get((start + timedelta(days=i)).strftime('%Y-%m-%d'), [])) /
-                                         max(len(grouped.get((start + timedelta(days=i)).strftime('%Y-%m-%d'), [])), 1)
+                    "average_sentiment": JournalService._average(
+                        [daily[start + timedelta(days=i)]] if start + timedelta(days=i) in daily else []
+                    )
                 }
                 for i in range(7)
             ]
         except Exception as e:
             print(f"Error getting last week sentiments: {e}")
-            return []
+            raise
 
     @staticmethod
-    def get_last_month_sentiments(user_id):
+    def get_last_month_sentiments(user_id, daily=None):
         try:
-            today = datetime.now(timezone.utc)
+            today = datetime.now(timezone.utc).date()
             start = today - timedelta(days=29)
-            raw = JournalEntryModel.get_sentiments_by_date(user_id, start.strftime('%Y-%m-%d'), today.strftime('%Y-%m-%d'))
+            if daily is None:
+                daily = JournalService._get_daily_sentiments(user_id, start, today)
             from collections import defaultdict
             grouped = defaultdict(list)
-            for e in raw:
-                # Skip entries without valid sentiment scores
-                if e["sentiment_score"] is not None and e["timestamp"] is not None:
-                    days_ago = (today - e["timestamp"]).days
-                    if days_ago <= 6:
-                        label = "This week"
-                    elif days_ago <= 13:
-                        label = "Last week"
-                    elif days_ago <= 20:
-                        label = "2 weeks ago"
-                    elif days_ago <= 27:
-                        label = "3 weeks ago"
-                    else:
-                        label = "4 weeks ago"
-                    grouped[label].append(e["sentiment_score"])
+            for day, totals in daily.items():
+                days_ago = (today - day).days
+                if days_ago < 0 or days_ago > 29:
+                    continue
+                if days_ago <= 6:
+                    label = "This week"
+                elif days_ago <= 13:
+                    label = "Last week"
+                elif days_ago <= 20:
+                    label = "2 weeks ago"
+                elif days_ago <= 27:
+                    label = "3 weeks ago"
+                else:
+                    label = "4 weeks ago"
+                grouped[label].append(totals)
             labels = ["4 weeks ago", "3 weeks ago", "2 weeks ago", "Last week", "This week"]
             return [
                 {
                     "week_label": label,
-                    "average_sentiment": sum(grouped[label]) / len(grouped[label]) if grouped[label] else 0
+                    "average_sentiment": JournalService._average(grouped[label])
                 }
                 for label in labels
             ]
         except Exception as e:
             print(f"Error getting last month sentiments: {e}")
-            return []
+            raise
 
     @staticmethod
-    def get_last_year_sentiments(user_id):
+    def get_last_year_sentiments(user_id, daily=None):
         try:
-            today = datetime.now(timezone.utc)
+            today = datetime.now(timezone.utc).date()
             start = today - timedelta(days=364)
-            raw = JournalEntryModel.get_sentiments_by_date(user_id, start.strftime('%Y-%m-%d'), today.strftime('%Y-%m-%d'))
+            if daily is None:
+                daily = JournalService._get_daily_sentiments(user_id, start, today)
             from collections import defaultdict
             from dateutil.relativedelta import relativedelta
             grouped = defaultdict(list)
-            for e in raw:
-                # Skip entries without valid sentiment scores
-                if e["sentiment_score"] is not None and e["timestamp"] is not None:
-                    key = e["timestamp"].strftime("%Y-%m")  # e.g., '2025-06'
-                    grouped[key].append(e["sentiment_score"])
+            for day, totals in daily.items():
+                if start <= day <= today:
+                    grouped[day.strftime("%Y-%m")].append(totals)
             results = []
             for i in range(12):
                 key = (start + relativedelta(months=i)).strftime('%Y-%m')
-                avg = sum(grouped.get(key, [])) / len(grouped[key]) if grouped.get(key) else 0
                 results.append({
                     "month": datetime.strptime(key, "%Y-%m").strftime("Month of %B"),
-                    "average_sentiment": avg
+                    "average_sentiment": JournalService._average(grouped.get(key, []))
                 })
             return results
         except Exception as e:
             print(f"Error getting last year sentiments: {e}")
-            return []
+            raise
+
+    @staticmethod
+    @cache.cached("sentiment_aggregates")
+    def get_sentiment_aggregates(user_id, granularity="day", start_date=None, end_date=None):
+        """
+        Average/count/min/max sentiment per day, week or month, computed in one query.
+        Reads journals rather than the daily rollup, which has no min/max; both use UTC
+        days, so day buckets agree with the dashboard charts.
+        :param start_date: Inclusive start date (YYYY-MM-DD). Defaults to one year before `end_date`.
+        :param end_date: Exclusive end date (YYYY-MM-DD). Defaults to tomorrow (UTC).
+        :return: A dictionary with the resolved range and the list of buckets.
+        """
+        try:
+            end = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date \
+                else datetime.now(timezone.utc).date() + timedelta(days=1)
+            start = datetime.strptime(start_date, "%Y-%m-%d").date() if start_date \
+                else end - timedelta(days=365)
+        except ValueError:
+            raise ValueError("Invalid date format. Use YYYY-MM-DD")
+        if start >= end:
+            raise ValueError("'from' must be before 'to'")
+
+        start_dt = datetime.combine(start, datetime.min.time(), tzinfo=timezone.utc)
+        end_dt = datetime.combine(end, datetime.min.time(), tzinfo=timezone.utc)
+        return {
+            "granularity": granularity,
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "buckets": JournalEntryModel.aggregate_sentiments(user_id, granularity, start_dt, end_dt)
+        }
 
     @staticmethod
-    def get_entries_by_keyword(user_id, keyword):
+    def get_entries_by_keyword(user_id, keyword, cursor=None, limit=None, start=None, end=None):
         """
-        Retrieve all journal entries for a user that contain a specific keyword.
+        Retrieve a page of journal entries for a user that contain a specific keyword.
+        :return: Tuple of (entries, next_cursor).
         """
-        return JournalEntryModel.get_entries_by_keyword(user_id, keyword)
+        return JournalEntryModel.get_entries_by_keyword(user_id, keyword, cursor, limit, start=start, end=end)
 
     @staticmethod
+    def suggest_keywords(user_id, prefix, limit=10):
+        """
+        Autocomplete keywords the user has written about, tolerating typos.
+        """
+        return UserKeywordCount.suggest(user_id, prefix.strip().lower(), limit)
+
+    @staticmethod
+    @cache.cached("keywords")
     def get_top_keywords(user_id, top_n=10):
         """
         Retrieve the top N most common keywords across all entries for a user.
+        Reads the incrementally maintained per-user keyword counts.
+        :return: List of (keyword, count) pairs, most common first.
         """
-        return JournalService.get_top_keywords(user_id, top_n)
+        return UserKeywordCount.get_top(user_id, top_n)
 
     @staticmethod
     def semantic_search_entries(user_id, query):
@@ -267,114 +354,147 @@ class JournalService:
             print(f"Semantic search service error: {e}", flush=True)
             return []
 
-    def get_top_keywords(user_id, top_n=10):
-        try:
-            entries = JournalEntryModel.get_all_keywords(user_id)
-            all_keywords = [kw for entry in entries if entry.keywords for kw in entry.keywords]
-            return Counter(all_keywords).most_common(top_n)
-        except Exception as e:
-            # All print statements removed from this file
-            raise
+    MAX_SIMILAR_RESULTS = 50
+
+    @staticmethod
+    @cache.cached("similar_entries")
+    def get_similar_entries(user_id, entry_id, top_k=5, start=None, end=None):
+        """
+        Find the user's entries most similar to one of their entries, reusing its stored
+        embedding so no embedding request is made.
+        :param top_k: Number of results, 1 to MAX_SIMILAR_RESULTS.
+        :param start: Optional inclusive lower bound on entry timestamps.
+        :param end: Optional exclusive upper bound on entry timestamps.
+        :raises ValueError: If `top_k` is out of range.
+        :return: List of entries, nearest first, or None if the entry doesn't exist.
+        """
+        if not 1 <= top_k <= JournalService.MAX_SIMILAR_RESULTS:
+            raise ValueError(f"top_k must be between 1 and {JournalService.MAX_SIMILAR_RESULTS}")
+        return JournalEntryModel.get_similar_entries(user_id, entry_id, top_k, start=start, end=end)
 
+    WEATHER_BAND_WIDTH = 5
+    MAX_WEATHER_BAND_WIDTH = 20
 
-    def get_streak_stats(user_id):
+    @staticmethod
+    @cache.cached("weather_mood")
+    def get_weather_mood(user_id, band_width=WEATHER_BAND_WIDTH):
         """
-        Computes journaling streak statistics for a given user.
-        Returns dates in UTC to ensure consistency across timezones.
+        Average sentiment by weather condition and by temperature band (°C) over the user's
+        whole history, from one aggregate query over the projected weather columns.
+        :param band_width: Width of each temperature band in degrees, 1 to MAX_WEATHER_BAND_WIDTH.
+        :raises ValueError: If `band_width` is out of range.
+        :return: Dictionary with the `overall` average, `conditions` (most written about first)
+            and `temperature_bands` (coldest first). Each group has its difference from the
+            overall average.
         """
-        entries = JournalService.get_all_journal_entries(user_id)
-        # Ensure we're using UTC for all date calculations
-        today = datetime.now(timezone.utc).date()
-        unique_dates = StreakService._extract_entry_dates(entries)
+        if not 1 <= band_width <= JournalService.MAX_WEATHER_BAND_WIDTH:
+            raise ValueError(f"band must be between 1 and {JournalService.MAX_WEATHER_BAND_WIDTH}")
+
+        overall = {"entry_count": 0, "average_sentiment": None}
+        conditions, bands = [], []
+        rows = JournalEntryModel.aggregate_weather_mood(user_id, band_width)
+        for row in rows:
+            if row.grouped_by == "overall":
+                overall = {
+                    "entry_count": row.count,
+                    "average_sentiment": float(row.average) if row.average is not None else None,
+                }
 
+        for row in rows:
+            if row.grouped_by == "overall" or (row.grouped_by == "band" and row.band is None):
+                continue
+            group = {
+                "entry_count": row.count,
+                "average_sentiment": float(row.average),
+                "min_sentiment": row.min,
+                "max_sentiment": row.max,
+                "difference": float(row.average) - overall["average_sentiment"],
+            }
+            if row.grouped_by == "condition":
+                conditions.append({"condition": row.condition, **group})
+            else:
+                bands.append({
+                    "min_temperature": row.band * band_width,
+                    "max_temperature": (row.band + 1) * band_width,
+                    **group,
+                })
 
+        conditions.sort(key=lambda group: (-group["entry_count"], group["condition"]))
+        bands.sort(key=lambda group: group["min_temperature"])
+        return {
+            "band_width": band_width,
+            "overall": overall,
+            "conditions": conditions,
+            "temperature_bands": bands,
+        }
 
-        if not unique_dates:
+    @staticmethod
+    @cache.cached("streak")
+    def get_streak_stats(user_id, tz=None):
+        """
+        Computes journaling streak statistics for a given user.
+        Dates are UTC unless an IANA timezone name is given, in which case each entry
+        counts towards the user's local calendar day.
+        """
+        zone = timezone.utc
+        if tz:
+            from dateutil import tz as dateutil_tz
+            from src.utils.timezone_utils import is_postgres_timezone
+            # The islands query converts with AT TIME ZONE, so Postgres must know the zone too
+            zone = dateutil_tz.gettz(tz) if is_postgres_timezone(tz) else None
+            if zone is None:
+                raise ValueError(f"Unknown timezone: {tz}")
+        today = datetime.now(zone).date()
+        window_start = today - timedelta(days=StreakService.CALENDAR_DAYS - 1)
+
+        islands = JournalDailyRollup.get_streak_islands(user_id, window_start, tz)
+        if not islands["last_day"]:
             return StreakService._empty_stats()
 
-        sorted_dates = sorted(unique_dates)
-        longest_streak = StreakService._calculate_longest_streak(sorted_dates)
-        current_streak = StreakService._calculate_current_streak(today, unique_dates)
-     
-        
-        missed_days = StreakService._get_missed_days(today, unique_dates)
-        calendar_activity = StreakService._get_calendar_activity(user_id, today, days=30)
-
-        last_entry = max(unique_dates)
+        recent_days = StreakService._expand_islands(islands["recent"], window_start)
+        last_entry = islands["last_day"]
+        last_entry_with_time = datetime.combine(last_entry, datetime.max.time()).replace(tzinfo=zone)
 
-        last_entry_with_time = datetime.combine(last_entry, datetime.max.time()).replace(tzinfo=timezone.utc)
-        
         return {
-            "streak": current_streak,
-            "longest_streak": longest_streak,
-            "has_written_today": today in unique_dates,
+            "streak": StreakService._current_streak(today, islands["recent"]),
+            "longest_streak": islands["longest"],
+            "has_written_today": today in recent_days,
             "last_entry_date": last_entry_with_time.isoformat(),
-            "missed_days": missed_days,
-            "calendar_activity": calendar_activity
+            "missed_days": StreakService._get_missed_days(today, recent_days),
+            "calendar_activity": StreakService._get_calendar_activity(today, recent_days, days=StreakService.CALENDAR_DAYS)
         }
 
 
 class StreakService:
-    @staticmethod
-    def _extract_entry_dates(entries):
-        """Parses timestamps and returns a set of unique UTC dates."""
-        date_set = set()
-        debug_dates = []
-        for entry in entries:
-            try:
-                entry_date = parse(entry["timestamp"]).astimezone(timezone.utc).date()
-                date_set.add(entry_date)
-                debug_dates.append((entry["timestamp"], str(entry_date)))
-            except Exception as e:
-                pass
-        
-        return date_set
-
+    CALENDAR_DAYS = 30
 
     @staticmethod
-    def _calculate_longest_streak(sorted_dates):
-        """Calculates the longest consecutive streak."""
-        if not sorted_dates:
-            return 0
-
-        longest = current = 1
-        for i in range(1, len(sorted_dates)):
-            if (sorted_dates[i] - sorted_dates[i - 1]).days == 1:
-                current += 1
-                longest = max(longest, current)
-            else:
-                current = 1
-        return longest
-
+    def _expand_islands(islands, window_start):
+        """Turns (start, end, length) islands into the set of active days from window_start on."""
+        days = set()
+        for start_day, end_day, _ in islands:
+            cursor = max(start_day, window_start)
+            while cursor <= end_day:
+                days.add(cursor)
+                cursor += timedelta(days=1)
+        return days
 
     @staticmethod
-    def _calculate_current_streak(today, date_set):
-        """Calculates current streak ending today."""
-        if not date_set:
+    def _current_streak(today, islands):
+        """Length of the most recent island if it ends today or yesterday."""
+        if not islands:
             return 0
-
-        last_entry_date = max(date_set)
-        
+        _, end_day, length = islands[-1]
         # If the last entry is not from today or yesterday, there is no current streak
-        if (today - last_entry_date).days > 1:
+        if (today - end_day).days > 1:
             return 0
-            
-        streak = 0
-        cursor = last_entry_date
-        
-        while cursor in date_set:
-            streak += 1
-            cursor -= timedelta(days=1)
-            
-        return streak
-
+        return length
 
     @staticmethod
-    def _get_calendar_activity(user_id, today, days):
+    def _get_calendar_activity(today, date_set, days):
         """Returns a heatmap-style dictionary of writing activity."""
-        heatmap = JournalService.get_heatmap_data(user_id)
         return {
-            (today - timedelta(days=i)).isoformat(): heatmap.get((today - timedelta(days=i)).isoformat(), 0) > 0
+            (today - timedelta(days=i)).isoformat(): (today - timedelta(days=i)) in date_set
             for i in range(days)
         }
 
@@ -400,4 +520,3 @@ class StreakService:
             if check_date not in date_set:
                 missed.append(check_date.isoformat())
         return missed
-    
\ No newline at end of file
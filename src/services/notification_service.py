@@ -1,8 +1,8 @@
 from typing import Dict, Any, Optional, List
 from datetime import datetime, time, timezone
 from src.models.notification_model import NotificationSettings
-from src.models.user_model import User
 from src.services.email_service import EmailService
+from src.utils.request_identity import load_identity, current_user, current_settings, forget_identity
 import random
 
 
@@ -26,7 +26,11 @@ class NotificationService:
     
     def get_user_settings(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Get notification settings for a user"""
-        settings = NotificationSettings.find_by_user_id(user_id)
+        return self.serialize_settings(current_settings(user_id))
+
+    @staticmethod
+    def serialize_settings(settings) -> Optional[Dict[str, Any]]:
+        """Settings row as returned by the API, or None"""
         if not settings:
             return None
         
@@ -69,21 +73,22 @@ class NotificationService:
         
         # Update settings
         settings = NotificationSettings.update_settings(user_id, **filtered_kwargs)
+        forget_identity(user_id)
         
-        return self.get_user_settings(user_id)
+        return self.serialize_settings(settings)
     
     def create_default_settings(self, user_id: str) -> Dict[str, Any]:
         """Create default notification settings for a new user"""
         settings = NotificationSettings.create_default_settings(user_id)
-        return self.get_user_settings(user_id)
+        forget_identity(user_id)
+        return self.serialize_settings(settings)
     
     def send_journal_reminder(self, user_id: str) -> bool:
         """Send a journal reminder email to a user"""
-        user = User.find_by_google_id(user_id)
+        user, settings = load_identity(user_id)
         if not user:
             return False
         
-        settings = NotificationSettings.find_by_user_id(user_id)
         if not settings or not settings.journal_enabled:
             return False
         
@@ -95,7 +100,7 @@ class NotificationService:
     
     def send_test_email(self, user_id: str) -> bool:
         """Send a test email to a user"""
-        user = User.find_by_google_id(user_id)
+        user = current_user(user_id)
         if not user:
             return False
         
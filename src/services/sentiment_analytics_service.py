@@ -0,0 +1,284 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from src.cache import cache
+from src.models.daily_rollup_model import JournalDailyRollup
+
+
+class SentimentAnalyticsService:
+    """
+    Trend analytics over a user's daily sentiment series, computed with NumPy array
+    operations on the daily rollup rather than per-row Python loops.
+
+    A series is a dense run of UTC days with per-day `sums` and `counts` of scored entries;
+    days without entries have a count of 0. Means are entry-weighted throughout.
+    """
+
+    DEFAULT_DAYS = 365
+    MAX_DAYS = 3650
+    SHORT_WINDOW = 7
+    LONG_WINDOW = 30
+    EWMA_SPAN = 14
+    # A day is anomalous when its mean is this many trailing standard deviations away...
+    ANOMALY_Z = 2.5
+    # ...and the trailing window has at least this many days with entries
+    ANOMALY_MIN_DAYS = 7
+    CHANGE_WINDOW = 14
+    CHANGE_MIN_DELTA = 0.3
+    # EWMA is solved block by block so the powers of the decay factor stay in float64 range
+    EWMA_BLOCK = 128
+
+    @staticmethod
+    def load_series(user_id, start_day, end_day):
+        """
+        Read the rollup for [start_day, end_day] into dense arrays.
+        :return: (days, sums, counts) with `days` as datetime64[D].
+        """
+        length = (end_day - start_day).days + 1
+        rows = JournalDailyRollup.get_range(user_id, start_day, end_day + timedelta(days=1))
+        sums = np.zeros(length)
+        counts = np.zeros(length)
+        if rows:
+            offsets = np.array([(row.day - start_day).days for row in rows])
+            sums[offsets] = [row.sentiment_sum for row in rows]
+            counts[offsets] = [row.scored_count for row in rows]
+        days = np.arange(np.datetime64(start_day, "D"), np.datetime64(end_day, "D") + 1)
+        return days, sums, counts
+
+    @staticmethod
+    def divide(numerator, denominator):
+        """Elementwise ratio, NaN where the denominator is 0."""
+        result = np.full(numerator.shape, np.nan)
+        np.divide(numerator, denominator, out=result, where=denominator > 0)
+        return result
+
+    @staticmethod
+    def trailing_sum(values, window):
+        """Sum of each position and the `window - 1` before it, via a prefix sum."""
+        cumulative = np.concatenate(([0.0], np.cumsum(values)))
+        start = np.maximum(np.arange(1, len(values) + 1) - window, 0)
+        return cumulative[1:] - cumulative[start]
+
+    @staticmethod
+    def rolling_mean(sums, counts, window):
+        return SentimentAnalyticsService.divide(
+            SentimentAnalyticsService.trailing_sum(sums, window),
+            SentimentAnalyticsService.trailing_sum(counts, window),
+        )
+
+    @staticmethod
+    def rolling_std(daily_means, window):
+        """Standard deviation of the daily means over the trailing window, ignoring empty days."""
+        observed = ~np.isnan(daily_means)
+        values = np.where(observed, daily_means, 0.0)
+        n = SentimentAnalyticsService.trailing_sum(observed.astype(float), window)
+        total = SentimentAnalyticsService.trailing_sum(values, window)
+        squares = SentimentAnalyticsService.trailing_sum(values ** 2, window)
+        mean = SentimentAnalyticsService.divide(total, n)
+        variance = SentimentAnalyticsService.divide(squares, n) - mean ** 2
+        std = np.sqrt(np.maximum(variance, 0.0))
+        std[n < 2] = np.nan
+        return std, n
+
+    @staticmethod
+    def linear_recurrence(inputs, decay, block=EWMA_BLOCK):
+        """
+        Solve y[t] = decay * y[t-1] + inputs[t] (y[-1] = 0) without a per-element loop:
+        within a block, y[t] = decay^t * (decay * y0 + cumsum(inputs[j] / decay^j)).
+        """
+        output = np.empty(len(inputs))
+        state = 0.0
+        powers = decay ** np.arange(block)
+        for start in range(0, len(inputs), block):
+            chunk = inputs[start:start + block]
+            scale = powers[:len(chunk)]
+            output[start:start + len(chunk)] = scale * (decay * state + np.cumsum(chunk / scale))
+            state = output[start + len(chunk) - 1]
+        return output
+
+    @staticmethod
+    def ewma(sums, counts, span=EWMA_SPAN):
+        """
+        Time-aware exponentially weighted mean: each day decays by the same factor whether
+        or not it has entries, and days are weighted by their entry counts.
+        """
+        alpha = 2.0 / (span + 1)
+        decay = 1.0 - alpha
+        numerator = SentimentAnalyticsService.linear_recurrence(alpha * sums, decay)
+        denominator = SentimentAnalyticsService.linear_recurrence(alpha * counts, decay)
+        return SentimentAnalyticsService.divide(numerator, denominator)
+
+    @staticmethod
+    def weekly(days, sums, counts):
+        """
+        Seven-day buckets ending on the last day, with week-over-week deltas.
+        Leading days that don't fill a whole week are dropped.
+        """
+        weeks = len(days) // 7
+        if weeks == 0:
+            return []
+        offset = len(days) - weeks * 7
+        week_sums = sums[offset:].reshape(weeks, 7).sum(axis=1)
+        week_counts = counts[offset:].reshape(weeks, 7).sum(axis=1)
+        means = SentimentAnalyticsService.divide(week_sums, week_counts)
+        deltas = np.concatenate(([np.nan], np.diff(means)))
+        starts = days[offset::7]
+        return [
+            {
+                "week_start": str(start),
+                "average_sentiment": SentimentAnalyticsService._round(mean),
+                "entry_count": int(count),
+                "delta": SentimentAnalyticsService._round(delta),
+            }
+            for start, mean, count, delta in zip(starts, means, week_counts, deltas)
+        ]
+
+    @staticmethod
+    def anomalies(daily_means, window=LONG_WINDOW, z=ANOMALY_Z, min_days=ANOMALY_MIN_DAYS):
+        """
+        Days whose mean is more than `z` standard deviations from the trailing window
+        before it (the day itself excluded).
+        """
+        std, n = SentimentAnalyticsService.rolling_std(daily_means, window)
+        observed = ~np.isnan(daily_means)
+        baseline_sum = SentimentAnalyticsService.trailing_sum(np.where(observed, daily_means, 0.0), window)
+        # Shift by one day so each day is compared with the window that precedes it
+        prior_mean = np.concatenate(([np.nan], SentimentAnalyticsService.divide(baseline_sum, n)[:-1]))
+        prior_std = np.concatenate(([np.nan], std[:-1]))
+        prior_n = np.concatenate(([0.0], n[:-1]))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            scores = (daily_means - prior_mean) / prior_std
+        flagged = observed & (prior_n >= min_days) & (prior_std > 0) & (np.abs(scores) > z)
+        return flagged, scores
+
+    @staticmethod
+    def change_points(days, sums, counts, window=CHANGE_WINDOW, min_delta=CHANGE_MIN_DELTA):
+        """
+        Days where the mean of the `window` days after differs most from the `window`
+        days before: local maxima of |after - before| at least `min_delta` apart in mean.
+        """
+        if len(days) < 2 * window + 1:
+            return []
+        before = SentimentAnalyticsService.rolling_mean(sums, counts, window)
+        # The window starting at each day is the trailing window ending window - 1 days later
+        after = np.full(len(days), np.nan)
+        after[:len(days) - window + 1] = before[window - 1:]
+        # Compare the window ending the day before with the window starting on the day
+        previous = np.concatenate(([np.nan], before[:-1]))
+        delta = after - previous
+        magnitude = np.nan_to_num(np.abs(delta), nan=0.0)
+
+        # Keep a day only if it is the largest shift within +/- window days
+        padded = np.pad(magnitude, window, constant_values=0.0)
+        neighbourhood_max = np.lib.stride_tricks.sliding_window_view(padded, 2 * window + 1).max(axis=1)
+        candidates = np.flatnonzero((magnitude >= min_delta) & (magnitude == neighbourhood_max))
+        # Ties on a plateau leave neighbouring maxima; keep the first of each run
+        candidates = candidates[np.diff(candidates, prepend=-window - 1) > window]
+        return [
+            {
+                "date": str(days[i]),
+                "before_mean": SentimentAnalyticsService._round(previous[i]),
+                "after_mean": SentimentAnalyticsService._round(after[i]),
+                "delta": SentimentAnalyticsService._round(delta[i]),
+            }
+            for i in candidates
+        ]
+
+    @staticmethod
+    def compute_metrics(sums, counts):
+        """Every per-day metric as an array aligned with the series."""
+        daily = SentimentAnalyticsService.divide(sums, counts)
+        volatility, _ = SentimentAnalyticsService.rolling_std(daily, SentimentAnalyticsService.LONG_WINDOW)
+        flagged, scores = SentimentAnalyticsService.anomalies(daily)
+        return {
+            "average_sentiment": daily,
+            "rolling_7": SentimentAnalyticsService.rolling_mean(sums, counts, SentimentAnalyticsService.SHORT_WINDOW),
+            "rolling_30": SentimentAnalyticsService.rolling_mean(sums, counts, SentimentAnalyticsService.LONG_WINDOW),
+            "ewma": SentimentAnalyticsService.ewma(sums, counts),
+            "volatility_30": volatility,
+            "anomaly": flagged,
+            "z_score": scores,
+        }
+
+    @staticmethod
+    def analyze(days, sums, counts):
+        """Compute every metric for a dense daily series and shape it for JSON."""
+        metrics = SentimentAnalyticsService.compute_metrics(sums, counts)
+        to_list = SentimentAnalyticsService._to_list
+        round_ = SentimentAnalyticsService._round
+
+        columns = {
+            "date": np.datetime_as_string(days, unit="D").tolist(),
+            "average_sentiment": to_list(metrics["average_sentiment"]),
+            "entry_count": counts.astype(int).tolist(),
+            "rolling_7": to_list(metrics["rolling_7"]),
+            "rolling_30": to_list(metrics["rolling_30"]),
+            "ewma": to_list(metrics["ewma"]),
+            "volatility_30": to_list(metrics["volatility_30"]),
+            "anomaly": metrics["anomaly"].tolist(),
+        }
+        names = list(columns)
+        series = [dict(zip(names, values)) for values in zip(*columns.values())]
+
+        anomaly_days = np.flatnonzero(metrics["anomaly"])
+        total_count = counts.sum()
+        smoothed, volatility = metrics["ewma"], metrics["volatility_30"]
+
+        return {
+            "summary": {
+                "average_sentiment": round_(sums.sum() / total_count) if total_count else None,
+                "entry_count": int(total_count),
+                "active_days": int((counts > 0).sum()),
+                "current_ewma": round_(smoothed[-1]) if len(smoothed) else None,
+                "current_volatility": round_(volatility[-1]) if len(volatility) else None,
+            },
+            "series": series,
+            "weekly": SentimentAnalyticsService.weekly(days, sums, counts),
+            "anomalies": [
+                {
+                    "date": str(days[i]),
+                    "average_sentiment": round_(metrics["average_sentiment"][i]),
+                    "z_score": round_(metrics["z_score"][i]),
+                }
+                for i in anomaly_days
+            ],
+            "change_points": SentimentAnalyticsService.change_points(days, sums, counts),
+        }
+
+    @staticmethod
+    @cache.cached("sentiment_analytics")
+    def get_analytics(user_id, start_date=None, end_date=None):
+        """
+        Sentiment trend analytics for the user's UTC days in [start_date, end_date).
+        :param start_date: Inclusive start date (YYYY-MM-DD). Defaults to DEFAULT_DAYS before `end_date`.
+        :param end_date: Exclusive end date (YYYY-MM-DD). Defaults to tomorrow (UTC).
+        :raises ValueError: For invalid dates, an empty range, or one longer than MAX_DAYS.
+        """
+        try:
+            end = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date \
+                else datetime.now(timezone.utc).date() + timedelta(days=1)
+            start = datetime.strptime(start_date, "%Y-%m-%d").date() if start_date \
+                else end - timedelta(days=SentimentAnalyticsService.DEFAULT_DAYS)
+        except ValueError:
+            raise ValueError("Invalid date format. Use YYYY-MM-DD")
+        if start >= end:
+            raise ValueError("'from' must be before 'to'")
+        if (end - start).days > SentimentAnalyticsService.MAX_DAYS:
+            raise ValueError(f"Range cannot exceed {SentimentAnalyticsService.MAX_DAYS} days")
+
+        days, sums, counts = SentimentAnalyticsService.load_series(user_id, start, end - timedelta(days=1))
+        result = SentimentAnalyticsService.analyze(days, sums, counts)
+        result.update({"from": start.isoformat(), "to": end.isoformat()})
+        return result
+
+    @staticmethod
+    def _to_list(values, digits=4):
+        """Rounded floats with NaN as None, converted in one pass."""
+        rounded = np.round(values, digits).astype(object)
+        rounded[np.isnan(values)] = None
+        return rounded.tolist()
+
+    @staticmethod
+    def _round(value, digits=4):
+        return None if value is None or np.isnan(value) else round(float(value), digits)
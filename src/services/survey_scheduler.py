@@ -64,12 +64,11 @@ def send_weekly_survey_reminders():
 def send_survey_reminder_task(user_id: str):
     """Send a survey reminder email to a specific user"""
     try:
-        user = User.find_by_google_id(user_id)
+        user, settings = User.find_with_settings(user_id)
         if not user:
             print(f"❌ [SURVEY_REMINDER] User not found: {user_id}")
             return {"success": False, "error": "User not found", "user_id": user_id}
         
-        settings = NotificationSettings.find_by_user_id(user_id)
         if not settings or not settings.survey_enabled:
             print(f"⏭️ [SURVEY_REMINDER] Survey notifications disabled for user: {user.name}")
             return {"success": False, "error": "Survey notifications disabled", "user_id": user_id}
@@ -0,0 +1,207 @@
+import math
+import zlib
+from collections import Counter
+from datetime import datetime, timezone
+
+import numpy as np
+
+from src.database import db
+from src.cache import cache
+from src.models.journal_model import JournalEntryModel
+from src.models.theme_model import UserTheme
+
+
+class ThemeService:
+    """
+    Groups each user's entries into themes by clustering their embeddings.
+
+    Fitting runs in the background (src/tasks/themes.py) with spherical mini-batch k-means,
+    so cost per iteration is bounded by the batch size rather than the user's history.
+    Between fits, newly enriched entries are assigned to the nearest stored centroid.
+    """
+
+    MIN_ENTRIES = 10
+    MAX_THEMES = 12
+    LABEL_KEYWORDS = 3
+    BATCH_SIZE = 256
+    MAX_ITERATIONS = 100
+    TOLERANCE = 1e-4
+    # Refit once the user has this many more embedded entries than at the last fit...
+    REFIT_MIN_NEW_ENTRIES = 10
+    # ...and at least this fraction more
+    REFIT_GROWTH = 0.25
+
+    @staticmethod
+    def normalize(vectors):
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    @staticmethod
+    def choose_k(n_entries):
+        """Number of themes for a history of `n_entries`: sqrt(n/2), clamped to [2, MAX_THEMES]."""
+        return int(max(2, min(ThemeService.MAX_THEMES, round(math.sqrt(n_entries / 2)))))
+
+    @staticmethod
+    def init_centroids(vectors, k, rng):
+        """k-means++ seeding under cosine distance."""
+        centroids = np.empty((k, vectors.shape[1]), dtype=vectors.dtype)
+        centroids[0] = vectors[rng.integers(len(vectors))]
+        distances = 1.0 - vectors @ centroids[0]
+        for i in range(1, k):
+            weights = np.maximum(distances, 0) ** 2
+            total = weights.sum()
+            index = rng.choice(len(vectors), p=weights / total) if total > 0 else rng.integers(len(vectors))
+            centroids[i] = vectors[index]
+            distances = np.minimum(distances, 1.0 - vectors @ centroids[i])
+        return centroids
+
+    @staticmethod
+    def minibatch_kmeans(vectors, k, batch_size=BATCH_SIZE, max_iterations=MAX_ITERATIONS,
+                         tolerance=TOLERANCE, seed=0):
+        """
+        Spherical mini-batch k-means (Sculley, 2010) on unit vectors: each step assigns a
+        random batch by cosine similarity and moves every centroid towards its batch mean
+        with a per-centroid learning rate of 1 / (points seen so far).
+
+        :param vectors: (n, d) array.
+        :return: (centroids, labels) with unit-length centroids and each vector's cluster.
+        """
+        rng = np.random.default_rng(seed)
+        data = ThemeService.normalize(np.asarray(vectors, dtype=np.float32))
+        n = len(data)
+        k = min(k, n)
+        centroids = ThemeService.init_centroids(data, k, rng)
+        seen = np.zeros(k)
+
+        for _ in range(max_iterations):
+            batch = data[rng.choice(n, size=min(batch_size, n), replace=False)]
+            assigned = np.argmax(batch @ centroids.T, axis=1)
+            batch_counts = np.bincount(assigned, minlength=k)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assigned, batch)
+
+            updated = batch_counts > 0
+            seen += batch_counts
+            rate = (batch_counts[updated] / seen[updated])[:, None]
+            means = sums[updated] / batch_counts[updated][:, None]
+            previous = centroids.copy()
+            centroids[updated] = (1 - rate) * centroids[updated] + rate * means
+            centroids = ThemeService.normalize(centroids)
+
+            if np.max(np.linalg.norm(centroids - previous, axis=1)) < tolerance:
+                break
+
+        labels = np.argmax(data @ centroids.T, axis=1)
+        return centroids, labels
+
+    @staticmethod
+    def label_themes(labels, keyword_lists, k):
+        """
+        Top keywords per cluster, weighted by how specific they are to the cluster
+        (count in cluster x log(entries / entries using the keyword)).
+        """
+        document_frequency = Counter()
+        per_cluster = [Counter() for _ in range(k)]
+        for label, keywords in zip(labels, keyword_lists):
+            unique = set(keywords or [])
+            document_frequency.update(unique)
+            per_cluster[label].update(unique)
+
+        total = max(len(keyword_lists), 1)
+        themes = []
+        for counts in per_cluster:
+            ranked = sorted(
+                counts.items(),
+                key=lambda item: (-item[1] * math.log(1 + total / document_frequency[item[0]]), item[0]),
+            )
+            themes.append([keyword for keyword, _ in ranked[:ThemeService.LABEL_KEYWORDS]])
+        return themes
+
+    @staticmethod
+    def fit_user(user_id):
+        """
+        Cluster all of the user's embedded entries, replace their themes and reassign
+        every entry, then commit.
+
+        :return: Number of themes stored (0 if the user has too few entries).
+        """
+        rows = JournalEntryModel.get_embeddings_for_clustering(user_id)
+        if len(rows) < ThemeService.MIN_ENTRIES:
+            return 0
+
+        vectors = np.array([row.embedding for row in rows], dtype=np.float32)
+        # Stable per-user seed so refits of an unchanged history give the same themes
+        seed = zlib.crc32(user_id.encode())
+        centroids, labels = ThemeService.minibatch_kmeans(vectors, ThemeService.choose_k(len(rows)), seed=seed)
+
+        # Drop clusters that ended up empty and number the rest from 0
+        used = sorted(set(labels.tolist()))
+        renumber = {old: new for new, old in enumerate(used)}
+        labels = [renumber[label] for label in labels.tolist()]
+        keywords = ThemeService.label_themes(labels, [row.keywords for row in rows], len(used))
+
+        fitted_at = datetime.now(timezone.utc)
+        try:
+            UserTheme.replace_for_user(user_id, [
+                {
+                    "theme_id": theme_id,
+                    "label": ", ".join(keywords[theme_id]) or f"Theme {theme_id + 1}",
+                    "keywords": keywords[theme_id],
+                    "centroid": centroids[old].tolist(),
+                    "fitted_entries": len(rows),
+                    "fitted_at": fitted_at,
+                }
+                for old, theme_id in renumber.items()
+            ])
+            JournalEntryModel.set_themes(user_id, [(row.entry_id, label) for row, label in zip(rows, labels)])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        cache.bump_user_version(user_id)
+        return len(used)
+
+    @staticmethod
+    def assign_entry(entry, embedding):
+        """Set a newly enriched entry's theme to the nearest centroid. Does not commit."""
+        if embedding is None:
+            return
+        entry.theme_id = UserTheme.nearest(entry.user_id, embedding)
+
+    @staticmethod
+    def find_users_to_refit():
+        return UserTheme.find_stale_users(
+            ThemeService.MIN_ENTRIES, ThemeService.REFIT_MIN_NEW_ENTRIES, ThemeService.REFIT_GROWTH,
+            JournalEntryModel.clustering_column(),
+        )
+
+    @staticmethod
+    @cache.cached("themes")
+    def get_themes(user_id, recent_per_theme=3):
+        """
+        The user's precomputed themes with entry counts and their most recent entries.
+        :return: Dict with `themes` and `fitted_at` (None if themes were never fit).
+        """
+        themes = UserTheme.get_for_user(user_id)
+        members = {}
+        for row in JournalEntryModel.get_theme_members(user_id, recent_per_theme):
+            theme = members.setdefault(row.theme_id, {"entry_count": row.total, "recent_entries": []})
+            theme["recent_entries"].append({
+                "entry_id": str(row.entry_id),
+                "timestamp": row.timestamp.isoformat(),
+                "snippet": row.snippet,
+            })
+
+        return {
+            "themes": [
+                {
+                    "theme_id": theme.theme_id,
+                    "label": theme.label,
+                    "keywords": theme.keywords or [],
+                    "entry_count": members.get(theme.theme_id, {}).get("entry_count", 0),
+                    "recent_entries": members.get(theme.theme_id, {}).get("recent_entries", []),
+                }
+                for theme in themes
+            ],
+            "fitted_at": themes[0].fitted_at.isoformat() if themes else None,
+        }
@@ -46,6 +46,25 @@ class WeatherService:
             }
 
 
+    @staticmethod
+    def project(weather):
+        """
+        The fields weather/mood analytics group by, as stored in the journals
+        `weather_condition` and `temperature` columns.
+        :param weather: Weather dictionary as returned by `get_weather_by_location`, or None.
+        :return: Tuple of (condition, temperature). Both are None for missing weather or the
+            "Unknown" placeholder returned when the lookup failed.
+        """
+        if not weather:
+            return None, None
+        condition = str(weather.get("description") or "").strip().lower()
+        if not condition or condition == "unknown":
+            return None, None
+        temperature = weather.get("temperature")
+        if isinstance(temperature, bool) or not isinstance(temperature, (int, float)):
+            temperature = None
+        return condition, temperature
+
     @staticmethod
     def get_location_from_ip(ip_address):
         """
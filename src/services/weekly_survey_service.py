@@ -1,8 +1,8 @@
 from typing import Dict, Any, List, Optional
 from datetime import date, datetime, timedelta
 from src.models.weekly_survey_model import WeeklySurvey
-from src.models.user_model import User
-from src.database import db
+from src.utils.request_identity import current_user, user_exists
+from src.cache import cache
 
 
 class WeeklySurveyService:
@@ -48,9 +48,9 @@ class WeeklySurveyService:
     @classmethod
     def create_weekly_survey(cls, user_id: str, survey_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new weekly survey for the user"""
-        # Validate user exists
-        user = User.find_by_google_id(user_id)
-        if not user:
+        # Writes check the database: a token issued before the account was deleted still
+        # carries the registered claim, and the insert would then fail on the users FK
+        if current_user(user_id) is None:
             raise ValueError("User not found")
         
         # Validate and clean survey data
@@ -79,8 +79,7 @@ class WeeklySurveyService:
     def get_user_surveys(cls, user_id: str, range_type: str = "last12", since_date: str = None) -> List[Dict[str, Any]]:
         """Get surveys for a user based on range parameters"""
         # Validate user exists
-        user = User.find_by_google_id(user_id)
-        if not user:
+        if not user_exists(user_id):
             raise ValueError("User not found")
         
         if since_date:
@@ -141,129 +140,168 @@ class WeeklySurveyService:
         # Default to current week
         return cls.calculate_week_start()
 
+    MAX_MISSING_WEEKS_PAGE = 104
+
+    @classmethod
+    def _parse_week(cls, name: str, value: str) -> date:
+        try:
+            return datetime.strptime(value, "%Y-%m-%d").date()
+        except ValueError:
+            raise ValueError(f"Invalid '{name}' value: {value}. Use YYYY-MM-DD")
+
     @classmethod
-    def get_missing_weeks(cls, user_id: str, weeks_back: int = 8) -> List[str]:
-        """Get list of missing weeks for the user (for week picker)"""
+    @cache.cached("missing_weeks")
+    def get_missing_weeks(cls, user_id: str, weeks_back: int = 8, start_date: Optional[str] = None,
+                          end_date: Optional[str] = None, limit: int = MAX_MISSING_WEEKS_PAGE,
+                          cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get missing weeks for the user (for week picker), newest first.
+
+        By default covers the last `weeks_back` weeks. `start_date` (inclusive) and `end_date`
+        (exclusive), as YYYY-MM-DD, select an arbitrary range instead; partial weeks count
+        by their Monday. The current week is only offered from Sunday, and future weeks never.
+        Pages hold up to `limit` weeks; pass the returned `next_cursor` to get the next page.
+        """
+        if limit < 1 or limit > cls.MAX_MISSING_WEEKS_PAGE:
+            raise ValueError(f"limit must be between 1 and {cls.MAX_MISSING_WEEKS_PAGE}")
+
         today = date.today()
-        missing_weeks = []
-        
-        # Generate last N weeks (excluding current week if it's not Sunday yet)
-        for i in range(weeks_back):
-            target_date = today - timedelta(weeks=i)
-            week_start = cls.calculate_week_start(target_date)
-            
-            # Skip current week if it's not Sunday yet
-            if i == 0 and today.weekday() < 6:  # Not Sunday
-                continue
-            
-            # Check if survey exists for this week
-            existing_survey = WeeklySurvey.find_by_user_and_week(user_id, week_start)
-            if not existing_survey:
-                missing_weeks.append(week_start.isoformat())
-        
-        return missing_weeks
+        current_week = cls.calculate_week_start(today)
+        # Skip current week if it's not Sunday yet
+        last_week = current_week if today.weekday() == 6 else current_week - timedelta(weeks=1)
+        first_week = current_week - timedelta(weeks=weeks_back - 1)
+
+        if start_date:
+            first_week = cls.calculate_week_start(cls._parse_week("from", start_date))
+        if end_date:
+            end = cls._parse_week("to", end_date)
+            if start_date and end <= cls._parse_week("from", start_date):
+                raise ValueError("'from' must be before 'to'")
+            last_week = min(last_week, cls.calculate_week_start(end - timedelta(days=1)))
+        if cursor:
+            last_week = min(last_week, cls._parse_week("cursor", cursor) - timedelta(weeks=1))
+
+        if last_week < first_week:
+            return {"missing_weeks": [], "next_cursor": None}
+
+        # One extra row tells whether another page follows
+        weeks = WeeklySurvey.find_missing_weeks(user_id, first_week, last_week, limit + 1)
+        page = [week.isoformat() for week in weeks[:limit]]
+        return {
+            "missing_weeks": page,
+            "next_cursor": page[-1] if len(weeks) > limit else None,
+        }
+
+    MAX_SUMMARY_WEEKS = 52
+    # Order of the statistics in `computed`
+    SUMMARY_FIELDS = ['happiness', 'satisfaction', 'stress', 'anxiety', 'depression']
 
     @classmethod
-    def get_survey_summary(cls, user_id: str, weeks: int = 12) -> Dict[str, Any]:
-        """Get survey summary with computed statistics for dashboard"""
+    @cache.cached("survey_summary")
+    def get_survey_summary(cls, user_id: str, weeks: int = 12, ranges: Optional[List[int]] = None) -> Dict[str, Any]:
+        """
+        Get survey summary with computed statistics for dashboard.
+
+        Statistics are aggregated in the database. `ranges` optionally asks for the computed
+        statistics of other periods (e.g. [4, 12, 52] weeks) too; they are returned under
+        `ranges`, keyed by week count, from the same query.
+        """
         # Validate user exists
-        user = User.find_by_google_id(user_id)
-        if not user:
+        if not user_exists(user_id):
             raise ValueError("User not found")
-        
-        today = date.today()
-        
-        # Calculate the start of the current week (Monday)
-        current_week_start = cls.calculate_week_start(today)
-        
-        # Calculate the start of the range (weeks back from current week)
+
+        periods = sorted(set([weeks] + list(ranges or [])))
+        if periods[0] < 1 or periods[-1] > cls.MAX_SUMMARY_WEEKS:
+            raise ValueError(f"Weeks must be between 1 and {cls.MAX_SUMMARY_WEEKS}")
+
+        # Ranges end with the current week (Monday) and go `weeks` weeks back
+        current_week_start = cls.calculate_week_start(date.today())
         range_start = current_week_start - timedelta(weeks=weeks-1)
-        
-        # Get surveys for the specified period
-        surveys = (
-            db.session.query(WeeklySurvey)
-            .filter(WeeklySurvey.user_id == user_id)
-            .filter(WeeklySurvey.week_start >= range_start)
-            .order_by(WeeklySurvey.week_start)
-            .all()
-        )
-        
+
         # Build week slots so missing weeks show nulls
-        by_week = {survey.week_start: survey for survey in surveys}
+        by_week = {row.week_start: row for row in WeeklySurvey.get_week_rows(user_id, range_start, current_week_start)}
         summary = []
-        
-        # Generate weeks from oldest to newest
         for i in range(weeks):
             week_start = range_start + timedelta(weeks=i)
             survey = by_week.get(week_start)
-            
-            if survey:
-                summary.append({
-                    "week_start": week_start.isoformat(),
-                    "label": week_start.strftime("%b %d").lstrip("0"),
-                    "stress": survey.stress,
-                    "anxiety": survey.anxiety,
-                    "depression": survey.depression,
-                    "happiness": survey.happiness,
-                    "satisfaction": survey.satisfaction,
-                    "urgent": survey.urgent_flag,
-                    "sleep_issue": survey.significant_sleep_issues
-                })
-            else:
-                summary.append({
-                    "week_start": week_start.isoformat(),
-                    "label": week_start.strftime("%b %d").lstrip("0"),
-                    "stress": None,
-                    "anxiety": None,
-                    "depression": None,
-                    "happiness": None,
-                    "satisfaction": None,
-                    "urgent": None,
-                    "sleep_issue": None
-                })
-        
-        # Calculate streak from most recent week backwards
-        streak = 0
-        for i in range(len(summary) - 1, -1, -1):  # Start from the end
-            if summary[i]["stress"] is not None:
-                streak += 1
-            else:
-                break  # Stop at first gap
-        
-        # Compute aggregates
-        filled = [w for w in summary if w["stress"] is not None]
-        
-        def avg(key):
-            if not filled:
-                return 0
-            values = [w[key] for w in filled if w[key] is not None]
-            return round(sum(values) / len(values), 1) if values else 0
-        
-        def stat(key, fn):
-            values = [w[key] for w in filled if w[key] is not None]
-            return fn(values) if values else 0
+            week = {
+                "week_start": week_start.isoformat(),
+                "label": week_start.strftime("%b %d").lstrip("0"),
+            }
+            for field in WeeklySurvey.SCORE_FIELDS:
+                week[field] = getattr(survey, field) if survey else None
+            week["urgent"] = survey.urgent_flag if survey else None
+            week["sleep_issue"] = survey.significant_sleep_issues if survey else None
+            summary.append(week)
 
         computed = {
-            "avg_happiness": avg("happiness"),
-            "max_happiness": stat("happiness", max),
-            "min_happiness": stat("happiness", min),
-            "avg_satisfaction": avg("satisfaction"),
-            "max_satisfaction": stat("satisfaction", max),
-            "min_satisfaction": stat("satisfaction", min),
-            "avg_stress": avg("stress"),
-            "max_stress": stat("stress", max),
-            "min_stress": stat("stress", min),
-            "avg_anxiety": avg("anxiety"),
-            "max_anxiety": stat("anxiety", max),
-            "min_anxiety": stat("anxiety", min),
-            "avg_depression": avg("depression"),
-            "max_depression": stat("depression", max),
-            "min_depression": stat("depression", min),
-            "completion_count": len(filled),
-            "completion_possible": weeks,
-            "completion_rate": round(len(filled) / weeks * 100) if weeks else 0,
-            "high_alerts": sum(1 for w in filled if w["urgent"]),
-            "streak_weeks": streak
+            row.weeks: cls._summary_statistics(row)
+            for row in WeeklySurvey.summarize_ranges(user_id, current_week_start, periods)
+        }
+        result = {"weeks": summary, "computed": computed[weeks]}
+        if ranges:
+            result["ranges"] = {str(period): computed[period] for period in sorted(set(ranges))}
+        return result
+
+    @classmethod
+    def _summary_statistics(cls, row) -> Dict[str, Any]:
+        """Shape one `WeeklySurvey.summarize_ranges` row; empty ranges report 0s"""
+        computed = {}
+        for field in cls.SUMMARY_FIELDS:
+            average = getattr(row, f"avg_{field}")
+            computed[f"avg_{field}"] = round(float(average), 1) if average is not None else 0
+            computed[f"max_{field}"] = getattr(row, f"max_{field}") or 0
+            computed[f"min_{field}"] = getattr(row, f"min_{field}") or 0
+        computed.update({
+            "completion_count": row.completion_count,
+            "completion_possible": row.weeks,
+            "completion_rate": round(row.completion_count / row.weeks * 100),
+            "high_alerts": row.high_alerts,
+            "streak_weeks": row.streak_weeks,
+        })
+        return computed
+
+    MAX_TIMELINE_WEEKS = 104
+    # Fewer paired weeks than this make a correlation meaningless, so it is reported as None
+    MIN_CORRELATION_WEEKS = 4
+
+    @classmethod
+    @cache.cached("weekly_timeline")
+    def get_weekly_timeline(cls, user_id: str, weeks: int = 12) -> Dict[str, Any]:
+        """
+        Survey scores alongside journal activity and sentiment for each of the last `weeks`
+        weeks (oldest first), plus how journal sentiment correlates with each survey score.
+        """
+        if weeks < 1 or weeks > cls.MAX_TIMELINE_WEEKS:
+            raise ValueError(f"Weeks parameter must be between 1 and {cls.MAX_TIMELINE_WEEKS}")
+
+        range_start = cls.calculate_week_start(date.today()) - timedelta(weeks=weeks - 1)
+        rows = WeeklySurvey.get_timeline(user_id, range_start, weeks)
+
+        timeline = []
+        for row in rows:
+            week = {
+                "week_start": row.week_start.isoformat(),
+                "label": row.week_start.strftime("%b %d").lstrip("0"),
+            }
+            for field in WeeklySurvey.SCORE_FIELDS:
+                week[field] = getattr(row, field)
+            week.update({
+                "urgent": row.urgent_flag,
+                "sleep_issue": row.significant_sleep_issues,
+                "entry_count": int(row.entry_count),
+                "average_sentiment": float(row.average_sentiment) if row.average_sentiment is not None else None,
+            })
+            timeline.append(week)
+
+        paired_weeks = rows[0].paired_weeks if rows else 0
+        correlations = {}
+        for field in WeeklySurvey.SCORE_FIELDS:
+            value = getattr(rows[0], f"{field}_correlation") if rows else None
+            correlations[field] = round(value, 3) \
+                if value is not None and paired_weeks >= cls.MIN_CORRELATION_WEEKS else None
+
+        return {
+            "weeks": timeline,
+            "correlations": {"sentiment": correlations, "paired_weeks": paired_weeks},
         }
-        
-        return {"weeks": summary, "computed": computed} 
\ No newline at end of file
@@ -0,0 +1,56 @@
+from src.database import db
+from src.cache import cache
+from src.models.journal_model import JournalEntryModel
+from src.models.keyword_count_model import UserKeywordCount
+from src.models.daily_rollup_model import JournalDailyRollup
+from src.models.journal_import_model import JournalImport
+from src.models.weekly_survey_model import WeeklySurvey
+from src.models.survey_state_model import SurveyRollingState
+from src.models.survey_cohort_model import SurveyCohortWeek
+from src.models.notification_model import NotificationSettings
+from src.models.user_model import User
+from src.models.theme_model import UserTheme
+
+from src.celery_app import celery_app as celery, get_flask_app
+
+ACCOUNT_DELETE_CHUNK_SIZE = 1000
+
+
+@celery.task(bind=True, acks_late=True, autoretry_for=(Exception,), retry_backoff=True, max_retries=3, soft_time_limit=1800, time_limit=1900)
+def delete_user_account(self, user_id, chunk_size=ACCOUNT_DELETE_CHUNK_SIZE):
+    """
+    Delete a user's account and everything stored for it.
+
+    Journals go first in committed chunks so no single transaction holds locks on the
+    whole history. Derived tables are then cleared wholesale rather than decremented
+    per entry, and the remaining per-user rows and the user go in one final transaction.
+    Safe to retry: every step only deletes what is left.
+    """
+    print(f"[ACCOUNT DELETE] Starting for {user_id}", flush=True)
+    app = get_flask_app()
+
+    try:
+        with app.app_context():
+            total = 0
+            while True:
+                deleted = JournalEntryModel.delete_chunk_for_user(user_id, chunk_size)
+                total += deleted
+                if deleted < chunk_size:
+                    break
+            print(f"[ACCOUNT DELETE] Deleted {total} journal entries for {user_id}", flush=True)
+
+            # Cohort totals are shared across users, so this user's surveys are subtracted
+            SurveyCohortWeek.remove_user(user_id)
+            for model in (UserKeywordCount, JournalDailyRollup, JournalImport, UserTheme, SurveyRollingState, WeeklySurvey, NotificationSettings):
+                db.session.query(model).filter(model.user_id == user_id).delete(synchronize_session=False)
+            db.session.query(User).filter(User.user_id == user_id).delete(synchronize_session=False)
+            db.session.commit()
+            cache.bump_user_version(user_id)
+            print(f"[ACCOUNT DELETE] Completed for {user_id}", flush=True)
+            return total
+
+    except Exception as e:
+        print(f"Error deleting account {user_id}: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
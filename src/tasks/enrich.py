@@ -1,19 +1,95 @@
 import os
+import uuid
 from celery import Celery
 from datetime import datetime, timezone
-from src.app import create_app
 from src.database import db
+from src.config import EmbeddingConfig
+from src.cache import cache
 from src.models.journal_model import JournalEntryModel
+from src.models.keyword_count_model import UserKeywordCount
+from src.models.daily_rollup_model import JournalDailyRollup
+from src.models.journal_import_model import JournalImport
 from src.services.text_service import TextAnalysisService
+from src.services.theme_service import ThemeService
 from src.services.weather_service import WeatherService
 
-from src.celery_app import celery_app as celery
+from src.celery_app import celery_app as celery, get_flask_app
+
+
+def _resolve_location(entry):
+    """Location from the entry's coordinates, else its IP address, else Unknown."""
+    coords = None
+    if entry.location and isinstance(entry.location, dict) and entry.location.get('latitude') and entry.location.get('longitude'):
+        coords = (entry.location['latitude'], entry.location['longitude'])
+    if coords:
+        return WeatherService.reverse_geocode(*coords)
+    if entry.ip_address:
+        return WeatherService.get_location_from_ip(entry.ip_address)
+    return {"city": "Unknown", "region": "Unknown", "country": "Unknown"}
+
+
+def _embed_texts(texts):
+    """Embed texts with one OpenAI request. Returns a list aligned with `texts` (None on failure)."""
+    # Use OpenAI for embedding to save memory
+    from src.services.text_service import get_openai_client
+    client = get_openai_client()
+    try:
+        response = client.embeddings.create(
+            input=texts,
+            model="text-embedding-3-small"
+        )
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+    except Exception as e:
+        print(f"Embedding failed: {e}")
+        return [None] * len(texts)
+
+
+def _apply_enrichment(entry, location, weather, sentiment, sentiment_score, keywords, embedding):
+    """
+    Store enrichment results and update derived tables. Does not commit.
+    The compact embedding, if enabled, is written separately with `_store_compact_embeddings`.
+    Re-enriching an entry (a retry or reprocess) replaces what its previous results counted.
+    """
+    previous_keywords = set(entry.keywords or [])
+    previous_score = entry.sentiment_score
+    new_keywords = set(keywords or [])
+
+    entry.location = location
+    entry.weather = weather
+    entry.weather_condition, entry.temperature = WeatherService.project(weather)
+    entry.sentiment = sentiment
+    entry.sentiment_score = sentiment_score
+    entry.keywords = keywords
+    entry.embedding = embedding if _keep_full_embeddings() else None
+    entry.processing = False
+    entry.last_enriched_at = datetime.now(timezone.utc)
+    entry.ip_address = None  # Clear IP after use
+    UserKeywordCount.decrement(entry.user_id, previous_keywords - new_keywords)
+    UserKeywordCount.increment(entry.user_id, new_keywords - previous_keywords, entry.timestamp)
+    if previous_score is not None:
+        JournalDailyRollup.apply(
+            entry.user_id, JournalDailyRollup.day_of(entry.timestamp), sentiment_delta=-previous_score, scored_delta=-1
+        )
+    JournalDailyRollup.record_sentiment(entry.user_id, entry.timestamp, sentiment_score)
+    ThemeService.assign_entry(entry, embedding)
+
+
+def _keep_full_embeddings():
+    return EmbeddingConfig.storage() == EmbeddingConfig.FULL or EmbeddingConfig.keep_full()
+
+
+def _store_compact_embeddings(entries, embeddings):
+    """Write the quantized copies used by compact semantic search. Does not commit."""
+    JournalEntryModel.store_compact_embeddings(
+        [(entry.entry_id, embedding) for entry, embedding in zip(entries, embeddings)]
+    )
+
 
 @celery.task(bind=True, acks_late=True, autoretry_for=(Exception,), retry_backoff=True, max_retries=3, soft_time_limit=300, time_limit=360)
 def enrich_journal_entry(self, entry_id):
     import gc
     print(f"[TASK START] Processing entry {entry_id}", flush=True)
-    app = create_app()
+    app = get_flask_app()
     
     try:
         with app.app_context():
@@ -22,16 +98,8 @@ def enrich_journal_entry(self, entry_id):
             if not entry or not entry.processing:
                 return  
 
-            coords = None
             print("Getting GEODATA")
-            if entry.location and isinstance(entry.location, dict) and entry.location.get('latitude') and entry.location.get('longitude'):
-                coords = (entry.location['latitude'], entry.location['longitude'])
-            if coords:
-                location = WeatherService.reverse_geocode(*coords)
-            elif entry.ip_address:
-                location = WeatherService.get_location_from_ip(entry.ip_address)
-            else:
-                location = {"city": "Unknown", "region": "Unknown", "country": "Unknown"}
+            location = _resolve_location(entry)
 
             # 2. Weather
             print("Getting Weather")
@@ -40,8 +108,6 @@ def enrich_journal_entry(self, entry_id):
             # 3. Text analysis (memory optimized)
             print("Getting ML services", flush=True)
             
-            # Use OpenAI for embedding to save memory
-            from src.services.text_service import get_openai_client
             import gc
             
             # Only load HF models when needed
@@ -53,7 +119,7 @@ def enrich_journal_entry(self, entry_id):
             print(f"Sentiment complete: {sentiment}", flush=True)
             
             print("Starting keyword extraction...", flush=True)
-            keywords = service.extract_keywords(entry.entry)
+            keywords = JournalEntryModel.normalize_keywords(service.extract_keywords(entry.entry))
             print(f"Keywords complete: {len(keywords)} found", flush=True)
             
             # Clean up HF models before OpenAI call
@@ -62,30 +128,15 @@ def enrich_journal_entry(self, entry_id):
             gc.collect()
             
             print("Starting embedding generation...", flush=True)
-            client = get_openai_client()
-            try:
-                response = client.embeddings.create(
-                    input=entry.entry,
-                    model="text-embedding-3-small"
-                )
-                embedding = response.data[0].embedding
-            except Exception as e:
-                print(f"Embedding failed: {e}")
-                embedding = None
+            embedding = _embed_texts([entry.entry])[0]
             print("Embedding complete", flush=True)
 
             # 4. Update entry
-            entry.location = location
-            entry.weather = weather
-            entry.sentiment = sentiment
-            entry.sentiment_score = sentiment_score
-            entry.keywords = keywords
-            entry.embedding = embedding
-            entry.processing = False
-            entry.last_enriched_at = datetime.now(timezone.utc)
-            entry.ip_address = None  # Clear IP after use
+            _apply_enrichment(entry, location, weather, sentiment, sentiment_score, keywords, embedding)
+            _store_compact_embeddings([entry], [embedding])
             print("Succesfully enrichment now comitting to DB")
             db.session.commit()
+            cache.bump_user_version(entry.user_id)
             
     except Exception as e:
         print(f"Error enriching entry {entry_id}: {e}")
@@ -96,4 +147,67 @@ def enrich_journal_entry(self, entry_id):
         # Clean up memory after each task
         from src.services.text_service import cleanup_models
         cleanup_models()
-        gc.collect() 
\ No newline at end of file
+        gc.collect() 
+
+
+@celery.task(bind=True, acks_late=True, autoretry_for=(Exception,), retry_backoff=True, max_retries=3, soft_time_limit=1800, time_limit=1900)
+def enrich_journal_batch(self, entry_ids, import_id=None):
+    """
+    Enrich a batch of imported entries. Routed to the `bulk` queue so imports never
+    delay enrichment of entries written through the app.
+
+    Models load once per batch and embeddings go out in a single request. Imported
+    entries are historical, so no weather is fetched and location is only resolved
+    from coordinates supplied with the import.
+    """
+    import gc
+    print(f"[BATCH START] Processing {len(entry_ids)} entries", flush=True)
+    app = get_flask_app()
+
+    try:
+        with app.app_context():
+            # Entries already enriched by an earlier attempt of this batch are skipped
+            entries = db.session.query(JournalEntryModel).filter(
+                JournalEntryModel.entry_id.in_([uuid.UUID(entry_id) for entry_id in entry_ids]),
+                JournalEntryModel.processing == True
+            ).all()
+            if not entries:
+                return
+
+            service = TextAnalysisService()
+            analyses = []
+            for entry in entries:
+                sentiment, sentiment_score = service.analyze_sentiment(entry.entry)
+                keywords = JournalEntryModel.normalize_keywords(service.extract_keywords(entry.entry))
+                analyses.append((sentiment, sentiment_score, keywords))
+
+            from src.services.text_service import cleanup_models
+            cleanup_models()
+            gc.collect()
+
+            embeddings = _embed_texts([entry.entry for entry in entries])
+
+            for entry, (sentiment, sentiment_score, keywords), embedding in zip(entries, analyses, embeddings):
+                if entry.location:
+                    location = _resolve_location(entry)
+                else:
+                    location = {"city": "Unknown", "region": "Unknown", "country": "Unknown"}
+                _apply_enrichment(entry, location, None, sentiment, sentiment_score, keywords, embedding)
+            _store_compact_embeddings(entries, embeddings)
+
+            if import_id:
+                JournalImport.record_enriched(uuid.UUID(import_id), len(entries))
+            db.session.commit()
+            for user_id in {entry.user_id for entry in entries}:
+                cache.bump_user_version(user_id)
+            print(f"[BATCH DONE] Enriched {len(entries)} entries", flush=True)
+
+    except Exception as e:
+        print(f"Error enriching batch: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+    finally:
+        from src.services.text_service import cleanup_models
+        cleanup_models()
+        gc.collect()
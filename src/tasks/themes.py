@@ -0,0 +1,25 @@
+from src.services.theme_service import ThemeService
+
+from src.celery_app import celery_app as celery, get_flask_app
+
+
+@celery.task(bind=True, acks_late=True, autoretry_for=(Exception,), retry_backoff=True, max_retries=3, soft_time_limit=600, time_limit=660)
+def fit_user_themes(self, user_id):
+    """Re-cluster one user's entries into themes."""
+    app = get_flask_app()
+    with app.app_context():
+        count = ThemeService.fit_user(user_id)
+        print(f"[THEMES] Fit {count} themes for {user_id}", flush=True)
+        return count
+
+
+@celery.task
+def refit_stale_themes():
+    """Periodic: queue a refit for every user whose history grew enough since the last fit."""
+    app = get_flask_app()
+    with app.app_context():
+        user_ids = ThemeService.find_users_to_refit()
+    for user_id in user_ids:
+        fit_user_themes.delay(user_id)
+    print(f"[THEMES] Queued theme refits for {len(user_ids)} users", flush=True)
+    return len(user_ids)
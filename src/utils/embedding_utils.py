@@ -0,0 +1,56 @@
+"""
+Conversions between full-precision embeddings and their compact (quantized) forms.
+"""
+
+import math
+
+from src.config import EmbeddingConfig
+
+
+def truncate_normalize(vector, dimensions):
+    """
+    Keep the first `dimensions` components and rescale to unit length. text-embedding-3
+    vectors are trained so that this prefix is itself a usable embedding.
+    """
+    head = [float(value) for value in vector[:dimensions]]
+    norm = math.sqrt(sum(value * value for value in head))
+    if norm == 0:
+        return head
+    return [value / norm for value in head]
+
+
+def to_vector_literal(vector):
+    """pgvector text form, castable to vector or halfvec."""
+    return "[" + ",".join(repr(float(value)) for value in vector) + "]"
+
+
+def to_bit_literal(vector):
+    """Sign bits as a bit string, matching pgvector's binary_quantize (1 where value > 0)."""
+    return "".join("1" if value > 0 else "0" for value in vector)
+
+
+def compact_embedding(vector, storage=None, dimensions=None):
+    """
+    Compact form of an embedding as a literal for the `embedding_compact` column,
+    or None when storing full vectors only.
+    """
+    storage = storage or EmbeddingConfig.storage()
+    if vector is None or storage == EmbeddingConfig.FULL:
+        return None
+    reduced = truncate_normalize(vector, dimensions or EmbeddingConfig.dimensions())
+    if storage == EmbeddingConfig.BINARY:
+        return to_bit_literal(reduced)
+    return to_vector_literal(reduced)
+
+
+def decode_compact_embedding(value, storage, dimensions=EmbeddingConfig.FULL_DIMENSIONS):
+    """
+    Float vector from the text form of an `embedding_compact` value: halfvec components as
+    floats, bits as +1/-1. Zero-padded to `dimensions`, which leaves cosine similarity
+    between padded vectors unchanged.
+    """
+    if storage == EmbeddingConfig.BINARY:
+        decoded = [1.0 if bit == "1" else -1.0 for bit in value]
+    else:
+        decoded = [float(component) for component in value.strip("[]").split(",")]
+    return decoded + [0.0] * (dimensions - len(decoded))
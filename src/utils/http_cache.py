@@ -0,0 +1,62 @@
+"""
+Conditional GET support for per-user read endpoints.
+ETags are derived from the user's data version in the response cache, so a matching
+If-None-Match is answered with 304 before the view runs any query. Only a shared (redis)
+backend's versions see every write, so ETags are off with the in-process backend.
+"""
+
+import functools
+import hashlib
+
+from flask import request, make_response
+from flask_jwt_extended import get_jwt_identity
+
+from src.cache import cache
+from src.utils.timezone_utils import local_date
+
+
+def compute_etag(user_id, version):
+    """
+    Strong ETag for the current request: user data version, path, query string and
+    the current day (dashboard responses are relative to "today"), in the `tz` query
+    timezone when one is given.
+    """
+    query = "&".join(
+        f"{key}={value}" for key, value in sorted(request.args.items(multi=True))
+    )
+    today = local_date(request.args.get("tz"))
+    raw = f"{user_id}:{version}:{request.path}:{query}:{today.isoformat()}"
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def conditional_get(view):
+    """
+    Add an ETag to successful responses and answer matching If-None-Match with 304.
+    Must be applied below `@jwt_required()`. Does nothing unless the response cache uses a
+    shared backend: an in-process version misses writes made by other workers and Celery,
+    and a 304 has no TTL to bound that.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not getattr(cache.backend, "shared", False):
+            return view(*args, **kwargs)
+
+        user_id = get_jwt_identity()
+        version = cache.get_user_version(user_id)
+        if version is None:
+            return view(*args, **kwargs)
+
+        etag = compute_etag(user_id, version)
+        if etag in request.if_none_match:
+            response = make_response("", 304)
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+
+        response.set_etag(etag)
+        # Clients must revalidate on every use; responses are user-specific
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
+
+    return wrapper
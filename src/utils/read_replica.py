@@ -0,0 +1,28 @@
+"""
+Route read-only endpoints to the read replica bind.
+"""
+
+import functools
+
+from flask import current_app, g
+from flask_jwt_extended import get_jwt_identity
+
+from src.cache import cache
+from src.database import REPLICA_BIND
+
+
+def read_replica(view):
+    """
+    Serve the view's reads from the replica unless the user wrote within the stickiness
+    window (tracked in the response cache), in which case they stay on the primary to read
+    their own writes. Must be applied below `@jwt_required()`.
+    Without a replica bind, or without a shared (redis) response cache to track writes in,
+    everything stays on the primary.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if REPLICA_BIND in current_app.config.get("SQLALCHEMY_BINDS", {}):
+            g.use_read_replica = cache.has_recent_write(get_jwt_identity()) is False
+        return view(*args, **kwargs)
+
+    return wrapper
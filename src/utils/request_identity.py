@@ -0,0 +1,58 @@
+"""
+Request-scoped identity: the JWT user and their notification settings.
+Both are fetched with one joined query, at most once per request, and shared by every
+controller and service that handles the request.
+"""
+
+from flask import g, has_request_context
+from flask_jwt_extended import get_jwt, get_jwt_identity
+
+from src.models.user_model import User
+
+# Claim set on tokens issued at login, once the user row is known to exist
+REGISTERED_CLAIM = "registered"
+
+
+def load_identity(user_id):
+    """
+    (user, settings) for `user_id`; either may be None. Memoized on `flask.g` for the rest
+    of the request. Outside a request (Celery tasks, scripts) every call queries.
+    """
+    if not has_request_context():
+        return User.find_with_settings(user_id)
+
+    identities = g.setdefault("identities", {})
+    if user_id not in identities:
+        identities[user_id] = User.find_with_settings(user_id)
+    return identities[user_id]
+
+
+def current_user(user_id):
+    return load_identity(user_id)[0]
+
+
+def current_settings(user_id):
+    return load_identity(user_id)[1]
+
+
+def forget_identity(user_id):
+    """Drop the memoized identity, e.g. after settings were created for the user."""
+    if has_request_context():
+        g.setdefault("identities", {}).pop(user_id, None)
+
+
+def user_exists(user_id):
+    """
+    Whether `user_id` has an account. A verified token for the same identity carrying the
+    registered claim answers without a query; anything else goes through the loader.
+    The claim outlives account deletion until the token expires, so use it for reads only;
+    writes that reference the user should check `current_user` instead.
+    """
+    if has_request_context():
+        try:
+            if get_jwt().get(REGISTERED_CLAIM) and get_jwt_identity() == user_id:
+                return True
+        except RuntimeError:
+            # No JWT verified for this request
+            pass
+    return current_user(user_id) is not None
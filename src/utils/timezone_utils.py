@@ -4,6 +4,7 @@ All datetime operations should use UTC internally and convert to user timezone f
 """
 
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Optional
 
 
@@ -28,6 +29,42 @@ def utc_date():
     return datetime.now(timezone.utc).date()
 
 
+def local_date(tz_name: Optional[str] = None):
+    """
+    Get the current date in an IANA timezone, e.g. for endpoints that take `?tz=`.
+    Falls back to the UTC date when the name is empty or unknown.
+
+    Returns:
+        date: Current local date
+    """
+    if tz_name:
+        from dateutil import tz
+
+        zone = tz.gettz(tz_name)
+        if zone is not None:
+            return datetime.now(zone).date()
+    return utc_date()
+
+
+@lru_cache(maxsize=1024)
+def is_postgres_timezone(tz_name: str) -> bool:
+    """
+    Check a zone name against Postgres' pg_timezone_names, i.e. what `AT TIME ZONE`
+    accepts. dateutil also accepts POSIX-style strings and file paths that Postgres
+    rejects. Results are cached per process.
+
+    Returns:
+        bool: True if Postgres knows the zone
+    """
+    from sqlalchemy import text
+    from src.database import db
+
+    return bool(db.session.execute(
+        text("SELECT EXISTS (SELECT 1 FROM pg_timezone_names WHERE name = :name)"),
+        {"name": tz_name},
+    ).scalar())
+
+
 def parse_user_datetime(dt_string: str, user_timezone: Optional[str] = None) -> datetime:
     """
     Parse a datetime string from user input and convert to UTC.
@@ -83,4 +120,29 @@ def ensure_utc(dt: datetime) -> datetime:
         return dt.replace(tzinfo=timezone.utc)
     else:
         # Convert to UTC
-        return dt.astimezone(timezone.utc)
\ No newline at end of file
+        return dt.astimezone(timezone.utc)
+
+def parse_time_range(start: Optional[str] = None, end: Optional[str] = None):
+    """
+    Parse optional `from`/`to` query values into a half-open UTC range [start, end).
+    Accepts dates (YYYY-MM-DD, midnight UTC) or ISO datetimes; naive values are UTC.
+
+    Returns:
+        tuple: (start, end) datetimes, either of which may be None
+
+    Raises:
+        ValueError: If a value can't be parsed or start is not before end
+    """
+    def parse_bound(name, value):
+        if not value:
+            return None
+        try:
+            return parse_user_datetime(value)
+        except (ValueError, OverflowError):
+            raise ValueError(f"Invalid '{name}' value: {value}")
+
+    start_dt = parse_bound("from", start)
+    end_dt = parse_bound("to", end)
+    if start_dt and end_dt and start_dt >= end_dt:
+        raise ValueError("'from' must be before 'to'")
+    return start_dt, end_dt
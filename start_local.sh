@@ -5,6 +5,7 @@
 python3 -m src.app &
 
 IS_CELERY_WORKER=1 celery -A src.celery_app worker \
+    -Q celery,bulk \
     --loglevel=info \
     --concurrency=1 \
     --max-tasks-per-child=10 \
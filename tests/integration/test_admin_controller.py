@@ -0,0 +1,81 @@
+import unittest
+from unittest.mock import patch
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token
+from src.controllers.admin_controller import admin_bp
+
+
+class TestAdminRoutes(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['TESTING'] = True
+        self.app.config['JWT_SECRET_KEY'] = 'test-secret-key'
+        self.app.register_blueprint(admin_bp)
+        self.jwt = JWTManager(self.app)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+    def tearDown(self):
+        self.app_context.pop()
+
+    def get_jwt_headers(self, user_id):
+        access_token = create_access_token(identity=user_id)
+        return {'Authorization': f'Bearer {access_token}'}
+
+    @patch.dict('os.environ', {'ADMIN_USER_IDS': 'admin_user, other_admin'})
+    @patch('src.services.cohort_service.CohortService.get_survey_weeks')
+    def test_get_survey_cohort_weeks_admin(self, mock_get_weeks):
+        mock_get_weeks.return_value = {"weeks": [], "next_cursor": None}
+
+        response = self.client.get('/api/admin/survey-cohort/weeks?limit=4&from=2024-01-01',
+                                   headers=self.get_jwt_headers('admin_user'))
+
+        self.assertEqual(response.status_code, 200)
+        mock_get_weeks.assert_called_once_with(limit=4, cursor=None, start_date="2024-01-01", end_date=None)
+
+    @patch.dict('os.environ', {'ADMIN_USER_IDS': 'admin_user'})
+    @patch('src.services.cohort_service.CohortService.get_survey_weeks')
+    def test_get_survey_cohort_weeks_forbidden(self, mock_get_weeks):
+        response = self.client.get('/api/admin/survey-cohort/weeks', headers=self.get_jwt_headers('test_user'))
+
+        self.assertEqual(response.status_code, 403)
+        mock_get_weeks.assert_not_called()
+
+    @patch.dict('os.environ', {'ADMIN_USER_IDS': 'admin_user'})
+    def test_get_survey_cohort_weeks_invalid_limit(self):
+        response = self.client.get('/api/admin/survey-cohort/weeks?limit=0', headers=self.get_jwt_headers('admin_user'))
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_get_survey_cohort_weeks_no_auth(self):
+        response = self.client.get('/api/admin/survey-cohort/weeks')
+        self.assertEqual(response.status_code, 401)
+
+
+    @patch.dict('os.environ', {'ADMIN_USER_IDS': 'admin_user'})
+    @patch('src.controllers.admin_controller.pool_stats')
+    @patch('src.controllers.admin_controller.db')
+    def test_get_db_pool_stats_admin(self, mock_db, mock_pool_stats):
+        mock_db.engines = {None: "primary-engine", "replica": "replica-engine"}
+        mock_pool_stats.side_effect = lambda engine: {"engine": engine}
+
+        response = self.client.get('/api/admin/db-pool', headers=self.get_jwt_headers('admin_user'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json, {
+            "primary": {"engine": "primary-engine"},
+            "replica": {"engine": "replica-engine"},
+        })
+
+    @patch.dict('os.environ', {'ADMIN_USER_IDS': 'admin_user'})
+    @patch('src.controllers.admin_controller.pool_stats')
+    def test_get_db_pool_stats_forbidden(self, mock_pool_stats):
+        response = self.client.get('/api/admin/db-pool', headers=self.get_jwt_headers('test_user'))
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.client.get('/api/admin/db-pool').status_code, 401)
+        mock_pool_stats.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,7 +2,7 @@ import unittest
 from unittest.mock import patch, MagicMock
 from flask import Flask, url_for
 from src.controllers.auth_controller import auth_bp
-from flask_jwt_extended import JWTManager
+from flask_jwt_extended import JWTManager, create_access_token
 
 
 class TestAuthController(unittest.TestCase):
@@ -130,6 +130,30 @@ class TestAuthController(unittest.TestCase):
         self.assertEqual(response.status_code, 400)
         self.assertEqual(response.json['error'], 'Missing code parameter')
 
+    @patch('src.tasks.account.delete_user_account.delay')
+    @patch('src.controllers.auth_controller.User.find_by_google_id')
+    def test_delete_account_schedules_job(self, mock_find_user, mock_delay):
+        mock_find_user.return_value = MagicMock()
+        mock_delay.return_value.id = 'task-id'
+        token = create_access_token(identity='test_user')
+
+        response = self.client.delete('/api/auth/account', headers={'Authorization': f'Bearer {token}'})
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json['task_id'], 'task-id')
+        mock_delay.assert_called_once_with('test_user')
+
+    @patch('src.tasks.account.delete_user_account.delay')
+    @patch('src.controllers.auth_controller.User.find_by_google_id')
+    def test_delete_account_user_not_found(self, mock_find_user, mock_delay):
+        mock_find_user.return_value = None
+        token = create_access_token(identity='test_user')
+
+        response = self.client.delete('/api/auth/account', headers={'Authorization': f'Bearer {token}'})
+
+        self.assertEqual(response.status_code, 404)
+        mock_delay.assert_not_called()
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,8 +1,11 @@
 import unittest
+import uuid
 from unittest.mock import patch
+from datetime import datetime, timezone
 from flask import Flask
 from flask_jwt_extended import JWTManager, create_access_token
 from src.controllers.journal_controller import journal_bp
+from src.cache import cache
 
 
 class TestJournalRoutes(unittest.TestCase):
@@ -20,8 +23,14 @@ class TestJournalRoutes(unittest.TestCase):
     def tearDown(self):
         self.app_context.pop()
 
+    def use_shared_cache(self):
+        self.app.config['RESPONSE_CACHE_BACKEND'] = 'memory'
+        cache.init_app(self.app)
+        # Stands in for the redis backend, whose versions every process shares
+        self.app.extensions['response_cache'].shared = True
+
     def get_jwt_headers(self, user_id):
-        access_token = create_access_token(identity={"google_id": user_id})
+        access_token = create_access_token(identity=user_id)
         return {'Authorization': f'Bearer {access_token}'}
 
     @patch('src.services.journal_service.JournalService.create_journal_entry')
@@ -70,7 +79,7 @@ class TestJournalRoutes(unittest.TestCase):
 
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json['message'], 'Journal entry deleted successfully')
-        mock_delete_journal_entry.assert_called_once_with('test-entry-id')
+        mock_delete_journal_entry.assert_called_once_with('test_user', 'test-entry-id')
 
     @patch('src.services.journal_service.JournalService.delete_journal_entry')
     def test_delete_journal_entry_not_found(self, mock_delete_journal_entry):
@@ -81,7 +90,113 @@ class TestJournalRoutes(unittest.TestCase):
 
         self.assertEqual(response.status_code, 404)
         self.assertEqual(response.json['error'], 'Journal entry not found')
-        mock_delete_journal_entry.assert_called_once_with('test-entry-id')
+        mock_delete_journal_entry.assert_called_once_with('test_user', 'test-entry-id')
+
+    @patch('src.services.journal_service.JournalEntryModel.delete_entries')
+    def test_batch_delete_journal_entries(self, mock_delete_entries):
+        owned, missing = str(uuid.uuid4()), str(uuid.uuid4())
+        mock_delete_entries.return_value = [owned]
+
+        headers = self.get_jwt_headers('test_user')
+        response = self.client.post('/api/journals/batch-delete', json={'entry_ids': [owned, missing, owned]}, headers=headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json, {'deleted': [owned], 'not_found': [missing]})
+        mock_delete_entries.assert_called_once_with('test_user', [owned, missing])
+
+    @patch('src.services.journal_service.JournalEntryModel.delete_entries')
+    def test_batch_delete_rejects_invalid_ids(self, mock_delete_entries):
+        headers = self.get_jwt_headers('test_user')
+        response = self.client.post('/api/journals/batch-delete', json={'entry_ids': ['not-a-uuid']}, headers=headers)
+
+        self.assertEqual(response.status_code, 400)
+        mock_delete_entries.assert_not_called()
+
+    @patch('src.services.journal_service.JournalEntryModel.delete_entries')
+    def test_batch_delete_rejects_oversized_batch(self, mock_delete_entries):
+        headers = self.get_jwt_headers('test_user')
+        entry_ids = [str(uuid.uuid4()) for _ in range(1001)]
+        response = self.client.post('/api/journals/batch-delete', json={'entry_ids': entry_ids}, headers=headers)
+
+        self.assertEqual(response.status_code, 400)
+        mock_delete_entries.assert_not_called()
+
+    @patch('src.services.journal_service.JournalEntryModel.get_similar_entries')
+    def test_get_similar_entries(self, mock_get_similar_entries):
+        mock_get_similar_entries.return_value = [{'entry_id': 'other-entry'}]
+
+        headers = self.get_jwt_headers('test_user')
+        response = self.client.get('/api/journals/test-entry-id/similar?top_k=3&from=2024-01-01', headers=headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['entries'], [{'entry_id': 'other-entry'}])
+        mock_get_similar_entries.assert_called_once_with(
+            'test_user', 'test-entry-id', 3, start=datetime(2024, 1, 1, tzinfo=timezone.utc), end=None
+        )
+
+    @patch('src.services.journal_service.JournalEntryModel.get_similar_entries')
+    def test_get_similar_entries_not_found(self, mock_get_similar_entries):
+        mock_get_similar_entries.return_value = None
+
+        headers = self.get_jwt_headers('test_user')
+        response = self.client.get('/api/journals/test-entry-id/similar', headers=headers)
+
+        self.assertEqual(response.status_code, 404)
+
+    @patch('src.services.journal_service.JournalEntryModel.get_similar_entries')
+    def test_get_similar_entries_invalid_top_k(self, mock_get_similar_entries):
+        headers = self.get_jwt_headers('test_user')
+        response = self.client.get('/api/journals/test-entry-id/similar?top_k=500', headers=headers)
+
+        self.assertEqual(response.status_code, 400)
+        mock_get_similar_entries.assert_not_called()
+
+    @patch('src.services.theme_service.JournalEntryModel.get_theme_members')
+    @patch('src.services.theme_service.UserTheme.get_for_user')
+    def test_get_themes(self, mock_get_for_user, mock_get_members):
+        mock_get_for_user.return_value = []
+        mock_get_members.return_value = []
+
+        headers = self.get_jwt_headers('test_user')
+        response = self.client.get('/api/journals/themes', headers=headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json, {'themes': [], 'fitted_at': None})
+        mock_get_for_user.assert_called_once_with('test_user')
+
+    @patch('src.services.sentiment_analytics_service.JournalDailyRollup.get_range')
+    def test_get_sentiment_analytics(self, mock_get_range):
+        mock_get_range.return_value = []
+
+        headers = self.get_jwt_headers('test_user')
+        response = self.client.get('/api/journals/sentiments/analytics?from=2024-01-01&to=2024-01-15', headers=headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json['series']), 14)
+        self.assertEqual(response.json['summary']['entry_count'], 0)
+
+    def test_get_sentiment_analytics_invalid_range(self):
+        headers = self.get_jwt_headers('test_user')
+        response = self.client.get('/api/journals/sentiments/analytics?from=2024-02-01&to=2024-01-01', headers=headers)
+
+        self.assertEqual(response.status_code, 400)
+
+    @patch('src.services.journal_service.JournalEntryModel.aggregate_weather_mood')
+    def test_get_weather_mood(self, mock_aggregate):
+        mock_aggregate.return_value = []
+
+        headers = self.get_jwt_headers('test_user')
+        response = self.client.get('/api/journals/weather/mood?band=10', headers=headers)
+
+        self.assertEqual(response.status_code, 200)
+        mock_aggregate.assert_called_once_with('test_user', 10)
+        self.assertEqual(response.json['band_width'], 10)
+
+    def test_get_weather_mood_invalid_band(self):
+        headers = self.get_jwt_headers('test_user')
+        response = self.client.get('/api/journals/weather/mood?band=50', headers=headers)
+
+        self.assertEqual(response.status_code, 400)
 
     @patch('src.services.journal_service.JournalService.get_heatmap_data')
     def test_get_heatmap_data_success(self, mock_get_heatmap_data):
@@ -111,3 +226,136 @@ class TestJournalRoutes(unittest.TestCase):
         self.assertEqual(response.status_code, 500)
         self.assertEqual(response.json['error'], 'Something went wrong')
 
+    @patch('src.services.journal_service.JournalService.get_sentiment_aggregates')
+    def test_get_sentiment_aggregates_success(self, mock_get_aggregates):
+        mock_get_aggregates.return_value = {
+            "granularity": "week",
+            "from": "2024-11-04",
+            "to": "2024-11-18",
+            "buckets": [{"bucket": "2024-11-04", "average_sentiment": 0.4, "count": 2,
+                         "min_sentiment": 0.1, "max_sentiment": 0.7}],
+        }
+
+        headers = self.get_jwt_headers('test_user')
+        response = self.client.get(
+            '/api/journals/sentiments/aggregate?granularity=week&from=2024-11-04&to=2024-11-18', headers=headers
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["buckets"][0]["count"], 2)
+        args = mock_get_aggregates.call_args[0]
+        self.assertEqual(args[1:], ("week", "2024-11-04", "2024-11-18"))
+
+    @patch('src.services.journal_service.JournalService.get_sentiment_aggregates')
+    def test_get_sentiment_aggregates_invalid_granularity(self, mock_get_aggregates):
+        headers = self.get_jwt_headers('test_user')
+        response = self.client.get('/api/journals/sentiments/aggregate?granularity=hour', headers=headers)
+
+        self.assertEqual(response.status_code, 400)
+        mock_get_aggregates.assert_not_called()
+
+    @patch('src.services.journal_service.JournalService.get_heatmap_data')
+    def test_conditional_get_returns_304_for_matching_etag(self, mock_get_heatmap_data):
+        self.use_shared_cache()
+        mock_get_heatmap_data.return_value = {'2024-11-30': 1}
+
+        headers = {'Authorization': f"Bearer {create_access_token(identity='test_user')}"}
+        first = self.client.get('/api/journals/heatmap', headers=headers)
+        etag = first.headers['ETag']
+
+        second = self.client.get('/api/journals/heatmap', headers={**headers, 'If-None-Match': etag})
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.headers['ETag'], etag)
+        mock_get_heatmap_data.assert_called_once()
+
+    @patch('src.services.journal_service.JournalService.get_heatmap_data')
+    def test_conditional_get_etag_changes_after_write(self, mock_get_heatmap_data):
+        self.use_shared_cache()
+        mock_get_heatmap_data.return_value = {}
+
+        headers = {'Authorization': f"Bearer {create_access_token(identity='test_user')}"}
+        etag = self.client.get('/api/journals/heatmap', headers=headers).headers['ETag']
+        cache.bump_user_version('test_user')
+
+        response = self.client.get('/api/journals/heatmap', headers={**headers, 'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+        self.assertEqual(mock_get_heatmap_data.call_count, 2)
+
+    @patch('src.services.journal_service.JournalService.get_heatmap_data')
+    def test_conditional_get_disabled_with_in_process_cache(self, mock_get_heatmap_data):
+        self.app.config['RESPONSE_CACHE_BACKEND'] = 'memory'
+        cache.init_app(self.app)
+        mock_get_heatmap_data.return_value = {}
+
+        response = self.client.get('/api/journals/heatmap', headers=self.get_jwt_headers('test_user'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response.headers)
+
+    @patch('src.services.journal_import_service.JournalImportService.import_entries')
+    def test_import_journal_entries_accepted(self, mock_import_entries):
+        mock_import_entries.return_value = {'import_id': 'import-1', 'status': 'enriching', 'total_rows': 1}
+
+        headers = self.get_jwt_headers('test_user')
+        body = '{"entry": "Imported", "date": "2023-01-01"}\n'
+        response = self.client.post(
+            '/api/journals/import', data=body, content_type='application/x-ndjson', headers=headers
+        )
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json['import']['import_id'], 'import-1')
+        self.assertEqual(mock_import_entries.call_args[0][1:], (body, 'ndjson'))
+
+    def test_import_journal_entries_row_errors(self):
+        headers = self.get_jwt_headers('test_user')
+        response = self.client.post(
+            '/api/journals/import', json=[{'entry': 'ok', 'date': '2023-01-01'}, {'entry': 'no date'}], headers=headers
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json['errors'], [{'row': 2, 'error': "'date' is required"}])
+
+    @patch('src.services.journal_export_service.JournalEntryModel.iter_export_rows')
+    def test_export_streams_attachment(self, mock_rows):
+        mock_rows.return_value = iter([{
+            'entry_id': 'entry-1', 'timestamp': None, 'entry': 'Hello', 'sentiment': None,
+            'sentiment_score': None, 'emotions': None, 'keywords': None, 'weather': None, 'location': None,
+        }])
+
+        headers = self.get_jwt_headers('test_user')
+        response = self.client.get('/api/journals/export?format=ndjson', headers=headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_streamed)
+        self.assertIn('attachment', response.headers['Content-Disposition'])
+        self.assertEqual(response.get_data(as_text=True).strip(), '{"entry_id": "entry-1", "timestamp": null, "entry": "Hello", "sentiment": null, "sentiment_score": null, "emotions": null, "keywords": null, "weather": null, "location": null}')
+
+    def test_export_invalid_format(self):
+        headers = self.get_jwt_headers('test_user')
+        response = self.client.get('/api/journals/export?format=xml', headers=headers)
+
+        self.assertEqual(response.status_code, 400)
+
+    @patch('src.services.journal_service.JournalService.get_recent_entries')
+    def test_recent_entries_time_range(self, mock_get_recent_entries):
+        mock_get_recent_entries.return_value = []
+
+        headers = self.get_jwt_headers('test_user')
+        response = self.client.get('/api/journals/recent?from=2024-11-01&to=2024-12-01T00:00:00-05:00', headers=headers)
+
+        self.assertEqual(response.status_code, 200)
+        kwargs = mock_get_recent_entries.call_args[1]
+        self.assertEqual(kwargs['start'], datetime(2024, 11, 1, tzinfo=timezone.utc))
+        self.assertEqual(kwargs['end'], datetime(2024, 12, 1, 5, tzinfo=timezone.utc))
+
+    @patch('src.services.journal_service.JournalService.get_recent_entries')
+    def test_recent_entries_invalid_time_range(self, mock_get_recent_entries):
+        headers = self.get_jwt_headers('test_user')
+        response = self.client.get('/api/journals/recent?from=2024-12-01&to=2024-11-01', headers=headers)
+
+        self.assertEqual(response.status_code, 400)
+        mock_get_recent_entries.assert_not_called()
@@ -32,7 +32,7 @@ class TestNotificationController(unittest.TestCase):
         response = self.client.get('/api/notifications/settings')
         self.assertEqual(response.status_code, 401)
 
-    @patch('src.models.user_model.User.find_by_google_id')
+    @patch('src.controllers.notification_controller.current_user')
     @patch('src.services.notification_service.NotificationService.get_user_settings')
     def test_get_notification_settings_success(self, mock_get_settings, mock_find_user):
         """Test GET /api/notifications/settings with authentication"""
@@ -56,7 +56,7 @@ class TestNotificationController(unittest.TestCase):
         self.assertIn('journal_frequency', data['settings'])
         self.assertIn('journal_time', data['settings'])
 
-    @patch('src.models.user_model.User.find_by_google_id')
+    @patch('src.controllers.notification_controller.current_user')
     @patch('src.services.notification_service.NotificationService.update_user_settings')
     def test_post_notification_settings_success(self, mock_update_settings, mock_find_user):
         """Test POST /api/notifications/settings with valid data"""
@@ -87,7 +87,7 @@ class TestNotificationController(unittest.TestCase):
         self.assertIn('message', data)
         self.assertIn('settings', data)
 
-    @patch('src.models.user_model.User.find_by_google_id')
+    @patch('src.controllers.notification_controller.current_user')
     def test_post_notification_settings_invalid_frequency(self, mock_find_user):
         """Test POST /api/notifications/settings with invalid frequency"""
         mock_find_user.return_value = MagicMock(user_id='test_user', email='test@example.com', name='Test User')
@@ -108,7 +108,7 @@ class TestNotificationController(unittest.TestCase):
         data = response.get_json()
         self.assertIn('error', data)
 
-    @patch('src.models.user_model.User.find_by_google_id')
+    @patch('src.controllers.notification_controller.current_user')
     def test_post_notification_settings_invalid_time(self, mock_find_user):
         """Test POST /api/notifications/settings with invalid time format"""
         mock_find_user.return_value = MagicMock(user_id='test_user', email='test@example.com', name='Test User')
@@ -147,7 +147,7 @@ class TestNotificationController(unittest.TestCase):
         self.assertIsInstance(data['prompts'], list)
         self.assertGreater(len(data['prompts']), 0)
 
-    @patch('src.models.user_model.User.find_by_google_id')
+    @patch('src.controllers.notification_controller.current_user')
     @patch('src.services.notification_service.NotificationService.send_test_email')
     def test_send_test_email_success(self, mock_send_email, mock_find_user):
         """Test POST /api/notifications/test"""
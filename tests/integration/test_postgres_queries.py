@@ -0,0 +1,175 @@
+"""
+Checks of raw SQL against a real Postgres database.
+Skipped unless TEST_DATABASE_URL points at one; each run works in a throwaway schema
+holding just the columns the queries under test read, and drops it afterwards.
+"""
+
+import os
+import unittest
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from flask import Flask
+from sqlalchemy import create_engine, text
+from src.database import db
+from src.models.daily_rollup_model import JournalDailyRollup
+from src.models.journal_model import JournalEntryModel
+from src.models.weekly_survey_model import WeeklySurvey
+from src.services.journal_service import JournalService
+
+DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+SCHEMA_SQL = """
+    CREATE TABLE journals (
+        entry_id uuid PRIMARY KEY,
+        user_id varchar NOT NULL,
+        timestamp timestamptz NOT NULL,
+        sentiment_score double precision
+    );
+    CREATE TABLE journal_daily_rollup (
+        user_id varchar NOT NULL,
+        day date NOT NULL,
+        entry_count integer NOT NULL DEFAULT 0,
+        sentiment_sum double precision NOT NULL DEFAULT 0,
+        scored_count integer NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, day)
+    );
+    CREATE TABLE weekly_surveys (
+        user_id varchar NOT NULL,
+        week_start date NOT NULL,
+        stress integer NOT NULL,
+        anxiety integer NOT NULL,
+        depression integer NOT NULL,
+        happiness integer NOT NULL,
+        satisfaction integer NOT NULL,
+        urgent_flag boolean NOT NULL DEFAULT false,
+        PRIMARY KEY (user_id, week_start)
+    );
+"""
+
+
+@unittest.skipUnless(DATABASE_URL, "TEST_DATABASE_URL is not set")
+class PostgresTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.schema = f"test_{uuid.uuid4().hex[:12]}"
+        cls.admin_engine = create_engine(DATABASE_URL)
+        with cls.admin_engine.begin() as conn:
+            conn.execute(text(f"CREATE SCHEMA {cls.schema}"))
+            conn.execute(text(f"SET LOCAL search_path TO {cls.schema}"))
+            conn.execute(text(SCHEMA_SQL))
+
+        cls.app = Flask(__name__)
+        cls.app.config["SQLALCHEMY_DATABASE_URI"] = DATABASE_URL
+        cls.app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+            "connect_args": {"options": f"-csearch_path={cls.schema}"}
+        }
+        db.init_app(cls.app)
+
+    @classmethod
+    def tearDownClass(cls):
+        with cls.app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+        with cls.admin_engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA {cls.schema} CASCADE"))
+        cls.admin_engine.dispose()
+
+    def setUp(self):
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+    def tearDown(self):
+        db.session.rollback()
+        self.app_context.pop()
+
+
+class TestDashboardMatchesSentimentAggregates(PostgresTestCase):
+
+    def add_entry(self, user_id, timestamp, sentiment_score):
+        """Insert an entry and maintain the rollup the way entry creation and enrichment do"""
+        db.session.execute(text("""
+            INSERT INTO journals (entry_id, user_id, timestamp, sentiment_score)
+            VALUES (:entry_id, :user_id, :timestamp, :sentiment_score)
+        """), {
+            "entry_id": uuid.uuid4(),
+            "user_id": user_id,
+            "timestamp": timestamp,
+            "sentiment_score": sentiment_score,
+        })
+        JournalDailyRollup.record_entry(user_id, timestamp)
+        JournalDailyRollup.record_sentiment(user_id, timestamp, sentiment_score)
+
+    def test_rollup_days_match_day_buckets(self):
+        """The dashboard's rollup days and the aggregate endpoint's day buckets must agree"""
+        user_id = f"user_{uuid.uuid4().hex[:8]}"
+        today = datetime.now(timezone.utc).date()
+        # Late-evening entries in zones either side of UTC land on different UTC days
+        zones = [timezone(timedelta(hours=-7)), timezone(timedelta(hours=13)), timezone.utc]
+        for i in range(14):
+            day = today - timedelta(days=i + 1)
+            for j, zone in enumerate(zones):
+                score = None if (i + j) % 4 == 0 else ((i * 3 + j) % 5 - 2) / 2.0
+                self.add_entry(user_id, datetime.combine(day, time(23, 30), tzinfo=zone), score)
+        db.session.commit()
+
+        daily = JournalService._get_daily_sentiments(user_id, today - timedelta(days=30), today + timedelta(days=1))
+        buckets = JournalEntryModel.aggregate_sentiments(
+            user_id,
+            "day",
+            datetime.combine(today - timedelta(days=30), time.min, tzinfo=timezone.utc),
+            datetime.combine(today + timedelta(days=2), time.min, tzinfo=timezone.utc),
+        )
+
+        self.assertTrue(buckets)
+        self.assertEqual(sorted(day.isoformat() for day in daily), [bucket["bucket"] for bucket in buckets])
+        for bucket in buckets:
+            sentiment_sum, scored_count = daily[date.fromisoformat(bucket["bucket"])]
+            self.assertEqual(scored_count, bucket["count"])
+            self.assertAlmostEqual(sentiment_sum / scored_count, bucket["average_sentiment"])
+
+
+class TestSummarizeRanges(PostgresTestCase):
+
+    def add_survey(self, user_id, week_start, stress=3, urgent_flag=False):
+        db.session.execute(text("""
+            INSERT INTO weekly_surveys
+                (user_id, week_start, stress, anxiety, depression, happiness, satisfaction, urgent_flag)
+            VALUES (:user_id, :week_start, :stress, 2, 2, 3, 3, :urgent_flag)
+        """), {"user_id": user_id, "week_start": week_start, "stress": stress, "urgent_flag": urgent_flag})
+
+    def test_ranges_counts_and_streak(self):
+        user_id = f"user_{uuid.uuid4().hex[:8]}"
+        current_week = date(2024, 1, 15)
+        # Surveys 0, 1, 3 and 5 weeks back; the streak ends at the gap two weeks back
+        self.add_survey(user_id, current_week, stress=2)
+        self.add_survey(user_id, current_week - timedelta(weeks=1), stress=4, urgent_flag=True)
+        self.add_survey(user_id, current_week - timedelta(weeks=3), stress=5)
+        self.add_survey(user_id, current_week - timedelta(weeks=5), stress=1)
+        # Neither a later week nor another user's survey counts
+        self.add_survey(user_id, current_week + timedelta(weeks=1), stress=5, urgent_flag=True)
+        self.add_survey("other_user", current_week, stress=5, urgent_flag=True)
+        db.session.commit()
+
+        rows = {row.weeks: row for row in WeeklySurvey.summarize_ranges(user_id, current_week, [1, 2, 4, 12])}
+
+        self.assertEqual(sorted(rows), [1, 2, 4, 12])
+        self.assertEqual(
+            [(rows[w].completion_count, rows[w].high_alerts, rows[w].streak_weeks) for w in (1, 2, 4, 12)],
+            [(1, 0, 1), (2, 1, 2), (3, 1, 2), (4, 1, 2)],
+        )
+        self.assertAlmostEqual(float(rows[2].avg_stress), 3.0)
+        self.assertEqual((rows[2].min_stress, rows[2].max_stress), (2, 4))
+        self.assertAlmostEqual(float(rows[12].avg_stress), 3.0)
+        self.assertEqual((rows[12].min_stress, rows[12].max_stress), (1, 5))
+
+    def test_ranges_without_surveys(self):
+        rows = WeeklySurvey.summarize_ranges("no_surveys_user", date(2024, 1, 15), [4, 12])
+
+        self.assertEqual([row.weeks for row in rows], [4, 12])
+        self.assertEqual([(row.completion_count, row.streak_weeks) for row in rows], [(0, 0), (0, 0)])
+        self.assertIsNone(rows[0].avg_stress)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -82,4 +82,16 @@ class TestWeatherServiceIntegration(unittest.TestCase):
         # Assertions
         self.assertEqual(result["city"], "Unknown")
         self.assertEqual(result["region"], "Unknown")
-        self.assertEqual(result["country"], "Unknown")
\ No newline at end of file
+        self.assertEqual(result["country"], "Unknown")
+
+    def test_project_weather(self):
+        weather = {"description": "Light Rain ", "temperature": 12.5, "humidity": 80, "wind_speed": 3}
+
+        self.assertEqual(WeatherService.project(weather), ("light rain", 12.5))
+
+    def test_project_failed_lookup(self):
+        placeholder = {"description": "Unknown", "temperature": 0, "humidity": 0, "wind_speed": 0}
+
+        self.assertEqual(WeatherService.project(placeholder), (None, None))
+        self.assertEqual(WeatherService.project(None), (None, None))
+        self.assertEqual(WeatherService.project({"description": "mist", "temperature": "N/A"}), ("mist", None))
@@ -256,6 +256,39 @@ class TestWeeklySurveyRoutes(unittest.TestCase):
         self.assertEqual(response.json['survey_exists_this_week'], False)
         mock_check_exists.assert_called_once_with('test_user')
 
+    @patch('src.services.weekly_survey_service.WeeklySurveyService.get_missing_weeks')
+    def test_get_missing_weeks_range(self, mock_get_missing):
+        mock_get_missing.return_value = {"missing_weeks": ["2024-01-08"], "next_cursor": None}
+
+        headers = self.get_jwt_headers('test_user')
+        response = self.client.get('/api/weekly-surveys/missing-weeks?from=2023-01-01&limit=10', headers=headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["missing_weeks"], ["2024-01-08"])
+        mock_get_missing.assert_called_once_with('test_user', start_date="2023-01-01", limit=10)
+
+    def test_get_missing_weeks_invalid_date(self):
+        headers = self.get_jwt_headers('test_user')
+        response = self.client.get('/api/weekly-surveys/missing-weeks?from=yesterday', headers=headers)
+
+        self.assertEqual(response.status_code, 400)
+
+    @patch('src.services.weekly_survey_service.WeeklySurveyService.get_weekly_timeline')
+    def test_get_weekly_timeline(self, mock_get_timeline):
+        mock_get_timeline.return_value = {"weeks": [], "correlations": {"sentiment": {}, "paired_weeks": 0}}
+
+        headers = self.get_jwt_headers('test_user')
+        response = self.client.get('/api/weekly-surveys/timeline?weeks=26', headers=headers)
+
+        self.assertEqual(response.status_code, 200)
+        mock_get_timeline.assert_called_once_with('test_user', 26)
+
+    def test_get_weekly_timeline_invalid_weeks(self):
+        headers = self.get_jwt_headers('test_user')
+        response = self.client.get('/api/weekly-surveys/timeline?weeks=500', headers=headers)
+
+        self.assertEqual(response.status_code, 400)
+
     def test_create_weekly_survey_no_auth(self):
         """Test survey creation without authentication"""
         survey_data = {
@@ -282,7 +315,7 @@ class TestWeeklySurveyRoutes(unittest.TestCase):
     @patch('src.services.weekly_survey_service.WeeklySurveyService.get_missing_weeks')
     def test_get_missing_weeks_success(self, mock_get_missing_weeks):
         """Test successful missing weeks retrieval"""
-        mock_get_missing_weeks.return_value = ["2024-01-01", "2024-01-08"]
+        mock_get_missing_weeks.return_value = {"missing_weeks": ["2024-01-01", "2024-01-08"], "next_cursor": None}
 
         headers = self.get_jwt_headers('test_user')
         response = self.client.get('/api/weekly-surveys/missing-weeks', headers=headers)
@@ -379,6 +412,20 @@ class TestWeeklySurveyRoutes(unittest.TestCase):
         response = self.client.get('/api/weekly-surveys/summary')
         self.assertEqual(response.status_code, 401)
 
+    @patch('src.services.weekly_survey_service.WeeklySurveyService.get_survey_summary')
+    def test_get_survey_summary_ranges(self, mock_get_summary):
+        """Test survey summary with several ranges"""
+        mock_get_summary.return_value = {"weeks": [], "computed": {}, "ranges": {}}
+
+        headers = self.get_jwt_headers('test_user')
+        response = self.client.get('/api/weekly-surveys/summary?ranges=4,12,52', headers=headers)
+
+        self.assertEqual(response.status_code, 200)
+        mock_get_summary.assert_called_once_with('test_user', 12, ranges=[4, 12, 52])
+
+        response = self.client.get('/api/weekly-surveys/summary?ranges=4,year', headers=headers)
+        self.assertEqual(response.status_code, 400)
+
     @patch('src.services.weekly_survey_service.WeeklySurveyService.get_survey_summary')
     def test_get_survey_summary_custom_weeks(self, mock_get_summary):
         """Test survey summary with custom weeks parameter"""
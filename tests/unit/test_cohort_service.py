@@ -0,0 +1,62 @@
+import unittest
+from datetime import date
+from unittest.mock import patch, MagicMock
+
+from src.services.cohort_service import CohortService
+
+
+class TestCohortService(unittest.TestCase):
+
+    @staticmethod
+    def week(week_start, respondents, urgent_count=0):
+        return MagicMock(week_start=week_start, respondents=respondents, urgent_count=urgent_count,
+                         sleep_issue_count=1, self_harm_count=0)
+
+    @patch('src.services.cohort_service.SurveyCohortScore.get_for_weeks')
+    @patch('src.services.cohort_service.SurveyRollingState.enrolled_by_week')
+    @patch('src.services.cohort_service.SurveyCohortWeek.get_page')
+    def test_get_survey_weeks_page(self, mock_get_page, mock_enrolled, mock_scores):
+        mock_get_page.return_value = [
+            self.week(date(2024, 1, 15), 4, urgent_count=1),
+            self.week(date(2024, 1, 8), 5),
+            self.week(date(2024, 1, 1), 2),
+        ]
+        mock_enrolled.return_value = {date(2024, 1, 15): 10, date(2024, 1, 8): 8}
+        mock_scores.return_value = [
+            MagicMock(week_start=date(2024, 1, 15), dimension="stress", score=2, respondents=3),
+            MagicMock(week_start=date(2024, 1, 15), dimension="stress", score=5, respondents=1),
+        ]
+
+        result = CohortService.get_survey_weeks(limit=2)
+
+        mock_get_page.assert_called_once_with(3, None, None, None)
+        mock_enrolled.assert_called_once_with(date(2024, 1, 8), date(2024, 1, 15))
+        self.assertEqual(result["next_cursor"], "2024-01-08")
+        latest = result["weeks"][0]
+        self.assertEqual(latest["completion_rate"], 40.0)
+        self.assertEqual(latest["urgent_rate"], 25.0)
+        self.assertEqual(latest["dimensions"]["stress"]["distribution"], {"1": 0, "2": 3, "3": 0, "4": 0, "5": 1})
+        self.assertEqual(latest["dimensions"]["stress"]["average"], 2.75)
+        self.assertIsNone(latest["dimensions"]["happiness"]["average"])
+        self.assertEqual(result["weeks"][1]["completion_rate"], 62.5)
+
+    @patch('src.services.cohort_service.SurveyCohortWeek.get_page')
+    def test_get_survey_weeks_range_and_cursor(self, mock_get_page):
+        mock_get_page.return_value = []
+
+        result = CohortService.get_survey_weeks(cursor="2024-01-15", start_date="2023-01-01", end_date="2024-01-01")
+
+        mock_get_page.assert_called_once_with(13, date(2024, 1, 15), date(2023, 1, 1), date(2023, 12, 31))
+        self.assertEqual(result, {"weeks": [], "next_cursor": None})
+
+    def test_get_survey_weeks_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            CohortService.get_survey_weeks(limit=500)
+        with self.assertRaises(ValueError):
+            CohortService.get_survey_weeks(start_date="2024-02-01", end_date="2024-01-01")
+        with self.assertRaises(ValueError):
+            CohortService.get_survey_weeks(cursor="last week")
+
+
+if __name__ == '__main__':
+    unittest.main()
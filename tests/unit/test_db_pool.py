@@ -0,0 +1,82 @@
+import os
+import unittest
+from unittest.mock import patch
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.pool import NullPool
+from src.config import DatabaseConfig
+from src.db_pool import InstrumentedQueuePool, instrument_engine, pool_stats
+
+
+class TestPoolMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://", poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.1
+        )
+        instrument_engine(self.engine)
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def test_counts_checkouts_and_open_connections(self):
+        with self.engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            stats = pool_stats(self.engine)
+            self.assertEqual(stats["checked_out"], 1)
+
+        with self.engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+        stats = pool_stats(self.engine)
+        self.assertEqual(stats["checkouts"], 2)
+        self.assertEqual(stats["connects"], 1)
+        self.assertEqual(stats["open_connections"], 1)
+        self.assertEqual(stats["checked_out"], 0)
+        self.assertEqual(stats["overflow"], 0)
+
+    def test_records_timeouts_as_waits(self):
+        with self.engine.connect():
+            with self.assertRaises(exc.TimeoutError):
+                self.engine.connect()
+
+        stats = pool_stats(self.engine)
+        self.assertEqual(stats["timeouts"], 1)
+        self.assertEqual(stats["waits"], 1)
+        self.assertGreaterEqual(stats["wait_seconds_max"], 0.1)
+
+    def test_metrics_survive_dispose(self):
+        with self.engine.connect():
+            pass
+        self.engine.dispose()
+        with self.engine.connect():
+            pass
+
+        stats = pool_stats(self.engine)
+        self.assertEqual(stats["checkouts"], 2)
+        self.assertEqual(stats["open_connections"], 1)
+
+
+class TestDatabaseConfig(unittest.TestCase):
+
+    @patch.dict(os.environ, {"DB_POOL_SIZE": "8", "DB_MAX_OVERFLOW": "2", "DB_STATEMENT_TIMEOUT_MS": "5000"}, clear=True)
+    def test_queue_pool_profile(self):
+        options = DatabaseConfig.engine_options()
+
+        self.assertIs(options["poolclass"], InstrumentedQueuePool)
+        self.assertEqual(options["pool_size"], 8)
+        self.assertEqual(options["max_overflow"], 2)
+        self.assertTrue(options["pool_pre_ping"])
+        self.assertEqual(options["connect_args"]["options"], "-c statement_timeout=5000")
+
+    @patch.dict(os.environ, {"DB_POOL_CLASS": "null", "DB_PGBOUNCER": "true", "DB_STATEMENT_TIMEOUT_MS": "5000"}, clear=True)
+    def test_pgbouncer_profile_uses_set_local_timeout(self):
+        options = DatabaseConfig.engine_options()
+
+        self.assertIs(options["poolclass"], NullPool)
+        self.assertNotIn("pool_size", options)
+        self.assertNotIn("options", options["connect_args"])
+        self.assertEqual(DatabaseConfig.statement_timeout_ms(), 5000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import math
+import unittest
+from unittest.mock import patch
+from src.config import EmbeddingConfig
+from src.utils.embedding_utils import compact_embedding, decode_compact_embedding, to_bit_literal, truncate_normalize
+
+
+class TestEmbeddingUtils(unittest.TestCase):
+
+    def test_truncate_normalize_returns_unit_prefix(self):
+        result = truncate_normalize([3.0, 4.0, 12.0], 2)
+
+        self.assertEqual(len(result), 2)
+        self.assertAlmostEqual(result[0], 0.6)
+        self.assertAlmostEqual(result[1], 0.8)
+        self.assertAlmostEqual(math.sqrt(sum(value * value for value in result)), 1.0)
+
+    def test_truncate_normalize_zero_vector(self):
+        self.assertEqual(truncate_normalize([0.0, 0.0, 1.0], 2), [0.0, 0.0])
+
+    def test_bit_literal_sets_positive_components(self):
+        self.assertEqual(to_bit_literal([0.5, -0.1, 0.0, 2.0]), "1001")
+
+    def test_compact_embedding_halfvec(self):
+        result = compact_embedding([3.0, 4.0, -1.0], EmbeddingConfig.HALFVEC, dimensions=2)
+        self.assertEqual(result, "[0.6,0.8]")
+
+    def test_compact_embedding_binary(self):
+        result = compact_embedding([3.0, -4.0, 1.0], EmbeddingConfig.BINARY, dimensions=3)
+        self.assertEqual(result, "101")
+
+    def test_compact_embedding_full_storage_returns_none(self):
+        self.assertIsNone(compact_embedding([1.0, 2.0], EmbeddingConfig.FULL))
+
+    def test_decode_compact_embedding_pads_to_full_dimensions(self):
+        self.assertEqual(decode_compact_embedding("[0.6,0.8]", EmbeddingConfig.HALFVEC, dimensions=4), [0.6, 0.8, 0.0, 0.0])
+        self.assertEqual(decode_compact_embedding("101", EmbeddingConfig.BINARY, dimensions=4), [1.0, -1.0, 1.0, 0.0])
+
+    @patch.dict('os.environ', {'EMBEDDING_STORAGE': 'binary', 'EMBEDDING_DIMENSIONS': '512'})
+    def test_config_compact_type(self):
+        self.assertEqual(EmbeddingConfig.compact_type(), "bit(512)")
+        self.assertEqual(EmbeddingConfig.compact_type(EmbeddingConfig.HALFVEC), "halfvec(512)")
+
+    @patch.dict('os.environ', {'EMBEDDING_STORAGE': 'int8'})
+    def test_config_rejects_unknown_storage(self):
+        with self.assertRaises(ValueError):
+            EmbeddingConfig.storage()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import patch, MagicMock
+from src.tasks.enrich import _apply_enrichment
+
+
+@patch('src.tasks.enrich.ThemeService.assign_entry')
+@patch('src.tasks.enrich.JournalDailyRollup')
+@patch('src.tasks.enrich.UserKeywordCount')
+class TestApplyEnrichment(unittest.TestCase):
+
+    def make_entry(self, keywords=None, sentiment_score=None):
+        return MagicMock(
+            user_id="test_user",
+            timestamp=datetime(2024, 3, 1, 12, tzinfo=timezone.utc),
+            keywords=keywords,
+            sentiment_score=sentiment_score,
+        )
+
+    def test_first_enrichment_counts_everything(self, mock_counts, mock_rollup, mock_assign):
+        entry = self.make_entry()
+
+        _apply_enrichment(entry, "Toronto", None, "positive", 0.5, ["work", "gym"], None)
+
+        mock_counts.decrement.assert_called_once_with("test_user", set())
+        mock_counts.increment.assert_called_once_with("test_user", {"work", "gym"}, entry.timestamp)
+        mock_rollup.apply.assert_not_called()
+        mock_rollup.record_sentiment.assert_called_once_with("test_user", entry.timestamp, 0.5)
+
+    def test_re_enrichment_replaces_previous_counts(self, mock_counts, mock_rollup, mock_assign):
+        """A retry or reprocess must not count the entry's keywords and score twice"""
+        entry = self.make_entry(keywords=["work", "sleep"], sentiment_score=-0.25)
+
+        _apply_enrichment(entry, "Toronto", None, "positive", 0.5, ["work", "gym"], None)
+
+        mock_counts.decrement.assert_called_once_with("test_user", {"sleep"})
+        mock_counts.increment.assert_called_once_with("test_user", {"gym"}, entry.timestamp)
+        mock_rollup.apply.assert_called_once_with(
+            "test_user", mock_rollup.day_of.return_value, sentiment_delta=0.25, scored_delta=-1
+        )
+        mock_rollup.record_sentiment.assert_called_once_with("test_user", entry.timestamp, 0.5)
+        self.assertEqual(entry.keywords, ["work", "gym"])
+
+
+if __name__ == '__main__':
+    unittest.main()
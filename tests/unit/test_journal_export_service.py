@@ -0,0 +1,72 @@
+import csv
+import gzip
+import io
+import json
+import unittest
+import uuid
+from datetime import datetime, timezone
+from unittest.mock import patch
+from src.services.journal_export_service import JournalExportService
+
+
+def make_rows(count, include_embedding=False):
+    for i in range(count):
+        row = {
+            "entry_id": uuid.UUID(int=i),
+            "timestamp": datetime(2024, 1, 1, i % 24, tzinfo=timezone.utc),
+            "entry": f"Entry {i}",
+            "sentiment": "positive",
+            "sentiment_score": 0.5,
+            "emotions": None,
+            "keywords": ["work", "sleep"],
+            "weather": {"temperature": 3},
+            "location": None,
+        }
+        if include_embedding:
+            row["embedding"] = [0.25, 0.5]
+        yield row
+
+
+class TestJournalExportService(unittest.TestCase):
+
+    @patch('src.services.journal_export_service.JournalEntryModel.iter_export_rows')
+    def test_ndjson_export(self, mock_rows):
+        mock_rows.return_value = make_rows(3)
+
+        body = b"".join(JournalExportService.export("test_user", "ndjson")).decode()
+        lines = [json.loads(line) for line in body.splitlines()]
+
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[0]["entry_id"], str(uuid.UUID(int=0)))
+        self.assertEqual(lines[0]["timestamp"], "2024-01-01T00:00:00+00:00")
+        self.assertNotIn("embedding", lines[0])
+        mock_rows.assert_called_once_with("test_user", False)
+
+    @patch('src.services.journal_export_service.JournalEntryModel.iter_export_rows')
+    def test_csv_export_with_embeddings(self, mock_rows):
+        mock_rows.return_value = make_rows(2, include_embedding=True)
+
+        body = b"".join(JournalExportService.export("test_user", "csv", include_embeddings=True)).decode()
+        records = list(csv.DictReader(io.StringIO(body)))
+
+        self.assertEqual(len(records), 2)
+        self.assertEqual(json.loads(records[0]["keywords"]), ["work", "sleep"])
+        self.assertEqual(json.loads(records[0]["embedding"]), [0.25, 0.5])
+
+    @patch('src.services.journal_export_service.JournalEntryModel.iter_export_rows')
+    def test_gzip_export_is_chunked_and_decompresses(self, mock_rows):
+        mock_rows.return_value = make_rows(2000)
+
+        chunks = list(JournalExportService.export("test_user", "ndjson", compress=True))
+        body = gzip.decompress(b"".join(chunks)).decode()
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(len(body.splitlines()), 2000)
+
+    def test_invalid_format(self):
+        with self.assertRaises(ValueError):
+            JournalExportService.export("test_user", "xml")
+
+
+if __name__ == '__main__':
+    unittest.main()
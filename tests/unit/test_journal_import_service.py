@@ -0,0 +1,99 @@
+import json
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import patch, MagicMock
+from src.services.journal_import_service import JournalImportService, ImportValidationError
+
+
+class TestJournalImportService(unittest.TestCase):
+
+    def test_detect_format(self):
+        self.assertEqual(JournalImportService.detect_format("application/x-ndjson"), "ndjson")
+        self.assertEqual(JournalImportService.detect_format("text/csv"), "csv")
+        self.assertEqual(JournalImportService.detect_format("application/json"), "json")
+        self.assertEqual(JournalImportService.detect_format("application/json", "csv"), "csv")
+        with self.assertRaises(ValueError):
+            JournalImportService.detect_format("application/json", "xml")
+
+    def test_validate_json_array(self):
+        body = json.dumps([
+            {"entry": "First", "date": "2023-01-05T08:00:00-05:00"},
+            {"entry": "Second", "date": "2023-01-06", "location": {"latitude": 43.6, "longitude": -79.4}},
+        ])
+
+        rows = JournalImportService.validate(body, "json")
+
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]["timestamp"], datetime(2023, 1, 5, 13, 0, tzinfo=timezone.utc))
+        self.assertEqual(rows[1]["location"], {"latitude": 43.6, "longitude": -79.4})
+
+    def test_validate_csv(self):
+        body = "entry,date,latitude,longitude\nHello,2023-02-01,,\nWorld,2023-02-02,10,20\n"
+
+        rows = JournalImportService.validate(body, "csv")
+
+        self.assertEqual([row["entry"] for row in rows], ["Hello", "World"])
+        self.assertIsNone(rows[0]["location"])
+        self.assertEqual(rows[1]["location"], {"latitude": 10.0, "longitude": 20.0})
+
+    def test_validate_reports_every_row_error(self):
+        body = "\n".join([
+            json.dumps({"entry": "ok", "date": "2023-01-01"}),
+            "{not json",
+            json.dumps({"entry": "", "date": "2023-01-01"}),
+            json.dumps({"entry": "no date"}),
+            json.dumps({"entry": "bad date", "date": "yesterday-ish"}),
+        ])
+
+        with self.assertRaises(ImportValidationError) as ctx:
+            JournalImportService.validate(body, "ndjson")
+
+        self.assertEqual([error["row"] for error in ctx.exception.errors], [2, 3, 4, 5])
+
+    def test_validate_rejects_empty_and_oversized_imports(self):
+        with self.assertRaises(ValueError):
+            JournalImportService.validate("[]", "json")
+
+        body = json.dumps([{"entry": "x", "date": "2023-01-01"}] * (JournalImportService.MAX_ROWS + 1))
+        with self.assertRaises(ValueError):
+            JournalImportService.validate(body, "json")
+
+    @patch('src.services.journal_import_service.cache')
+    @patch('src.services.journal_import_service.JournalImportService.dispatch_enrichment')
+    @patch('src.services.journal_import_service.JournalEntryModel.bulk_insert')
+    @patch('src.services.journal_import_service.db.session')
+    def test_import_entries_commits_once_and_dispatches(self, mock_session, mock_bulk_insert, mock_dispatch, mock_cache):
+        mock_bulk_insert.return_value = ["id-1", "id-2"]
+        body = json.dumps([{"entry": "a", "date": "2023-01-01"}, {"entry": "b", "date": "2023-01-02"}])
+
+        result = JournalImportService.import_entries("test_user", body, "json")
+
+        self.assertEqual(result["total_rows"], 2)
+        self.assertEqual(result["status"], "enriching")
+        mock_session.commit.assert_called_once()
+        mock_cache.bump_user_version.assert_called_once_with("test_user")
+        mock_dispatch.assert_called_once()
+        self.assertEqual(mock_dispatch.call_args[0][1], ["id-1", "id-2"])
+
+    @patch('src.services.journal_import_service.JournalEntryModel.bulk_insert')
+    @patch('src.services.journal_import_service.db.session')
+    def test_import_entries_invalid_rows_insert_nothing(self, mock_session, mock_bulk_insert):
+        with self.assertRaises(ImportValidationError):
+            JournalImportService.import_entries("test_user", json.dumps([{"entry": "a"}]), "json")
+
+        mock_bulk_insert.assert_not_called()
+        mock_session.commit.assert_not_called()
+
+    def test_dispatch_enrichment_in_batches(self):
+        mock_task = MagicMock()
+        entry_ids = [f"id-{i}" for i in range(JournalImportService.ENRICH_BATCH_SIZE + 1)]
+
+        with patch('src.tasks.enrich.enrich_journal_batch', mock_task, create=True):
+            JournalImportService.dispatch_enrichment("import-1", entry_ids)
+
+        self.assertEqual(mock_task.delay.call_count, 2)
+        self.assertEqual(len(mock_task.delay.call_args_list[0][0][0]), JournalImportService.ENRICH_BATCH_SIZE)
+
+
+if __name__ == '__main__':
+    unittest.main()
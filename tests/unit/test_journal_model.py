@@ -1,9 +1,10 @@
 import unittest
 from unittest.mock import patch, MagicMock
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 import uuid
+from types import SimpleNamespace
 from src.models.journal_model import JournalEntryModel
-from sqlalchemy.orm.exc import NoResultFound
+from sqlalchemy.dialects import postgresql
 
 class TestJournalModel(unittest.TestCase):
 
@@ -69,42 +70,103 @@ class TestJournalModel(unittest.TestCase):
                 self.assertEqual(len(result), 2)
                 mock_db_session.query.assert_called_once_with(JournalEntryModel)
 
+    @patch('src.models.journal_model.JournalDailyRollup.remove_entries')
+    @patch('src.models.journal_model.UserKeywordCount.decrement_many')
     @patch('src.models.journal_model.db.session')
-    def test_delete_entry(self, mock_db_session):
+    def test_delete_entry(self, mock_db_session, mock_decrement_many, mock_remove_entries):
         # Arrange
-        entry_id = str(uuid.uuid4())
-        mock_entry = JournalEntryModel(entry_id=entry_id, user_id="test_user", entry="Test entry")
-        
-        mock_query = MagicMock()
-        mock_query.filter_by.return_value.one.return_value = mock_entry
-        mock_db_session.query.return_value = mock_query
-        
+        entry_id = uuid.uuid4()
+        mock_db_session.execute.return_value.all.return_value = [
+            MagicMock(entry_id=entry_id, timestamp=datetime(2024, 11, 30, 14, 30, tzinfo=timezone.utc),
+                      sentiment_score=None, keywords=None)
+        ]
+
         # Act
-        result = JournalEntryModel.delete_entry(entry_id)
-        
+        result = JournalEntryModel.delete_entry(str(entry_id), "test_user")
+
         # Assert
         self.assertTrue(result)
-        mock_db_session.query.assert_called_once_with(JournalEntryModel)
-        mock_db_session.delete.assert_called_once_with(mock_entry)
+        mock_db_session.execute.assert_called_once()
+        mock_db_session.query.assert_not_called()
+        mock_db_session.commit.assert_called_once()
+
+    @patch('src.models.journal_model.db.session')
+    def test_delete_entry_is_scoped_to_owner(self, mock_db_session):
+        # Arrange
+        mock_db_session.execute.return_value.all.return_value = []
+
+        # Act
+        JournalEntryModel.delete_entry(str(uuid.uuid4()), "test_user")
+
+        # Assert
+        sql = str(mock_db_session.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+        self.assertIn("journals.entry_id = ANY", sql)
+        self.assertIn("journals.user_id =", sql)
+        self.assertIn("RETURNING", sql)
+
+    @patch('src.models.journal_model.UserKeywordCount.decrement_many')
+    @patch('src.models.journal_model.db.session')
+    def test_delete_entries_decrements_keyword_counts(self, mock_db_session, mock_decrement_many):
+        # Arrange
+        rows = [
+            MagicMock(entry_id=uuid.uuid4(), timestamp=datetime(2024, 11, 30, 14, 30, tzinfo=timezone.utc),
+                      sentiment_score=0.5, keywords=["work", "sleep"]),
+            MagicMock(entry_id=uuid.uuid4(), timestamp=datetime(2024, 12, 1, 9, 0, tzinfo=timezone.utc),
+                      sentiment_score=None, keywords=["work"]),
+        ]
+        mock_db_session.execute.return_value.all.return_value = rows
+
+        # Act
+        result = JournalEntryModel.delete_entries("test_user", [row.entry_id for row in rows])
+
+        # Assert
+        self.assertEqual(result, [str(row.entry_id) for row in rows])
+        mock_decrement_many.assert_called_once_with("test_user", [["work", "sleep"], ["work"]])
         mock_db_session.commit.assert_called_once()
 
+    @patch('src.models.journal_model.db.session')
+    def test_delete_entries_updates_daily_rollup(self, mock_db_session):
+        # Arrange
+        rows = [
+            MagicMock(entry_id=uuid.uuid4(), timestamp=datetime(2024, 11, 30, 23, 30, tzinfo=timezone.utc),
+                      sentiment_score=-0.4, keywords=None),
+            MagicMock(entry_id=uuid.uuid4(), timestamp=datetime(2024, 11, 30, 8, 0, tzinfo=timezone.utc),
+                      sentiment_score=None, keywords=None),
+        ]
+        mock_db_session.execute.return_value.all.return_value = rows
+
+        # Act
+        JournalEntryModel.delete_entries("test_user", [row.entry_id for row in rows])
+
+        # Assert: one DELETE plus one rollup upsert for the shared day
+        self.assertEqual(mock_db_session.execute.call_count, 2)
+        upsert = mock_db_session.execute.call_args_list[1][0][0]
+        params = upsert.compile(dialect=postgresql.dialect()).params
+        self.assertEqual(params["day_m0"], date(2024, 11, 30))
+        self.assertEqual(params["entry_count_m0"], -2)
+        self.assertAlmostEqual(params["sentiment_sum_m0"], 0.4)
+        self.assertEqual(params["scored_count_m0"], -1)
+
     @patch('src.models.journal_model.db.session')
     def test_delete_entry_not_found(self, mock_db_session):
         # Arrange
-        entry_id = str(uuid.uuid4())
-        
-        mock_query = MagicMock()
-        mock_query.filter_by.return_value.one.side_effect = NoResultFound()
-        mock_db_session.query.return_value = mock_query
-        
+        mock_db_session.execute.return_value.all.return_value = []
+
         # Act
-        result = JournalEntryModel.delete_entry(entry_id)
-        
+        result = JournalEntryModel.delete_entry(str(uuid.uuid4()), "test_user")
+
         # Assert
         self.assertFalse(result)
-        mock_db_session.query.assert_called_once_with(JournalEntryModel)
-        mock_db_session.delete.assert_not_called()
-        mock_db_session.commit.assert_not_called()
+        mock_db_session.query.assert_not_called()
+
+    @patch('src.models.journal_model.db.session')
+    def test_delete_entry_invalid_id(self, mock_db_session):
+        # Act
+        result = JournalEntryModel.delete_entry("not-a-uuid", "test_user")
+
+        # Assert
+        self.assertFalse(result)
+        mock_db_session.execute.assert_not_called()
 
     @patch('src.models.journal_model.db.session')
     def test_get_entries_by_keyword(self, mock_db_session):
@@ -116,19 +178,78 @@ class TestJournalModel(unittest.TestCase):
         expected_entries = [entry1, entry2]
         
         mock_query = MagicMock()
-        mock_query.filter.return_value.filter.return_value.all.return_value = expected_entries
+        mock_query.filter.return_value.filter.return_value.order_by.return_value.limit.return_value.all.return_value = expected_entries
         mock_db_session.query.return_value = mock_query
         
         # Mock to_dict method
         with patch.object(entry1, 'to_dict', return_value={'entry': 'I am happy today'}):
             with patch.object(entry2, 'to_dict', return_value={'entry': 'Feeling happy and content'}):
                 # Act
-                result = JournalEntryModel.get_entries_by_keyword(user_id, keyword)
+                result, next_cursor = JournalEntryModel.get_entries_by_keyword(user_id, keyword)
                 
                 # Assert
                 self.assertEqual(len(result), 2)
+                self.assertIsNone(next_cursor)
                 mock_db_session.query.assert_called_once_with(JournalEntryModel)
 
+    @patch('src.models.journal_model.db.session')
+    def test_get_entries_by_keyword_next_cursor(self, mock_db_session):
+        # Arrange
+        timestamp = datetime(2024, 11, 30, 14, 30, tzinfo=timezone.utc)
+        entries = [
+            JournalEntryModel(entry_id=uuid.uuid4(), user_id="test_user", entry=f"Entry {i}", timestamp=timestamp)
+            for i in range(3)
+        ]
+
+        mock_query = MagicMock()
+        mock_query.filter.return_value.filter.return_value.order_by.return_value.limit.return_value.all.return_value = entries
+        mock_db_session.query.return_value = mock_query
+
+        # Act
+        with patch.object(JournalEntryModel, 'to_dict', return_value={}):
+            result, next_cursor = JournalEntryModel.get_entries_by_keyword("test_user", "Happy ", limit=2)
+
+        # Assert
+        self.assertEqual(len(result), 2)
+        self.assertEqual(JournalEntryModel.decode_cursor(next_cursor), (timestamp, entries[1].entry_id))
+
+    def test_in_time_range_is_half_open(self):
+        query = MagicMock()
+        start = datetime(2024, 11, 1, tzinfo=timezone.utc)
+        end = datetime(2024, 12, 1, tzinfo=timezone.utc)
+
+        JournalEntryModel.in_time_range(query, start, end)
+
+        lower = query.filter.call_args[0][0]
+        upper = query.filter.return_value.filter.call_args[0][0]
+        self.assertEqual(lower.operator.__name__, "ge")
+        self.assertEqual(upper.operator.__name__, "lt")
+        self.assertEqual(upper.right.value, end)
+
+    def test_in_time_range_without_bounds(self):
+        query = MagicMock()
+        self.assertIs(JournalEntryModel.in_time_range(query), query)
+        query.filter.assert_not_called()
+
+    @patch('src.models.journal_model.JournalEntryModel.in_time_range')
+    @patch('src.models.journal_model.db.session')
+    def test_get_entries_by_month_uses_next_month_as_end(self, mock_db_session, mock_in_time_range):
+        mock_in_time_range.return_value.all.return_value = []
+
+        JournalEntryModel.get_entries_by_month("test_user", 2024, 12)
+
+        _, start, end = mock_in_time_range.call_args[0]
+        self.assertEqual(start, datetime(2024, 12, 1, tzinfo=timezone.utc))
+        self.assertEqual(end, datetime(2025, 1, 1, tzinfo=timezone.utc))
+
+    def test_decode_cursor_invalid(self):
+        with self.assertRaises(ValueError):
+            JournalEntryModel.decode_cursor("not-a-cursor")
+
+    def test_normalize_keywords(self):
+        result = JournalEntryModel.normalize_keywords([" Happy", "happy", "Work ", "", "FAMILY"])
+        self.assertEqual(result, ["happy", "work", "family"])
+
     @patch('src.models.journal_model.db.session')
     def test_get_top_keywords(self, mock_db_session):
         # Arrange
@@ -146,5 +267,176 @@ class TestJournalModel(unittest.TestCase):
         self.assertEqual(result, mock_keywords)
         mock_db_session.query.assert_called_once_with(JournalEntryModel.keywords)
 
+    @patch('src.models.journal_model.db.session')
+    def test_aggregate_sentiments(self, mock_db_session):
+        # Arrange
+        row = MagicMock(bucket=datetime(2024, 11, 4), average=0.25, count=4, min=-0.5)
+        row.max = 0.9
+        mock_query = MagicMock()
+        mock_query.filter.return_value = mock_query
+        mock_query.group_by.return_value.order_by.return_value.all.return_value = [row]
+        mock_db_session.query.return_value = mock_query
+
+        # Act
+        result = JournalEntryModel.aggregate_sentiments(
+            "test_user", "week", datetime(2024, 11, 1, tzinfo=timezone.utc), datetime(2024, 12, 1, tzinfo=timezone.utc)
+        )
+
+        # Assert
+        self.assertEqual(result, [{
+            "bucket": "2024-11-04",
+            "average_sentiment": 0.25,
+            "count": 4,
+            "min_sentiment": -0.5,
+            "max_sentiment": 0.9,
+        }])
+        mock_db_session.query.assert_called_once()
+
+    def test_aggregate_sentiments_invalid_granularity(self):
+        with self.assertRaises(ValueError):
+            JournalEntryModel.aggregate_sentiments("test_user", "hour", None, None)
+
+    @patch.dict('os.environ', {'EMBEDDING_STORAGE': 'halfvec', 'EMBEDDING_DIMENSIONS': '2', 'EMBEDDING_RERANK_CANDIDATES': '4'})
+    @patch('src.models.journal_model.db.session')
+    def test_search_compact_embeddings_reranks_with_full_vectors(self, mock_db_session):
+        # Arrange
+        entry_id = uuid.uuid4()
+        mock_db_session.execute.return_value.all.return_value = [MagicMock(entry_id=entry_id)]
+
+        # Act
+        result = JournalEntryModel.search_compact_embeddings("test_user", [3.0, 4.0, 0.0], top_k=5, rerank=True)
+
+        # Assert
+        self.assertEqual(result, [entry_id])
+        statement, params = mock_db_session.execute.call_args[0]
+        sql = str(statement)
+        self.assertIn("embedding_compact <=> CAST(:query_compact AS halfvec(2))", sql)
+        self.assertIn("ORDER BY embedding <=> CAST(:query AS vector(1536))", sql)
+        self.assertEqual(params["candidates"], 20)
+        self.assertEqual(params["query_compact"], "[0.6,0.8]")
+
+    @patch.dict('os.environ', {'EMBEDDING_STORAGE': 'binary', 'EMBEDDING_DIMENSIONS': '3'})
+    @patch('src.models.journal_model.db.session')
+    def test_search_compact_embeddings_binary_without_rerank(self, mock_db_session):
+        # Arrange
+        mock_db_session.execute.return_value.all.return_value = []
+
+        # Act
+        JournalEntryModel.search_compact_embeddings("test_user", [1.0, -1.0, 1.0], top_k=5, rerank=False)
+
+        # Assert
+        statement, params = mock_db_session.execute.call_args[0]
+        sql = str(statement)
+        self.assertIn("embedding_compact <~> CAST(:query_compact AS bit(3))", sql)
+        self.assertNotIn(":query AS vector", sql)
+        self.assertEqual(params["candidates"], 5)
+        self.assertEqual(params["query_compact"], "101")
+
+    @patch.dict('os.environ', {'EMBEDDING_STORAGE': 'halfvec', 'EMBEDDING_DIMENSIONS': '2', 'EMBEDDING_EF_SEARCH': '200'})
+    @patch('src.models.journal_model.db.session')
+    def test_search_compact_embeddings_uses_iterative_scan(self, mock_db_session):
+        """The shared HNSW index must keep scanning until this user's results are filled"""
+        mock_db_session.execute.return_value.all.return_value = []
+
+        JournalEntryModel.search_compact_embeddings("test_user", [3.0, 4.0], top_k=5, rerank=False)
+
+        (settings, settings_params), (search, search_params) = [c[0] for c in mock_db_session.execute.call_args_list]
+        self.assertIn("set_config('hnsw.iterative_scan', 'relaxed_order', true)", str(settings))
+        self.assertEqual(settings_params, {"ef_search": "200"})
+        sql = str(search)
+        self.assertIn("WHERE user_id = :user_id", sql)
+        # relaxed_order results are re-sorted by distance outside the index scan
+        self.assertIn("AS MATERIALIZED", sql)
+        self.assertIn("ORDER BY distance", sql)
+        self.assertEqual(search_params["user_id"], "test_user")
+
+    @patch.dict('os.environ', {'EMBEDDING_STORAGE': 'halfvec', 'EMBEDDING_DIMENSIONS': '2', 'EMBEDDING_KEEP_FULL': 'false'})
+    @patch('src.models.journal_model.db.session')
+    def test_get_embeddings_for_clustering_compact_only(self, mock_db_session):
+        """With full vectors dropped, clustering reads the decoded compact copy"""
+        entry_id = uuid.uuid4()
+        mock_db_session.execute.return_value.all.return_value = [
+            MagicMock(entry_id=entry_id, compact="[0.6,0.8]", keywords=["work"]),
+        ]
+
+        rows = JournalEntryModel.get_embeddings_for_clustering("test_user")
+
+        self.assertIn("embedding_compact IS NOT NULL", str(mock_db_session.execute.call_args[0][0]))
+        mock_db_session.query.assert_not_called()
+        self.assertEqual(rows[0].entry_id, entry_id)
+        self.assertEqual(rows[0].keywords, ["work"])
+        self.assertEqual(len(rows[0].embedding), 1536)
+        self.assertEqual(rows[0].embedding[:3], [0.6, 0.8, 0.0])
+
+    @patch.dict('os.environ', {'EMBEDDING_STORAGE': 'full'})
+    @patch('src.models.journal_model.db.session')
+    def test_store_compact_embeddings_noop_for_full_storage(self, mock_db_session):
+        JournalEntryModel.store_compact_embeddings([(uuid.uuid4(), [0.1, 0.2])])
+        mock_db_session.execute.assert_not_called()
+
+
+    @patch('src.models.journal_model.db.session')
+    def test_get_similar_entries_invalid_id(self, mock_db_session):
+        self.assertIsNone(JournalEntryModel.get_similar_entries("test_user", "not-a-uuid"))
+        mock_db_session.query.assert_not_called()
+
+    @patch.dict('os.environ', {'EMBEDDING_STORAGE': 'halfvec', 'EMBEDDING_KEEP_FULL': 'true'})
+    @patch('src.models.journal_model.db.session')
+    def test_get_similar_entries_uses_stored_vectors(self, mock_db_session):
+        # Arrange
+        source_id = uuid.uuid4()
+        mock_db_session.execute.return_value.first.return_value = SimpleNamespace(has_full=True, has_compact=True)
+        mock_db_session.execute.return_value.all.return_value = []
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+        # Act
+        result = JournalEntryModel.get_similar_entries("test_user", str(source_id), top_k=3, start=start)
+
+        # Assert: the source entry exists but has no neighbours
+        self.assertEqual(result, [])
+        lookup, lookup_params = mock_db_session.execute.call_args_list[0][0]
+        self.assertIn("embedding_compact IS NOT NULL AS has_compact", str(lookup))
+        self.assertEqual(lookup_params, {"source_id": source_id, "user_id": "test_user"})
+        statement, params = mock_db_session.execute.call_args[0]
+        sql = str(statement)
+        self.assertIn("(SELECT embedding_compact FROM journals WHERE entry_id = :source_id AND user_id = :user_id)", sql)
+        self.assertIn("ORDER BY embedding <=> (SELECT embedding FROM journals", sql)
+        self.assertIn("entry_id <> :source_id", sql)
+        self.assertIn("timestamp >= :start", sql)
+        self.assertNotIn(":end", sql)
+        self.assertEqual(params["source_id"], source_id)
+        self.assertEqual(params["start"], start)
+
+    @patch.dict('os.environ', {'EMBEDDING_STORAGE': 'halfvec'})
+    @patch('src.models.journal_model.db.session')
+    def test_get_similar_entries_source_not_found(self, mock_db_session):
+        mock_db_session.execute.return_value.first.return_value = None
+
+        self.assertIsNone(JournalEntryModel.get_similar_entries("test_user", str(uuid.uuid4())))
+        self.assertEqual(mock_db_session.execute.call_count, 1)
+
+    @patch.dict('os.environ', {'EMBEDDING_STORAGE': 'full'})
+    @patch('src.models.journal_model.db.session')
+    def test_get_similar_entries_source_without_embedding(self, mock_db_session):
+        # Arrange: other entries have embeddings, but the source hasn't been enriched yet
+        mock_db_session.execute.return_value.first.return_value = SimpleNamespace(has_full=False, has_compact=False)
+        mock_db_session.query.return_value.filter.return_value.filter.return_value.filter.return_value \
+            .order_by.return_value.limit.return_value.all.return_value = [MagicMock()]
+
+        # Act
+        result = JournalEntryModel.get_similar_entries("test_user", str(uuid.uuid4()))
+
+        # Assert: no kNN query runs against a NULL query vector
+        self.assertEqual(result, [])
+        mock_db_session.query.assert_not_called()
+
+    @patch.dict('os.environ', {'EMBEDDING_STORAGE': 'binary', 'EMBEDDING_KEEP_FULL': 'true'})
+    @patch('src.models.journal_model.db.session')
+    def test_get_similar_entries_compact_source_without_vector(self, mock_db_session):
+        mock_db_session.execute.return_value.first.return_value = SimpleNamespace(has_full=True, has_compact=False)
+
+        self.assertEqual(JournalEntryModel.get_similar_entries("test_user", str(uuid.uuid4())), [])
+        self.assertEqual(mock_db_session.execute.call_count, 1)
+
 if __name__ == '__main__':
     unittest.main()  
\ No newline at end of file
@@ -1,5 +1,9 @@
 import unittest
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock
+from flask import Flask
+from src.cache import cache
 from src.models.journal_model import JournalEntryModel
 from src.services.journal_service import JournalService
 
@@ -82,5 +86,158 @@ class TestJournalService(unittest.TestCase):
         self.assertEqual(len(entries), 2)
         self.assertEqual(entries[0]["entry_id"], "uuid1")
 
+    @patch('src.services.journal_service.UserKeywordCount.get_top')
+    def test_get_top_keywords_reads_counts(self, mock_get_top):
+        mock_get_top.return_value = [("work", 7), ("sleep", 3)]
+
+        result = JournalService.get_top_keywords("test_user", 2)
+
+        mock_get_top.assert_called_once_with("test_user", 2)
+        self.assertEqual(result, [("work", 7), ("sleep", 3)])
+
+    @patch('src.services.journal_service.JournalDailyRollup.get_range')
+    def test_get_heatmap_data_from_rollup(self, mock_get_range):
+        today = datetime.now(timezone.utc).date()
+        mock_get_range.return_value = [
+            SimpleNamespace(day=today - timedelta(days=1), entry_count=2, sentiment_sum=0.5, scored_count=2),
+            SimpleNamespace(day=today, entry_count=1, sentiment_sum=0.0, scored_count=0),
+        ]
+
+        result = JournalService.get_heatmap_data("test_user", days=3)
+
+        mock_get_range.assert_called_once_with("test_user", today - timedelta(days=2), today + timedelta(days=1))
+        self.assertEqual(result, {
+            today.isoformat(): 1,
+            (today - timedelta(days=1)).isoformat(): 2,
+            (today - timedelta(days=2)).isoformat(): 0,
+        })
+
+    @patch('src.services.journal_service.JournalDailyRollup.get_range')
+    def test_get_dashboard_sentiments_single_rollup_read(self, mock_get_range):
+        today = datetime.now(timezone.utc).date()
+        mock_get_range.return_value = [
+            SimpleNamespace(day=today, entry_count=3, sentiment_sum=1.5, scored_count=3),
+            SimpleNamespace(day=today - timedelta(days=8), entry_count=1, sentiment_sum=-0.5, scored_count=1),
+        ]
+
+        result = JournalService.get_dashboard_sentiments("test_user")
+
+        mock_get_range.assert_called_once()
+        self.assertEqual(result["last_week"][-1]["average_sentiment"], 0.5)
+        self.assertEqual(result["last_month"][-1], {"week_label": "This week", "average_sentiment": 0.5})
+        self.assertEqual(result["last_month"][-2], {"week_label": "Last week", "average_sentiment": -0.5})
+
+    @patch('src.services.journal_service.JournalDailyRollup.get_range')
+    def test_dashboard_errors_are_not_cached(self, mock_get_range):
+        """A failed read raises instead of caching empty charts for the whole TTL"""
+        app = Flask(__name__)
+        app.config['RESPONSE_CACHE_BACKEND'] = 'memory'
+        cache.init_app(app)
+        mock_get_range.side_effect = [Exception("connection reset"), Exception("connection reset"), [], []]
+
+        with app.app_context():
+            with self.assertRaises(Exception):
+                JournalService.get_heatmap_data("test_user", days=3)
+            with self.assertRaises(Exception):
+                JournalService.get_dashboard_sentiments("test_user")
+
+            self.assertEqual(len(JournalService.get_heatmap_data("test_user", days=3)), 3)
+            self.assertEqual(len(JournalService.get_dashboard_sentiments("test_user")["last_week"]), 7)
+
+    @patch('src.services.journal_service.JournalDailyRollup.get_streak_islands')
+    def test_get_streak_stats_from_islands(self, mock_get_islands):
+        today = datetime.now(timezone.utc).date()
+        mock_get_islands.return_value = {
+            "longest": 9,
+            "last_day": today - timedelta(days=1),
+            "recent": [
+                (today - timedelta(days=40), today - timedelta(days=27), 14),
+                (today - timedelta(days=3), today - timedelta(days=1), 3),
+            ],
+        }
+
+        result = JournalService.get_streak_stats("test_user")
+
+        mock_get_islands.assert_called_once_with("test_user", today - timedelta(days=29), None)
+        self.assertEqual(result["streak"], 3)
+        self.assertEqual(result["longest_streak"], 9)
+        self.assertFalse(result["has_written_today"])
+        self.assertEqual(result["missed_days"], [
+            (today - timedelta(days=i)).isoformat() for i in (0, 4, 5, 6)
+        ])
+        self.assertTrue(result["calendar_activity"][(today - timedelta(days=29)).isoformat()])
+        self.assertFalse(result["calendar_activity"][(today - timedelta(days=26)).isoformat()])
+
+    @patch('src.services.journal_service.JournalDailyRollup.get_streak_islands')
+    def test_get_streak_stats_no_entries(self, mock_get_islands):
+        mock_get_islands.return_value = {"longest": 0, "last_day": None, "recent": []}
+
+        result = JournalService.get_streak_stats("test_user")
+
+        self.assertEqual(result["streak"], 0)
+        self.assertIsNone(result["last_entry_date"])
+
+    @patch('src.utils.timezone_utils.is_postgres_timezone', return_value=False)
+    def test_get_streak_stats_unknown_timezone(self, mock_is_postgres_timezone):
+        with self.assertRaises(ValueError):
+            JournalService.get_streak_stats("test_user", "Not/AZone")
+
+    @patch('src.services.journal_service.JournalDailyRollup.get_streak_islands')
+    @patch('src.utils.timezone_utils.is_postgres_timezone', return_value=False)
+    def test_get_streak_stats_timezone_postgres_rejects(self, mock_is_postgres_timezone, mock_get_islands):
+        """dateutil accepts POSIX strings like this one; AT TIME ZONE would fail with a 500"""
+        with self.assertRaises(ValueError):
+            JournalService.get_streak_stats("test_user", "EST5EDT4,M3.2.0,M11.1.0")
+        mock_get_islands.assert_not_called()
+
+    @patch('src.services.journal_service.JournalEntryModel.aggregate_weather_mood')
+    def test_get_weather_mood_groups(self, mock_aggregate):
+        mock_aggregate.return_value = [
+            SimpleNamespace(condition=None, band=None, grouped_by="overall", count=6, average=0.2, min=-0.5, max=0.9),
+            SimpleNamespace(condition="rain", band=None, grouped_by="condition", count=2, average=-0.1, min=-0.5, max=0.3),
+            SimpleNamespace(condition="clear sky", band=None, grouped_by="condition", count=4, average=0.35, min=0.1, max=0.9),
+            SimpleNamespace(condition=None, band=2, grouped_by="band", count=3, average=0.4, min=0.1, max=0.9),
+            SimpleNamespace(condition=None, band=-1, grouped_by="band", count=2, average=-0.2, min=-0.5, max=0.1),
+            SimpleNamespace(condition=None, band=None, grouped_by="band", count=1, average=0.3, min=0.3, max=0.3),
+        ]
+
+        result = JournalService.get_weather_mood("test_user")
+
+        mock_aggregate.assert_called_once_with("test_user", 5)
+        self.assertEqual(result["overall"], {"entry_count": 6, "average_sentiment": 0.2})
+        self.assertEqual([group["condition"] for group in result["conditions"]], ["clear sky", "rain"])
+        self.assertAlmostEqual(result["conditions"][1]["difference"], -0.3)
+        self.assertEqual(
+            [(band["min_temperature"], band["max_temperature"]) for band in result["temperature_bands"]],
+            [(-5, 0), (10, 15)],
+        )
+
+    @patch('src.services.journal_service.JournalEntryModel.aggregate_weather_mood')
+    def test_get_weather_mood_no_weather(self, mock_aggregate):
+        mock_aggregate.return_value = [
+            SimpleNamespace(condition=None, band=None, grouped_by="overall", count=0, average=None, min=None, max=None),
+        ]
+
+        result = JournalService.get_weather_mood("test_user")
+
+        self.assertEqual(result["overall"], {"entry_count": 0, "average_sentiment": None})
+        self.assertEqual(result["conditions"], [])
+        self.assertEqual(result["temperature_bands"], [])
+
+    def test_get_weather_mood_invalid_band(self):
+        with self.assertRaises(ValueError):
+            JournalService.get_weather_mood("test_user", 0)
+
+    @patch('src.models.keyword_count_model.db.session')
+    def test_suggest_keywords_escapes_like_wildcards(self, mock_db_session):
+        mock_db_session.execute.return_value.all.return_value = []
+
+        JournalService.suggest_keywords("test_user", " 50%_Off\\ ")
+
+        statement, params = mock_db_session.execute.call_args[0]
+        self.assertIn("LIKE :prefix ESCAPE '\\'", str(statement))
+        self.assertEqual(params["prefix"], "50\\%\\_off\\\\%")
+        self.assertEqual(params["query"], "50%_off\\")
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -38,14 +38,12 @@ class TestNotificationService:
         assert len(prompts) > 0
         assert all(isinstance(prompt, str) for prompt in prompts)
     
-    @patch('src.services.notification_service.User.find_by_google_id')
-    @patch('src.services.notification_service.NotificationSettings.find_by_user_id')
+    @patch('src.models.user_model.User.find_with_settings')
     @patch('src.services.notification_service.EmailService.send_journal_reminder')
-    def test_send_journal_reminder_success(self, mock_send_email, mock_find_settings, mock_find_user, 
+    def test_send_journal_reminder_success(self, mock_send_email, mock_find_identity,
                                          notification_service, mock_user, mock_settings):
         """Test successful journal reminder sending"""
-        mock_find_user.return_value = mock_user
-        mock_find_settings.return_value = mock_settings
+        mock_find_identity.return_value = (mock_user, mock_settings)
         mock_send_email.return_value = True
         
         result = notification_service.send_journal_reminder("test_user_id")
@@ -53,35 +51,33 @@ class TestNotificationService:
         assert result is True
         mock_send_email.assert_called_once()
     
-    @patch('src.services.notification_service.User.find_by_google_id')
-    def test_send_journal_reminder_user_not_found(self, mock_find_user, notification_service):
+    @patch('src.models.user_model.User.find_with_settings')
+    def test_send_journal_reminder_user_not_found(self, mock_find_identity, notification_service):
         """Test journal reminder when user not found"""
-        mock_find_user.return_value = None
+        mock_find_identity.return_value = (None, None)
         
         result = notification_service.send_journal_reminder("invalid_user_id")
         
         assert result is False
     
-    @patch('src.services.notification_service.User.find_by_google_id')
-    @patch('src.services.notification_service.NotificationSettings.find_by_user_id')
-    def test_send_journal_reminder_notifications_disabled(self, mock_find_settings, mock_find_user,
+    @patch('src.models.user_model.User.find_with_settings')
+    def test_send_journal_reminder_notifications_disabled(self, mock_find_identity,
                                                         notification_service, mock_user):
         """Test journal reminder when notifications are disabled"""
-        mock_find_user.return_value = mock_user
         mock_settings = Mock()
         mock_settings.journal_enabled = False
-        mock_find_settings.return_value = mock_settings
+        mock_find_identity.return_value = (mock_user, mock_settings)
         
         result = notification_service.send_journal_reminder("test_user_id")
         
         assert result is False
     
-    @patch('src.services.notification_service.User.find_by_google_id')
+    @patch('src.models.user_model.User.find_with_settings')
     @patch('src.services.notification_service.EmailService.send_test_email')
-    def test_send_test_email_success(self, mock_send_email, mock_find_user, 
+    def test_send_test_email_success(self, mock_send_email, mock_find_identity,
                                    notification_service, mock_user):
         """Test successful test email sending"""
-        mock_find_user.return_value = mock_user
+        mock_find_identity.return_value = (mock_user, None)
         mock_send_email.return_value = True
         
         result = notification_service.send_test_email("test_user_id")
@@ -89,10 +85,10 @@ class TestNotificationService:
         assert result is True
         mock_send_email.assert_called_once()
     
-    @patch('src.services.notification_service.User.find_by_google_id')
-    def test_send_test_email_user_not_found(self, mock_find_user, notification_service):
+    @patch('src.models.user_model.User.find_with_settings')
+    def test_send_test_email_user_not_found(self, mock_find_identity, notification_service):
         """Test test email when user not found"""
-        mock_find_user.return_value = None
+        mock_find_identity.return_value = (None, None)
         
         result = notification_service.send_test_email("invalid_user_id")
         
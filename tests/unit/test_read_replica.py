@@ -0,0 +1,90 @@
+import unittest
+from flask import Flask, g
+from flask_jwt_extended import JWTManager, create_access_token, jwt_required
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import Column, Integer, insert, select, text
+from src.cache import cache
+from src.database import RoutingSession
+from src.utils.read_replica import read_replica
+
+
+class TestRoutingSession(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        self.app.config['SQLALCHEMY_BINDS'] = {'replica': 'sqlite://'}
+        self.db = SQLAlchemy(self.app, session_options={'class_': RoutingSession})
+
+        class Item(self.db.Model):
+            id = Column(Integer, primary_key=True)
+
+        self.Item = Item
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.primary = self.db.engines[None]
+        self.replica = self.db.engines['replica']
+
+    def tearDown(self):
+        self.app_context.pop()
+
+    def test_reads_use_primary_by_default(self):
+        self.assertIs(self.db.session.get_bind(clause=select(self.Item)), self.primary)
+
+    def test_reads_use_replica_when_requested(self):
+        g.use_read_replica = True
+        self.assertIs(self.db.session.get_bind(clause=select(self.Item)), self.replica)
+
+    def test_writes_and_locking_reads_stay_on_primary(self):
+        g.use_read_replica = True
+        self.assertIs(self.db.session.get_bind(clause=insert(self.Item)), self.primary)
+        self.assertIs(self.db.session.get_bind(clause=select(self.Item).with_for_update()), self.primary)
+
+    def test_raw_sql_stays_on_primary(self):
+        g.use_read_replica = True
+        self.assertIs(self.db.session.get_bind(clause=text("UPDATE item SET id = id")), self.primary)
+
+
+class TestReadReplicaDecorator(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['JWT_SECRET_KEY'] = 'test-secret-key'
+        self.app.config['SQLALCHEMY_BINDS'] = {'replica': 'sqlite://'}
+        self.app.config['READ_REPLICA_STICKY_SECONDS'] = 15
+        self.app.config['RESPONSE_CACHE_BACKEND'] = 'memory'
+        JWTManager(self.app)
+        cache.init_app(self.app)
+        # Stands in for the redis backend, whose stickiness flags every process shares
+        self.app.extensions['response_cache'].shared = True
+
+        @self.app.route('/read')
+        @jwt_required()
+        @read_replica
+        def read():
+            return {'replica': g.get('use_read_replica', False)}
+
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            token = create_access_token(identity='test_user')
+        self.headers = {'Authorization': f'Bearer {token}'}
+
+    def test_routes_to_replica_without_recent_write(self):
+        self.assertTrue(self.client.get('/read', headers=self.headers).json['replica'])
+
+    def test_sticks_to_primary_after_write(self):
+        with self.app.app_context():
+            cache.bump_user_version('test_user')
+        self.assertFalse(self.client.get('/read', headers=self.headers).json['replica'])
+
+    def test_stays_on_primary_with_in_process_cache(self):
+        self.app.extensions['response_cache'].shared = False
+        self.assertFalse(self.client.get('/read', headers=self.headers).json['replica'])
+
+    def test_stays_on_primary_without_replica_bind(self):
+        del self.app.config['SQLALCHEMY_BINDS']
+        self.assertFalse(self.client.get('/read', headers=self.headers).json['replica'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token, verify_jwt_in_request
+from src.utils.request_identity import (
+    load_identity, current_user, current_settings, forget_identity, user_exists, REGISTERED_CLAIM
+)
+
+
+class TestRequestIdentity(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['JWT_SECRET_KEY'] = 'test-secret-key'
+        JWTManager(self.app)
+        self.user = MagicMock(user_id='test_user')
+        self.settings = MagicMock(survey_enabled=True)
+
+    @patch('src.utils.request_identity.User.find_with_settings')
+    def test_loaded_once_per_request(self, mock_find):
+        mock_find.return_value = (self.user, self.settings)
+
+        with self.app.test_request_context():
+            self.assertIs(current_user('test_user'), self.user)
+            self.assertIs(current_settings('test_user'), self.settings)
+            self.assertEqual(load_identity('test_user'), (self.user, self.settings))
+
+        mock_find.assert_called_once_with('test_user')
+
+    @patch('src.utils.request_identity.User.find_with_settings')
+    def test_not_shared_between_requests(self, mock_find):
+        mock_find.return_value = (self.user, self.settings)
+
+        with self.app.test_request_context():
+            current_user('test_user')
+        with self.app.test_request_context():
+            current_user('test_user')
+
+        self.assertEqual(mock_find.call_count, 2)
+
+    @patch('src.utils.request_identity.User.find_with_settings')
+    def test_forget_identity_reloads(self, mock_find):
+        mock_find.side_effect = [(self.user, None), (self.user, self.settings)]
+
+        with self.app.test_request_context():
+            self.assertIsNone(current_settings('test_user'))
+            forget_identity('test_user')
+            self.assertIs(current_settings('test_user'), self.settings)
+
+    @patch('src.utils.request_identity.User.find_with_settings')
+    def test_outside_request_queries_every_call(self, mock_find):
+        mock_find.return_value = (self.user, self.settings)
+
+        load_identity('test_user')
+        load_identity('test_user')
+
+        self.assertEqual(mock_find.call_count, 2)
+
+    @patch('src.utils.request_identity.User.find_with_settings')
+    def test_user_exists_trusts_registered_claim(self, mock_find):
+        with self.app.app_context():
+            token = create_access_token(identity='test_user', additional_claims={REGISTERED_CLAIM: True})
+
+        with self.app.test_request_context(headers={'Authorization': f'Bearer {token}'}):
+            verify_jwt_in_request()
+            self.assertTrue(user_exists('test_user'))
+
+        mock_find.assert_not_called()
+
+    @patch('src.utils.request_identity.User.find_with_settings')
+    def test_user_exists_queries_without_claim(self, mock_find):
+        mock_find.return_value = (None, None)
+        with self.app.app_context():
+            token = create_access_token(identity='test_user')
+
+        with self.app.test_request_context(headers={'Authorization': f'Bearer {token}'}):
+            verify_jwt_in_request()
+            self.assertFalse(user_exists('test_user'))
+            # A claim only vouches for its own identity
+            self.assertFalse(user_exists('other_user'))
+
+        self.assertEqual(mock_find.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
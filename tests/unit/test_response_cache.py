@@ -0,0 +1,125 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from flask import Flask
+from datetime import date
+from src.cache import InProcessCacheBackend, ResponseCache
+from src.utils.http_cache import compute_etag
+
+
+class TestInProcessCacheBackend(unittest.TestCase):
+
+    def test_evicts_least_recently_used(self):
+        backend = InProcessCacheBackend(max_entries=2)
+        backend.set("a", 1, ttl=60)
+        backend.set("b", 2, ttl=60)
+        backend.get("a")
+        backend.set("c", 3, ttl=60)
+
+        self.assertEqual(backend.get("a"), 1)
+        self.assertIsNone(backend.get("b"))
+        self.assertEqual(backend.get("c"), 3)
+
+    @patch('src.cache.time.monotonic')
+    def test_expires_after_ttl(self, mock_monotonic):
+        backend = InProcessCacheBackend()
+        mock_monotonic.return_value = 100.0
+        backend.set("a", 1, ttl=10)
+
+        mock_monotonic.return_value = 105.0
+        self.assertEqual(backend.get("a"), 1)
+        mock_monotonic.return_value = 111.0
+        self.assertIsNone(backend.get("a"))
+
+    @patch('src.cache.time.monotonic')
+    def test_ttl_capped_at_max_ttl(self, mock_monotonic):
+        """Bumps from other processes never reach this cache, so entries must expire quickly"""
+        backend = InProcessCacheBackend(max_ttl=30)
+        mock_monotonic.return_value = 100.0
+        backend.set("a", 1, ttl=900)
+
+        mock_monotonic.return_value = 129.0
+        self.assertEqual(backend.get("a"), 1)
+        mock_monotonic.return_value = 131.0
+        self.assertIsNone(backend.get("a"))
+
+    def test_versions_survive_eviction(self):
+        backend = InProcessCacheBackend(max_entries=1)
+        version = backend.get_version("user_version:u1")
+        backend.set("a", 1, ttl=60)
+        backend.set("b", 2, ttl=60)
+
+        self.assertEqual(backend.get_version("user_version:u1"), version)
+        self.assertEqual(backend.incr_version("user_version:u1"), version + 1)
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['RESPONSE_CACHE_BACKEND'] = 'memory'
+        self.cache = ResponseCache()
+        self.cache.init_app(self.app)
+        self.loader = MagicMock(side_effect=lambda user_id, days=7: {"user": user_id, "days": days})
+        self.cached_loader = self.cache.cached("heatmap")(lambda user_id, days=7: self.loader(user_id, days))
+
+    def test_hit_until_user_version_bumped(self):
+        with self.app.app_context():
+            self.assertEqual(self.cached_loader("u1"), {"user": "u1", "days": 7})
+            self.cached_loader("u1")
+            self.assertEqual(self.loader.call_count, 1)
+
+            self.cache.bump_user_version("u1")
+            self.cached_loader("u1")
+            self.assertEqual(self.loader.call_count, 2)
+
+    def test_keys_include_params_and_user(self):
+        with self.app.app_context():
+            self.cached_loader("u1")
+            self.cached_loader("u1", days=30)
+            self.cached_loader("u2")
+            self.assertEqual(self.loader.call_count, 3)
+
+            # Bumping one user leaves other users' entries intact
+            self.cache.bump_user_version("u2")
+            self.cached_loader("u1")
+            self.assertEqual(self.loader.call_count, 3)
+
+    def test_bypassed_outside_app_context(self):
+        self.cached_loader("u1")
+        self.cached_loader("u1")
+        self.assertEqual(self.loader.call_count, 2)
+
+    def test_disabled_backend(self):
+        app = Flask(__name__)
+        app.config['RESPONSE_CACHE_BACKEND'] = 'none'
+        self.cache.init_app(app)
+        with app.app_context():
+            self.cached_loader("u1")
+            self.cached_loader("u1")
+        self.assertEqual(self.loader.call_count, 2)
+
+
+    @patch('src.cache.local_date')
+    def test_key_uses_local_day_for_tz_params(self, mock_local_date):
+        mock_local_date.side_effect = lambda tz=None: date(2025, 3, 2) if tz else date(2025, 3, 1)
+
+        utc_key = ResponseCache.build_key("streak", "u1", 1, {"tz": None})
+        local_key = ResponseCache.build_key("streak", "u1", 1, {"tz": "Pacific/Auckland"})
+
+        self.assertIn(":2025-03-01:", utc_key)
+        self.assertIn(":2025-03-02:", local_key)
+
+    @patch('src.utils.http_cache.local_date')
+    def test_etag_changes_at_local_midnight(self, mock_local_date):
+        """A zone ahead of UTC must not keep yesterday's ETag until UTC midnight"""
+        with self.app.test_request_context('/api/journals/streak?tz=Pacific/Auckland'):
+            mock_local_date.return_value = date(2025, 3, 1)
+            before = compute_etag("u1", 1)
+            mock_local_date.return_value = date(2025, 3, 2)
+            after = compute_etag("u1", 1)
+
+        self.assertNotEqual(before, after)
+        mock_local_date.assert_called_with("Pacific/Auckland")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+from datetime import date
+from unittest.mock import patch, MagicMock
+
+import numpy as np
+
+from src.services.sentiment_analytics_service import SentimentAnalyticsService
+
+
+def dense_days(length, start="2024-01-01"):
+    return np.arange(np.datetime64(start), np.datetime64(start) + length)
+
+
+class TestSentimentAnalyticsService(unittest.TestCase):
+
+    def test_rolling_mean_is_entry_weighted(self):
+        sums = np.array([1.0, 0.0, -1.0, 0.6])
+        counts = np.array([2.0, 0.0, 1.0, 3.0])
+
+        result = SentimentAnalyticsService.rolling_mean(sums, counts, 2)
+
+        np.testing.assert_allclose(result, [0.5, 0.5, -1.0, -0.1])
+
+    def test_rolling_mean_empty_window_is_nan(self):
+        result = SentimentAnalyticsService.rolling_mean(np.zeros(3), np.zeros(3), 2)
+        self.assertTrue(np.isnan(result).all())
+
+    def test_ewma_matches_recursive_definition(self):
+        rng = np.random.default_rng(0)
+        counts = rng.integers(0, 3, 400).astype(float)
+        sums = rng.uniform(-1, 1, 400) * counts
+        alpha = 2.0 / (SentimentAnalyticsService.EWMA_SPAN + 1)
+
+        numerator = denominator = 0.0
+        expected = []
+        for total, count in zip(sums, counts):
+            numerator = (1 - alpha) * numerator + alpha * total
+            denominator = (1 - alpha) * denominator + alpha * count
+            expected.append(numerator / denominator if denominator else np.nan)
+
+        np.testing.assert_allclose(SentimentAnalyticsService.ewma(sums, counts), expected, rtol=1e-9)
+
+    def test_weekly_buckets_end_on_last_day(self):
+        days = dense_days(15)
+        counts = np.ones(15)
+        sums = np.concatenate((np.full(8, 0.2), np.full(7, 0.5)))
+
+        weeks = SentimentAnalyticsService.weekly(days, sums, counts)
+
+        self.assertEqual([week["week_start"] for week in weeks], ["2024-01-02", "2024-01-09"])
+        self.assertEqual(weeks[1]["average_sentiment"], 0.5)
+        self.assertIsNone(weeks[0]["delta"])
+        self.assertAlmostEqual(weeks[1]["delta"], 0.3)
+
+    def test_anomalies_flag_outlier_days(self):
+        daily = np.where(np.arange(60) % 2 == 0, 0.35, 0.45)
+        daily[45] = -0.8
+
+        flagged, scores = SentimentAnalyticsService.anomalies(daily)
+
+        self.assertEqual(np.flatnonzero(flagged).tolist(), [45])
+        self.assertLess(scores[45], -SentimentAnalyticsService.ANOMALY_Z)
+
+    def test_change_points_find_regime_shift(self):
+        days = dense_days(90)
+        counts = np.ones(90)
+        sums = np.where(np.arange(90) < 50, 0.5, -0.3)
+
+        points = SentimentAnalyticsService.change_points(days, sums, counts)
+
+        self.assertEqual(len(points), 1)
+        self.assertEqual(points[0]["date"], str(days[50]))
+        self.assertAlmostEqual(points[0]["delta"], -0.8)
+
+    def test_analyze_shapes_series(self):
+        days = dense_days(3)
+        result = SentimentAnalyticsService.analyze(days, np.array([0.5, 0.0, -0.2]), np.array([1.0, 0.0, 2.0]))
+
+        self.assertEqual(result["summary"]["entry_count"], 3)
+        self.assertEqual(result["summary"]["active_days"], 2)
+        self.assertEqual(result["series"][1]["date"], "2024-01-02")
+        self.assertIsNone(result["series"][1]["average_sentiment"])
+        self.assertEqual(result["series"][2]["average_sentiment"], -0.1)
+        self.assertEqual(result["series"][2]["entry_count"], 2)
+
+    @patch('src.services.sentiment_analytics_service.JournalDailyRollup.get_range')
+    def test_get_analytics_reads_rollup_range(self, mock_get_range):
+        mock_get_range.return_value = [
+            MagicMock(day=date(2024, 1, 2), sentiment_sum=0.8, scored_count=2),
+        ]
+
+        result = SentimentAnalyticsService.get_analytics("test_user", "2024-01-01", "2024-01-08")
+
+        mock_get_range.assert_called_once_with("test_user", date(2024, 1, 1), date(2024, 1, 8))
+        self.assertEqual(len(result["series"]), 7)
+        self.assertEqual(result["series"][1]["average_sentiment"], 0.4)
+        self.assertEqual((result["from"], result["to"]), ("2024-01-01", "2024-01-08"))
+
+    def test_get_analytics_rejects_invalid_ranges(self):
+        with self.assertRaises(ValueError):
+            SentimentAnalyticsService.get_analytics("test_user", "2024-01-08", "2024-01-01")
+        with self.assertRaises(ValueError):
+            SentimentAnalyticsService.get_analytics("test_user", "2000-01-01", "2024-01-01")
+        with self.assertRaises(ValueError):
+            SentimentAnalyticsService.get_analytics("test_user", "yesterday", None)
+
+
+if __name__ == '__main__':
+    unittest.main()
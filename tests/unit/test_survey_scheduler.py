@@ -43,12 +43,11 @@ class TestSurveyScheduler:
         mock_user_instance.user_id = "test_user"
         mock_user_instance.name = "Test User"
         mock_user_instance.email = "test@example.com"
-        mock_user.find_by_google_id.return_value = mock_user_instance
         
         # Mock settings
         mock_settings_instance = MagicMock()
         mock_settings_instance.survey_enabled = True
-        mock_notification_settings.find_by_user_id.return_value = mock_settings_instance
+        mock_user.find_with_settings.return_value = (mock_user_instance, mock_settings_instance)
         
         # Mock email service
         mock_email_service.send_weekly_survey_reminder.return_value = True
@@ -66,7 +65,7 @@ class TestSurveyScheduler:
     @patch('src.services.survey_scheduler.User')
     def test_send_survey_reminder_task_user_not_found(self, mock_user):
         """Test survey reminder when user not found"""
-        mock_user.find_by_google_id.return_value = None
+        mock_user.find_with_settings.return_value = (None, None)
         
         result = send_survey_reminder_task("nonexistent_user")
         
@@ -81,12 +80,11 @@ class TestSurveyScheduler:
         mock_user_instance = MagicMock()
         mock_user_instance.user_id = "test_user"
         mock_user_instance.name = "Test User"
-        mock_user.find_by_google_id.return_value = mock_user_instance
         
         # Mock settings with notifications disabled
         mock_settings_instance = MagicMock()
         mock_settings_instance.survey_enabled = False
-        mock_notification_settings.find_by_user_id.return_value = mock_settings_instance
+        mock_user.find_with_settings.return_value = (mock_user_instance, mock_settings_instance)
         
         result = send_survey_reminder_task("test_user")
         
@@ -0,0 +1,129 @@
+import unittest
+import uuid
+from datetime import datetime, timezone
+from unittest.mock import patch, MagicMock
+
+import numpy as np
+
+from src.services.theme_service import ThemeService
+
+
+def make_clusters(per_cluster=30, dimensions=16, seed=1):
+    """Three well separated groups of noisy vectors around orthogonal directions."""
+    rng = np.random.default_rng(seed)
+    vectors, truth = [], []
+    for cluster in range(3):
+        center = np.zeros(dimensions)
+        center[cluster] = 1.0
+        vectors.append(center + rng.normal(scale=0.05, size=(per_cluster, dimensions)))
+        truth.extend([cluster] * per_cluster)
+    return np.vstack(vectors), truth
+
+
+class TestThemeService(unittest.TestCase):
+
+    def test_minibatch_kmeans_recovers_clusters(self):
+        vectors, truth = make_clusters()
+
+        centroids, labels = ThemeService.minibatch_kmeans(vectors, 3, batch_size=32, seed=7)
+
+        self.assertEqual(centroids.shape, (3, 16))
+        np.testing.assert_allclose(np.linalg.norm(centroids, axis=1), 1.0, rtol=1e-5)
+        # Every true cluster maps onto exactly one learned cluster
+        mapping = {(t, int(l)) for t, l in zip(truth, labels)}
+        self.assertEqual(len(mapping), 3)
+        self.assertEqual(len({t for t, _ in mapping}), 3)
+
+    def test_minibatch_kmeans_is_deterministic_for_seed(self):
+        vectors, _ = make_clusters()
+
+        _, first = ThemeService.minibatch_kmeans(vectors, 3, seed=3)
+        _, second = ThemeService.minibatch_kmeans(vectors, 3, seed=3)
+
+        np.testing.assert_array_equal(first, second)
+
+    def test_choose_k_is_clamped(self):
+        self.assertEqual(ThemeService.choose_k(10), 2)
+        self.assertEqual(ThemeService.choose_k(50), 5)
+        self.assertEqual(ThemeService.choose_k(100000), ThemeService.MAX_THEMES)
+
+    def test_label_themes_prefers_cluster_specific_keywords(self):
+        labels = [0, 0, 1, 1]
+        keyword_lists = [["day", "work"], ["day", "work", "boss"], ["day", "gym"], ["day", "gym", "run"]]
+
+        themes = ThemeService.label_themes(labels, keyword_lists, 2)
+
+        self.assertEqual(themes[0][0], "work")
+        self.assertEqual(themes[1][0], "gym")
+        self.assertEqual(themes[0][-1], "day")
+
+    @patch('src.services.theme_service.JournalEntryModel.get_embeddings_for_clustering')
+    @patch('src.services.theme_service.UserTheme.replace_for_user')
+    def test_fit_user_skips_short_histories(self, mock_replace, mock_get_embeddings):
+        mock_get_embeddings.return_value = [MagicMock()] * (ThemeService.MIN_ENTRIES - 1)
+
+        self.assertEqual(ThemeService.fit_user("test_user"), 0)
+        mock_replace.assert_not_called()
+
+    @patch('src.services.theme_service.db.session')
+    @patch('src.services.theme_service.JournalEntryModel.set_themes')
+    @patch('src.services.theme_service.UserTheme.replace_for_user')
+    @patch('src.services.theme_service.JournalEntryModel.get_embeddings_for_clustering')
+    def test_fit_user_stores_themes_and_assignments(self, mock_get_embeddings, mock_replace, mock_set_themes, mock_session):
+        vectors, truth = make_clusters(per_cluster=10)
+        keywords = {0: ["work"], 1: ["gym"], 2: ["family"]}
+        rows = [
+            MagicMock(entry_id=uuid.uuid4(), embedding=vector, keywords=keywords[cluster])
+            for vector, cluster in zip(vectors, truth)
+        ]
+        mock_get_embeddings.return_value = rows
+
+        count = ThemeService.fit_user("test_user")
+
+        themes = mock_replace.call_args[0][1]
+        self.assertEqual(count, len(themes))
+        self.assertEqual(sorted(theme["theme_id"] for theme in themes), list(range(count)))
+        self.assertTrue(all(theme["fitted_entries"] == 30 for theme in themes))
+        assignments = mock_set_themes.call_args[0][1]
+        self.assertEqual([entry_id for entry_id, _ in assignments], [row.entry_id for row in rows])
+        mock_session.commit.assert_called_once()
+
+    @patch('src.services.theme_service.UserTheme.nearest')
+    def test_assign_entry_uses_nearest_centroid(self, mock_nearest):
+        mock_nearest.return_value = 2
+        entry = MagicMock(user_id="test_user")
+
+        ThemeService.assign_entry(entry, [0.1, 0.2])
+
+        self.assertEqual(entry.theme_id, 2)
+        mock_nearest.assert_called_once_with("test_user", [0.1, 0.2])
+
+    @patch('src.services.theme_service.UserTheme.nearest')
+    def test_assign_entry_without_embedding(self, mock_nearest):
+        ThemeService.assign_entry(MagicMock(), None)
+        mock_nearest.assert_not_called()
+
+    @patch('src.services.theme_service.JournalEntryModel.get_theme_members')
+    @patch('src.services.theme_service.UserTheme.get_for_user')
+    def test_get_themes(self, mock_get_for_user, mock_get_members):
+        fitted_at = datetime(2024, 12, 1, tzinfo=timezone.utc)
+        mock_get_for_user.return_value = [
+            MagicMock(theme_id=0, label="work, boss", keywords=["work", "boss"], fitted_at=fitted_at),
+            MagicMock(theme_id=1, label="gym", keywords=["gym"], fitted_at=fitted_at),
+        ]
+        entry_id = uuid.uuid4()
+        mock_get_members.return_value = [
+            MagicMock(theme_id=0, total=4, entry_id=entry_id, timestamp=fitted_at, snippet="Long day"),
+        ]
+
+        result = ThemeService.get_themes("test_user")
+
+        self.assertEqual(result["fitted_at"], fitted_at.isoformat())
+        self.assertEqual(result["themes"][0]["entry_count"], 4)
+        self.assertEqual(result["themes"][0]["recent_entries"][0]["entry_id"], str(entry_id))
+        self.assertEqual(result["themes"][1]["entry_count"], 0)
+        self.assertEqual(result["themes"][1]["recent_entries"], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
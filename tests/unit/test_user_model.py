@@ -91,6 +91,25 @@ class TestUserModel(unittest.TestCase):
         self.assertIsNone(result)
         mock_db_session.query.assert_called_once_with(User)
 
+    @patch('src.models.user_model.db.session')
+    def test_find_with_settings_single_query(self, mock_db_session):
+        """Test the user and settings come back from one joined query."""
+        user = User(user_id="google_user_123", email="google@example.com", name="Google User")
+        settings = MagicMock()
+        mock_db_session.query.return_value.outerjoin.return_value.filter.return_value.first.return_value = (user, settings)
+
+        result = User.find_with_settings("google_user_123")
+
+        self.assertEqual(result, (user, settings))
+        mock_db_session.query.assert_called_once()
+
+    @patch('src.models.user_model.db.session')
+    def test_find_with_settings_not_found(self, mock_db_session):
+        """Test a missing user yields (None, None)."""
+        mock_db_session.query.return_value.outerjoin.return_value.filter.return_value.first.return_value = None
+
+        self.assertEqual(User.find_with_settings("nonexistent_user_123"), (None, None))
+
     @patch('src.models.user_model.db.session')
     def test_find_by_google_id_database_error(self, mock_db_session):
         """Test handling database errors during user lookup."""
@@ -1,8 +1,12 @@
 import pytest
 from datetime import date, timedelta
+from decimal import Decimal
 from src.models.weekly_survey_model import WeeklySurvey
+from src.models.survey_state_model import SurveyRollingState
 from src.services.weekly_survey_service import WeeklySurveyService
 from unittest.mock import patch, MagicMock
+from sqlalchemy import ARRAY
+from sqlalchemy.dialects import postgresql
 
 
 class TestWeeklySurveyModel:
@@ -68,6 +72,131 @@ class TestWeeklySurveyModel:
         )
         assert survey.compute_urgent_flag() is False
 
+    def test_compute_urgent_flag_high_stress_streak(self):
+        """Test urgent flag after several high-stress weeks in a row"""
+        survey = WeeklySurvey(
+            user_id="test_user",
+            week_start=date.today(),
+            stress=4,
+            anxiety=2,
+            depression=2,
+            happiness=3,
+            satisfaction=3,
+            self_harm_thoughts=False,
+            significant_sleep_issues=False
+        )
+        assert survey.compute_urgent_flag(high_stress_streak=2) is False
+        assert survey.compute_urgent_flag(high_stress_streak=3) is True
+
+
+class TestSurveyRollingState:
+    """Test incremental rolling-state updates"""
+
+    @staticmethod
+    def survey(week_start, stress):
+        return WeeklySurvey(
+            user_id="test_user", week_start=week_start, stress=stress, anxiety=1, depression=1,
+            happiness=3, satisfaction=3, self_harm_thoughts=False, significant_sleep_issues=False,
+        )
+
+    @staticmethod
+    def state(last_week_start, streak, survey_count=2, urgent_count=0):
+        state = SurveyRollingState(user_id="test_user", last_week_start=last_week_start, high_stress_streak=streak,
+                                   survey_count=survey_count, urgent_count=urgent_count)
+        for field in SurveyRollingState.SCORE_FIELDS:
+            setattr(state, f"{field}_sum", 6)
+        return state
+
+    @patch('src.models.survey_state_model.db')
+    def test_apply_survey_extends_streak(self, mock_db):
+        state = self.state(date(2024, 1, 8), 2)
+        mock_db.session.query.return_value.filter.return_value.with_for_update.return_value.one.return_value = state
+        survey = self.survey(date(2024, 1, 15), 5)
+
+        streak = SurveyRollingState.apply_survey(survey)
+
+        assert streak == 3
+        assert survey.urgent_flag is True
+        assert state.last_week_start == date(2024, 1, 15)
+        assert state.high_stress_streak == 3
+        assert state.survey_count == 3
+        assert state.stress_sum == 11
+        assert state.urgent_count == 1
+        mock_db.session.flush.assert_not_called()
+
+    @patch('src.models.survey_state_model.db')
+    def test_apply_survey_gap_or_low_stress_restarts(self, mock_db):
+        state = self.state(date(2024, 1, 1), 4)
+        mock_db.session.query.return_value.filter.return_value.with_for_update.return_value.one.return_value = state
+
+        # A skipped week starts a new streak
+        survey = self.survey(date(2024, 1, 15), 4)
+        assert SurveyRollingState.apply_survey(survey) == 1
+        assert survey.urgent_flag is False
+
+        # A lower-stress week ends it
+        survey = self.survey(date(2024, 1, 22), 3)
+        assert SurveyRollingState.apply_survey(survey) == 0
+        assert state.high_stress_streak == 0
+        assert state.survey_count == 4
+
+    @patch('src.models.survey_state_model.SurveyRollingState.rebuild')
+    @patch('src.models.survey_state_model.SurveyRollingState.streak_ending')
+    @patch('src.models.survey_state_model.db')
+    def test_apply_survey_for_earlier_week_rebuilds(self, mock_db, mock_streak_ending, mock_rebuild):
+        state = self.state(date(2024, 1, 15), 1)
+        mock_db.session.query.return_value.filter.return_value.with_for_update.return_value.one.return_value = state
+        mock_streak_ending.return_value = 3
+        survey = self.survey(date(2024, 1, 8), 5)
+
+        assert SurveyRollingState.apply_survey(survey) == 3
+
+        mock_streak_ending.assert_called_once_with("test_user", date(2024, 1, 8))
+        mock_rebuild.assert_called_once_with("test_user")
+        assert survey.urgent_flag is True
+
+
+    @patch('src.models.survey_state_model.SurveyCohortWeek.adjust_urgent_count')
+    @patch('src.models.survey_state_model.SurveyRollingState.rebuild')
+    @patch('src.models.survey_state_model.SurveyRollingState.streak_ending')
+    @patch('src.models.survey_state_model.db')
+    def test_backfill_reflags_following_weeks(self, mock_db, mock_streak_ending, mock_rebuild, mock_adjust):
+        """Filling in a high-stress week joins the streaks of the weeks right after it"""
+        state = self.state(date(2024, 1, 22), 2)
+        mock_db.session.query.return_value.filter.return_value.with_for_update.return_value.one.return_value = state
+        mock_streak_ending.return_value = 1
+        next_week = self.survey(date(2024, 1, 15), 5)
+        next_week.urgent_flag = False
+        week_after = self.survey(date(2024, 1, 22), 5)
+        week_after.urgent_flag = False
+        mock_db.session.query.return_value.filter.return_value.order_by.return_value.all.return_value = [
+            next_week, week_after,
+        ]
+
+        assert SurveyRollingState.apply_survey(self.survey(date(2024, 1, 8), 5)) == 1
+
+        # Streaks of 2 and 3 after the backfill; only the third week reaches the threshold
+        assert next_week.urgent_flag is False
+        assert week_after.urgent_flag is True
+        mock_adjust.assert_called_once_with(date(2024, 1, 22), 1)
+        mock_rebuild.assert_called_once_with("test_user")
+
+    @patch('src.models.survey_state_model.SurveyCohortWeek.adjust_urgent_count')
+    @patch('src.models.survey_state_model.SurveyRollingState.rebuild')
+    @patch('src.models.survey_state_model.SurveyRollingState.streak_ending')
+    @patch('src.models.survey_state_model.db')
+    def test_backfill_stops_at_gap(self, mock_db, mock_streak_ending, mock_rebuild, mock_adjust):
+        state = self.state(date(2024, 1, 22), 1)
+        mock_db.session.query.return_value.filter.return_value.with_for_update.return_value.one.return_value = state
+        mock_streak_ending.return_value = 2
+        later = self.survey(date(2024, 1, 22), 5)
+        later.urgent_flag = False
+        mock_db.session.query.return_value.filter.return_value.order_by.return_value.all.return_value = [later]
+
+        SurveyRollingState.apply_survey(self.survey(date(2024, 1, 8), 5))
+
+        assert later.urgent_flag is False
+        mock_adjust.assert_not_called()
 
 class TestWeeklySurveyService:
     """Test WeeklySurveyService functionality"""
@@ -152,6 +281,18 @@ class TestWeeklySurveyService:
         with pytest.raises(ValueError, match="Cannot create surveys for future weeks"):
             WeeklySurveyService._determine_week_start(data)
     
+    @patch('src.services.weekly_survey_service.WeeklySurvey.create_survey')
+    @patch('src.services.weekly_survey_service.user_exists', return_value=True)
+    @patch('src.services.weekly_survey_service.current_user', return_value=None)
+    def test_create_weekly_survey_checks_database_not_claim(self, mock_current_user, mock_user_exists, mock_create):
+        """A deleted user's still-valid token must not reach the insert"""
+        with pytest.raises(ValueError, match="User not found"):
+            WeeklySurveyService.create_weekly_survey("deleted_user", {"stress": 3})
+
+        mock_current_user.assert_called_once_with("deleted_user")
+        mock_user_exists.assert_not_called()
+        mock_create.assert_not_called()
+
     def test_validate_survey_data_valid(self):
         """Test validation of valid survey data"""
         valid_data = {
@@ -220,211 +361,321 @@ class TestWeeklySurveyService:
 
 class TestWeeklySurveySummary:
     """Test WeeklySurvey summary functionality"""
-    
-    @patch('src.services.weekly_survey_service.User.find_by_google_id')
-    @patch('src.services.weekly_survey_service.db.session.query')
-    def test_get_survey_summary_success(self, mock_query, mock_find_user):
+
+    @staticmethod
+    def week_row(week_start, stress=3, anxiety=2, depression=1, happiness=4, satisfaction=4,
+                 urgent_flag=False, significant_sleep_issues=False):
+        return MagicMock(
+            week_start=week_start, stress=stress, anxiety=anxiety, depression=depression,
+            happiness=happiness, satisfaction=satisfaction, urgent_flag=urgent_flag,
+            significant_sleep_issues=significant_sleep_issues,
+        )
+
+    @staticmethod
+    def summary_row(weeks, completion_count=0, high_alerts=0, streak_weeks=0, **stats):
+        """A `summarize_ranges` row; score statistics not given are None (no surveys)"""
+        values = {}
+        for field in WeeklySurvey.SCORE_FIELDS:
+            for stat in ("avg", "min", "max"):
+                values[f"{stat}_{field}"] = stats.get(f"{stat}_{field}")
+        return MagicMock(weeks=weeks, completion_count=completion_count, high_alerts=high_alerts,
+                         streak_weeks=streak_weeks, **values)
+
+    @patch('src.services.weekly_survey_service.WeeklySurvey.summarize_ranges')
+    @patch('src.services.weekly_survey_service.WeeklySurvey.get_week_rows')
+    @patch('src.services.weekly_survey_service.user_exists')
+    def test_get_survey_summary_success(self, mock_find_user, mock_week_rows, mock_summarize):
         """Test successful survey summary generation"""
-        # Mock user
-        mock_user = MagicMock()
-        mock_find_user.return_value = mock_user
-        
-        # Mock survey data - using dates that match the week calculation
-        # For 2 weeks starting from Jan 8, 2024 (when today is Jan 15)
-        mock_survey1 = MagicMock()
-        mock_survey1.week_start = date(2024, 1, 8)  # First week in range
-        mock_survey1.stress = 3
-        mock_survey1.anxiety = 2
-        mock_survey1.depression = 1
-        mock_survey1.happiness = 4
-        mock_survey1.satisfaction = 4
-        mock_survey1.urgent_flag = False
-        mock_survey1.significant_sleep_issues = False
-        
-        mock_survey2 = MagicMock()
-        mock_survey2.week_start = date(2024, 1, 15)  # Second week in range
-        mock_survey2.stress = 2
-        mock_survey2.anxiety = 1
-        mock_survey2.depression = 1
-        mock_survey2.happiness = 5
-        mock_survey2.satisfaction = 5
-        mock_survey2.urgent_flag = False
-        mock_survey2.significant_sleep_issues = False
-        
-        # Mock query chain
-        mock_query_instance = MagicMock()
-        mock_query_instance.filter.return_value = mock_query_instance
-        mock_query_instance.order_by.return_value = mock_query_instance
-        mock_query_instance.all.return_value = [mock_survey1, mock_survey2]
-        mock_query.return_value = mock_query_instance
-        
+        mock_find_user.return_value = MagicMock()
+        mock_week_rows.return_value = [
+            self.week_row(date(2024, 1, 8), stress=3, anxiety=2, happiness=4, satisfaction=4),
+            self.week_row(date(2024, 1, 15), stress=2, anxiety=1, happiness=5, satisfaction=5),
+        ]
+        mock_summarize.return_value = [self.summary_row(
+            2, completion_count=2, streak_weeks=2,
+            avg_happiness=Decimal("4.5000"), max_happiness=5, min_happiness=4,
+            avg_satisfaction=Decimal("4.5000"), max_satisfaction=5, min_satisfaction=4,
+            avg_stress=Decimal("2.5000"), max_stress=3, min_stress=2,
+            avg_anxiety=Decimal("1.5000"), max_anxiety=2, min_anxiety=1,
+            avg_depression=Decimal("1.0000"), max_depression=1, min_depression=1,
+        )]
+
         with patch('src.services.weekly_survey_service.date') as mock_date:
             mock_date.today.return_value = date(2024, 1, 15)
-            
+
             result = WeeklySurveyService.get_survey_summary("test_user", 2)
-            
-            assert "weeks" in result
-            assert "computed" in result
-            assert len(result["weeks"]) == 2
-            # With 2 surveys, we expect the average to be calculated correctly
-            # First survey: happiness=4, satisfaction=4, stress=3, anxiety=2
-            # Second survey: happiness=5, satisfaction=5, stress=2, anxiety=1
-            # Averages: happiness=4.5, satisfaction=4.5, stress=2.5, anxiety=1.5
-            # Check new computed fields for happiness
-            assert result["computed"]["avg_happiness"] == 4.5
-            assert result["computed"]["max_happiness"] == 5
-            assert result["computed"]["min_happiness"] == 4
-            # Check new computed fields for satisfaction
-            assert result["computed"]["avg_satisfaction"] == 4.5
-            assert result["computed"]["max_satisfaction"] == 5
-            assert result["computed"]["min_satisfaction"] == 4
-            # Check new computed fields for stress
-            assert result["computed"]["avg_stress"] == 2.5
-            assert result["computed"]["max_stress"] == 3
-            assert result["computed"]["min_stress"] == 2
-            # Check new computed fields for anxiety
-            assert result["computed"]["avg_anxiety"] == 1.5
-            assert result["computed"]["max_anxiety"] == 2
-            assert result["computed"]["min_anxiety"] == 1
-            # Check new computed fields for depression
-            assert result["computed"]["avg_depression"] == 1
-            assert result["computed"]["max_depression"] == 1
-            assert result["computed"]["min_depression"] == 1
-            # Check completion fields
-            assert result["computed"]["completion_count"] == 2
-            assert result["computed"]["completion_possible"] == 2
-            assert result["computed"]["completion_rate"] == 100
-            # Check legacy fields
-            assert result["computed"]["high_alerts"] == 0
-            assert result["computed"]["streak_weeks"] == 2
-    
-    @patch('src.services.weekly_survey_service.User.find_by_google_id')
+
+        mock_week_rows.assert_called_once_with("test_user", date(2024, 1, 8), date(2024, 1, 15))
+        mock_summarize.assert_called_once_with("test_user", date(2024, 1, 15), [2])
+        assert "ranges" not in result
+        assert len(result["weeks"]) == 2
+        assert result["weeks"][0]["week_start"] == "2024-01-08"
+        assert result["weeks"][1]["happiness"] == 5
+        assert result["computed"]["avg_happiness"] == 4.5
+        assert result["computed"]["max_happiness"] == 5
+        assert result["computed"]["min_happiness"] == 4
+        assert result["computed"]["avg_stress"] == 2.5
+        assert result["computed"]["avg_depression"] == 1
+        assert result["computed"]["completion_count"] == 2
+        assert result["computed"]["completion_possible"] == 2
+        assert result["computed"]["completion_rate"] == 100
+        assert result["computed"]["high_alerts"] == 0
+        assert result["computed"]["streak_weeks"] == 2
+
+    @patch('src.services.weekly_survey_service.user_exists')
     def test_get_survey_summary_user_not_found(self, mock_find_user):
         """Test survey summary with non-existent user"""
         mock_find_user.return_value = None
-        
+
         with pytest.raises(ValueError, match="User not found"):
             WeeklySurveyService.get_survey_summary("nonexistent_user", 12)
-    
-    @patch('src.services.weekly_survey_service.User.find_by_google_id')
-    @patch('src.services.weekly_survey_service.db.session.query')
-    def test_get_survey_summary_with_missing_weeks(self, mock_query, mock_find_user):
+
+    @patch('src.services.weekly_survey_service.WeeklySurvey.summarize_ranges')
+    @patch('src.services.weekly_survey_service.WeeklySurvey.get_week_rows')
+    @patch('src.services.weekly_survey_service.user_exists')
+    def test_get_survey_summary_with_missing_weeks(self, mock_find_user, mock_week_rows, mock_summarize):
         """Test survey summary with missing weeks (nulls)"""
-        # Mock user
-        mock_user = MagicMock()
-        mock_find_user.return_value = mock_user
-        
-        # Mock only one survey (missing week) - using correct date
-        mock_survey = MagicMock()
-        mock_survey.week_start = date(2024, 1, 8)  # First week in range
-        mock_survey.stress = 3
-        mock_survey.anxiety = 2
-        mock_survey.depression = 1
-        mock_survey.happiness = 4
-        mock_survey.satisfaction = 4
-        mock_survey.urgent_flag = False
-        mock_survey.significant_sleep_issues = False
-        
-        # Mock query chain
-        mock_query_instance = MagicMock()
-        mock_query_instance.filter.return_value = mock_query_instance
-        mock_query_instance.order_by.return_value = mock_query_instance
-        mock_query_instance.all.return_value = [mock_survey]
-        mock_query.return_value = mock_query_instance
-        
+        mock_find_user.return_value = MagicMock()
+        mock_week_rows.return_value = [self.week_row(date(2024, 1, 8))]
+        mock_summarize.return_value = [self.summary_row(2, completion_count=1, streak_weeks=0)]
+
         with patch('src.services.weekly_survey_service.date') as mock_date:
             mock_date.today.return_value = date(2024, 1, 15)
-            
+
             result = WeeklySurveyService.get_survey_summary("test_user", 2)
-            
-            assert len(result["weeks"]) == 2
-            # Check that we have one week with data and one with nulls
-            filled_weeks = [w for w in result["weeks"] if w["stress"] is not None]
-            null_weeks = [w for w in result["weeks"] if w["stress"] is None]
-            assert len(filled_weeks) == 1
-            assert len(null_weeks) == 1
-            # Streak should be 0 since the most recent week (Jan 15) has no data
-            assert result["computed"]["streak_weeks"] == 0
-            # Check completion fields for missing weeks
-            assert result["computed"]["completion_count"] == 1
-            assert result["computed"]["completion_possible"] == 2
-            assert result["computed"]["completion_rate"] == 50
-            # Check legacy fields for missing weeks
-            assert result["computed"]["high_alerts"] == 0
-            assert result["computed"]["streak_weeks"] == 0
-    
-    @patch('src.services.weekly_survey_service.User.find_by_google_id')
-    @patch('src.services.weekly_survey_service.db.session.query')
-    def test_get_survey_summary_with_urgent_flags(self, mock_query, mock_find_user):
+
+        filled_weeks = [w for w in result["weeks"] if w["stress"] is not None]
+        null_weeks = [w for w in result["weeks"] if w["stress"] is None]
+        assert len(filled_weeks) == 1
+        assert len(null_weeks) == 1
+        assert null_weeks[0]["week_start"] == "2024-01-15"
+        assert null_weeks[0]["urgent"] is None
+        assert result["computed"]["streak_weeks"] == 0
+        assert result["computed"]["completion_count"] == 1
+        assert result["computed"]["completion_possible"] == 2
+        assert result["computed"]["completion_rate"] == 50
+
+    @patch('src.services.weekly_survey_service.WeeklySurvey.summarize_ranges')
+    @patch('src.services.weekly_survey_service.WeeklySurvey.get_week_rows')
+    @patch('src.services.weekly_survey_service.user_exists')
+    def test_get_survey_summary_with_urgent_flags(self, mock_find_user, mock_week_rows, mock_summarize):
         """Test survey summary with urgent flags"""
-        # Mock user
-        mock_user = MagicMock()
-        mock_find_user.return_value = mock_user
-        
-        # Mock survey with urgent flag - using correct date for 1 week
-        mock_survey = MagicMock()
-        mock_survey.week_start = date(2024, 1, 15)  # Current week in range
-        mock_survey.stress = 5
-        mock_survey.anxiety = 5
-        mock_survey.depression = 5
-        mock_survey.happiness = 1
-        mock_survey.satisfaction = 1
-        mock_survey.urgent_flag = True
-        mock_survey.significant_sleep_issues = True
-        
-        # Mock query chain
-        mock_query_instance = MagicMock()
-        mock_query_instance.filter.return_value = mock_query_instance
-        mock_query_instance.order_by.return_value = mock_query_instance
-        mock_query_instance.all.return_value = [mock_survey]
-        mock_query.return_value = mock_query_instance
-        
+        mock_find_user.return_value = MagicMock()
+        mock_week_rows.return_value = [self.week_row(
+            date(2024, 1, 15), stress=5, anxiety=5, depression=5, happiness=1, satisfaction=1,
+            urgent_flag=True, significant_sleep_issues=True,
+        )]
+        mock_summarize.return_value = [self.summary_row(1, completion_count=1, high_alerts=1, streak_weeks=1)]
+
         with patch('src.services.weekly_survey_service.date') as mock_date:
             mock_date.today.return_value = date(2024, 1, 15)
-            
+
             result = WeeklySurveyService.get_survey_summary("test_user", 1)
-            
-            # For 1 week, we should have exactly one week with data
-            assert len(result["weeks"]) == 1
-            data_week = result["weeks"][0]
-            assert data_week["stress"] is not None
-            assert data_week["urgent"] is True
-            assert data_week["sleep_issue"] is True
-            assert result["computed"]["high_alerts"] == 1
-            assert result["computed"]["streak_weeks"] == 1
-    
-    @patch('src.services.weekly_survey_service.User.find_by_google_id')
-    @patch('src.services.weekly_survey_service.db.session.query')
-    def test_get_survey_summary_no_surveys(self, mock_query, mock_find_user):
+
+        assert len(result["weeks"]) == 1
+        data_week = result["weeks"][0]
+        assert data_week["stress"] == 5
+        assert data_week["urgent"] is True
+        assert data_week["sleep_issue"] is True
+        assert result["computed"]["high_alerts"] == 1
+        assert result["computed"]["streak_weeks"] == 1
+
+    @patch('src.services.weekly_survey_service.WeeklySurvey.summarize_ranges')
+    @patch('src.services.weekly_survey_service.WeeklySurvey.get_week_rows')
+    @patch('src.services.weekly_survey_service.user_exists')
+    def test_get_survey_summary_no_surveys(self, mock_find_user, mock_week_rows, mock_summarize):
         """Test survey summary with no surveys"""
-        # Mock user
-        mock_user = MagicMock()
-        mock_find_user.return_value = mock_user
-        
-        # Mock empty survey list
-        mock_query_instance = MagicMock()
-        mock_query_instance.filter.return_value = mock_query_instance
-        mock_query_instance.order_by.return_value = mock_query_instance
-        mock_query_instance.all.return_value = []
-        mock_query.return_value = mock_query_instance
-        
+        mock_find_user.return_value = MagicMock()
+        mock_week_rows.return_value = []
+        mock_summarize.return_value = [self.summary_row(2)]
+
         with patch('src.services.weekly_survey_service.date') as mock_date:
             mock_date.today.return_value = date(2024, 1, 15)
-            
+
             result = WeeklySurveyService.get_survey_summary("test_user", 2)
-            
-            assert len(result["weeks"]) == 2
-            assert result["weeks"][0]["stress"] is None
-            assert result["weeks"][1]["stress"] is None
-            assert result["computed"]["avg_happiness"] == 0
-            assert result["computed"]["avg_satisfaction"] == 0
-            assert result["computed"]["avg_stress"] == 0
-            assert result["computed"]["avg_anxiety"] == 0
-            assert result["computed"]["streak_weeks"] == 0
-            assert result["computed"]["high_alerts"] == 0
-            assert result["computed"]["completion_count"] == 0
-            assert result["computed"]["completion_possible"] == 2
-            assert result["computed"]["completion_rate"] == 0 
-            # Check legacy fields for no surveys
-            assert result["computed"]["high_alerts"] == 0
-            assert result["computed"]["streak_weeks"] == 0 
\ No newline at end of file
+
+        assert len(result["weeks"]) == 2
+        assert result["weeks"][0]["stress"] is None
+        assert result["weeks"][1]["stress"] is None
+        for field in WeeklySurveyService.SUMMARY_FIELDS:
+            assert result["computed"][f"avg_{field}"] == 0
+            assert result["computed"][f"max_{field}"] == 0
+            assert result["computed"][f"min_{field}"] == 0
+        assert result["computed"]["streak_weeks"] == 0
+        assert result["computed"]["high_alerts"] == 0
+        assert result["computed"]["completion_count"] == 0
+        assert result["computed"]["completion_possible"] == 2
+        assert result["computed"]["completion_rate"] == 0
+
+    @patch('src.services.weekly_survey_service.WeeklySurvey.summarize_ranges')
+    @patch('src.services.weekly_survey_service.WeeklySurvey.get_week_rows')
+    @patch('src.services.weekly_survey_service.user_exists')
+    def test_get_survey_summary_multiple_ranges(self, mock_find_user, mock_week_rows, mock_summarize):
+        """Test computing several ranges in one call"""
+        mock_find_user.return_value = MagicMock()
+        mock_week_rows.return_value = []
+        mock_summarize.return_value = [
+            self.summary_row(4, completion_count=4, streak_weeks=4, avg_stress=Decimal("2.25")),
+            self.summary_row(12, completion_count=6, streak_weeks=4, avg_stress=Decimal("2.5")),
+            self.summary_row(52, completion_count=13, streak_weeks=4, avg_stress=Decimal("3.1538")),
+        ]
+
+        with patch('src.services.weekly_survey_service.date') as mock_date:
+            mock_date.today.return_value = date(2024, 1, 15)
+
+            result = WeeklySurveyService.get_survey_summary("test_user", 12, ranges=[52, 4])
+
+        mock_summarize.assert_called_once_with("test_user", date(2024, 1, 15), [4, 12, 52])
+        assert result["computed"]["completion_rate"] == 50
+        assert list(result["ranges"]) == ["4", "52"]
+        assert result["ranges"]["4"]["avg_stress"] == 2.2
+        assert result["ranges"]["52"]["avg_stress"] == 3.2
+        assert result["ranges"]["52"]["completion_rate"] == 25
+
+    @patch('src.services.weekly_survey_service.user_exists')
+    def test_get_survey_summary_invalid_range(self, mock_find_user):
+        """Test survey summary with a range beyond the limit"""
+        mock_find_user.return_value = MagicMock()
+
+        with pytest.raises(ValueError):
+            WeeklySurveyService.get_survey_summary("test_user", 12, ranges=[104])
+
+    @patch('src.models.weekly_survey_model.db.session')
+    def test_summarize_ranges_statement(self, mock_db_session):
+        """The summary statement compiles for Postgres with every range in one pass"""
+        WeeklySurvey.summarize_ranges("test_user", date(2024, 1, 15), [4, 12, 52])
+
+        statement, params = mock_db_session.execute.call_args[0]
+        compiled = statement.compile(dialect=postgresql.dialect())
+        sql = " ".join(str(compiled).split())
+
+        assert "ROW_NUMBER() OVER (ORDER BY week_start DESC)" in sql
+        assert "FROM unnest(%(ranges)s::INTEGER[]) AS r(weeks) LEFT JOIN surveys s ON s.weeks_ago < r.weeks" in sql
+        assert "COUNT(*) FILTER (WHERE s.urgent_flag) AS high_alerts" in sql
+        assert "COUNT(*) FILTER (WHERE s.in_streak) AS streak_weeks" in sql
+        for field in WeeklySurvey.SCORE_FIELDS:
+            assert f"AVG(s.{field}) AS avg_{field}, MIN(s.{field}) AS min_{field}, MAX(s.{field}) AS max_{field}" in sql
+        assert "GROUP BY r.weeks ORDER BY r.weeks" in sql
+        assert isinstance(compiled.binds["ranges"].type, ARRAY)
+        assert set(compiled.binds) == set(params)
+        assert params["ranges"] == [4, 12, 52]
+        assert params["max_weeks"] == 52
+        assert params["current_week"] == date(2024, 1, 15)
+
+
+class TestWeeklyTimeline:
+    """Test the joint survey/journal weekly timeline"""
+
+    @staticmethod
+    def timeline_row(week_start, survey=None, entry_count=0, average_sentiment=None, paired_weeks=0, correlation=None):
+        scores = survey or {}
+        return MagicMock(
+            week_start=week_start,
+            urgent_flag=scores.get("urgent_flag"),
+            significant_sleep_issues=scores.get("significant_sleep_issues"),
+            entry_count=entry_count,
+            average_sentiment=average_sentiment,
+            paired_weeks=paired_weeks,
+            **{field: scores.get(field) for field in WeeklySurvey.SCORE_FIELDS},
+            **{f"{field}_correlation": correlation for field in WeeklySurvey.SCORE_FIELDS},
+        )
+
+    @patch('src.services.weekly_survey_service.WeeklySurvey.get_timeline')
+    def test_get_weekly_timeline_merges_weeks(self, mock_get_timeline):
+        survey = {"stress": 2, "anxiety": 1, "depression": 1, "happiness": 4, "satisfaction": 4,
+                  "urgent_flag": False, "significant_sleep_issues": True}
+        mock_get_timeline.return_value = [
+            self.timeline_row(date(2024, 1, 8), entry_count=3, average_sentiment=0.25, paired_weeks=5, correlation=0.81234),
+            self.timeline_row(date(2024, 1, 15), survey, entry_count=0, paired_weeks=5, correlation=0.81234),
+        ]
+
+        with patch('src.services.weekly_survey_service.date') as mock_date:
+            mock_date.today.return_value = date(2024, 1, 17)
+
+            result = WeeklySurveyService.get_weekly_timeline("test_user", 2)
+
+        mock_get_timeline.assert_called_once_with("test_user", date(2024, 1, 8), 2)
+        assert result["weeks"][0]["stress"] is None
+        assert result["weeks"][0]["entry_count"] == 3
+        assert result["weeks"][0]["average_sentiment"] == 0.25
+        assert result["weeks"][1]["happiness"] == 4
+        assert result["weeks"][1]["sleep_issue"] is True
+        assert result["weeks"][1]["average_sentiment"] is None
+        assert result["correlations"]["paired_weeks"] == 5
+        assert result["correlations"]["sentiment"]["happiness"] == 0.812
+
+    @patch('src.services.weekly_survey_service.WeeklySurvey.get_timeline')
+    def test_get_weekly_timeline_too_few_pairs(self, mock_get_timeline):
+        mock_get_timeline.return_value = [
+            self.timeline_row(date(2024, 1, 15), paired_weeks=2, correlation=1.0),
+        ]
+
+        result = WeeklySurveyService.get_weekly_timeline("test_user", 1)
+
+        assert result["correlations"]["sentiment"]["stress"] is None
+
+    def test_get_weekly_timeline_invalid_weeks(self):
+        with pytest.raises(ValueError):
+            WeeklySurveyService.get_weekly_timeline("test_user", 0)
+
+
+class TestMissingWeeks:
+    """Test missing-week detection for the week picker"""
+
+    @patch('src.services.weekly_survey_service.WeeklySurvey.find_missing_weeks')
+    def test_get_missing_weeks_default_range(self, mock_find):
+        mock_find.return_value = [date(2024, 1, 8), date(2023, 12, 4)]
+
+        with patch('src.services.weekly_survey_service.date') as mock_date:
+            mock_date.today.return_value = date(2024, 1, 17)  # Wednesday
+
+            result = WeeklySurveyService.get_missing_weeks("test_user")
+
+        # Current week is skipped before Sunday; 8 weeks back reaches 2023-11-27
+        mock_find.assert_called_once_with("test_user", date(2023, 11, 27), date(2024, 1, 8), 105)
+        assert result == {"missing_weeks": ["2024-01-08", "2023-12-04"], "next_cursor": None}
+
+    @patch('src.services.weekly_survey_service.WeeklySurvey.find_missing_weeks')
+    def test_get_missing_weeks_includes_current_week_on_sunday(self, mock_find):
+        mock_find.return_value = []
+
+        with patch('src.services.weekly_survey_service.date') as mock_date:
+            mock_date.today.return_value = date(2024, 1, 21)  # Sunday
+
+            WeeklySurveyService.get_missing_weeks("test_user")
+
+        assert mock_find.call_args[0][2] == date(2024, 1, 15)
+
+    @patch('src.services.weekly_survey_service.WeeklySurvey.find_missing_weeks')
+    def test_get_missing_weeks_range_and_pages(self, mock_find):
+        mock_find.return_value = [date(2023, 3, 20), date(2023, 3, 13), date(2023, 3, 6)]
+
+        with patch('src.services.weekly_survey_service.date') as mock_date:
+            mock_date.today.return_value = date(2024, 1, 17)
+
+            result = WeeklySurveyService.get_missing_weeks(
+                "test_user", start_date="2023-01-04", end_date="2023-04-01", limit=2
+            )
+
+        mock_find.assert_called_once_with("test_user", date(2023, 1, 2), date(2023, 3, 27), 3)
+        assert result == {"missing_weeks": ["2023-03-20", "2023-03-13"], "next_cursor": "2023-03-13"}
+
+    @patch('src.services.weekly_survey_service.WeeklySurvey.find_missing_weeks')
+    def test_get_missing_weeks_continues_from_cursor(self, mock_find):
+        mock_find.return_value = []
+
+        with patch('src.services.weekly_survey_service.date') as mock_date:
+            mock_date.today.return_value = date(2024, 1, 17)
+
+            WeeklySurveyService.get_missing_weeks("test_user", start_date="2023-01-02", cursor="2023-03-13")
+
+        assert mock_find.call_args[0][1:3] == (date(2023, 1, 2), date(2023, 3, 6))
+
+    def test_get_missing_weeks_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            WeeklySurveyService.get_missing_weeks("test_user", start_date="2023-13-01")
+        with pytest.raises(ValueError):
+            WeeklySurveyService.get_missing_weeks("test_user", start_date="2023-03-01", end_date="2023-01-01")
+        with pytest.raises(ValueError):
+            WeeklySurveyService.get_missing_weeks("test_user", limit=0)
+